@@ -0,0 +1,61 @@
+-- Migration 031: Bitmask columns for activity boundary / anatomy filtering
+--
+-- hard_boundaries and required_bodyparts use small closed taxonomies
+-- (ALLOWED_BOUNDARIES: 8 keys, ALLOWED_BODYPARTS: 3 parts in
+-- src/models/activity.py). Mirroring them as integer bitmasks lets candidate
+-- queries filter with a single AND per row instead of over-fetching and
+-- filtering in Python.
+--
+-- Bit i corresponds to index i of the taxonomy list in the model. The app keeps
+-- the masks in sync on every ORM insert/update; this migration backfills
+-- existing rows. Keys outside the taxonomies have no bit and are still checked
+-- in Python.
+-- ============================================================================
+
+ALTER TABLE activities
+  ADD COLUMN IF NOT EXISTS boundary_mask INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE activities
+  ADD COLUMN IF NOT EXISTS active_bodypart_mask INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE activities
+  ADD COLUMN IF NOT EXISTS partner_bodypart_mask INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from the JSONB columns
+UPDATE activities SET
+  boundary_mask =
+      (CASE WHEN hard_boundaries ? 'hardBoundaryImpact'      THEN 1   ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryRestrain'    THEN 2   ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryBreath'      THEN 4   ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryDegrade'     THEN 8   ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryPublic'      THEN 16  ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryRecord'      THEN 32  ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryAnal'        THEN 64  ELSE 0 END)
+    | (CASE WHEN hard_boundaries ? 'hardBoundaryWatersports' THEN 128 ELSE 0 END),
+  active_bodypart_mask =
+      (CASE WHEN required_bodyparts->'active' ? 'penis'   THEN 1 ELSE 0 END)
+    | (CASE WHEN required_bodyparts->'active' ? 'vagina'  THEN 2 ELSE 0 END)
+    | (CASE WHEN required_bodyparts->'active' ? 'breasts' THEN 4 ELSE 0 END),
+  partner_bodypart_mask =
+      (CASE WHEN required_bodyparts->'partner' ? 'penis'   THEN 1 ELSE 0 END)
+    | (CASE WHEN required_bodyparts->'partner' ? 'vagina'  THEN 2 ELSE 0 END)
+    | (CASE WHEN required_bodyparts->'partner' ? 'breasts' THEN 4 ELSE 0 END);
+
+-- Indexes used by the candidate query
+CREATE INDEX IF NOT EXISTS idx_activities_boundary_mask
+  ON activities (boundary_mask);
+
+CREATE INDEX IF NOT EXISTS idx_activities_active_bodypart_mask
+  ON activities (active_bodypart_mask);
+
+CREATE INDEX IF NOT EXISTS idx_activities_partner_bodypart_mask
+  ON activities (partner_bodypart_mask);
+
+-- ============================================================================
+-- Migration 031 complete
+--
+-- Verification:
+-- SELECT activity_id, hard_boundaries, boundary_mask, required_bodyparts,
+--        active_bodypart_mask, partner_bodypart_mask
+-- FROM activities WHERE boundary_mask <> 0 OR active_bodypart_mask <> 0 LIMIT 20;
+-- ============================================================================
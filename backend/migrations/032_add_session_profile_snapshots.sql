@@ -0,0 +1,21 @@
+-- Migration 032: Session-scoped profile snapshots
+--
+-- Turn generation used to load both players' full profiles on every card.
+-- The scoring-relevant fields (activities, power_dynamic, domain_scores,
+-- arousal_propensity, boundaries, anatomy) are now snapshotted on the session
+-- and reused until the underlying profile's updated_at changes.
+--
+-- Shape: {"<player id>": {"id": <profile id>, "updated_at": "<iso>", ...fields}}
+-- The app fills the column lazily; no backfill is needed.
+-- ============================================================================
+
+ALTER TABLE sessions
+  ADD COLUMN IF NOT EXISTS profile_snapshots JSONB;
+
+-- ============================================================================
+-- Migration 032 complete
+--
+-- Verification:
+-- SELECT session_id, jsonb_object_keys(profile_snapshots)
+-- FROM sessions WHERE profile_snapshots IS NOT NULL LIMIT 20;
+-- ============================================================================
@@ -0,0 +1,17 @@
+-- Migration 033: Index for per-player recent-activity lookups
+--
+-- Repetition prevention keeps an in-process buffer of each player's last 100
+-- activities as primary (src/game/recency.py). A cache miss loads it with
+--   SELECT activity_id FROM user_activity_history
+--   WHERE primary_player_id = $1 AND activity_id IS NOT NULL
+--   ORDER BY presented_at DESC, id DESC LIMIT 100;
+-- Session buffers use the existing idx_activity_history_session index.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_activity_history_primary_player_presented
+  ON user_activity_history (primary_player_id, presented_at DESC)
+  WHERE primary_player_id IS NOT NULL;
+
+-- ============================================================================
+-- Migration 033 complete
+-- ============================================================================
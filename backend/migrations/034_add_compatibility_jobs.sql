@@ -0,0 +1,46 @@
+-- Migration 034: Compatibility job queue
+--
+-- Accepting a partner connection used to calculate compatibility inside the
+-- HTTP request. The request now enqueues a job here and
+-- scripts/run_compatibility_worker.py calculates the result, upserts
+-- compatibility_results and sends the acceptance push notification.
+--
+-- One row per profile pair (lower id first, like compatibility_results):
+-- re-enqueueing a pair reuses its row. GET /api/compatibility reports
+-- "pending" while the pair's job is queued or running.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS compatibility_jobs (
+  id                   SERIAL PRIMARY KEY,
+  player_a_id          INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  player_b_id          INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  requester_profile_id INTEGER NOT NULL,
+  status               VARCHAR(16) NOT NULL DEFAULT 'queued',  -- queued, running, done, failed
+  attempts             INTEGER NOT NULL DEFAULT 0,
+  max_attempts         INTEGER NOT NULL DEFAULT 3,
+  last_error           TEXT,
+  run_after            TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at            TIMESTAMP,
+  notification         JSONB,
+  created_at           TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at           TIMESTAMP NOT NULL DEFAULT NOW(),
+  completed_at         TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_compatibility_jobs_pair
+  ON compatibility_jobs (player_a_id, player_b_id);
+
+-- Worker poll: due queued jobs
+CREATE INDEX IF NOT EXISTS idx_compatibility_jobs_queue
+  ON compatibility_jobs (status, run_after);
+
+-- RLS: service role only (no client access)
+ALTER TABLE compatibility_jobs ENABLE ROW LEVEL SECURITY;
+-- No policies - service role bypasses RLS automatically
+
+-- ============================================================================
+-- Migration 034 complete
+--
+-- Verification:
+-- SELECT status, COUNT(*) FROM compatibility_jobs GROUP BY status;
+-- ============================================================================
@@ -0,0 +1,42 @@
+-- Migration 035: Compatibility fan-out jobs
+--
+-- A survey retake rewrites the user's profile in place, leaving every stored
+-- compatibility_results row with their partners stale. Profile writes now
+-- enqueue one fan-out job per user; scripts/run_compatibility_worker.py
+-- re-scores the user against all accepted partners in one batch.
+--
+-- One row per user. Enqueueing again pushes run_after back by the debounce
+-- window (app_config compatibility_fanout_debounce_seconds, default 60), so
+-- repeated retakes trigger one re-score. requested_at lets a running job see
+-- a retake that arrived mid-run and queue itself again.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS compatibility_fanout_jobs (
+  id            SERIAL PRIMARY KEY,
+  user_id       UUID NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+  status        VARCHAR(16) NOT NULL DEFAULT 'queued',  -- queued, running, done, failed
+  attempts      INTEGER NOT NULL DEFAULT 0,
+  max_attempts  INTEGER NOT NULL DEFAULT 3,
+  last_error    TEXT,
+  requested_at  TIMESTAMP NOT NULL DEFAULT NOW(),
+  run_after     TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at     TIMESTAMP,
+  created_at    TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at    TIMESTAMP NOT NULL DEFAULT NOW(),
+  completed_at  TIMESTAMP
+);
+
+-- Worker poll: due queued jobs
+CREATE INDEX IF NOT EXISTS idx_compatibility_fanout_jobs_queue
+  ON compatibility_fanout_jobs (status, run_after);
+
+-- RLS: service role only (no client access)
+ALTER TABLE compatibility_fanout_jobs ENABLE ROW LEVEL SECURITY;
+-- No policies - service role bypasses RLS automatically
+
+-- ============================================================================
+-- Migration 035 complete
+--
+-- Verification:
+-- SELECT status, COUNT(*) FROM compatibility_fanout_jobs GROUP BY status;
+-- ============================================================================
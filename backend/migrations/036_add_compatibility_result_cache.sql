@@ -0,0 +1,35 @@
+-- Migration 036: Content-addressed survey compatibility result cache
+--
+-- GET /api/survey/compatibility/<source_id>/<target_id> recalculated the
+-- result (and, without a stored derived profile, both profiles) on every
+-- request. Results are now cached under a sha256 of both submission ids, a
+-- hash of each submission's derived payload (or answers) and the calculator
+-- version. The key is also the response's strong ETag.
+--
+-- Keys change whenever an input changes, so rows never need invalidation;
+-- old calculation_version rows can be pruned at any time. The app keeps an
+-- in-process LRU in front of this table and works without it (app_config
+-- survey_compatibility_db_cache = 0 disables the table tier).
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS compatibility_result_cache (
+  cache_key            VARCHAR(64) PRIMARY KEY,
+  result               JSONB NOT NULL,
+  calculation_version  VARCHAR(16) NOT NULL,
+  created_at           TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Pruning superseded calculator versions
+CREATE INDEX IF NOT EXISTS idx_compatibility_result_cache_version
+  ON compatibility_result_cache (calculation_version);
+
+-- RLS: service role only (no client access)
+ALTER TABLE compatibility_result_cache ENABLE ROW LEVEL SECURITY;
+-- No policies - service role bypasses RLS automatically
+
+-- ============================================================================
+-- Migration 036 complete
+--
+-- Verification:
+-- SELECT calculation_version, COUNT(*) FROM compatibility_result_cache GROUP BY 1;
+-- ============================================================================
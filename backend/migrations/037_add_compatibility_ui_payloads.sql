@@ -0,0 +1,56 @@
+-- Migration 037: Materialized compatibility UI payloads
+--
+-- GET /api/compatibility/<user_id>/<partner_id>/ui loaded both users and
+-- both latest profiles and rebuilt the radar domains, arousal comparison and
+-- interest tags on every request. The payload is now built when the
+-- compatibility record is written and stored once per viewer; the endpoint
+-- reads one row by (viewer, partner) and applies the partner's sharing
+-- setting as a projection.
+--
+-- compatibility_results.version is bumped on every rewrite of a record and
+-- feeds the endpoint's ETag. Sharing setting and display name changes are
+-- written through to the partner's rows in place; a survey retake drops the
+-- user's rows until the re-score writes them again. Existing records are
+-- materialized lazily on first view, so no backfill is needed.
+-- ============================================================================
+
+ALTER TABLE compatibility_results
+  ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+CREATE TABLE IF NOT EXISTS compatibility_ui_payloads (
+  id                    SERIAL PRIMARY KEY,
+  viewer_user_id        UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  partner_user_id       UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  viewer_profile_id     INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  partner_profile_id    INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  compatibility_id      INTEGER NOT NULL REFERENCES compatibility_results(id) ON DELETE CASCADE,
+  record_version        INTEGER NOT NULL,
+  sharing_setting       VARCHAR(32) NOT NULL,  -- partner's profile_sharing_setting
+  partner_display_name  VARCHAR(255),
+  payload               JSONB NOT NULL,        -- unrestricted view, projected on read
+  updated_at            TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Endpoint read: one row per (viewer, partner)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_compatibility_ui_payloads_viewer
+  ON compatibility_ui_payloads (viewer_user_id, partner_user_id);
+
+-- Sharing setting / display name write-through
+CREATE INDEX IF NOT EXISTS idx_compatibility_ui_payloads_partner
+  ON compatibility_ui_payloads (partner_user_id);
+
+CREATE INDEX IF NOT EXISTS ix_compatibility_ui_payloads_compatibility_id
+  ON compatibility_ui_payloads (compatibility_id);
+
+-- RLS: service role only (no client access)
+-- Payloads hold the unrestricted view; sharing settings apply only on read
+ALTER TABLE compatibility_ui_payloads ENABLE ROW LEVEL SECURITY;
+-- No policies - service role bypasses RLS automatically
+
+-- ============================================================================
+-- Migration 037 complete
+--
+-- Verification:
+-- SELECT sharing_setting, COUNT(*) FROM compatibility_ui_payloads GROUP BY 1;
+-- SELECT MAX(version) FROM compatibility_results;
+-- ============================================================================
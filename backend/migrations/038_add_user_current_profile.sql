@@ -0,0 +1,51 @@
+-- Migration 038: Current profile pointer on users
+--
+-- Hot paths (compatibility routes, partner acceptance, profile UI, re-score
+-- scripts) found a user's latest profile with
+--   SELECT ... FROM profiles WHERE user_id = ? ORDER BY created_at DESC LIMIT 1
+-- once per user. users.current_profile_id is now set in the same transaction
+-- as the profile write (survey submit, process_submission), turning the
+-- lookup into a primary-key fetch and allowing one join for many users
+-- (repository.get_current_profiles). Users without the pointer fall back to
+-- the ORDER BY lookup.
+-- ============================================================================
+
+ALTER TABLE users
+  ADD COLUMN IF NOT EXISTS current_profile_id INTEGER;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'fk_users_current_profile'
+    ) THEN
+        ALTER TABLE users
+        ADD CONSTRAINT fk_users_current_profile
+        FOREIGN KEY (current_profile_id) REFERENCES profiles(id) ON DELETE SET NULL;
+    END IF;
+END $$;
+
+-- ON DELETE SET NULL lookups when profiles are deleted
+CREATE INDEX IF NOT EXISTS idx_users_current_profile
+  ON users (current_profile_id);
+
+-- Backfill: latest profile per user (same order as the old lookup)
+UPDATE users u
+SET current_profile_id = latest.id
+FROM (
+  SELECT DISTINCT ON (user_id) user_id, id
+  FROM profiles
+  WHERE user_id IS NOT NULL
+  ORDER BY user_id, created_at DESC, id DESC
+) latest
+WHERE latest.user_id = u.id
+  AND u.current_profile_id IS DISTINCT FROM latest.id;
+
+-- ============================================================================
+-- Migration 038 complete
+--
+-- Verification (should be 0):
+-- SELECT COUNT(*) FROM users u
+-- WHERE EXISTS (SELECT 1 FROM profiles p WHERE p.user_id = u.id)
+--   AND u.current_profile_id IS NULL;
+-- ============================================================================
@@ -0,0 +1,47 @@
+-- Migration 039: Anonymous activity usage counters
+--
+-- Every gameplay limit check for an anonymous player ran
+--   SELECT COUNT(*) FROM user_activity_history
+--   WHERE anonymous_session_id = ? AND presented_at > now() - 24h
+-- several times per /api/game/<id>/next. Charges now add to an hourly
+-- bucket per anonymous session; usage is the sum of the buckets in the last
+-- 24 hours (services/entitlements.py). Buckets older than the window are
+-- deleted by CleanupService.
+--
+-- Authenticated users are charged with a single
+--   UPDATE users SET lifetime_activity_count = lifetime_activity_count + 1
+--   ... RETURNING lifetime_activity_count
+-- which needs no schema change.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS anonymous_activity_usage (
+  anonymous_session_id  VARCHAR(255) NOT NULL,
+  bucket_start          TIMESTAMP NOT NULL,    -- UTC, truncated to the hour
+  activity_count        INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (anonymous_session_id, bucket_start)
+);
+
+-- Cleanup of buckets that have left the window
+CREATE INDEX IF NOT EXISTS idx_anonymous_activity_usage_bucket
+  ON anonymous_activity_usage (bucket_start);
+
+-- RLS: service role only (no client access)
+-- Clients must not reset the counters the free-tier limit is read from
+ALTER TABLE anonymous_activity_usage ENABLE ROW LEVEL SECURITY;
+-- No policies - service role bypasses RLS automatically
+
+-- Backfill: the last 24h of anonymous history, so limits carry over
+INSERT INTO anonymous_activity_usage (anonymous_session_id, bucket_start, activity_count)
+SELECT anonymous_session_id, date_trunc('hour', presented_at), COUNT(*)
+FROM user_activity_history
+WHERE anonymous_session_id IS NOT NULL
+  AND presented_at > NOW() - INTERVAL '24 hours'
+GROUP BY 1, 2
+ON CONFLICT (anonymous_session_id, bucket_start) DO NOTHING;
+
+-- ============================================================================
+-- Migration 039 complete
+--
+-- Verification:
+-- SELECT COUNT(DISTINCT anonymous_session_id), SUM(activity_count) FROM anonymous_activity_usage;
+-- ============================================================================
@@ -0,0 +1,22 @@
+-- Migration 040: Per-session turn seed
+--
+-- Turn generation drew its truth/dare choice, RANDOM-mode player rotation
+-- and candidate sampling from the process-wide random module, so a session's
+-- queue could not be recomputed. Every random choice for a turn now comes
+-- from a generator derived from (turn_seed, step) (game/turn_rng.py): the
+-- same seed, step and exclusions give the same card on any worker.
+--
+-- Sessions created before this migration get a seed on their next queue
+-- refill; no backfill is needed.
+-- ============================================================================
+
+ALTER TABLE sessions
+  ADD COLUMN IF NOT EXISTS turn_seed BIGINT;
+
+-- ============================================================================
+-- Migration 040 complete
+--
+-- Verification:
+-- SELECT COUNT(*) FILTER (WHERE turn_seed IS NULL) AS unseeded, COUNT(*) AS total
+-- FROM sessions WHERE status = 'active';
+-- ============================================================================
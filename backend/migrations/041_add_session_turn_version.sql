@@ -0,0 +1,24 @@
+-- Migration 041: Session turn version for optimistic concurrency
+--
+-- /api/game/<id>/next read current_turn_state, popped the head, refilled
+-- and wrote the whole state back. Two concurrent calls for one session
+-- (double tap, two devices in a group game) both popped the same card and
+-- charged it twice, and the last commit silently won.
+--
+-- turn_version counts advances. /next writes its state with
+--   UPDATE sessions SET current_turn_state = ..., turn_version = turn_version + 1
+--   WHERE session_id = ? AND turn_version = <version it read>
+-- and, if no row matched, rolls back (history row and charge included) and
+-- returns the state the winning request wrote. Background prefetch writes
+-- with the same check but does not bump the version.
+-- ============================================================================
+
+ALTER TABLE sessions
+  ADD COLUMN IF NOT EXISTS turn_version INTEGER NOT NULL DEFAULT 0;
+
+-- ============================================================================
+-- Migration 041 complete
+--
+-- Verification:
+-- SELECT turn_version, COUNT(*) FROM sessions GROUP BY turn_version ORDER BY 1 LIMIT 20;
+-- ============================================================================
@@ -0,0 +1,15 @@
+-- Rollback for Migration 031: Remove activity filter bitmask columns
+-- ============================================================================
+
+DROP INDEX IF EXISTS idx_activities_boundary_mask;
+DROP INDEX IF EXISTS idx_activities_active_bodypart_mask;
+DROP INDEX IF EXISTS idx_activities_partner_bodypart_mask;
+
+ALTER TABLE activities DROP COLUMN IF EXISTS boundary_mask;
+ALTER TABLE activities DROP COLUMN IF EXISTS active_bodypart_mask;
+ALTER TABLE activities DROP COLUMN IF EXISTS partner_bodypart_mask;
+
+-- ============================================================================
+-- Rollback complete. Candidate filtering falls back to the JSONB columns only
+-- after the application code is rolled back as well.
+-- ============================================================================
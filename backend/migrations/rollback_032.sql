@@ -0,0 +1,9 @@
+-- Rollback for Migration 032: Remove session profile snapshots
+-- ============================================================================
+
+ALTER TABLE sessions DROP COLUMN IF EXISTS profile_snapshots;
+
+-- ============================================================================
+-- Rollback complete. Roll back the application code as well; it reads and
+-- writes sessions.profile_snapshots on every queue refill.
+-- ============================================================================
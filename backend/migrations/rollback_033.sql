@@ -0,0 +1,8 @@
+-- Rollback for Migration 033: Remove per-player recent-activity index
+-- ============================================================================
+
+DROP INDEX IF EXISTS idx_activity_history_primary_player_presented;
+
+-- ============================================================================
+-- Rollback complete
+-- ============================================================================
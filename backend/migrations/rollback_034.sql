@@ -0,0 +1,9 @@
+-- Rollback for Migration 034: Remove the compatibility job queue
+-- ============================================================================
+
+DROP TABLE IF EXISTS compatibility_jobs;
+
+-- ============================================================================
+-- Rollback complete. Roll back the application code as well; accepting a
+-- partner connection enqueues into compatibility_jobs.
+-- ============================================================================
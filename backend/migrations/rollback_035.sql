@@ -0,0 +1,9 @@
+-- Rollback for Migration 035: Remove compatibility fan-out jobs
+-- ============================================================================
+
+DROP TABLE IF EXISTS compatibility_fanout_jobs;
+
+-- ============================================================================
+-- Rollback complete. Roll back the application code as well; survey
+-- submission enqueues into compatibility_fanout_jobs.
+-- ============================================================================
@@ -0,0 +1,10 @@
+-- Rollback for Migration 036: Remove the survey compatibility result cache
+-- ============================================================================
+
+DROP TABLE IF EXISTS compatibility_result_cache;
+
+-- ============================================================================
+-- Rollback complete. The application can stay deployed: with the table gone
+-- the cache logs a warning per miss and serves from the in-process tier.
+-- Set app_config survey_compatibility_db_cache = 0 to silence it.
+-- ============================================================================
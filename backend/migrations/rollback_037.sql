@@ -0,0 +1,11 @@
+-- Rollback for Migration 037: Remove materialized compatibility UI payloads
+-- ============================================================================
+
+DROP TABLE IF EXISTS compatibility_ui_payloads;
+
+ALTER TABLE compatibility_results DROP COLUMN IF EXISTS version;
+
+-- ============================================================================
+-- Rollback complete. Redeploy the previous application version first: the
+-- current one reads compatibility_results.version.
+-- ============================================================================
@@ -0,0 +1,13 @@
+-- Rollback for Migration 038: Remove the current profile pointer
+-- ============================================================================
+
+DROP INDEX IF EXISTS idx_users_current_profile;
+
+ALTER TABLE users DROP CONSTRAINT IF EXISTS fk_users_current_profile;
+
+ALTER TABLE users DROP COLUMN IF EXISTS current_profile_id;
+
+-- ============================================================================
+-- Rollback complete. Redeploy the previous application version first: the
+-- current one reads users.current_profile_id.
+-- ============================================================================
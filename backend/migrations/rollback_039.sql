@@ -0,0 +1,9 @@
+-- Rollback for Migration 039: Remove anonymous activity usage counters
+-- ============================================================================
+
+DROP TABLE IF EXISTS anonymous_activity_usage;
+
+-- ============================================================================
+-- Rollback complete. Redeploy the previous application version first: the
+-- current one reads and writes anonymous_activity_usage.
+-- ============================================================================
@@ -0,0 +1,9 @@
+-- Rollback for Migration 040: Remove the per-session turn seed
+-- ============================================================================
+
+ALTER TABLE sessions DROP COLUMN IF EXISTS turn_seed;
+
+-- ============================================================================
+-- Rollback complete. Roll back the application code as well; it reads and
+-- writes sessions.turn_seed on every queue refill.
+-- ============================================================================
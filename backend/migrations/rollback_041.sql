@@ -0,0 +1,9 @@
+-- Rollback for Migration 041: Remove the session turn version
+-- ============================================================================
+
+ALTER TABLE sessions DROP COLUMN IF EXISTS turn_version;
+
+-- ============================================================================
+-- Rollback complete. Roll back the application code as well; /next and the
+-- prefetch worker compare-and-swap on sessions.turn_version.
+-- ============================================================================
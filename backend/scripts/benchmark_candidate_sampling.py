@@ -0,0 +1,119 @@
+"""
+Benchmark random candidate sampling strategies on a seeded activity bank.
+
+Compares:
+  - order_by_random: the previous `ORDER BY random() LIMIT k` query
+  - id_sample:       repository.sample_activities (ids without ORDER BY, sample, load by pk)
+  - bank_sample:     random.sample over an in-memory bank partition
+
+Usage:
+    python backend/scripts/benchmark_candidate_sampling.py [--activities 20000] [--k 150] [--runs 50]
+
+Uses an in-memory SQLite database by default; set BENCHMARK_DATABASE_URL to
+run against a scratch Postgres database (the activities table is created and
+the seeded rows are deleted afterwards).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from flask import Flask
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from backend.src.extensions import db
+from backend.src.models.activity import Activity
+from backend.src.db.activity_bank import ActivityBank, BankActivity, _BANK_COLUMNS
+from backend.src.db.repository import sample_activities
+
+
+@compiles(JSONB, 'sqlite')
+def _compile_jsonb(element, compiler, **kw):
+    return compiler.visit_JSON(element, **kw)
+
+
+SEED_ID_BASE = 9_000_000
+
+
+def _seed(count: int, rng: random.Random) -> None:
+    rows = []
+    for i in range(count):
+        rows.append(Activity(
+            activity_id=SEED_ID_BASE + i,
+            type=rng.choice(['truth', 'dare']),
+            rating=rng.choice(['G', 'R', 'X']),
+            intensity=rng.randint(1, 5),
+            audience_scope=rng.choice(['couples', 'groups', 'all']),
+            script={'steps': [{'actor': 'A', 'do': f'Benchmark activity {i}'}]},
+            preference_keys=['massage_give', 'massage_receive'],
+        ))
+    db.session.bulk_save_objects(rows)
+    db.session.commit()
+
+
+def _filtered_query():
+    return Activity.query.filter(
+        Activity.is_active == True,
+        Activity.approved == True,
+        Activity.rating == 'R',
+        Activity.type == 'truth',
+        Activity.intensity >= 2,
+        Activity.intensity <= 4,
+        Activity.audience_scope.in_(['couples', 'all']),
+    )
+
+
+def _time(label: str, fn, runs: int) -> None:
+    fn()  # Warm-up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<18} median {statistics.median(samples):8.2f} ms   "
+          f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--activities', type=int, default=20000)
+    parser.add_argument('--k', type=int, default=150)
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('BENCHMARK_DATABASE_URL', 'sqlite:///:memory:')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        Activity.__table__.create(db.engine, checkfirst=True)
+        _seed(args.activities, random.Random(42))
+        try:
+            matching = _filtered_query().count()
+            print(f"Seeded {args.activities} activities; {matching} match the filter; k={args.k}\n")
+
+            rows = db.session.query(*_BANK_COLUMNS).filter(
+                Activity.is_active == True, Activity.approved == True
+            ).all()
+            bank = ActivityBank([BankActivity(tuple(row)) for row in rows], version=None)
+
+            _time('order_by_random', lambda: _filtered_query().order_by(db.func.random()).limit(args.k).all(), args.runs)
+            _time('id_sample', lambda: sample_activities(_filtered_query(), args.k), args.runs)
+            _time('bank_sample', lambda: random.sample(
+                bank.candidates('R', 2, 4, activity_type='truth'), min(args.k, matching)
+            ), args.runs)
+        finally:
+            Activity.query.filter(Activity.activity_id >= SEED_ID_BASE).delete()
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+Benchmark the compiled directional key table against per-call suffix matching.
+
+Times the calculator hot path with the previous string-based implementations
+(endswith / str.replace / special cases, copied below) and with the current
+ones that look pairs up in scoring.directional.DIRECTIONAL_KEYS:
+  - calculate_asymmetric_directional_jaccard (Top/Bottom pairs, per category)
+  - calculate_same_pole_jaccard (Top/Top and Bottom/Bottom pairs, per category)
+  - score_mutual_interest (activity preference keys, recommender)
+
+Profiles are built from random survey answers with convert_activities, so
+every category carries the full survey key set.
+
+Usage:
+    python backend/scripts/benchmark_directional_pairs.py [--profiles 200] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from backend.src.compatibility.calculator import (
+    calculate_asymmetric_directional_jaccard,
+    calculate_same_pole_jaccard,
+)
+from backend.src.recommender.scoring import score_mutual_interest
+from backend.src.scoring.activities import convert_activities
+from backend.src.scoring.directional import ACTIVITY_LAYOUT
+
+
+QUESTION_IDS = [f'B{i}{part}' for i in range(1, 29) for part in ('', 'a', 'b')]
+
+
+# Previous implementations (string matching on every call)
+
+def legacy_calculate_asymmetric_directional_jaccard(top_activities: Dict[str, float], bottom_activities: Dict[str, float]) -> float:
+    keys = set(list(top_activities.keys()) + list(bottom_activities.keys()))
+    primary_matches = 0
+    primary_potential = 0
+    secondary_matches = 0
+    secondary_potential = 0
+    non_directional_matches = 0
+    non_directional_potential = 0
+    processed_keys = set()
+    for key in keys:
+        if key in processed_keys:
+            continue
+        top_val = top_activities.get(key, 0)
+        bottom_val = bottom_activities.get(key, 0)
+        if key.endswith('_give'):
+            processed_keys.add(key)
+            receive_key = key.replace('_give', '_receive')
+            processed_keys.add(receive_key)
+            bottom_receive_val = bottom_activities.get(receive_key, 0)
+            top_receive_val = top_activities.get(receive_key, 0)
+            primary_potential += 1
+            if top_val >= 0.5 and bottom_receive_val >= 0.5:
+                primary_matches += 1
+            elif top_val < 0.5 and bottom_receive_val < 0.5:
+                primary_matches += 1
+            secondary_potential += 1
+            if bottom_val >= 0.5 and top_receive_val >= 0.5:
+                secondary_matches += 1
+            elif bottom_val < 0.5 and top_receive_val < 0.5:
+                secondary_matches += 1
+            elif bottom_val >= 0.5 and top_receive_val < 0.5:
+                secondary_matches += 0.5
+        elif key.endswith('_self'):
+            if key in ['stripping_self', 'solo_pleasure_self']:
+                continue
+            processed_keys.add(key)
+            watching_key = key.replace('_self', '_watching')
+            processed_keys.add(watching_key)
+            top_watching_val = top_activities.get(watching_key, 0)
+            bottom_watching_val = bottom_activities.get(watching_key, 0)
+            if bottom_val >= 0.5 or top_watching_val >= 0.5:
+                primary_potential += 1
+                if bottom_val >= 0.5 and top_watching_val >= 0.5:
+                    primary_matches += 1
+            if top_val >= 0.5 or bottom_watching_val >= 0.5:
+                secondary_potential += 1
+                if top_val >= 0.5 and bottom_watching_val >= 0.5:
+                    secondary_matches += 1
+                elif top_val >= 0.5 and bottom_watching_val < 0.5:
+                    secondary_matches += 0.5
+        elif key == 'watching_strip':
+            processed_keys.add(key)
+            self_key = 'stripping_self'
+            processed_keys.add(self_key)
+            top_self_val = top_activities.get(self_key, 0)
+            bottom_self_val = bottom_activities.get(self_key, 0)
+            if bottom_self_val >= 0.5 or top_val >= 0.5:
+                primary_potential += 1
+                if bottom_self_val >= 0.5 and top_val >= 0.5:
+                    primary_matches += 1
+            if top_self_val >= 0.5 or bottom_val >= 0.5:
+                secondary_potential += 1
+                if top_self_val >= 0.5 and bottom_val >= 0.5:
+                    secondary_matches += 1
+                elif top_self_val >= 0.5 and bottom_val < 0.5:
+                    secondary_matches += 0.5
+        elif key == 'watching_solo_pleasure':
+            processed_keys.add(key)
+            self_key = 'solo_pleasure_self'
+            processed_keys.add(self_key)
+            top_self_val = top_activities.get(self_key, 0)
+            bottom_self_val = bottom_activities.get(self_key, 0)
+            if bottom_self_val >= 0.5 or top_val >= 0.5:
+                primary_potential += 1
+                if bottom_self_val >= 0.5 and top_val >= 0.5:
+                    primary_matches += 1
+            if top_self_val >= 0.5 or bottom_val >= 0.5:
+                secondary_potential += 1
+                if top_self_val >= 0.5 and bottom_val >= 0.5:
+                    secondary_matches += 1
+                elif top_self_val >= 0.5 and bottom_val < 0.5:
+                    secondary_matches += 0.5
+        elif not key.endswith('_receive') and (not key.endswith('_watching')):
+            processed_keys.add(key)
+            non_directional_potential += 1
+            if top_val >= 0.5 and bottom_val >= 0.5 or (top_val < 0.5 and bottom_val < 0.5):
+                non_directional_matches += 1
+    total_matches = primary_matches * 0.8 + secondary_matches * 0.2 + non_directional_matches
+    total_potential = primary_potential * 0.8 + secondary_potential * 0.2 + non_directional_potential
+    if total_potential == 0:
+        return 0.5
+    return total_matches / total_potential
+
+
+def legacy_calculate_same_pole_jaccard(activities_a: Dict[str, float], activities_b: Dict[str, float]) -> float:
+    keys = set(list(activities_a.keys()) + list(activities_b.keys()))
+    compatible_interactions = 0
+    total_possible_interactions = 0
+    for key in keys:
+        val_a = activities_a.get(key, 0)
+        val_b = activities_b.get(key, 0)
+        if key.endswith('_give'):
+            receive_key = key.replace('_give', '_receive')
+            receive_a = activities_a.get(receive_key, 0)
+            receive_b = activities_b.get(receive_key, 0)
+            if val_a >= 0.5 or val_b >= 0.5:
+                total_possible_interactions += 1
+                if (val_a >= 0.5 and receive_a >= 0.5) and (val_b >= 0.5 and receive_b < 0.5):
+                    compatible_interactions += 0.3
+                elif (val_a >= 0.5 and receive_a < 0.5) and (val_b >= 0.5 and receive_b >= 0.5):
+                    compatible_interactions += 0.3
+                elif (val_a >= 0.5 and receive_a >= 0.5) and (val_b >= 0.5 and receive_b >= 0.5):
+                    compatible_interactions += 0.5
+        elif not key.endswith('_receive') and (not key.endswith('_watching')):
+            if val_a >= 0.5 and val_b >= 0.5:
+                compatible_interactions += 1.0
+            if val_a >= 0.5 or val_b >= 0.5:
+                total_possible_interactions += 1
+    if total_possible_interactions == 0:
+        return 0
+    return compatible_interactions / total_possible_interactions
+
+
+def legacy_score_mutual_interest(activity_preference_keys: List[str], player_a_activities: Dict[str, float], player_b_activities: Dict[str, float]) -> float:
+    if not activity_preference_keys:
+        return 0.5
+    scores = []
+    processed_keys = set()
+    for pref_key in activity_preference_keys:
+        if pref_key in processed_keys:
+            continue
+        score_a = player_a_activities.get(pref_key, 0.5)
+        score_b = player_b_activities.get(pref_key, 0.5)
+        is_directional_pair = False
+        complementary_score = None
+        if pref_key.endswith('_give'):
+            receive_key = pref_key.replace('_give', '_receive')
+            if receive_key in activity_preference_keys:
+                processed_keys.add(pref_key)
+                processed_keys.add(receive_key)
+                is_directional_pair = True
+                score_a_receive = player_a_activities.get(receive_key, 0.5)
+                score_b_receive = player_b_activities.get(receive_key, 0.5)
+                comp1 = min(score_a, score_b_receive)
+                comp2 = min(score_b, score_a_receive)
+                complementary_score = max(comp1, comp2)
+        elif pref_key.endswith('_self'):
+            watching_key = pref_key.replace('_self', '_watching')
+            if pref_key == 'stripping_self':
+                watching_key = 'watching_strip'
+            elif pref_key == 'solo_pleasure_self':
+                watching_key = 'watching_solo_pleasure'
+            if watching_key in activity_preference_keys:
+                processed_keys.add(pref_key)
+                processed_keys.add(watching_key)
+                is_directional_pair = True
+                score_a_watching = player_a_activities.get(watching_key, 0.5)
+                score_b_watching = player_b_activities.get(watching_key, 0.5)
+                comp1 = min(score_a, score_b_watching)
+                comp2 = min(score_b, score_a_watching)
+                complementary_score = max(comp1, comp2)
+        elif pref_key == 'watching_strip':
+            self_key = 'stripping_self'
+            if self_key in activity_preference_keys:
+                processed_keys.add(pref_key)
+                processed_keys.add(self_key)
+                is_directional_pair = True
+                score_a_self = player_a_activities.get(self_key, 0.5)
+                score_b_self = player_b_activities.get(self_key, 0.5)
+                comp1 = min(score_a, score_b_self)
+                comp2 = min(score_b, score_a_self)
+                complementary_score = max(comp1, comp2)
+        elif pref_key == 'watching_solo_pleasure':
+            self_key = 'solo_pleasure_self'
+            if self_key in activity_preference_keys:
+                processed_keys.add(pref_key)
+                processed_keys.add(self_key)
+                is_directional_pair = True
+                score_a_self = player_a_activities.get(self_key, 0.5)
+                score_b_self = player_b_activities.get(self_key, 0.5)
+                comp1 = min(score_a, score_b_self)
+                comp2 = min(score_b, score_a_self)
+                complementary_score = max(comp1, comp2)
+        if is_directional_pair and complementary_score is not None:
+            if complementary_score >= 0.7:
+                scores.append(1.0)
+            elif complementary_score >= 0.5:
+                scores.append(0.8)
+            elif complementary_score >= 0.3:
+                scores.append(0.6)
+            else:
+                scores.append(0.3)
+            continue
+        processed_keys.add(pref_key)
+        if score_a >= 0.7 and score_b >= 0.7:
+            scores.append(1.0)
+        elif score_a >= 0.7 and 0.3 <= score_b < 0.7 or (score_b >= 0.7 and 0.3 <= score_a < 0.7):
+            scores.append(0.6)
+        elif 0.3 <= score_a < 0.7 and 0.3 <= score_b < 0.7:
+            scores.append(0.4)
+        elif score_a >= 0.7 and score_b < 0.3 or (score_b >= 0.7 and score_a < 0.3):
+            scores.append(0.1)
+        else:
+            scores.append(0.0)
+    return sum(scores) / len(scores) if scores else 0.5
+
+
+
+def _profiles(count: int, rng: random.Random) -> List[Dict[str, Dict[str, float]]]:
+    return [
+        convert_activities({qid: rng.choice(['Y', 'M', 'N']) for qid in QUESTION_IDS})
+        for _ in range(count)
+    ]
+
+
+def _preference_key_sets(count: int, rng: random.Random) -> List[List[str]]:
+    keys = [key for keys in ACTIVITY_LAYOUT.values() for key in keys]
+    key_sets = []
+    for _ in range(count):
+        chosen = rng.sample(keys, rng.randint(1, 4))
+        # Bank activities usually list both sides of a directional pair
+        if chosen[0].endswith('_give'):
+            chosen.append(chosen[0].replace('_give', '_receive'))
+        key_sets.append(chosen)
+    return key_sets
+
+
+def _best_ms(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--profiles', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    profiles = _profiles(args.profiles, rng)
+    category_pairs = [
+        (a[category], b[category])
+        for a, b in zip(profiles, profiles[1:] + profiles[:1])
+        for category in ACTIVITY_LAYOUT
+    ]
+    flat = [{k: v for keys in p.values() for k, v in keys.items()} for p in profiles]
+    key_sets = _preference_key_sets(len(profiles) * 5, rng)
+    mutual_inputs = [(keys, flat[i % len(flat)], flat[(i + 1) % len(flat)]) for i, keys in enumerate(key_sets)]
+
+    cases = [
+        ('asymmetric_jaccard', category_pairs,
+         legacy_calculate_asymmetric_directional_jaccard, calculate_asymmetric_directional_jaccard),
+        ('same_pole_jaccard', category_pairs,
+         legacy_calculate_same_pole_jaccard, calculate_same_pole_jaccard),
+        ('mutual_interest', mutual_inputs,
+         legacy_score_mutual_interest, score_mutual_interest),
+    ]
+
+    print(f"{'function':<20} {'calls':>7} {'legacy ms':>10} {'table ms':>10} {'speedup':>8}")
+    for label, inputs, legacy, current in cases:
+        for call_args in inputs:
+            assert legacy(*call_args) == current(*call_args), (label, call_args)
+        legacy_ms = _best_ms(lambda: [legacy(*call_args) for call_args in inputs], args.repeat)
+        current_ms = _best_ms(lambda: [current(*call_args) for call_args in inputs], args.repeat)
+        print(f"{label:<20} {len(inputs):>7} {legacy_ms:>10.2f} {current_ms:>10.2f} {legacy_ms / current_ms:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark repository.save_session_activities against the previous per-row save.
+
+For 25 and 100 activities, times:
+  - per_row: one SELECT per (session_id, seq), ORM add/update, one commit (previous code)
+  - bulk:    repository.save_session_activities (set-based upsert, one commit)
+each for a fresh session (all inserts) and a re-save (all updates).
+
+Usage:
+    python backend/scripts/benchmark_save_session_activities.py [--runs 30]
+
+Uses an in-memory SQLite database by default; set BENCHMARK_DATABASE_URL to
+run against a scratch Postgres database (benchmark sessions are deleted
+afterwards).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from flask import Flask
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from backend.src.extensions import db
+from backend.src.models.session import Session
+from backend.src.models.session_activity import SessionActivity
+from backend.src.db.repository import save_session_activities
+
+
+@compiles(JSONB, 'sqlite')
+def _compile_jsonb(element, compiler, **kw):
+    return compiler.visit_JSON(element, **kw)
+
+
+SESSION_PREFIX = 'bench-save-'
+
+
+def _activities(count: int):
+    return [
+        {
+            'seq': seq, 'type': 'truth' if seq % 2 else 'dare', 'rating': 'R', 'intensity': 1 + seq % 3,
+            'script': {'steps': [{'actor': 'A' if seq % 2 else 'B', 'do': f'Benchmark activity {seq}'}]},
+            'tags': ['benchmark'], 'roles': {'active_player': 'A', 'partner_player': 'B'},
+            'provenance': {'source': 'ai_generated', 'template_id': None},
+            'checks': {'respects_hard_limits': True, 'notes': 'benchmark'},
+        }
+        for seq in range(1, count + 1)
+    ]
+
+
+def _per_row_save(session_id, activities):
+    """The previous implementation: a lookup per activity, then ORM add/update."""
+    for activity_data in activities:
+        existing = SessionActivity.query.filter_by(session_id=session_id, seq=activity_data['seq']).first()
+        provenance = activity_data.get('provenance', {})
+        if existing:
+            existing.type = activity_data.get('type')
+            existing.rating = activity_data.get('rating')
+            existing.intensity = activity_data.get('intensity')
+            existing.script = activity_data.get('script')
+            existing.tags = activity_data.get('tags', [])
+            existing.roles = activity_data.get('roles')
+            existing.source = provenance.get('source', 'ai_generated')
+            existing.template_id = provenance.get('template_id')
+            existing.checks = activity_data.get('checks', {})
+        else:
+            db.session.add(SessionActivity(
+                session_id=session_id, seq=activity_data['seq'],
+                activity_id=provenance.get('template_id'),
+                type=activity_data.get('type'), rating=activity_data.get('rating'),
+                intensity=activity_data.get('intensity'), script=activity_data.get('script'),
+                tags=activity_data.get('tags', []), roles=activity_data.get('roles'),
+                source=provenance.get('source', 'ai_generated'),
+                template_id=provenance.get('template_id'), checks=activity_data.get('checks', {}),
+            ))
+    db.session.commit()
+
+
+def _new_session() -> str:
+    session_id = f'{SESSION_PREFIX}{uuid.uuid4()}'
+    db.session.add(Session(session_id=session_id, player_a_profile_id=1, player_b_profile_id=1))
+    db.session.commit()
+    return session_id
+
+
+def _time(save, activities, runs):
+    inserts, updates = [], []
+    for _ in range(runs):
+        session_id = _new_session()
+        start = time.perf_counter()
+        save(session_id, activities)
+        inserts.append((time.perf_counter() - start) * 1000)
+        db.session.expunge_all()
+
+        start = time.perf_counter()
+        save(session_id, activities)
+        updates.append((time.perf_counter() - start) * 1000)
+        db.session.expunge_all()
+    return statistics.median(inserts), statistics.median(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('BENCHMARK_DATABASE_URL', 'sqlite:///:memory:')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[Session.__table__, SessionActivity.__table__])
+        try:
+            print(f"{'rows':>5} {'strategy':<8} {'insert ms':>10} {'update ms':>10}")
+            for count in (25, 100):
+                activities = _activities(count)
+                for label, save in (('per_row', _per_row_save), ('bulk', save_session_activities)):
+                    insert_ms, update_ms = _time(save, activities, args.runs)
+                    print(f"{count:>5} {label:<8} {insert_ms:>10.2f} {update_ms:>10.2f}")
+        finally:
+            SessionActivity.query.filter(SessionActivity.session_id.like(f'{SESSION_PREFIX}%')).delete(
+                synchronize_session=False
+            )
+            Session.query.filter(Session.session_id.like(f'{SESSION_PREFIX}%')).delete(synchronize_session=False)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
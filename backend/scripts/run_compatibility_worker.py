@@ -0,0 +1,61 @@
+"""
+Compatibility job worker.
+
+Polls compatibility_jobs (calculation, Compatibility upsert, acceptance push
+notification) and compatibility_fanout_jobs (re-score of a user's partners
+after a survey retake). Several workers can run at once; jobs are claimed
+with FOR UPDATE SKIP LOCKED on PostgreSQL.
+
+    python backend/scripts/run_compatibility_worker.py          # run forever
+    python backend/scripts/run_compatibility_worker.py --once   # drain and exit (cron)
+"""
+import argparse
+import sys
+import time
+import logging
+from pathlib import Path
+
+# Add project root to path
+# Assuming script is run from project root or backend folder
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from backend.src.main import create_app
+from backend.src.extensions import db
+from backend.src.services.compatibility_jobs import CompatibilityJobService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Entry point for the compatibility worker."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+    parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per poll')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when idle')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        logger.info("Compatibility worker started")
+        while True:
+            try:
+                processed = CompatibilityJobService.run_pending(args.batch_size)
+            except Exception as e:
+                logger.error(f"Compatibility worker poll failed: {e}")
+                db.session.rollback()
+                processed = 0
+            if processed:
+                continue
+            if args.once:
+                break
+            time.sleep(args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
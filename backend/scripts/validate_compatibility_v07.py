@@ -32,6 +32,7 @@ from src.models.profile import Profile
 from src.models.partner import PartnerConnection
 from src.models.user import User
 from src.compatibility.calculator import calculate_compatibility
+from src.db.repository import get_current_profile
 
 
 def get_accepted_connections() -> List[PartnerConnection]:
@@ -40,8 +41,8 @@ def get_accepted_connections() -> List[PartnerConnection]:
 
 
 def get_profile_for_user(user_id: str) -> Optional[Profile]:
-    """Get the most recent profile for a user."""
-    return Profile.query.filter_by(user_id=user_id).order_by(Profile.created_at.desc()).first()
+    """Get the current profile for a user."""
+    return get_current_profile(user_id)
 
 
 def profile_to_compat_format(profile: Profile) -> Dict[str, Any]:
@@ -14,10 +14,53 @@ v0.7 Changes (Jan 2026):
 - Same-pole domain penalty: 0.5 multiplier for Top+Top and Bottom+Bottom
 - Versatile power complement: 0.75 for Versatile/Versatile pairs
 
+calculate_compatibility_many() scores one profile against many partners at
+once with NumPy and returns exactly what calculate_compatibility() returns
+for each pair.
+
 See docs/TECHNICAL_NOTES.md for full algorithm documentation.
 """
 import math
-from typing import Dict, List, Any, Optional, Tuple
+from itertools import compress
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..scoring.directional import (
+    ACTIVITY_CATEGORIES,
+    ACTIVITY_LAYOUT,
+    DIRECTIONAL_KEYS,
+    GIVE,
+    RECEIVE,
+    SELF,
+    WATCHING,
+    directional_key,
+)
+from ..scoring.truth_topics import convert_truth_topics
+
+
+# Stored as Compatibility.calculation_version; bump when results change.
+# 0.7: agreement-based Jaccard, same-pole domain penalty, Versatile power complement
+COMPATIBILITY_VERSION = '0.7'
+
+# Updated weights: Truth reduced from 0.20 to 0.15, added SE (0.03) and SIS-C (0.02)
+DEFAULT_WEIGHTS = {
+    'power': 0.15,
+    'domain': 0.25,
+    'activity': 0.40,
+    'truth': 0.15,  # Reduced from 0.20
+    'se': 0.03,     # NEW: SE capacity (added as modifier)
+    'sisc': 0.02,   # NEW: SIS-C alignment (added as modifier)
+}
+
+# Activity categories that contain _give/_receive or _self/_watching pairs
+DIRECTIONAL_CATEGORIES = (
+    'physical_touch', 'oral', 'anal', 'power_exchange', 'display_performance', 'verbal_roleplay'
+)
+
+# Truth topics asked by the survey (B29-B36), in survey order
+TRUTH_TOPIC_KEYS = tuple(key for key in convert_truth_topics({}) if key != 'openness_score')
 
 
 def calculate_se_modifier(se_a: float, se_b: float) -> float:
@@ -208,15 +251,13 @@ def calculate_asymmetric_directional_jaccard(
     
     Mirrors frontend/src/lib/matching/compatibilityMapper.js logic.
     
-    Recognizes complementary pairs:
+    Recognizes complementary pairs (see scoring.directional):
     - _give/_receive (e.g., spanking_give with spanking_receive)
     - _self/_watching (e.g., stripping_self with watching_strip)
     
     Primary axis (80% weight): Does Top want to GIVE what Bottom wants to RECEIVE?
     Secondary axis (20% weight): Does Bottom want to GIVE what Top wants to RECEIVE?
     """
-    keys = set(list(top_activities.keys()) + list(bottom_activities.keys()))
-    
     primary_matches = 0
     primary_potential = 0
     secondary_matches = 0
@@ -224,24 +265,18 @@ def calculate_asymmetric_directional_jaccard(
     non_directional_matches = 0
     non_directional_potential = 0
     
-    processed_keys = set()
-    
-    for key in keys:
-        if key in processed_keys:
-            continue
-            
-        # print(f"Processing key: {key}")
-        top_val = top_activities.get(key, 0)
-        bottom_val = bottom_activities.get(key, 0)
+    # Each pair is scored once, from its give key, its regular _self key
+    # or its irregular watching key (watching_strip, watching_solo_pleasure)
+    for key in top_activities.keys() | bottom_activities.keys():
+        entry = DIRECTIONAL_KEYS.get(key) or directional_key(key)
+        direction = entry.direction
         
         # Handle _give/_receive pairs
-        if key.endswith('_give'):
-            processed_keys.add(key)
-            receive_key = key.replace('_give', '_receive')
-            processed_keys.add(receive_key)
-
-            bottom_receive_val = bottom_activities.get(receive_key, 0)
-            top_receive_val = top_activities.get(receive_key, 0)
+        if direction == GIVE:
+            top_val = top_activities.get(key, 0)
+            bottom_val = bottom_activities.get(key, 0)
+            bottom_receive_val = bottom_activities.get(entry.partner, 0)
+            top_receive_val = top_activities.get(entry.partner, 0)
 
             # PRIMARY: Top gives → Bottom receives (agreement-based)
             primary_potential += 1
@@ -264,81 +299,32 @@ def calculate_asymmetric_directional_jaccard(
                 secondary_matches += 0.5  # Partial credit (one wants, other doesn't)
         
         # Handle _self/_watching pairs (Display & Performance)
-        elif key.endswith('_self'):
-            # Skip special cases handled elsewhere
-            if key in ['stripping_self', 'solo_pleasure_self']:
-                continue
-                
-            processed_keys.add(key)
-            watching_key = key.replace('_self', '_watching')
-            processed_keys.add(watching_key)
+        elif (direction == SELF and not entry.irregular) or (direction == WATCHING and entry.irregular):
+            self_key, watching_key = (key, entry.partner) if direction == SELF else (entry.partner, key)
             
+            top_self_val = top_activities.get(self_key, 0)
+            bottom_self_val = bottom_activities.get(self_key, 0)
             top_watching_val = top_activities.get(watching_key, 0)
             bottom_watching_val = bottom_activities.get(watching_key, 0)
             
             # PRIMARY: Bottom performs → Top watches
-            if bottom_val >= 0.5 or top_watching_val >= 0.5:
+            if bottom_self_val >= 0.5 or top_watching_val >= 0.5:
                 primary_potential += 1
-                if bottom_val >= 0.5 and top_watching_val >= 0.5:
+                if bottom_self_val >= 0.5 and top_watching_val >= 0.5:
                     primary_matches += 1
             
             # SECONDARY: Top performs → Bottom watches
-            if top_val >= 0.5 or bottom_watching_val >= 0.5:
+            if top_self_val >= 0.5 or bottom_watching_val >= 0.5:
                 secondary_potential += 1
-                if top_val >= 0.5 and bottom_watching_val >= 0.5:
+                if top_self_val >= 0.5 and bottom_watching_val >= 0.5:
                     secondary_matches += 1
-                elif top_val >= 0.5 and bottom_watching_val < 0.5:
+                elif top_self_val >= 0.5 and bottom_watching_val < 0.5:
                     secondary_matches += 0.5  # Partial credit
         
-        # Handle special cases: watching_strip pairs with stripping_self
-        elif key == 'watching_strip':
-            processed_keys.add(key)
-            self_key = 'stripping_self'
-            processed_keys.add(self_key)
-            
-            top_self_val = top_activities.get(self_key, 0)
-            bottom_self_val = bottom_activities.get(self_key, 0)
-            
-            # PRIMARY: Bottom performs → Top watches
-            if bottom_self_val >= 0.5 or top_val >= 0.5:
-                primary_potential += 1
-                if bottom_self_val >= 0.5 and top_val >= 0.5:
-                    primary_matches += 1
-            
-            # SECONDARY: Top performs → Bottom watches
-            if top_self_val >= 0.5 or bottom_val >= 0.5:
-                secondary_potential += 1
-                if top_self_val >= 0.5 and bottom_val >= 0.5:
-                    secondary_matches += 1
-                elif top_self_val >= 0.5 and bottom_val < 0.5:
-                    secondary_matches += 0.5
-        
-        # Handle special case: watching_solo_pleasure pairs with solo_pleasure_self
-        elif key == 'watching_solo_pleasure':
-            processed_keys.add(key)
-            self_key = 'solo_pleasure_self'
-            processed_keys.add(self_key)
-            
-            top_self_val = top_activities.get(self_key, 0)
-            bottom_self_val = bottom_activities.get(self_key, 0)
-            
-            # PRIMARY: Bottom performs → Top watches
-            if bottom_self_val >= 0.5 or top_val >= 0.5:
-                primary_potential += 1
-                if bottom_self_val >= 0.5 and top_val >= 0.5:
-                    primary_matches += 1
-            
-            # SECONDARY: Top performs → Bottom watches
-            if top_self_val >= 0.5 or bottom_val >= 0.5:
-                secondary_potential += 1
-                if top_self_val >= 0.5 and bottom_val >= 0.5:
-                    secondary_matches += 1
-                elif top_self_val >= 0.5 and bottom_val < 0.5:
-                    secondary_matches += 0.5
-        
         # Non-directional activities - use agreement-based scoring
-        elif not key.endswith('_receive') and not key.endswith('_watching'):
-            processed_keys.add(key)
+        elif direction is None:
+            top_val = top_activities.get(key, 0)
+            bottom_val = bottom_activities.get(key, 0)
             non_directional_potential += 1
             # Both interested OR both not interested = agreement
             if (top_val >= 0.5 and bottom_val >= 0.5) or (top_val < 0.5 and bottom_val < 0.5):
@@ -366,19 +352,22 @@ def calculate_same_pole_jaccard(
     
     Mirrors frontend/src/lib/matching/compatibilityMapper.js calculateSamePoleJaccard()
     """
+    # Credits of 0.3 are summed in set order; build the set the same way as
+    # always so results stay bit-for-bit stable
     keys = set(list(activities_a.keys()) + list(activities_b.keys()))
     
     compatible_interactions = 0
     total_possible_interactions = 0
     
     for key in keys:
-        val_a = activities_a.get(key, 0)
-        val_b = activities_b.get(key, 0)
+        entry = DIRECTIONAL_KEYS.get(key) or directional_key(key)
+        direction = entry.direction
         
-        if key.endswith('_give'):
-            receive_key = key.replace('_give', '_receive')
-            receive_a = activities_a.get(receive_key, 0)
-            receive_b = activities_b.get(receive_key, 0)
+        if direction == GIVE:
+            val_a = activities_a.get(key, 0)
+            val_b = activities_b.get(key, 0)
+            receive_a = activities_a.get(entry.partner, 0)
+            receive_b = activities_b.get(entry.partner, 0)
             
             # For same-pole pairs, both wanting same role is incompatible
             if val_a >= 0.5 or val_b >= 0.5:
@@ -392,8 +381,11 @@ def calculate_same_pole_jaccard(
                 elif (val_a >= 0.5 and receive_a >= 0.5) and (val_b >= 0.5 and receive_b >= 0.5):
                     compatible_interactions += 0.5
         
-        elif not key.endswith('_receive') and not key.endswith('_watching'):
-            # Non-directional activities
+        # Receive and regular _watching keys are skipped; _self keys and the
+        # irregular watching keys count as non-directional here
+        elif direction != RECEIVE and not (direction == WATCHING and not entry.irregular):
+            val_a = activities_a.get(key, 0)
+            val_b = activities_b.get(key, 0)
             if val_a >= 0.5 and val_b >= 0.5:
                 compatible_interactions += 1.0 # v0.5 uses 1.0 for non-directional in same-pole
             if val_a >= 0.5 or val_b >= 0.5:
@@ -436,9 +428,7 @@ def calculate_activity_overlap(
         
         score = 0.0
         
-        has_directional = category in [
-            'physical_touch', 'oral', 'anal', 'power_exchange', 'display_performance', 'verbal_roleplay'
-        ]
+        has_directional = category in DIRECTIONAL_CATEGORIES
         
         if is_top_bottom and has_directional:
             if orientation_a == 'Top':
@@ -482,12 +472,9 @@ def calculate_truth_overlap(
     
     Both players comfortable with same topics = better.
     """
-    topics = ['past_experiences', 'fantasies', 'turn_ons', 'turn_offs',
-              'insecurities', 'boundaries', 'future_fantasies', 'feeling_desired']
-    
     overlaps = []
     
-    for topic in topics:
+    for topic in TRUTH_TOPIC_KEYS:
         score_a = truth_topics_a.get(topic, 0.0)
         score_b = truth_topics_b.get(topic, 0.0)
         
@@ -675,15 +662,7 @@ def calculate_compatibility(
         Complete compatibility result dict
     """
     if weights is None:
-        # Updated weights: Truth reduced from 0.20 to 0.15, added SE (0.03) and SIS-C (0.02)
-        weights = {
-            'power': 0.15,
-            'domain': 0.25,
-            'activity': 0.40,
-            'truth': 0.15,  # Reduced from 0.20
-            'se': 0.03,     # NEW: SE capacity (added as modifier)
-            'sisc': 0.02,   # NEW: SIS-C alignment (added as modifier)
-        }
+        weights = DEFAULT_WEIGHTS
     
     # Extract components
     power_a = player_a.get('power_dynamic', {})
@@ -756,9 +735,7 @@ def calculate_compatibility(
     
     # Mutual truth topics
     mutual_truth_topics = []
-    topic_keys = ['past_experiences', 'fantasies', 'turn_ons', 'turn_offs',
-                  'insecurities', 'boundaries', 'future_fantasies', 'feeling_desired']
-    for key in topic_keys:
+    for key in TRUTH_TOPIC_KEYS:
         if truth_topics_a.get(key, 0) >= 0.5 and truth_topics_b.get(key, 0) >= 0.5:
             mutual_truth_topics.append(key)
     
@@ -769,7 +746,7 @@ def calculate_compatibility(
     ))
     
     return {
-        'compatibility_version': '0.7',  # Agreement-based Jaccard, same-pole domain penalty, Versatile power complement
+        'compatibility_version': COMPATIBILITY_VERSION,
         'overall_compatibility': {
             'score': overall_percentage,
             'interpretation': interpret_compatibility(overall_percentage)
@@ -800,3 +777,475 @@ def calculate_compatibility(
         'boundary_conflicts': boundary_conflicts
     }
 
+# =============================================================================
+# Batch scoring: one profile against many partners
+# =============================================================================
+#
+# Survey profiles always carry the same activity keys (convert_activities) and
+# truth topics (convert_truth_topics), so every profile is encoded as one row
+# of floats over a fixed column layout:
+#
+#   [activities in layout order | truth topics | domains | SE, SIS-C, intensity]
+#
+# The Jaccard variants are precomputed as column-index units per category,
+# following the control flow of the scalar functions on that layout. Profiles
+# that do not fit the layout (custom keys, missing categories, non-numeric
+# values) are scored with calculate_compatibility() instead.
+
+_DOMAIN_KEYS = ('sensation', 'connection', 'power', 'exploration', 'verbal')
+
+_ACTIVITY_KEYS = tuple(key for keys in ACTIVITY_LAYOUT.values() for key in keys)
+_COLUMN = {key: i for i, key in enumerate(_ACTIVITY_KEYS)}
+
+_N_ACTIVITIES = len(_ACTIVITY_KEYS)
+_TRUTH_COLUMNS = slice(_N_ACTIVITIES, _N_ACTIVITIES + len(TRUTH_TOPIC_KEYS))
+_DOMAIN_COLUMNS = slice(_TRUTH_COLUMNS.stop, _TRUTH_COLUMNS.stop + len(_DOMAIN_KEYS))
+_SE_COLUMN = _DOMAIN_COLUMNS.stop
+_SISC_COLUMN = _SE_COLUMN + 1
+_INTENSITY_COLUMN = _SE_COLUMN + 2
+
+# Activity columns in alphabetical key order (mutual activities / growth opportunities are sorted)
+_SORTED_COLUMNS = np.array(sorted(range(_N_ACTIVITIES), key=lambda i: _ACTIVITY_KEYS[i]), dtype=np.intp)
+_SORTED_KEYS = [_ACTIVITY_KEYS[i] for i in _SORTED_COLUMNS.tolist()]
+
+# Values of one category in layout order (KeyError if a key is missing)
+_CATEGORY_VALUES = {category: itemgetter(*keys) for category, keys in ACTIVITY_LAYOUT.items()}
+_NUMBER_TYPES = {int, float}
+
+def _jaccard_units() -> Dict[str, Tuple[np.ndarray, ...]]:
+    """
+    Column-index units of the survey layout for each Jaccard variant.
+
+    Built from the directional key table, with the same unit rules as the
+    scalar functions:
+    - give: (give, receive, category) pairs
+    - watch: (self, watching, category) pairs, including stripping_self/watching_strip
+      and solo_pleasure_self/watching_solo_pleasure
+    - asymmetric_single / same_pole_single / standard: (key, category) units
+    """
+    units: Dict[str, List[Tuple[int, ...]]] = {
+        'give': [], 'watch': [], 'asymmetric_single': [], 'same_pole_single': [], 'standard': [],
+    }
+
+    for column, key in enumerate(_ACTIVITY_KEYS):
+        entry = DIRECTIONAL_KEYS[key]
+        units['standard'].append((column, entry.category))
+
+        if entry.direction == GIVE:
+            units['give'].append((column, _COLUMN[entry.partner], entry.category))
+            continue
+        if entry.direction == RECEIVE or (entry.direction == WATCHING and not entry.irregular):
+            continue
+
+        # Same-pole Jaccard treats everything else, _self keys included, as non-directional
+        units['same_pole_single'].append((column, entry.category))
+
+        if entry.direction == SELF and not entry.irregular:
+            units['watch'].append((column, _COLUMN[entry.partner], entry.category))
+        elif entry.direction == WATCHING:
+            units['watch'].append((_COLUMN[entry.partner], column, entry.category))
+        elif entry.direction is None:
+            units['asymmetric_single'].append((column, entry.category))
+
+    return {
+        name: tuple(np.array(part, dtype=np.intp) for part in zip(*rows))
+        for name, rows in units.items()
+    }
+
+
+_UNITS = _jaccard_units()
+_KEYS_PER_CATEGORY = np.array([len(keys) for keys in ACTIVITY_LAYOUT.values()], dtype=float)
+_DIRECTIONAL = np.array([category in DIRECTIONAL_CATEGORIES for category in ACTIVITY_CATEGORIES], dtype=bool)
+
+
+def _encode_profile(profile: Dict[str, Any]) -> Optional[List[float]]:
+    """Encode a profile as one row of the batch layout, or None if it does not fit."""
+    activities = profile.get('activities', {})
+    if not isinstance(activities, dict) or activities.keys() != ACTIVITY_LAYOUT.keys():
+        return None
+
+    row = []
+    for category, keys in ACTIVITY_LAYOUT.items():
+        values = activities[category]
+        if not isinstance(values, dict) or len(values) != len(keys):
+            return None
+        try:
+            row.extend(_CATEGORY_VALUES[category](values))
+        except KeyError:
+            return None
+
+    truth_topics = profile.get('truth_topics', {})
+    row.extend(truth_topics.get(topic, 0.0) for topic in TRUTH_TOPIC_KEYS)
+    domains = profile.get('domain_scores', {})
+    row.extend(domains.get(domain, 0) for domain in _DOMAIN_KEYS)
+    arousal = profile.get('arousal_propensity', {})
+    row.append(arousal.get('sexual_excitation', 0.5))
+    row.append(arousal.get('inhibition_consequence', 0.5))
+    row.append(profile.get('power_dynamic', {}).get('intensity', 0.5))
+
+    if not set(map(type, row)) <= _NUMBER_TYPES:
+        return None
+    return row
+
+
+def _category_sums(values: np.ndarray, categories: np.ndarray) -> np.ndarray:
+    """Sum unit values into (rows x categories), adding units in layout order."""
+    sums = np.zeros((values.shape[0], len(ACTIVITY_CATEGORIES)))
+    np.add.at(sums, (slice(None), categories), values)
+    return sums
+
+
+def _standard_jaccard(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Agreement-based Jaccard per category (both yes or both no)."""
+    columns, categories = _UNITS['standard']
+    agreement = ((a[:, columns] >= 0.5) == (b[:, columns] >= 0.5)).astype(float)
+    return _category_sums(agreement, categories) / _KEYS_PER_CATEGORY
+
+
+def _asymmetric_directional_jaccard(top: np.ndarray, bottom: np.ndarray) -> np.ndarray:
+    """Batch calculate_asymmetric_directional_jaccard per category."""
+    n = top.shape[0]
+    give, receive, give_categories = _UNITS['give']
+    self_cols, watching, watch_categories = _UNITS['watch']
+    singles, single_categories = _UNITS['asymmetric_single']
+
+    # _give/_receive: always counted, agreement-based, partial credit on the secondary axis
+    top_gives, bottom_receives = top[:, give] >= 0.5, bottom[:, receive] >= 0.5
+    bottom_gives, top_receives = bottom[:, give] >= 0.5, top[:, receive] >= 0.5
+    give_primary = (top_gives == bottom_receives).astype(float)
+    give_secondary = (bottom_gives == top_receives) + np.where(bottom_gives & ~top_receives, 0.5, 0.0)
+    give_potential = np.ones((n, len(give)))
+
+    # _self/_watching: only counted when someone is interested
+    bottom_performs, top_watches = bottom[:, self_cols] >= 0.5, top[:, watching] >= 0.5
+    top_performs, bottom_watches = top[:, self_cols] >= 0.5, bottom[:, watching] >= 0.5
+    watch_primary = (bottom_performs & top_watches).astype(float)
+    watch_primary_potential = (bottom_performs | top_watches).astype(float)
+    watch_secondary = np.where(top_performs, np.where(bottom_watches, 1.0, 0.5), 0.0)
+    watch_secondary_potential = (top_performs | bottom_watches).astype(float)
+
+    # Non-directional keys: agreement-based
+    single_matches = ((top[:, singles] >= 0.5) == (bottom[:, singles] >= 0.5)).astype(float)
+
+    primary_matches = _category_sums(give_primary, give_categories) + \
+        _category_sums(watch_primary, watch_categories)
+    primary_potential = _category_sums(give_potential, give_categories) + \
+        _category_sums(watch_primary_potential, watch_categories)
+    secondary_matches = _category_sums(give_secondary, give_categories) + \
+        _category_sums(watch_secondary, watch_categories)
+    secondary_potential = _category_sums(give_potential, give_categories) + \
+        _category_sums(watch_secondary_potential, watch_categories)
+    single_potential = _category_sums(np.ones((n, len(singles))), single_categories)
+    single_matches = _category_sums(single_matches, single_categories)
+
+    total_matches = (primary_matches * 0.8) + (secondary_matches * 0.2) + single_matches
+    total_potential = (primary_potential * 0.8) + (secondary_potential * 0.2) + single_potential
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total_potential == 0, 0.5, total_matches / total_potential)
+
+
+def _same_pole_jaccard(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Batch calculate_same_pole_jaccard per category."""
+    give, receive, give_categories = _UNITS['give']
+    singles, single_categories = _UNITS['same_pole_single']
+
+    a_gives, a_receives = a[:, give] >= 0.5, a[:, receive] >= 0.5
+    b_gives, b_receives = b[:, give] >= 0.5, b[:, receive] >= 0.5
+    a_versatile, b_versatile = a_gives & a_receives, b_gives & b_receives
+    give_compatible = np.select(
+        [
+            a_versatile & b_gives & ~b_receives,
+            a_gives & ~a_receives & b_versatile,
+            a_versatile & b_versatile,
+        ],
+        [0.3, 0.3, 0.5],
+        0.0
+    )
+    give_possible = (a_gives | b_gives).astype(float)
+
+    a_single, b_single = a[:, singles] >= 0.5, b[:, singles] >= 0.5
+    single_compatible = (a_single & b_single).astype(float)
+    single_possible = (a_single | b_single).astype(float)
+
+    # Units are interleaved in layout order so credits are added in key order
+    compatible = np.concatenate([give_compatible, single_compatible], axis=1)
+    possible = np.concatenate([give_possible, single_possible], axis=1)
+    columns = np.concatenate([give, singles])
+    categories = np.concatenate([give_categories, single_categories])
+    order = np.argsort(columns, kind='stable')
+
+    compatible = _category_sums(compatible[:, order], categories[order])
+    possible = _category_sums(possible[:, order], categories[order])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(possible == 0, 0.0, compatible / possible)
+
+
+def _power_complement(power_a: Dict[str, Any], orientations: List[Any], intensity_b: np.ndarray) -> np.ndarray:
+    """Batch calculate_power_complement."""
+    orientation_a = power_a.get('orientation', 'Switch')
+    intensity_a = power_a.get('intensity', 0.5)
+
+    # Non-complementary pairs only depend on the orientations: one scalar call each
+    table = {o: calculate_power_complement(power_a, {'orientation': o}) for o in set(orientations)}
+    complement = np.array([table[o] for o in orientations], dtype=float)
+
+    complementary = np.array([
+        (orientation_a == 'Top' and o == 'Bottom') or (orientation_a == 'Bottom' and o == 'Top')
+        for o in orientations
+    ], dtype=bool)
+    if complementary.any():
+        alignment = np.minimum(1.0, 1.0 - np.abs(intensity_a - intensity_b) * 0.3)
+        complement = np.where(complementary, alignment, complement)
+    return complement
+
+
+def _domain_similarity(
+    domains_a: np.ndarray,
+    domains_b: np.ndarray,
+    complementary: np.ndarray,
+    same_pole: np.ndarray
+) -> np.ndarray:
+    """Batch calculate_domain_similarity over (sensation, connection, power, exploration, verbal)."""
+    def norm(s): return np.where(s > 1.0, s / 100.0, s)
+    def percent(s): return np.where(s <= 1.0, s * 100, s)
+
+    distances = 1.0 - np.abs(norm(domains_a) - norm(domains_b))
+    sensation_dist, connection_dist, power_dist, exploration_dist, verbal_dist = distances.T
+
+    # Complementary pairs: minimum-threshold scores for exploration/verbal
+    minimum = np.minimum(percent(domains_a[3:]), percent(domains_b[:, 3:]))
+    threshold = np.where(minimum >= 50, 1.0, minimum / 50.0)
+    exploration_score = np.where(complementary, threshold[:, 0], exploration_dist)
+    verbal_score = np.where(complementary, threshold[:, 1], verbal_dist)
+
+    similarity = (sensation_dist + connection_dist + power_dist + exploration_score + verbal_score) / 5.0
+    return np.where(same_pole, similarity * 0.5, similarity)
+
+
+def _truth_overlap(truth_a: np.ndarray, truth_b: np.ndarray) -> np.ndarray:
+    """Batch calculate_truth_overlap, summed in topic order."""
+    overlaps = np.where(
+        (truth_a >= 0.5) & (truth_b >= 0.5),
+        np.minimum(truth_a, truth_b),
+        np.where((truth_a < 0.5) & (truth_b < 0.5), 0.5, 0.3)
+    )
+    total = overlaps[:, 0]
+    for column in range(1, overlaps.shape[1]):
+        total = total + overlaps[:, column]
+    return total / overlaps.shape[1]
+
+
+def _se_modifier(se_a: float, se_b: np.ndarray) -> np.ndarray:
+    """Batch calculate_se_modifier."""
+    a_high = se_a >= 0.65
+    b_high = se_b >= 0.65
+    other = se_b if a_high else np.full_like(se_b, se_a)
+    return np.select(
+        [a_high & b_high, a_high | b_high],
+        [0.03, np.where(other >= 0.35, 0.015, 0.005)],
+        0.0
+    )
+
+
+def _sisc_modifier(sisc_a: float, sisc_b: np.ndarray) -> np.ndarray:
+    """Batch calculate_sisc_modifier."""
+    both_mid = (0.35 <= sisc_a <= 0.65) & (0.35 <= sisc_b) & (sisc_b <= 0.65)
+    return np.select([np.abs(sisc_a - sisc_b) > 0.4, both_mid], [-0.02, 0.02], 0.0)
+
+
+def _compatibility_rows(
+    player_a: Dict[str, Any],
+    row_a: List[float],
+    partners: Sequence[Dict[str, Any]],
+    rows: np.ndarray,
+    weights: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    """Score encoded partner rows against player A; see calculate_compatibility_many."""
+    n = len(partners)
+    a = np.array(row_a, dtype=float)
+    power_a = player_a.get('power_dynamic', {})
+    orientation_a = power_a.get('orientation', 'Switch')
+    orientations = [p.get('power_dynamic', {}).get('orientation', 'Switch') for p in partners]
+
+    top_bottom = np.array([
+        (orientation_a == 'Top' and o == 'Bottom') or (orientation_a == 'Bottom' and o == 'Top')
+        for o in orientations
+    ], dtype=bool)
+    same_pole = np.array([orientation_a in ('Top', 'Bottom') and o == orientation_a for o in orientations], dtype=bool)
+
+    # Activity overlap: category scores for the variant each pair uses
+    activities_a = np.broadcast_to(a[:_N_ACTIVITIES], (n, _N_ACTIVITIES))
+    activities_b = rows[:, :_N_ACTIVITIES]
+    category_scores = _standard_jaccard(activities_a, activities_b)
+
+    if top_bottom.any():
+        partner_rows = activities_b[top_bottom]
+        own_rows = activities_a[top_bottom]
+        if orientation_a == 'Top':
+            directional = _asymmetric_directional_jaccard(own_rows, partner_rows)
+        else:
+            directional = _asymmetric_directional_jaccard(partner_rows, own_rows)
+        category_scores[top_bottom] = np.where(_DIRECTIONAL, directional, category_scores[top_bottom])
+
+    if same_pole.any():
+        directional = _same_pole_jaccard(activities_a[same_pole], activities_b[same_pole])
+        category_scores[same_pole] = np.where(_DIRECTIONAL, directional, category_scores[same_pole])
+
+    # Averaged in player A's category order, with the scalar function's sum()
+    category_order = [ACTIVITY_CATEGORIES.index(category) for category in player_a.get('activities', {})]
+    activity_overlap = [
+        sum(scores) / len(scores)
+        for scores in category_scores[:, category_order].tolist()
+    ]
+
+    power_complement = _power_complement(power_a, orientations, rows[:, _INTENSITY_COLUMN])
+    domain_similarity = _domain_similarity(a[_DOMAIN_COLUMNS], rows[:, _DOMAIN_COLUMNS], top_bottom, same_pole)
+    truth_overlap = _truth_overlap(a[_TRUTH_COLUMNS], rows[:, _TRUTH_COLUMNS])
+    adjusted_truth_overlap = np.where(same_pole, truth_overlap * 0.5, truth_overlap)
+    se_modifier = _se_modifier(a[_SE_COLUMN], rows[:, _SE_COLUMN])
+    sisc_modifier = _sisc_modifier(a[_SISC_COLUMN], rows[:, _SISC_COLUMN])
+
+    overall_scores = (
+        weights['power'] * power_complement +
+        weights['domain'] * domain_similarity +
+        weights['activity'] * np.array(activity_overlap, dtype=float) +
+        weights['truth'] * adjusted_truth_overlap +
+        se_modifier +
+        sisc_modifier
+    )
+
+    # Mutual interests over the flat activity keys, already in sorted order
+    sorted_a = a[_SORTED_COLUMNS]
+    sorted_b = activities_b[:, _SORTED_COLUMNS]
+    mutual = (sorted_a >= 0.7) & (sorted_b >= 0.7)
+    growth = ((sorted_a >= 0.7) & (sorted_b >= 0.3) & (sorted_b < 0.7)) | \
+             ((sorted_b >= 0.7) & (sorted_a >= 0.3) & (sorted_a < 0.7))
+    mutual_topics = (a[_TRUTH_COLUMNS] >= 0.5) & (rows[:, _TRUTH_COLUMNS] >= 0.5)
+    mutual, growth, mutual_topics = mutual.tolist(), growth.tolist(), mutual_topics.tolist()
+
+    # Python floats from here on, so rounding matches calculate_compatibility
+    overall_scores = overall_scores.tolist()
+    power_complement = power_complement.tolist()
+    domain_similarity = domain_similarity.tolist()
+    adjusted_truth_overlap = adjusted_truth_overlap.tolist()
+    se_modifier = se_modifier.tolist()
+    sisc_modifier = sisc_modifier.tolist()
+
+    activities = player_a.get('activities', {})
+    boundaries_a = player_a.get('boundaries', {})
+    arousal_a = player_a.get('arousal_propensity', {})
+    se_a = arousal_a.get('sexual_excitation', 0.5)
+    sisc_a = arousal_a.get('inhibition_consequence', 0.5)
+    flat_a = None
+
+    results = []
+    for i, player_b in enumerate(partners):
+        boundaries_b = player_b.get('boundaries', {})
+        arousal_b = player_b.get('arousal_propensity', {})
+        se_b = arousal_b.get('sexual_excitation', 0.5)
+        sisc_b = arousal_b.get('inhibition_consequence', 0.5)
+
+        boundary_conflicts = []
+        if boundaries_a.get('hard_limits') or boundaries_b.get('hard_limits'):
+            if flat_a is None:
+                flat_a = flatten_activities(activities)
+            boundary_conflicts = check_boundary_conflicts(
+                {'activities': flat_a, 'boundaries': boundaries_a},
+                {'activities': flatten_activities(player_b.get('activities', {})), 'boundaries': boundaries_b}
+            )
+
+        # Same clamping as calculate_compatibility
+        overall_score = max(0, overall_scores[i] - len(boundary_conflicts) * 0.20)
+        overall_score = min(1.0, overall_score)
+        overall_percentage = round(overall_score * 100)
+
+        se_mod = se_modifier[i]
+        sisc_mod = sisc_modifier[i]
+        all_hard_limits = list(set(
+            boundaries_a.get('hard_limits', []) +
+            boundaries_b.get('hard_limits', [])
+        ))
+
+        results.append({
+            'compatibility_version': COMPATIBILITY_VERSION,
+            'overall_compatibility': {
+                'score': overall_percentage,
+                'interpretation': interpret_compatibility(overall_percentage)
+            },
+            'breakdown': {
+                'power_complement': round(power_complement[i] * 100),
+                'domain_similarity': round(domain_similarity[i] * 100),
+                'activity_overlap': round(activity_overlap[i] * 100),
+                'truth_overlap': round(adjusted_truth_overlap[i] * 100),
+                'se_modifier': round(se_mod * 100),
+                'sisc_modifier': round(sisc_mod * 100),
+            },
+            'arousal_alignment': {
+                'se_a': round(se_a, 2),
+                'se_b': round(se_b, 2),
+                'sisc_a': round(sisc_a, 2),
+                'sisc_b': round(sisc_b, 2),
+                'se_modifier': round(se_mod * 100),
+                'sisc_modifier': round(sisc_mod * 100),
+            },
+            'mutual_activities': list(compress(_SORTED_KEYS, mutual[i])),
+            'growth_opportunities': list(compress(_SORTED_KEYS, growth[i])),
+            'mutual_truth_topics': list(compress(TRUTH_TOPIC_KEYS, mutual_topics[i])),
+            'blocked_activities': {
+                'reason': 'hard_boundaries',
+                'activities': all_hard_limits
+            },
+            'boundary_conflicts': boundary_conflicts
+        })
+
+    return results
+
+
+def calculate_compatibility_many(
+    player_a: Dict[str, Any],
+    partners: Sequence[Dict[str, Any]],
+    weights: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Calculate compatibility between one player and many partners.
+
+    Batch version of calculate_compatibility: power complement, domain
+    similarity, activity overlap, truth overlap and the SE/SIS-C modifiers
+    are computed with NumPy across all partners at once. Partners whose
+    profiles do not fit the survey layout fall back to the scalar function.
+
+    Args:
+        player_a: Player A's complete profile
+        partners: Complete profiles to compare against
+        weights: Optional custom weights (see calculate_compatibility)
+
+    Returns:
+        One result dict per partner, in order, identical to
+        calculate_compatibility(player_a, partner, weights)
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    partners = list(partners)
+
+    row_a = _encode_profile(player_a)
+    if row_a is None:
+        return [calculate_compatibility(player_a, partner, weights) for partner in partners]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(partners)
+    positions, rows = [], []
+    for i, partner in enumerate(partners):
+        row = _encode_profile(partner)
+        if row is None:
+            results[i] = calculate_compatibility(player_a, partner, weights)
+        else:
+            positions.append(i)
+            rows.append(row)
+
+    if rows:
+        batch = _compatibility_rows(
+            player_a, row_a, [partners[i] for i in positions], np.array(rows, dtype=float), weights
+        )
+        for i, result in zip(positions, batch):
+            results[i] = result
+
+    return results
@@ -0,0 +1,273 @@
+"""
+Bulk (re-)scoring of stored compatibility results.
+
+Walks accepted partner connections in id order, one chunk at a time:
+1. loads the latest profile of every user in the chunk (two queries);
+2. loads the existing compatibility_results rows of the chunk's pairs (one query);
+3. scores the selected pairs with calculate_compatibility_many, in a process
+   pool when more than one worker is requested;
+4. bulk-upserts the results and commits;
+5. records the last connection id in a checkpoint file so an interrupted run
+   can resume after the last committed chunk.
+
+Modes:
+- 'all': re-score every pair (e.g. after COMPATIBILITY_VERSION changes)
+- 'stale': pairs with no row, an older calculation_version, or a row older
+  than either profile's updated_at
+- 'missing': pairs with no row (the original backfill)
+
+rescore_compatibility() is the entry point for scripts/backfill_compatibility.py;
+rescore_partners() re-scores one user's partners after a survey retake
+(compatibility fan-out jobs in services/compatibility_jobs.py).
+"""
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_, tuple_
+
+from ..extensions import db
+from ..models.compatibility import Compatibility
+from ..models.partner import PartnerConnection
+from ..models.profile import Profile
+from ..db.repository import compatibility_row, get_current_profiles, upsert_compatibility_rows
+from .calculator import COMPATIBILITY_VERSION, calculate_compatibility, calculate_compatibility_many
+
+logger = logging.getLogger(__name__)
+
+MODES = ('all', 'stale', 'missing')
+
+# Profile fields read by the calculator (all that is shipped to worker processes)
+CALCULATOR_FIELDS = (
+    'power_dynamic', 'arousal_propensity', 'domain_scores', 'activities', 'truth_topics', 'boundaries',
+)
+
+Pair = Tuple[int, int]
+
+
+def _calculator_profile(profile: Profile) -> Dict[str, Any]:
+    return {field: getattr(profile, field) or {} for field in CALCULATOR_FIELDS}
+
+
+def score_groups(groups: List[Tuple[Dict[str, Any], List[Tuple[Pair, Dict[str, Any]]]]]) -> List[Tuple[Pair, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Score (profile_a, [(pair, profile_b), ...]) groups.
+
+    Runs in worker processes, so it only touches plain dicts. A group that
+    fails as a batch is re-scored pair by pair to isolate the bad profile.
+
+    Returns:
+        (pair, result, error) per pair; result is None when error is set
+    """
+    scored = []
+    for profile_a, partners in groups:
+        try:
+            results = calculate_compatibility_many(profile_a, [profile_b for _, profile_b in partners])
+            scored.extend((pair, result, None) for (pair, _), result in zip(partners, results))
+            continue
+        except Exception:
+            pass
+
+        for pair, profile_b in partners:
+            try:
+                scored.append((pair, calculate_compatibility(profile_a, profile_b), None))
+            except Exception as e:
+                scored.append((pair, None, str(e)))
+    return scored
+
+
+def _existing_rows(pairs: Iterable[Pair]) -> Dict[Pair, Tuple[str, datetime]]:
+    """(calculation_version, created_at) of the stored rows for the given pairs."""
+    pairs = list(pairs)
+    if not pairs:
+        return {}
+    return {
+        (a, b): (version, created_at)
+        for a, b, version, created_at in db.session.query(
+            Compatibility.player_a_id, Compatibility.player_b_id,
+            Compatibility.calculation_version, Compatibility.created_at
+        ).filter(tuple_(Compatibility.player_a_id, Compatibility.player_b_id).in_(pairs))
+    }
+
+
+def _needs_scoring(mode: str, existing: Optional[Tuple[str, datetime]], profiles: Tuple[Profile, Profile]) -> bool:
+    if mode == 'all' or existing is None:
+        return True
+    if mode == 'missing':
+        return False
+    version, created_at = existing
+    return version != COMPATIBILITY_VERSION or any(
+        profile.updated_at and created_at < profile.updated_at for profile in profiles
+    )
+
+
+def _read_checkpoint(path: Optional[str]) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        checkpoint = json.load(f)
+    logger.info(f"Resuming compatibility re-score after connection {checkpoint['last_connection_id']}")
+    return int(checkpoint['last_connection_id'])
+
+
+def _write_checkpoint(path: Optional[str], last_connection_id: int, mode: str, stats: Dict[str, int]) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'last_connection_id': last_connection_id,
+            'mode': mode,
+            'calculation_version': COMPATIBILITY_VERSION,
+            'stats': stats,
+            'updated_at': datetime.utcnow().isoformat(),
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def _split(items: List[Any], parts: int) -> List[List[Any]]:
+    """Split items into at most `parts` contiguous, similarly sized lists."""
+    size = max(1, -(-len(items) // max(1, parts)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _score_connections(
+    connections: List[Tuple[int, Any, Any]],
+    mode: str,
+    stats: Dict[str, int],
+    executor: Optional[ProcessPoolExecutor] = None,
+    workers: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Score (connection id, requester user id, recipient user id) rows.
+
+    Returns:
+        compatibility_results rows for the pairs that needed scoring
+    """
+    profiles = get_current_profiles(
+        {user_id for _, a, b in connections for user_id in (a, b) if user_id is not None}
+    )
+
+    # Requester is player A, as when the connection was accepted
+    candidates: Dict[Pair, Tuple[Profile, Profile]] = {}
+    for connection_id, requester_id, recipient_id in connections:
+        requester, recipient = profiles.get(requester_id), profiles.get(recipient_id)
+        if requester is None or recipient is None:
+            stats['skipped'] += 1
+            continue
+        pair = Compatibility.get_or_create_key(requester.id, recipient.id)
+        if pair in candidates:
+            stats['skipped'] += 1  # Same pair through another connection
+            continue
+        candidates[pair] = (requester, recipient)
+
+    existing = _existing_rows(candidates) if mode != 'all' else {}
+    groups: Dict[int, Tuple[Dict[str, Any], List[Tuple[Pair, Dict[str, Any]]]]] = {}
+    for pair, (requester, recipient) in candidates.items():
+        if not _needs_scoring(mode, existing.get(pair), (requester, recipient)):
+            stats['up_to_date'] += 1
+            continue
+        if requester.id not in groups:
+            groups[requester.id] = (_calculator_profile(requester), [])
+        groups[requester.id][1].append((pair, _calculator_profile(recipient)))
+
+    tasks = _split(list(groups.values()), workers * 4)
+    results = executor.map(score_groups, tasks) if executor else map(score_groups, tasks)
+
+    rows = []
+    for scored in results:
+        for pair, result, error in scored:
+            if error is not None:
+                logger.error(f"Compatibility re-score failed for profiles {pair}: {error}")
+                stats['errors'] += 1
+            else:
+                rows.append(compatibility_row(pair[0], pair[1], result))
+    stats['scored'] += len(rows)
+    return rows
+
+
+def rescore_compatibility(
+    mode: str = 'all',
+    chunk_size: int = 500,
+    workers: int = 1,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False
+) -> Dict[str, int]:
+    """
+    Re-score compatibility results for accepted partner connections.
+
+    Must run inside an app context.
+
+    Args:
+        mode: 'all', 'stale' or 'missing' (see module docstring)
+        chunk_size: Connections per chunk (one commit and checkpoint each)
+        workers: Calculator processes; 1 scores in this process
+        checkpoint_path: File recording the last committed connection id
+        resume: Start after the connection id in checkpoint_path
+
+    Returns:
+        Counts: connections, scored, up_to_date, skipped, errors
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+
+    stats = {'connections': 0, 'scored': 0, 'up_to_date': 0, 'skipped': 0, 'errors': 0}
+    last_id = _read_checkpoint(checkpoint_path) if resume else 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        while True:
+            connections = db.session.query(
+                PartnerConnection.id, PartnerConnection.requester_user_id, PartnerConnection.recipient_user_id
+            ).filter(
+                PartnerConnection.status == 'accepted',
+                PartnerConnection.id > last_id
+            ).order_by(PartnerConnection.id).limit(chunk_size).all()
+            if not connections:
+                break
+
+            stats['connections'] += len(connections)
+            rows = _score_connections(connections, mode, stats, executor, workers)
+            upsert_compatibility_rows(rows)
+
+            last_id = connections[-1][0]
+            _write_checkpoint(checkpoint_path, last_id, mode, stats)
+            logger.info(f"Compatibility re-score: through connection {last_id}, {stats}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # A finished run leaves nothing to resume
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return stats
+
+
+def rescore_partners(user_id: Any) -> Dict[str, int]:
+    """
+    Re-score a user's latest profile against every accepted partner.
+
+    Used after a survey retake: one query for the user's connections, one
+    calculate_compatibility_many call for the connections the user
+    requested (partners who requested the user stay player A), and one
+    bulk upsert. Must run inside an app context.
+
+    Returns:
+        Counts: connections, scored, up_to_date, skipped, errors
+    """
+    stats = {'connections': 0, 'scored': 0, 'up_to_date': 0, 'skipped': 0, 'errors': 0}
+    connections = db.session.query(
+        PartnerConnection.id, PartnerConnection.requester_user_id, PartnerConnection.recipient_user_id
+    ).filter(
+        PartnerConnection.status == 'accepted',
+        or_(PartnerConnection.requester_user_id == user_id, PartnerConnection.recipient_user_id == user_id)
+    ).order_by(PartnerConnection.id).all()
+
+    stats['connections'] = len(connections)
+    if connections:
+        upsert_compatibility_rows(_score_connections(connections, 'all', stats))
+    logger.info(f"Compatibility re-score for user {user_id}: {stats}")
+    return stats
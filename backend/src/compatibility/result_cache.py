@@ -0,0 +1,141 @@
+"""
+Content-addressed cache for survey compatibility results.
+
+GET /api/survey/compatibility/<source_id>/<target_id> scores two survey
+submissions. The result depends only on the submissions' derived profiles
+(or their answers and the profile scoring version, when the profile is
+derived on the fly) and the calculator version, so it is cached under
+
+    sha256(version, (source id, payload hash), (target id, payload hash))
+
+The key doubles as the response's strong ETag: a client revalidating with
+If-None-Match gets a 304 without the result being computed or loaded.
+
+Tiers:
+1. In-process LRU (app_config survey_compatibility_cache_size, default 1024)
+2. compatibility_result_cache table, shared across processes; disable with
+   app_config survey_compatibility_db_cache = 0. Lookup or write failures
+   (e.g. table not migrated) are logged and the request falls back to
+   calculating.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models.compatibility_result_cache import CompatibilityResultCache
+from ..scoring.profile import SCORING_VERSION
+from .calculator import COMPATIBILITY_VERSION
+
+logger = logging.getLogger(__name__)
+
+_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def _cache_size() -> int:
+    from ..services.config_service import get_config_int
+    return get_config_int('survey_compatibility_cache_size', 1024)
+
+
+def _db_tier_enabled() -> bool:
+    from ..services.config_service import get_config_int
+    return get_config_int('survey_compatibility_db_cache', 1) > 0
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """sha256 of a JSON payload in canonical form (sorted keys, no whitespace)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def submission_input(submission_id: str, payload_json: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    (submission id, content hash) of what the calculator sees for a submission.
+
+    Hashes the stored derived profile, or the answers and the scoring
+    version when the profile is derived on the fly.
+    """
+    payload_json = payload_json or {}
+    derived = payload_json.get('derived')
+    if derived:
+        return submission_id, payload_hash({'derived': derived})
+    return submission_id, payload_hash({
+        'answers': payload_json.get('answers', {}),
+        'scoring_version': SCORING_VERSION
+    })
+
+
+def cache_key(source: Tuple[str, str], target: Tuple[str, str]) -> str:
+    """Cache key and ETag for a (source, target) pair of submission_input() tuples."""
+    return payload_hash({'version': COMPATIBILITY_VERSION, 'source': list(source), 'target': list(target)})
+
+
+def get_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    """Look the key up in the LRU, then the database tier (promoting hits)."""
+    with _results_lock:
+        result = _results.get(key)
+        if result is not None:
+            _results.move_to_end(key)
+            return result
+
+    if not _db_tier_enabled():
+        return None
+    try:
+        row = db.session.get(CompatibilityResultCache, key)
+    except Exception as e:
+        logger.warning(f"Compatibility result cache lookup failed: {e}")
+        db.session.rollback()
+        return None
+    if row is None:
+        return None
+
+    _remember(key, row.result)
+    return row.result
+
+
+def store_result(key: str, result: Dict[str, Any]) -> None:
+    """Store a result in both tiers."""
+    _remember(key, result)
+    if not _db_tier_enabled():
+        return
+    try:
+        db.session.add(CompatibilityResultCache(
+            cache_key=key, result=result, calculation_version=result.get('compatibility_version', COMPATIBILITY_VERSION)
+        ))
+        db.session.commit()
+    except IntegrityError:
+        # Same content stored by a concurrent request
+        db.session.rollback()
+    except Exception as e:
+        logger.warning(f"Compatibility result cache write failed: {e}")
+        db.session.rollback()
+
+
+def get_or_calculate(key: str, calculate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Cached result for key, calculating and storing it on a miss."""
+    result = get_cached_result(key)
+    if result is None:
+        result = calculate()
+        store_result(key, result)
+    return result
+
+
+def clear_memory_cache() -> None:
+    """Drop the in-process tier (tests, calculator reloads)."""
+    with _results_lock:
+        _results.clear()
+
+
+def _remember(key: str, result: Dict[str, Any]) -> None:
+    max_size = _cache_size()
+    with _results_lock:
+        _results[key] = result
+        _results.move_to_end(key)
+        while len(_results) > max_size:
+            _results.popitem(last=False)
@@ -0,0 +1,538 @@
+"""
+Materialized compatibility UI payloads.
+
+GET /api/compatibility/<user_id>/<partner_id>/ui used to load both users and
+both latest profiles and rebuild the radar domains, arousal comparison and
+interest tags on every request. All of it depends only on the compatibility
+record, the two profiles and the partner's sharing setting, so the payload
+is built when the record is written (upsert_compatibility_rows,
+save_compatibility) and stored per viewer in compatibility_ui_payloads:
+
+- payload: the unrestricted view, as for 'all_responses'
+- sharing_setting, partner_display_name: the partner's current values,
+  updated in place when the partner changes them (refresh_partner_settings)
+
+The endpoint reads one row by (viewer, partner) and applies project() for
+the stored sharing setting. Its ETag is derived from the record id and
+version plus the partner settings (etag()).
+
+Rows are only materialized for each user's latest profile, and dropped when
+either user's profile is rewritten (invalidate_user); the endpoint rebuilds
+a missing row from the database on the next view.
+"""
+import copy
+from datetime import datetime
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, tuple_, update
+
+from ..db.repository import _ON_CONFLICT_DIALECTS, get_current_profile_ids
+from ..extensions import db
+from ..models.compatibility import Compatibility
+from ..models.compatibility_ui_payload import CompatibilityUIPayload
+from ..models.profile import Profile
+from ..models.user import User
+from ..scoring.directional import DIRECTIONAL_KEYS, GIVE, RECEIVE, directional_key
+from ..scoring.display_names import (
+    DOMAIN_DISPLAY_NAMES,
+    ACTIVITY_SECTION_DISPLAY_NAMES,
+    ACTIVITY_DISPLAY_NAMES
+)
+
+logger = logging.getLogger(__name__)
+
+# Radar chart order
+DOMAIN_KEYS_ORDERED = ['sensation', 'connection', 'power', 'exploration', 'verbal']
+
+# Partner profile fields shown when the partner shares demographics only
+HIDDEN_AROUSAL = {"sexual_excitation": 0.0, "inhibition_performance": 0.0, "inhibition_consequence": 0.0}
+HIDDEN_POWER = {"label": "Hidden", "top_percentage": 50, "bottom_percentage": 50, "confidence": ""}
+
+PAYLOAD_UPDATE_COLUMNS = (
+    'viewer_profile_id', 'partner_profile_id', 'compatibility_id', 'record_version',
+    'sharing_setting', 'partner_display_name', 'payload', 'updated_at',
+)
+
+
+def _safe_val(val, default=0):
+    return val if val is not None else default
+
+
+def build_payload(record, viewer_profile, partner_profile, partner_user) -> Dict[str, Any]:
+    """
+    Unrestricted UI payload of a compatibility record as seen by viewer_profile.
+
+    Same schema as the endpoint response; pass it through project() before
+    returning it to a client.
+    """
+    # Radar domains - strict order: Sensation, Connection, Power, Exploration, Verbal
+    u_domains = viewer_profile.domain_scores or {}
+    p_domains = partner_profile.domain_scores or {}
+    comparison_domains = [
+        {
+            "domain": DOMAIN_DISPLAY_NAMES.get(key, key.title()),
+            "user_score": _safe_val(u_domains.get(key, 0)),
+            "partner_score": _safe_val(p_domains.get(key, 0))
+        }
+        for key in DOMAIN_KEYS_ORDERED
+    ]
+
+    breakdown = record.breakdown or {}
+    comparison_scores = {
+        "overall_score": record.overall_percentage,
+        "power_score": _safe_val(breakdown.get('power_complement', 0)),
+        "domain_score": _safe_val(breakdown.get('domain_similarity', 0)),
+        "activity_score": _safe_val(breakdown.get('activity_overlap', 0)),
+        "truth_score": _safe_val(breakdown.get('truth_overlap', 0))
+    }
+
+    u_power = viewer_profile.power_dynamic or {}
+    p_power = partner_profile.power_dynamic or {}
+    power_overlap = {
+        "user_label": u_power.get('orientation', 'Switch'),
+        "partner_label": p_power.get('orientation', 'Switch'),
+        "complement_score": _safe_val(breakdown.get('power', 0))
+    }
+
+    u_arousal = viewer_profile.arousal_propensity or {}
+    p_arousal = partner_profile.arousal_propensity or {}
+    arousal_comparison = {
+        "user_sexual_excitation": _safe_val(u_arousal.get('sexual_excitation', 0)),
+        "user_inhibition_performance": _safe_val(u_arousal.get('inhibition_performance', 0)),
+        "user_inhibition_consequence": _safe_val(u_arousal.get('inhibition_consequence', 0)),
+        "partner_sexual_excitation": _safe_val(p_arousal.get('sexual_excitation', 0)),
+        "partner_inhibition_performance": _safe_val(p_arousal.get('inhibition_performance', 0)),
+        "partner_inhibition_consequence": _safe_val(p_arousal.get('inhibition_consequence', 0))
+    }
+
+    interests_comp = compare_interests(
+        viewer_profile.activities or {},
+        viewer_profile.boundaries or {},
+        partner_profile.activities or {},
+        partner_profile.boundaries or {},
+        False
+    )
+
+    return {
+        "compatibility_summary": {
+            "overall_score": record.overall_percentage,
+            "interpretation": record.interpretation,
+            "sharing_setting": 'all_responses',
+            "comparison_scores": comparison_scores
+        },
+        "comparison_data": {
+            "domains": comparison_domains,
+            "power_overlap": power_overlap,
+            "arousal": arousal_comparison
+        },
+        "interests_comparison": interests_comp,
+        "partner_profile": transform_profile_for_ui(partner_profile, partner_user, 'all_responses')
+    }
+
+
+def project(payload: Dict[str, Any], sharing_setting: str, partner_display_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Privacy projection of a build_payload() result for the partner's settings.
+
+    - overlapping_only: one-sided interest tags and the partner's own
+      boundaries and interests are removed
+    - demographics_only: partner scores are zeroed, labels hidden and lists
+      emptied; only the overall score remains
+    """
+    view = copy.deepcopy(payload)
+    summary = view['compatibility_summary']
+    comparison = view['comparison_data']
+    partner = view['partner_profile']
+
+    summary['sharing_setting'] = sharing_setting
+    partner['display_name'] = partner_display_name
+
+    if sharing_setting == 'demographics_only':
+        summary['comparison_scores'].update(power_score=0, domain_score=0, activity_score=0, truth_score=0)
+        for domain in comparison['domains']:
+            domain['partner_score'] = 0
+        comparison['power_overlap'].update(partner_label="Hidden", complement_score=0)
+        for key in comparison['arousal']:
+            if key.startswith('partner_'):
+                comparison['arousal'][key] = 0
+        view['interests_comparison'] = []
+        partner['general'] = {
+            "arousal_profile": dict(HIDDEN_AROUSAL),
+            "power": dict(HIDDEN_POWER),
+            "domains": [],
+            "boundaries": []
+        }
+        partner['interests'] = []
+    elif sharing_setting != 'all_responses':
+        # overlapping_only: only what both share
+        view['interests_comparison'] = [
+            {"section": section['section'], "tags": tags}
+            for section in view['interests_comparison']
+            for tags in [[tag for tag in section['tags'] if tag['status'] in ('mutual', 'conflict')]]
+            if tags
+        ]
+        partner['general']['boundaries'] = []
+        partner['interests'] = []
+    return view
+
+
+def etag(compatibility_id: int, record_version: int, sharing_setting: str,
+         partner_display_name: Optional[str]) -> str:
+    """Strong ETag of a projected payload."""
+    tag = f"{compatibility_id}:{record_version}:{sharing_setting}:{partner_display_name or ''}"
+    return hashlib.sha256(tag.encode('utf-8')).hexdigest()[:32]
+
+
+def payload_etag(row: CompatibilityUIPayload) -> str:
+    return etag(row.compatibility_id, row.record_version, row.sharing_setting, row.partner_display_name)
+
+
+def payload_row(record, viewer_profile, partner_profile, partner_user) -> Dict[str, Any]:
+    """compatibility_ui_payloads column values for one viewer of a record."""
+    return {
+        'viewer_user_id': viewer_profile.user_id,
+        'partner_user_id': partner_profile.user_id,
+        'viewer_profile_id': viewer_profile.id,
+        'partner_profile_id': partner_profile.id,
+        'compatibility_id': record.id,
+        'record_version': record.version,
+        'sharing_setting': partner_user.profile_sharing_setting,
+        'partner_display_name': partner_user.display_name,
+        'payload': build_payload(record, viewer_profile, partner_profile, partner_user),
+        'updated_at': datetime.utcnow(),
+    }
+
+
+def get_payload(viewer_user_id, partner_user_id) -> Optional[CompatibilityUIPayload]:
+    """The viewer's materialized payload row, or None (lookup failures are logged)."""
+    try:
+        return CompatibilityUIPayload.query.filter_by(
+            viewer_user_id=viewer_user_id, partner_user_id=partner_user_id
+        ).first()
+    except Exception as e:
+        logger.warning(f"Compatibility UI payload lookup failed: {e}")
+        return None
+
+
+def store_rows(rows: List[Dict[str, Any]]) -> bool:
+    """
+    Upsert payload_row() dicts keyed by (viewer_user_id, partner_user_id).
+
+    Runs in a savepoint and does not commit; a failure (e.g. table not
+    migrated) is logged, leaves the caller's transaction intact and
+    returns False.
+    """
+    by_viewer = {(row['viewer_user_id'], row['partner_user_id']): row for row in rows}
+    if not by_viewer:
+        return True
+
+    table = CompatibilityUIPayload.__table__
+    try:
+        with db.session.begin_nested():
+            dialect_insert = _ON_CONFLICT_DIALECTS.get(db.session.get_bind().dialect.name)
+            if dialect_insert is not None:
+                stmt = dialect_insert(table).values(list(by_viewer.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.viewer_user_id, table.c.partner_user_id],
+                    set_={column: stmt.excluded[column] for column in PAYLOAD_UPDATE_COLUMNS}
+                )
+                db.session.execute(stmt)
+            else:
+                db.session.execute(delete(CompatibilityUIPayload).where(
+                    tuple_(CompatibilityUIPayload.viewer_user_id, CompatibilityUIPayload.partner_user_id)
+                    .in_(list(by_viewer))
+                ))
+                db.session.execute(insert(CompatibilityUIPayload), list(by_viewer.values()))
+    except Exception as e:
+        logger.warning(f"Compatibility UI payload write failed: {e}")
+        return False
+    return True
+
+
+def save_row(row: Dict[str, Any]) -> None:
+    """Store and commit one payload row (the endpoint's rebuild after a miss)."""
+    if not store_rows([row]):
+        return
+    try:
+        db.session.commit()
+    except Exception as e:
+        logger.warning(f"Compatibility UI payload commit failed: {e}")
+        db.session.rollback()
+
+
+def materialize(pairs: Iterable[Tuple[int, int]]) -> int:
+    """
+    Build and store both viewers' payloads for the given (player_a_id,
+    player_b_id) records. Called by the compatibility writers before they
+    commit. Records of superseded profiles are skipped.
+
+    Returns:
+        Number of payload rows written
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+
+    # populate_existing: the rows were just rewritten by a bulk statement
+    records = Compatibility.query.filter(
+        tuple_(Compatibility.player_a_id, Compatibility.player_b_id).in_(pairs)
+    ).execution_options(populate_existing=True).all()
+    profiles = {
+        profile.id: profile
+        for profile in Profile.query.filter(
+            Profile.id.in_({pid for record in records for pid in (record.player_a_id, record.player_b_id)})
+        )
+    }
+    user_ids = {profile.user_id for profile in profiles.values()}
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids))}
+    latest = get_current_profile_ids(user_ids)
+
+    rows = []
+    for record in records:
+        profile_a, profile_b = profiles.get(record.player_a_id), profiles.get(record.player_b_id)
+        if profile_a is None or profile_b is None or profile_a.user_id == profile_b.user_id:
+            continue
+        if latest.get(profile_a.user_id) != profile_a.id or latest.get(profile_b.user_id) != profile_b.id:
+            continue
+        if profile_a.user_id not in users or profile_b.user_id not in users:
+            continue
+        rows.append(payload_row(record, profile_a, profile_b, users[profile_b.user_id]))
+        rows.append(payload_row(record, profile_b, profile_a, users[profile_a.user_id]))
+
+    store_rows(rows)
+    return len(rows)
+
+
+def refresh_partner_settings(user) -> None:
+    """
+    Write a user's sharing setting and display name through to the payloads
+    their partners see. Does not commit.
+    """
+    db.session.execute(
+        update(CompatibilityUIPayload)
+        .where(CompatibilityUIPayload.partner_user_id == user.id)
+        .values(sharing_setting=user.profile_sharing_setting, partner_display_name=user.display_name)
+    )
+
+
+def invalidate_user(user_id) -> None:
+    """Drop every payload built from a user's profile (profile rewritten). Does not commit."""
+    db.session.execute(
+        delete(CompatibilityUIPayload).where(
+            (CompatibilityUIPayload.viewer_user_id == user_id) | (CompatibilityUIPayload.partner_user_id == user_id)
+        )
+    )
+
+
+def transform_profile_for_ui(profile, user, sharing_setting):
+    """
+    Transforms profile into UI schema.
+    Applies privacy: if restricted, returns empty structs, not nulls.
+    """
+    # Defaults
+    arousal_ui = {"sexual_excitation": 0.0, "inhibition_performance": 0.0, "inhibition_consequence": 0.0}
+    power_ui = {"label": "Hidden", "top_percentage": 50, "bottom_percentage": 50, "confidence": ""}
+    domain_ui = []
+    boundaries_ui = []
+    interests_ui = []
+
+    if sharing_setting == 'demographics_only':
+        # Return skeleton
+        pass
+    else:
+        # 1. Arousal
+        arousal = profile.arousal_propensity or {}
+        arousal_ui = {
+            "sexual_excitation": arousal.get('sexual_excitation', 0.0),
+            "inhibition_performance": arousal.get('inhibition_performance', 0.0),
+            "inhibition_consequence": arousal.get('inhibition_consequence', 0.0)
+        }
+        
+        # 2. Power
+        power = profile.power_dynamic or {}
+        top = power.get('top_score', 0)
+        btm = power.get('bottom_score', 0)
+        total = top + btm
+        if total > 0:
+            top_pct = int((top/total)*100)
+        else:
+            top_pct = 50
+        power_ui = {
+            "label": power.get('orientation', 'Switch'),
+            "top_percentage": top_pct,
+            "bottom_percentage": 100 - top_pct,
+            "confidence": power.get('interpretation', '')
+        }
+        
+        # 3. Domains
+        domains = profile.domain_scores or {}
+        for key in ['sensation', 'connection', 'power', 'exploration', 'verbal']: # Use same order
+             display = DOMAIN_DISPLAY_NAMES.get(key, key.title())
+             domain_ui.append({"domain": display, "score": domains.get(key, 0)})
+             
+        # 4. Boundaries
+        # In Overlapping Only, do we show full hard limits? 
+        # "Safety is critical". We'll list them unless prohibited.
+        # But for UI safety, if overlapping_only, usually we only show what matches.
+        # The prompt said "If data is restricted, return empty state".
+        # Let's assume for partner_profile snippet, overlapping_only hides non-shared info.
+        # But this is "Self" view of "Partner".
+        # We'll leave boundaries empty for overlapping_only to be conservative, 
+        # they appear in "conflict" check anyway.
+        if sharing_setting == 'all_responses':
+            bounds = profile.boundaries or {}
+            boundaries_ui = bounds.get('hard_limits', [])
+
+        # 5. Interests
+        # For Partner Profile UI, we only show what is allowed.
+        # If overlapping_only, we probably shouldn't show their full list here, 
+        # only the comparison list.
+        # So we keep this empty for overlapping_only.
+        if sharing_setting == 'all_responses':
+            acts = profile.activities or {}
+            for section_key, section_name in ACTIVITY_SECTION_DISPLAY_NAMES.items():
+                section_items = acts.get(section_key, {})
+                tags = []
+                for k, v in section_items.items():
+                    if v > 0:
+                        tags.append(ACTIVITY_DISPLAY_NAMES.get(k, k.replace('_', ' ').title()))
+                tags.sort()
+                if tags:
+                    interests_ui.append({"section": section_name, "tags": tags})
+
+    return {
+        "user_id": str(user.id),
+        "display_name": user.display_name,
+        "submission_id": str(profile.submission_id),
+        "general": {
+            "arousal_profile": arousal_ui,
+            "power": power_ui,
+            "domains": domain_ui,
+            "boundaries": boundaries_ui
+        },
+        "interests": interests_ui    
+    }
+
+def compare_interests(u_acts, u_bounds, p_acts, p_bounds, overlapping_only):
+    """
+    Generates comparison list with Smart Matching & Conflicts.
+    
+    Returns tags with:
+    - status: 'mutual', 'conflict', 'user_only', 'partner_only'
+    - compatible: True if directional activities align (give/receive cross-match)
+    """
+    results = []
+    
+    # Normalize hard limits to lowercase for easier matching
+    # Limits might be stored as "Spanking" or "massage".
+    u_hard = {str(h).lower() for h in u_bounds.get('hard_limits', [])}
+    p_hard = {str(h).lower() for h in p_bounds.get('hard_limits', [])}
+
+    for section_key, section_name in ACTIVITY_SECTION_DISPLAY_NAMES.items():
+        u_section = u_acts.get(section_key, {})
+        p_section = p_acts.get(section_key, {})
+        
+        # Collect all unique keys appearing in either
+        all_keys = set(u_section.keys()) | set(p_section.keys())
+        
+        section_tags = []
+        
+        # We need to handle "Giving" vs "Receiving" pairs to avoid double counting
+        processed_keys = set()
+        
+        sorted_keys = sorted(list(all_keys))
+        
+        for k in sorted_keys:
+            if k in processed_keys:
+                continue
+            
+            u_score = u_section.get(k, 0)
+            p_score = p_section.get(k, 0)
+            
+            # Smart Match Logic: only _give/_receive pairs cross-match here
+            entry = DIRECTIONAL_KEYS.get(k) or directional_key(k)
+            is_directional = entry.direction in (GIVE, RECEIVE)
+            base = entry.stem if is_directional else k
+            complement = entry.partner if is_directional else None
+            
+            # Improved Fallback Formatting
+            display_name = ACTIVITY_DISPLAY_NAMES.get(k, k.replace('_', ' ').title())
+            
+            # Status determination
+            status = None
+
+            # 1. Direct Conflict Logic
+            # Normalize key and base for checking
+            # We check if the OTHER person has any limit matching this activity
+            
+            # Check matches for Partner's limits (User likes 'k')
+            if u_score > 0:
+                # Does partner hate this?
+                # Check raw key, base key, and display name
+                checks = [k.lower(), base.lower(), base.replace('_', ' ').lower(), display_name.lower()]
+                if any(c in p_hard for c in checks):
+                    status = "conflict"
+
+            # Check matches for User's limits (Partner likes 'k')
+            if not status and p_score > 0:
+                 checks = [k.lower(), base.lower(), base.replace('_', ' ').lower(), display_name.lower()]
+                 if any(c in u_hard for c in checks):
+                     status = "conflict"
+            
+            if not status:
+                # 2. Smart Match
+                if u_score > 0 and p_score > 0:
+                    status = "mutual"
+                elif complement and complement in p_section:
+                    # Check cross match: User(Receive) & Partner(Give)
+                    if u_score > 0 and p_section[complement] > 0:
+                        status = "mutual"
+                        # De-duplicate: Mark complement as processed so it's not listed again
+                        processed_keys.add(complement)
+            
+            if not status:
+                if u_score > 0:
+                    status = "user_only"
+                elif p_score > 0:
+                    status = "partner_only"
+            
+            # Calculate compatibility (directional cross-match)
+            # compatible=True means the activity can actually happen with both satisfied
+            compatible = False
+            
+            if status == "conflict":
+                # Hard limit conflict - never compatible
+                compatible = False
+            elif is_directional:
+                # For directional activities, check if roles complement
+                # A "give" activity is compatible if the other wants to receive,
+                # a "receive" activity if the other wants to give
+                # Partner does k → User does the complement?
+                if p_score > 0 and u_section.get(complement, 0) > 0:
+                    compatible = True
+                # User does k → Partner does the complement?
+                if u_score > 0 and p_section.get(complement, 0) > 0:
+                    compatible = True
+            else:
+                # Non-directional activities: compatible if mutual
+                compatible = (status == "mutual")
+            
+            if status:
+                tag_data = {"name": display_name, "status": status, "compatible": compatible}
+                
+                # Privacy Filter
+                if overlapping_only:
+                    if status in ['mutual', 'conflict']:
+                        section_tags.append(tag_data)
+                    # Hide one-sided things
+                else:
+                    section_tags.append(tag_data)
+            
+            processed_keys.add(k)
+
+        if section_tags:
+            results.append({"section": section_name, "tags": section_tags})
+            
+    return results
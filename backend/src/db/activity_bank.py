@@ -0,0 +1,275 @@
+"""
+In-process snapshot of the activity bank.
+
+The bank (~850 rows) changes only when scripts/import_activities.py runs or an
+admin edits activities, yet gameplay and recommendations look it up on every
+turn. This module loads the active, approved activities once per worker and
+partitions them by (rating, type, intensity, audience_scope) so candidate
+lookups are answered from memory.
+
+Freshness is tracked with a version stamp (row count + latest updated_at).
+The stamp is re-checked at most every `activity_bank_check_seconds` (app
+config, default 30; 0 = every lookup) and the snapshot is hot-swapped when
+it changes. Writes made through the ORM in this process invalidate it
+immediately, so only out-of-process edits (imports, admin SQL) wait for the
+next check.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+
+from ..extensions import db
+from ..models.activity import Activity, BOUNDARY_BITS, BODYPART_BITS, encode_boundaries, encode_bodyparts
+
+logger = logging.getLogger(__name__)
+
+# Audience scopes that may be served to each session mode
+SESSION_MODE_SCOPES = {
+    'couples': ('couples', 'all'),
+    'groups': ('groups', 'all'),
+}
+
+# Columns kept in the snapshot (everything needed to filter, score and render a card)
+_BANK_COLUMNS = (
+    Activity.activity_id,
+    Activity.type,
+    Activity.rating,
+    Activity.intensity,
+    Activity.audience_scope,
+    Activity.script,
+    Activity.tags,
+    Activity.power_role,
+    Activity.preference_keys,
+    Activity.domains,
+    Activity.intensity_modifiers,
+    Activity.requires_consent_negotiation,
+    Activity.hard_limit_keys,
+    Activity.hard_boundaries,
+    Activity.required_bodyparts,
+)
+
+
+class BankActivity:
+    """
+    Read-only view of one activity in the bank snapshot.
+
+    Exposes the same attribute names as the Activity model for the fields it
+    keeps, so callers of the repository can use either interchangeably.
+    Instances are shared between requests: never mutate them (copy the
+    script before changing actors).
+    """
+
+    __slots__ = (
+        'activity_id', 'type', 'rating', 'intensity', 'audience_scope',
+        'script', 'tags', 'power_role', 'preference_keys', 'domains',
+        'intensity_modifiers', 'requires_consent_negotiation',
+        'hard_limit_keys', 'hard_boundaries', 'required_bodyparts',
+        # Derived filter data (see repository.CandidateFilter)
+        'boundary_mask', 'active_bodypart_mask', 'partner_bodypart_mask',
+        'extra_boundaries', 'has_extra_bodyparts',
+    )
+
+    def __init__(self, row: Tuple[Any, ...]):
+        (
+            self.activity_id, self.type, self.rating, self.intensity,
+            self.audience_scope, self.script, tags, self.power_role,
+            preference_keys, domains, intensity_modifiers,
+            self.requires_consent_negotiation, hard_limit_keys,
+            hard_boundaries, required_bodyparts,
+        ) = row
+        self.tags = tags or []
+        self.preference_keys = preference_keys or []
+        self.domains = domains or []
+        self.intensity_modifiers = intensity_modifiers or []
+        self.hard_limit_keys = hard_limit_keys or []
+        self.hard_boundaries = hard_boundaries or []
+        self.required_bodyparts = required_bodyparts or {"active": [], "partner": []}
+
+        active_parts = self.required_bodyparts.get('active') or []
+        partner_parts = self.required_bodyparts.get('partner') or []
+        self.boundary_mask = encode_boundaries(self.hard_boundaries)
+        self.active_bodypart_mask = encode_bodyparts(active_parts)
+        self.partner_bodypart_mask = encode_bodyparts(partner_parts)
+        self.extra_boundaries = tuple(b for b in self.hard_boundaries if b not in BOUNDARY_BITS)
+        self.has_extra_bodyparts = any(
+            part not in BODYPART_BITS for part in list(active_parts) + list(partner_parts)
+        )
+
+    def __repr__(self):
+        return f"<BankActivity {self.activity_id} {self.type} {self.rating}{self.intensity}>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict shape produced by Activity.to_dict() (scoring fields only)."""
+        return {
+            'activity_id': self.activity_id,
+            'type': self.type,
+            'rating': self.rating,
+            'intensity': self.intensity,
+            'script': self.script,
+            'tags': list(self.tags),
+            'hard_limit_keys': list(self.hard_limit_keys),
+            'power_role': self.power_role,
+            'preference_keys': list(self.preference_keys),
+            'domains': list(self.domains),
+            'intensity_modifiers': list(self.intensity_modifiers),
+            'requires_consent_negotiation': self.requires_consent_negotiation,
+            'audience_scope': self.audience_scope,
+            'hard_boundaries': list(self.hard_boundaries),
+            'required_bodyparts': self.required_bodyparts,
+        }
+
+
+class ActivityBank:
+    """Immutable, partitioned snapshot of the active activity bank."""
+
+    def __init__(self, activities: List[BankActivity], version: Tuple[Any, ...]):
+        self.version = version
+        self.activities = tuple(sorted(activities, key=lambda a: a.activity_id))
+        self.by_id = {a.activity_id: a for a in self.activities}
+
+        partitions: Dict[Tuple[str, str, int, str], List[BankActivity]] = {}
+        for activity in self.activities:
+            key = (activity.rating, activity.type, activity.intensity, activity.audience_scope)
+            partitions.setdefault(key, []).append(activity)
+        self.partitions = {key: tuple(items) for key, items in partitions.items()}
+        self._scoring_matrix = None
+
+    def __len__(self):
+        return len(self.activities)
+
+    @property
+    def scoring_matrix(self):
+        """Batch-scoring encoding of the whole bank (recommender.batch_scoring), built on first use."""
+        if self._scoring_matrix is None:
+            from ..recommender.batch_scoring import ActivityMatrix
+            self._scoring_matrix = ActivityMatrix([a.to_dict() for a in self.activities])
+        return self._scoring_matrix
+
+    def get(self, activity_id: int) -> Optional[BankActivity]:
+        """Look up a single activity by ID."""
+        return self.by_id.get(activity_id)
+
+    def candidates(
+        self,
+        rating: str,
+        intensity_min: int,
+        intensity_max: int,
+        activity_type: Optional[str] = None,
+        session_mode: str = 'couples'
+    ) -> List[BankActivity]:
+        """
+        Return activities matching the partition filters, ordered by activity_id.
+
+        Mirrors the SQL filters of repository.find_activity_candidates: unknown
+        session modes are not filtered by audience scope.
+        """
+        scopes = SESSION_MODE_SCOPES.get(session_mode)
+        matches = []
+        for (p_rating, p_type, p_intensity, p_scope), items in self.partitions.items():
+            if p_rating != rating:
+                continue
+            if activity_type and p_type != activity_type:
+                continue
+            if p_intensity is None or not (intensity_min <= p_intensity <= intensity_max):
+                continue
+            if scopes is not None and p_scope not in scopes:
+                continue
+            matches.extend(items)
+
+        matches.sort(key=lambda a: a.activity_id)
+        return matches
+
+
+# ==============================================================================
+# Snapshot lifecycle
+# ==============================================================================
+
+_bank: Optional[ActivityBank] = None
+_bank_engine_id: Optional[int] = None
+_bank_checked_at = 0.0
+_bank_invalidated = False
+_bank_lock = threading.Lock()
+
+
+def _fetch_version() -> Tuple[Any, ...]:
+    """Cheap aggregate used to detect changes to the bank."""
+    count, last_updated, last_id = db.session.query(
+        func.count(Activity.activity_id),
+        func.max(Activity.updated_at),
+        func.max(Activity.activity_id),
+    ).one()
+    return (count, last_updated, last_id)
+
+
+def _load_bank(version: Tuple[Any, ...]) -> ActivityBank:
+    rows = db.session.query(*_BANK_COLUMNS).filter(
+        Activity.is_active == True,
+        Activity.approved == True,
+    ).all()
+    bank = ActivityBank([BankActivity(tuple(row)) for row in rows], version)
+    logger.info(f"Activity bank loaded: {len(bank)} activities, {len(bank.partitions)} partitions")
+    return bank
+
+
+def get_activity_bank() -> Optional[ActivityBank]:
+    """
+    Get the current activity bank snapshot, reloading it if the bank changed.
+
+    Returns:
+        ActivityBank, or None if the bank could not be loaded (callers should
+        fall back to querying the database directly)
+    """
+    global _bank, _bank_engine_id, _bank_checked_at, _bank_invalidated
+    from ..services.config_service import get_config_int
+
+    try:
+        engine_id = id(db.engine)
+        now = time.monotonic()
+        bank = _bank
+        if (
+            bank is not None
+            and not _bank_invalidated
+            and _bank_engine_id == engine_id
+            and now - _bank_checked_at < get_config_int('activity_bank_check_seconds', 30)
+        ):
+            return bank
+
+        # Savepoint: a failed lookup must not abort the caller's transaction,
+        # which falls back to querying the database directly
+        with _bank_lock, db.session.begin_nested():
+            version = _fetch_version()
+            if (
+                _bank is None
+                or _bank_invalidated
+                or _bank_engine_id != engine_id
+                or _bank.version != version
+            ):
+                _bank_invalidated = False
+                try:
+                    _bank = _load_bank(version)
+                except Exception:
+                    _bank_invalidated = True  # Retry the reload on the next call
+                    raise
+                _bank_engine_id = engine_id
+            _bank_checked_at = now
+            return _bank
+    except Exception as e:
+        logger.error(f"Failed to load activity bank snapshot: {e}")
+        return None
+
+
+def invalidate_activity_bank() -> None:
+    """Force the next get_activity_bank() call to reload the snapshot."""
+    global _bank_invalidated
+    _bank_invalidated = True
+
+
+@event.listens_for(Activity, 'after_insert')
+@event.listens_for(Activity, 'after_update')
+@event.listens_for(Activity, 'after_delete')
+def _invalidate_on_activity_write(mapper, connection, target):
+    """Drop the snapshot when activities are written through the ORM in this process."""
+    invalidate_activity_bank()
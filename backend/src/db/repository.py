@@ -1,16 +1,26 @@
 """Data repository for accessing profiles, sessions, activities, and compatibility."""
 import logging
-from typing import Optional, List, Dict, Any
+import random
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime
 
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from ..extensions import db
 from ..models.profile import Profile
 from ..models.session import Session
-from ..models.activity import Activity
+from ..models.activity import (
+    Activity, BOUNDARY_BITS, BODYPART_BITS, ALL_BODYPARTS_MASK,
+    encode_boundaries, encode_bodyparts
+)
 from ..models.session_activity import SessionActivity
 from ..models.compatibility import Compatibility
 from ..models.survey import SurveySubmission
 from ..models.user import User
+from .activity_bank import BankActivity, get_activity_bank
 
 logger = logging.getLogger(__name__)
 
@@ -134,6 +144,81 @@ def get_profile_by_submission(submission_id: str) -> Optional[Profile]:
     return Profile.query.filter_by(submission_id=submission_id).first()
 
 
+def get_current_profile_ids(user_ids: Iterable[Any]) -> Dict[Any, int]:
+    """
+    Current profile id of each user, keyed by user id (users without a
+    profile are absent).
+    
+    Reads users.current_profile_id in one query; users without the pointer
+    (profiles written outside the survey submit paths) fall back to their
+    latest profile by created_at.
+    """
+    user_ids = _as_uuids(user_ids)
+    if not user_ids:
+        return {}
+    
+    current = {
+        user_id: profile_id
+        for user_id, profile_id in db.session.query(User.id, User.current_profile_id).filter(
+            User.id.in_(user_ids), User.current_profile_id.isnot(None)
+        )
+    }
+    missing = [user_id for user_id in user_ids if user_id not in current]
+    if missing:
+        current.update(_latest_profile_ids(missing))
+    return current
+
+
+def get_current_profiles(user_ids: Iterable[Any]) -> Dict[Any, Profile]:
+    """
+    Current profile of each user, keyed by user id (users without a profile
+    are absent).
+    
+    One primary-key join through users.current_profile_id, plus the
+    created_at fallback of get_current_profile_ids() for users without the
+    pointer.
+    """
+    user_ids = _as_uuids(user_ids)
+    if not user_ids:
+        return {}
+    
+    profiles = {
+        user_id: profile
+        for user_id, profile in db.session.query(User.id, Profile).join(
+            Profile, Profile.id == User.current_profile_id
+        ).filter(User.id.in_(user_ids))
+    }
+    missing = _latest_profile_ids([user_id for user_id in user_ids if user_id not in profiles])
+    if missing:
+        by_id = {profile.id: profile for profile in Profile.query.filter(Profile.id.in_(list(missing.values())))}
+        profiles.update({user_id: by_id[profile_id] for user_id, profile_id in missing.items()})
+    return profiles
+
+
+def get_current_profile(user_id: Any) -> Optional[Profile]:
+    """Current profile of one user (see get_current_profiles)."""
+    profiles = get_current_profiles([user_id])
+    return next(iter(profiles.values()), None)
+
+
+def _as_uuids(user_ids: Iterable[Any]) -> List[uuid.UUID]:
+    """Distinct user ids as UUIDs (result keys are UUIDs, as loaded from GUID columns)."""
+    return list({user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id)) for user_id in user_ids})
+
+
+def _latest_profile_ids(user_ids: List[Any]) -> Dict[Any, int]:
+    """Id of each user's latest profile by (created_at, id), from one stamp query."""
+    if not user_ids:
+        return {}
+    latest: Dict[Any, tuple] = {}
+    for user_id, profile_id, created_at in db.session.query(
+        Profile.user_id, Profile.id, Profile.created_at
+    ).filter(Profile.user_id.in_(user_ids)):
+        if user_id not in latest or (created_at, profile_id) > latest[user_id]:
+            latest[user_id] = (created_at, profile_id)
+    return {user_id: profile_id for user_id, (_, profile_id) in latest.items()}
+
+
 # ==============================================================================
 # Session Operations
 # ==============================================================================
@@ -257,37 +342,147 @@ def has_boundary_conflict(activity_boundaries: List[str], player_boundaries: Lis
     return any(b in player_boundaries for b in activity_boundaries)
 
 
-def find_activity_candidates(
+class CandidateFilter:
+    """
+    Player-pair boundary and anatomy filter encoded as bitmasks.
+    
+    Build once per player pair; each candidate check is then a couple of
+    AND/compare operations against the activity's precomputed masks. Keys
+    outside the boundary/bodypart taxonomies have no bit and fall back to the
+    list-based checks above, so results match meets_anatomy_requirements and
+    has_boundary_conflict exactly.
+    """
+    
+    __slots__ = (
+        'check_boundaries', 'boundary_mask', 'extra_boundaries',
+        'check_anatomy', 'player_anatomy', 'missing_active_mask', 'missing_partner_mask',
+    )
+    
+    def __init__(
+        self,
+        player_boundaries: Optional[List[str]] = None,
+        player_anatomy: Optional[Dict[str, List[str]]] = None
+    ):
+        self.check_boundaries = bool(player_boundaries)
+        self.boundary_mask = encode_boundaries(player_boundaries)
+        self.extra_boundaries = frozenset(
+            b for b in player_boundaries or () if b not in BOUNDARY_BITS
+        )
+        
+        self.check_anatomy = bool(player_anatomy)
+        self.player_anatomy = player_anatomy
+        self.missing_active_mask = 0
+        self.missing_partner_mask = 0
+        if player_anatomy:
+            # Same defaults as meets_anatomy_requirements
+            active_has = player_anatomy.get('active_anatomy', ['penis', 'vagina', 'breasts'])
+            partner_has = player_anatomy.get('partner_anatomy', ['penis', 'vagina', 'breasts'])
+            self.missing_active_mask = ALL_BODYPARTS_MASK & ~encode_bodyparts(active_has)
+            self.missing_partner_mask = ALL_BODYPARTS_MASK & ~encode_bodyparts(partner_has)
+    
+    @property
+    def is_exact_in_sql(self) -> bool:
+        """True when sql_criteria() captures every player-side key."""
+        return not self.extra_boundaries
+    
+    def allows(self, activity) -> bool:
+        """Check one activity (Activity or BankActivity) against the pair."""
+        if self.check_boundaries:
+            if (activity.boundary_mask or 0) & self.boundary_mask:
+                return False
+            if self.extra_boundaries:
+                extra = _extra_boundaries(activity)
+                if extra and not self.extra_boundaries.isdisjoint(extra):
+                    return False
+        
+        if self.check_anatomy:
+            if (activity.active_bodypart_mask or 0) & self.missing_active_mask:
+                return False
+            if (activity.partner_bodypart_mask or 0) & self.missing_partner_mask:
+                return False
+            if _has_extra_bodyparts(activity):
+                return meets_anatomy_requirements(activity, self.player_anatomy)
+        
+        return True
+    
+    def sql_criteria(self) -> list:
+        """SQL filter expressions equivalent to allows() for taxonomy keys."""
+        criteria = []
+        if self.check_boundaries and self.boundary_mask:
+            criteria.append(Activity.boundary_mask.op('&')(self.boundary_mask) == 0)
+        if self.missing_active_mask:
+            criteria.append(Activity.active_bodypart_mask.op('&')(self.missing_active_mask) == 0)
+        if self.missing_partner_mask:
+            criteria.append(Activity.partner_bodypart_mask.op('&')(self.missing_partner_mask) == 0)
+        return criteria
+
+
+def _extra_boundaries(activity) -> tuple:
+    """Boundary keys of an activity that fall outside the bitmask taxonomy."""
+    extra = getattr(activity, 'extra_boundaries', None)
+    if extra is None:
+        extra = tuple(b for b in activity.hard_boundaries or () if b not in BOUNDARY_BITS)
+    return extra
+
+
+def _has_extra_bodyparts(activity) -> bool:
+    """Whether an activity requires body parts outside the bitmask taxonomy."""
+    flag = getattr(activity, 'has_extra_bodyparts', None)
+    if flag is None:
+        req = activity.required_bodyparts or {}
+        flag = any(
+            part not in BODYPART_BITS
+            for part in (req.get('active') or []) + (req.get('partner') or [])
+        )
+    return flag
+
+
+def sample_activities(query, k: int, rng: Optional[random.Random] = None) -> List[Activity]:
+    """
+    Uniformly sample up to k activities from a filtered Activity query.
+
+    Same distribution as `query.order_by(func.random()).limit(k)` (a uniform
+    random k-subset in random order) without sorting the filtered set: the
+    matching activity_ids are read without ORDER BY, sampled in Python and
+    the chosen rows loaded by primary key.
+
+    Args:
+        query: Activity query with the candidate filters applied (no ordering)
+        k: Number of activities to return
+        rng: Random source (module `random` by default), for reproducible tests
+
+    Returns:
+        List of up to k Activity instances in random order
+    """
+    rng = rng or random
+    ids = [activity_id for (activity_id,) in query.with_entities(Activity.activity_id).all()]
+    if not ids or k <= 0:
+        return []
+
+    chosen = rng.sample(ids, min(k, len(ids)))
+    rows = {a.activity_id: a for a in Activity.query.filter(Activity.activity_id.in_(chosen)).all()}
+    return [rows[activity_id] for activity_id in chosen if activity_id in rows]
+
+
+def _query_activity_candidates(
     rating: str,
     intensity_min: int,
     intensity_max: int,
     activity_type: Optional[str] = None,
     session_mode: str = 'couples',
-    player_boundaries: Optional[List[str]] = None,
-    player_anatomy: Optional[Dict[str, List[str]]] = None,
-    hard_limits: Optional[List[str]] = None,  # LEGACY, deprecated
-    tags: Optional[List[str]] = None,
+    candidate_filter: Optional[CandidateFilter] = None,
+    over_fetch: bool = True,
     randomize: bool = False,
-    limit: int = 50
+    limit: Optional[int] = 50,
+    rng: Optional[random.Random] = None
 ) -> List[Activity]:
     """
-    Find activity candidates matching criteria with pre-filters for anatomy, boundaries, and audience.
-    
-    Args:
-        rating: Content rating (G/R/X)
-        intensity_min: Minimum intensity
-        intensity_max: Maximum intensity
-        activity_type: Optional type filter (truth/dare)
-        session_mode: Session mode ('couples' or 'groups')
-        player_boundaries: List of combined player hard boundaries
-        player_anatomy: Dict with 'active_anatomy' and 'partner_anatomy' lists
-        hard_limits: LEGACY - List of hard limit keys to exclude (deprecated)
-        tags: Optional tag filters
-        randomize: Whether to sort results randomly
-        limit: Maximum results to return
+    Query activity candidates directly from the database.
     
-    Returns:
-        List of matching Activity instances
+    Used when the in-memory bank snapshot is unavailable. Boundary and
+    anatomy masks are pushed into the query; over-fetches (limit * 3) only
+    when the caller still has post-filters the query cannot express.
+    limit=None returns every matching row.
     """
     # Base query: active, approved activities only
     query = Activity.query.filter(
@@ -307,31 +502,89 @@ def find_activity_candidates(
     # Filter by activity type
     if activity_type:
         query = query.filter(Activity.type == activity_type)
+    
+    # Boundary / anatomy bitmasks
+    if candidate_filter is not None:
+        criteria = candidate_filter.sql_criteria()
+        if criteria:
+            query = query.filter(*criteria)
         
-    # Apply randomization if requested
+    if limit is None:
+        return query.all()
+    
+    size = limit * 3 if over_fetch else limit
+    
+    # Random sample without sorting the whole filtered set
     if randomize:
-        query = query.order_by(db.func.random())
+        return sample_activities(query, size, rng=rng)
+    
+    return query.limit(size).all()
+
+
+def find_activity_candidates(
+    rating: str,
+    intensity_min: int,
+    intensity_max: int,
+    activity_type: Optional[str] = None,
+    session_mode: str = 'couples',
+    player_boundaries: Optional[List[str]] = None,
+    player_anatomy: Optional[Dict[str, List[str]]] = None,
+    hard_limits: Optional[List[str]] = None,  # LEGACY, deprecated
+    tags: Optional[List[str]] = None,
+    randomize: bool = False,
+    limit: int = 50,
+    candidate_filter: Optional[CandidateFilter] = None,
+    rng: Optional[random.Random] = None
+) -> List[Activity]:
+    """
+    Find activity candidates matching criteria with pre-filters for anatomy, boundaries, and audience.
     
-    # Fetch candidates (over-fetch to account for post-filtering)
-    candidates = query.limit(limit * 3).all()
+    Args:
+        rating: Content rating (G/R/X)
+        intensity_min: Minimum intensity
+        intensity_max: Maximum intensity
+        activity_type: Optional type filter (truth/dare)
+        session_mode: Session mode ('couples' or 'groups')
+        player_boundaries: List of combined player hard boundaries
+        player_anatomy: Dict with 'active_anatomy' and 'partner_anatomy' lists
+        hard_limits: LEGACY - List of hard limit keys to exclude (deprecated)
+        tags: Optional tag filters
+        randomize: Whether to return a uniform random sample (see sample_activities)
+        limit: Maximum results to return
+        candidate_filter: Precomputed CandidateFilter for the player pair
+            (built from player_boundaries/player_anatomy when omitted)
+        rng: Random source for the sample (module `random` by default)
     
-    # Post-filter: anatomy requirements
-    if player_anatomy:
-        filtered = []
-        for activity in candidates:
-            if not meets_anatomy_requirements(activity, player_anatomy):
-                continue
-            filtered.append(activity)
-        candidates = filtered
+    Returns:
+        List of matching activities (BankActivity from the in-memory snapshot,
+        or Activity instances if the snapshot is unavailable)
+    """
+    if candidate_filter is None:
+        candidate_filter = CandidateFilter(player_boundaries, player_anatomy)
     
-    # Post-filter: hard boundaries (new system)
-    if player_boundaries:
-        filtered = []
-        for activity in candidates:
-            if has_boundary_conflict(activity.hard_boundaries or [], player_boundaries):
-                continue
-            filtered.append(activity)
-        candidates = filtered
+    bank = get_activity_bank()
+    if bank is not None:
+        # In-memory snapshot: the partition lookup already applies the column filters
+        candidates = bank.candidates(
+            rating, intensity_min, intensity_max,
+            activity_type=activity_type,
+            session_mode=session_mode
+        )
+    else:
+        candidates = _query_activity_candidates(
+            rating, intensity_min, intensity_max,
+            activity_type=activity_type,
+            session_mode=session_mode,
+            candidate_filter=candidate_filter,
+            over_fetch=bool(hard_limits) or not candidate_filter.is_exact_in_sql,
+            randomize=randomize,
+            limit=limit,
+            rng=rng
+        )
+    
+    # Post-filter: anatomy requirements and hard boundaries (new system)
+    if candidate_filter.check_anatomy or candidate_filter.check_boundaries:
+        candidates = [a for a in candidates if candidate_filter.allows(a)]
     
     # Legacy hard limits filter (for backward compatibility)
     if hard_limits:
@@ -343,7 +596,9 @@ def find_activity_candidates(
             filtered.append(activity)
         candidates = filtered
     
-    # Return up to limit
+    # Return up to limit (random sample when reading from the snapshot)
+    if bank is not None and randomize and len(candidates) > limit:
+        candidates = (rng or random).sample(candidates, limit)
     candidates = candidates[:limit]
     
     logger.debug(
@@ -358,6 +613,43 @@ def find_activity_candidates(
     return candidates
 
 
+def find_activity_pool(
+    rating: str,
+    intensity_min: int,
+    intensity_max: int,
+    session_mode: str = 'couples',
+    candidate_filter: Optional[CandidateFilter] = None
+) -> List[Activity]:
+    """
+    Every truth and dare matching a rating, intensity range and audience, in one lookup.
+    
+    Used by callers that pick many activities for the same players (see
+    recommender.planner). Answered from the bank snapshot when available,
+    otherwise with a single query.
+    
+    Returns:
+        Matching activities ordered by activity_id
+    """
+    bank = get_activity_bank()
+    if bank is not None:
+        pool = bank.candidates(rating, intensity_min, intensity_max, session_mode=session_mode)
+    else:
+        pool = sorted(
+            _query_activity_candidates(
+                rating, intensity_min, intensity_max,
+                session_mode=session_mode,
+                candidate_filter=candidate_filter,
+                over_fetch=False,
+                limit=None
+            ),
+            key=lambda a: a.activity_id
+        )
+    
+    if candidate_filter is not None and (candidate_filter.check_anatomy or candidate_filter.check_boundaries):
+        pool = [a for a in pool if candidate_filter.allows(a)]
+    return pool
+
+
 def get_activity(activity_id: int) -> Optional[Activity]:
     """Get activity by ID."""
     return Activity.query.get(activity_id)
@@ -376,8 +668,9 @@ def find_best_activity_candidate(
     hard_limits: Optional[List[str]] = None,  # LEGACY
     excluded_ids: Optional[set] = None,
     top_n: int = 20,
-    randomize: bool = True
-) -> Optional[Activity]:
+    randomize: bool = True,
+    rng: Optional[random.Random] = None
+) -> Optional[BankActivity]:
     """
     Find best-matching activity using preference-based scoring with anatomy and boundary filters.
     
@@ -395,11 +688,12 @@ def find_best_activity_candidate(
         excluded_ids: Set of activity IDs already used (for deduplication)
         top_n: Consider top N candidates for scoring
         randomize: Whether to fetch candidates randomly (default True)
+        rng: Random source for the candidate sample (module `random` by default)
     
     Returns:
-        Best-matching Activity or None
+        Best-matching activity (see find_activity_candidates) or None
     """
-    from ..recommender.scoring import score_activity_for_players, filter_by_power_dynamics
+    from ..recommender.batch_scoring import ActivityMatrix, to_score_dicts
     
     if excluded_ids is None:
         excluded_ids = set()
@@ -415,7 +709,8 @@ def find_best_activity_candidate(
         player_anatomy=player_anatomy,
         hard_limits=hard_limits,
         randomize=randomize,
-        limit=top_n * 2  # Get more to account for exclusions
+        limit=top_n * 2,  # Get more to account for exclusions
+        rng=rng
     )
     
     if not candidates:
@@ -428,47 +723,41 @@ def find_best_activity_candidate(
         logger.warning("All candidates already used, no activities available")
         return None
     
-    # Convert to dicts for scoring
-    candidate_dicts = [c.to_dict() for c in candidates]
+    # Score the whole pool in one vectorized pass (bank candidates reuse the
+    # bank-wide encoding; SQL fallback candidates are encoded on the fly)
+    bank = get_activity_bank()
+    if bank is not None and all(bank.get(c.activity_id) is c for c in candidates):
+        matrix = bank.scoring_matrix
+        rows = [matrix.row_of[c.activity_id] for c in candidates]
+    else:
+        matrix = ActivityMatrix([c.to_dict() for c in candidates])
+        rows = None
+    components = matrix.score(player_a_profile, player_b_profile, rows=rows)
     
-    # Filter by power dynamics first (removes hard mismatches)
-    player_a_orientation = player_a_profile.get('power_dynamic', {}).get('orientation', 'Switch')
-    player_b_orientation = player_b_profile.get('power_dynamic', {}).get('orientation', 'Switch')
+    # Filter by power dynamics first (removes hard mismatches, same threshold
+    # as filter_by_power_dynamics with moderate filtering)
+    compatible = [
+        i for i, power in enumerate(components['power_alignment'].tolist())
+        if power >= 0.3
+    ]
     
-    compatible_dicts = filter_by_power_dynamics(
-        candidate_dicts,
-        player_a_orientation,
-        player_b_orientation,
-        min_score=0.3  # Moderate filtering
-    )
-    
-    if not compatible_dicts:
+    if not compatible:
         # No power-compatible activities, return first candidate anyway
         logger.warning(f"No power-compatible activities found, using first candidate")
         return candidates[0]
     
-    # Score each compatible activity
-    scored_activities = []
-    
-    for activity_dict in compatible_dicts:
-        scores = score_activity_for_players(
-            activity_dict,
-            player_a_profile,
-            player_b_profile
-        )
-        
-        scored_activities.append({
-            'activity_id': activity_dict['activity_id'],
-            'score': scores['overall_score'],
-            'scores': scores
-        })
-    
-    # Sort by overall score descending
-    scored_activities.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Get best activity
-    best = scored_activities[0]
-    best_activity = next(c for c in candidates if c.activity_id == best['activity_id'])
+    # Best overall score (first candidate wins ties, as with a stable sort)
+    overall_scores = [round(score, 3) for score in components['overall'].tolist()]
+    best_index = max(compatible, key=lambda i: (overall_scores[i], -i))
+    best_scores = to_score_dicts(
+        {name: values[best_index:best_index + 1] for name, values in components.items()}
+    )[0]
+    best = {
+        'activity_id': candidates[best_index].activity_id,
+        'score': best_scores['overall_score'],
+        'scores': best_scores
+    }
+    best_activity = candidates[best_index]
     
     logger.debug(
         f"Selected activity with score {best['score']:.3f}",
@@ -487,51 +776,87 @@ def find_best_activity_candidate(
 # Session Activity Operations
 # ==============================================================================
 
+# Columns overwritten when a (session_id, seq) row already exists
+# (activity_id and created_at keep their first-saved values)
+SESSION_ACTIVITY_UPDATE_COLUMNS = (
+    'type', 'rating', 'intensity', 'script', 'tags', 'roles', 'source', 'template_id', 'checks'
+)
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_ON_CONFLICT_DIALECTS = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+
+def _session_activity_row(session_id: str, activity_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one session_activities row."""
+    provenance = activity_data.get('provenance', {})
+    return {
+        'session_id': session_id,
+        'seq': activity_data.get('seq'),
+        'activity_id': provenance.get('template_id'),
+        'type': activity_data.get('type'),
+        'rating': activity_data.get('rating'),
+        'intensity': activity_data.get('intensity'),
+        'script': activity_data.get('script'),
+        'tags': activity_data.get('tags', []),
+        'roles': activity_data.get('roles'),
+        'source': provenance.get('source', 'ai_generated'),
+        'template_id': provenance.get('template_id'),
+        'checks': activity_data.get('checks', {}),
+        'created_at': datetime.utcnow(),
+    }
+
+
 def save_session_activities(session_id: str, activities: List[Dict[str, Any]]) -> None:
     """
     Save or update activities for a session.
     
+    Set-based upsert keyed by (session_id, seq): a single multi-row
+    INSERT ... ON CONFLICT DO UPDATE on PostgreSQL/SQLite; on other dialects
+    one query for the existing seqs, then one bulk insert and one bulk update.
+    Commits once.
+    
     Args:
         session_id: Session ID
         activities: List of activity dicts with seq, type, rating, intensity, script, etc.
     """
+    # One row per seq; a repeated seq updates the earlier row, as before
+    rows: Dict[Any, Dict[str, Any]] = {}
     for activity_data in activities:
-        seq = activity_data.get('seq')
-        
-        # Check if already exists
-        existing = SessionActivity.query.filter_by(
-            session_id=session_id,
-            seq=seq
-        ).first()
-        
-        if existing:
-            # Update existing
-            existing.type = activity_data.get('type')
-            existing.rating = activity_data.get('rating')
-            existing.intensity = activity_data.get('intensity')
-            existing.script = activity_data.get('script')
-            existing.tags = activity_data.get('tags', [])
-            existing.roles = activity_data.get('roles')
-            existing.source = activity_data.get('provenance', {}).get('source', 'ai_generated')
-            existing.template_id = activity_data.get('provenance', {}).get('template_id')
-            existing.checks = activity_data.get('checks', {})
+        row = _session_activity_row(session_id, activity_data)
+        if row['seq'] in rows:
+            rows[row['seq']].update({column: row[column] for column in SESSION_ACTIVITY_UPDATE_COLUMNS})
         else:
-            # Create new
-            session_activity = SessionActivity(
-                session_id=session_id,
-                seq=seq,
-                activity_id=activity_data.get('provenance', {}).get('template_id'),
-                type=activity_data.get('type'),
-                rating=activity_data.get('rating'),
-                intensity=activity_data.get('intensity'),
-                script=activity_data.get('script'),
-                tags=activity_data.get('tags', []),
-                roles=activity_data.get('roles'),
-                source=activity_data.get('provenance', {}).get('source', 'ai_generated'),
-                template_id=activity_data.get('provenance', {}).get('template_id'),
-                checks=activity_data.get('checks', {})
+            rows[row['seq']] = row
+    
+    if rows:
+        table = SessionActivity.__table__
+        dialect_insert = _ON_CONFLICT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(table).values(list(rows.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.session_id, table.c.seq],
+                set_={column: stmt.excluded[column] for column in SESSION_ACTIVITY_UPDATE_COLUMNS}
             )
-            db.session.add(session_activity)
+            db.session.execute(stmt)
+        else:
+            existing = {
+                seq for (seq,) in db.session.query(SessionActivity.seq).filter(
+                    SessionActivity.session_id == session_id,
+                    SessionActivity.seq.in_(list(rows))
+                )
+            }
+            new_rows = [row for seq, row in rows.items() if seq not in existing]
+            updated_rows = [
+                {'session_id': session_id, 'seq': seq, **{c: row[c] for c in SESSION_ACTIVITY_UPDATE_COLUMNS}}
+                for seq, row in rows.items() if seq in existing
+            ]
+            if new_rows:
+                db.session.execute(insert(SessionActivity), new_rows)
+            if updated_rows:
+                db.session.execute(update(SessionActivity), updated_rows)
     
     db.session.commit()
     logger.info(f"Saved {len(activities)} activities for session {session_id}")
@@ -598,6 +923,7 @@ def save_compatibility_result(
         existing.blocked_activities = blocked_activities
         existing.boundary_conflicts = boundary_conflicts
         existing.created_at = datetime.utcnow()  # Update timestamp
+        existing.version = (existing.version or 0) + 1
         
         compatibility = existing
     else:
@@ -617,12 +943,107 @@ def save_compatibility_result(
         )
         db.session.add(compatibility)
     
+    db.session.flush()
+    _materialize_ui_payloads([(ordered_a, ordered_b)])
     db.session.commit()
     logger.info(f"Saved compatibility for profiles {ordered_a} and {ordered_b}: {overall_percentage}%")
     
     return compatibility
 
 
+# Columns overwritten when a (player_a_id, player_b_id) row already exists
+COMPATIBILITY_UPDATE_COLUMNS = (
+    'overall_score', 'overall_percentage', 'interpretation', 'breakdown', 'mutual_activities',
+    'growth_opportunities', 'mutual_truth_topics', 'blocked_activities', 'boundary_conflicts',
+    'calculation_version', 'created_at',
+)
+
+
+def compatibility_row(player_a_id: int, player_b_id: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one compatibility_results row (player ids ordered low-high)."""
+    ordered_a, ordered_b = Compatibility.get_or_create_key(player_a_id, player_b_id)
+    overall = result['overall_compatibility']
+    return {
+        'player_a_id': ordered_a,
+        'player_b_id': ordered_b,
+        'overall_score': float(overall['score']) / 100.0,
+        'overall_percentage': int(overall['score']),
+        'interpretation': overall['interpretation'],
+        'breakdown': result['breakdown'],
+        'mutual_activities': result['mutual_activities'],
+        'growth_opportunities': result['growth_opportunities'],
+        'mutual_truth_topics': result['mutual_truth_topics'],
+        'blocked_activities': result['blocked_activities'],
+        'boundary_conflicts': result['boundary_conflicts'],
+        'calculation_version': result['compatibility_version'],
+        'created_at': datetime.utcnow(),
+    }
+
+
+def upsert_compatibility_rows(rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert or update compatibility_results rows built by compatibility_row().
+    
+    Set-based upsert keyed by (player_a_id, player_b_id), like
+    save_session_activities: one multi-row INSERT ... ON CONFLICT DO UPDATE
+    on PostgreSQL/SQLite, otherwise one lookup, one bulk insert and one bulk
+    update. Bumps the version of rewritten rows and materializes their UI
+    payloads (compatibility/ui_payload.py) in the same transaction. Commits
+    once.
+    """
+    # One row per pair; a repeated pair keeps the last result
+    by_pair = {(row['player_a_id'], row['player_b_id']): row for row in rows}
+    
+    if by_pair:
+        table = Compatibility.__table__
+        dialect_insert = _ON_CONFLICT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(table).values(list(by_pair.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.player_a_id, table.c.player_b_id],
+                set_={
+                    **{column: stmt.excluded[column] for column in COMPATIBILITY_UPDATE_COLUMNS},
+                    'version': table.c.version + 1,
+                }
+            )
+            db.session.execute(stmt)
+        else:
+            existing = {
+                (a, b): row_id for row_id, a, b in db.session.query(
+                    Compatibility.id, Compatibility.player_a_id, Compatibility.player_b_id
+                ).filter(tuple_(Compatibility.player_a_id, Compatibility.player_b_id).in_(list(by_pair)))
+            }
+            new_rows = [row for pair, row in by_pair.items() if pair not in existing]
+            updated_rows = [
+                {'id': existing[pair], **{c: row[c] for c in COMPATIBILITY_UPDATE_COLUMNS}}
+                for pair, row in by_pair.items() if pair in existing
+            ]
+            if new_rows:
+                db.session.execute(insert(Compatibility), new_rows)
+            if updated_rows:
+                db.session.execute(update(Compatibility), updated_rows)
+                db.session.execute(
+                    update(Compatibility)
+                    .where(Compatibility.id.in_([row['id'] for row in updated_rows]))
+                    .values(version=Compatibility.version + 1)
+                )
+        
+        _materialize_ui_payloads(list(by_pair))
+    
+    db.session.commit()
+    logger.info(f"Upserted {len(by_pair)} compatibility results")
+
+
+def _materialize_ui_payloads(pairs: List[Any]) -> None:
+    """Write-through of the compatibility UI payloads for freshly written records."""
+    # Imported here: ui_payload imports this module
+    from ..compatibility.ui_payload import materialize
+    try:
+        materialize(pairs)
+    except Exception as e:
+        logger.warning(f"Compatibility UI payload materialization failed: {e}")
+
+
 def get_compatibility_result(player_a_id: int, player_b_id: int) -> Optional[Compatibility]:
     """Get compatibility result for two players."""
     ordered_a, ordered_b = Compatibility.get_or_create_key(player_a_id, player_b_id)
@@ -0,0 +1,191 @@
+"""
+Per-session pair ranking of the activity bank.
+
+Within a game session the two profiles, the rating and the audience scope are
+fixed; only the intensity window, the truth/dare type and the exclusion set
+change from turn to turn. A PairRanking scores every eligible bank activity
+for one (primary, secondary) player pair once, keeps the results bucketed by
+(type, intensity) in descending score order, and answers each turn by walking
+the buckets of the current window for the best non-excluded activity.
+
+Rankings are cached in-process per session and player pair. The cache key
+includes the bank version and both profiles' updated_at stamps, so a bank
+reload or a profile update rebuilds the ranking on next use.
+"""
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..db.activity_bank import ActivityBank, BankActivity, SESSION_MODE_SCOPES, get_activity_bank
+from ..db.repository import CandidateFilter
+from ..logging_config import get_logger
+
+logger = get_logger()
+
+# Same threshold find_best_activity_candidate uses (filter_by_power_dynamics)
+MIN_POWER_ALIGNMENT = 0.3
+
+
+class PairRanking:
+    """
+    Ranked activities for one player pair, bucketed by (type, intensity).
+
+    Each bucket holds (compatible, score, activity) tuples: power-compatible
+    activities first by descending overall score, then the incompatible ones
+    as a last resort. Ties keep a per-ranking shuffled order so equally
+    scored activities still vary between sessions (`rng` makes the order
+    reproducible, see game/turn_rng.ranking_rng).
+    """
+
+    def __init__(
+        self,
+        bank: ActivityBank,
+        player_a_profile: Dict[str, Any],
+        player_b_profile: Dict[str, Any],
+        rating: str,
+        session_mode: str = 'couples',
+        candidate_filter: Optional[CandidateFilter] = None,
+        rng: Optional[random.Random] = None
+    ):
+        self.bank_version = bank.version
+        scopes = SESSION_MODE_SCOPES.get(session_mode)
+
+        eligible: List[BankActivity] = []
+        for (p_rating, _, _, p_scope), items in bank.partitions.items():
+            if p_rating != rating or (scopes is not None and p_scope not in scopes):
+                continue
+            if candidate_filter is None:
+                eligible.extend(items)
+            else:
+                eligible.extend(a for a in items if candidate_filter.allows(a))
+        (rng or random).shuffle(eligible)
+
+        self.buckets: Dict[Tuple[str, int], List[Tuple[bool, float, BankActivity]]] = {}
+        if eligible:
+            matrix = bank.scoring_matrix
+            components = matrix.score(
+                player_a_profile,
+                player_b_profile,
+                rows=[matrix.row_of[a.activity_id] for a in eligible]
+            )
+            for activity, power, overall in zip(
+                eligible,
+                components['power_alignment'].tolist(),
+                components['overall'].tolist(),
+            ):
+                entry = (power >= MIN_POWER_ALIGNMENT, round(overall, 3), activity)
+                self.buckets.setdefault((activity.type, activity.intensity), []).append(entry)
+
+        for entries in self.buckets.values():
+            # Stable sort: ties keep the shuffled order
+            entries.sort(key=lambda e: (e[0], e[1]), reverse=True)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.buckets.values())
+
+    def pick(
+        self,
+        activity_type: str,
+        intensity_min: int,
+        intensity_max: int,
+        excluded_ids: Optional[Iterable[int]] = None
+    ) -> Optional[BankActivity]:
+        """
+        Return the best non-excluded activity of a type within an intensity window.
+
+        Args:
+            activity_type: 'truth' or 'dare'
+            intensity_min: Minimum intensity (inclusive)
+            intensity_max: Maximum intensity (inclusive)
+            excluded_ids: Activity IDs that must not be returned
+
+        Returns:
+            BankActivity, or None if every eligible activity is excluded
+        """
+        excluded = excluded_ids if excluded_ids is not None else ()
+        best = None
+        for intensity in range(intensity_min, intensity_max + 1):
+            for entry in self.buckets.get((activity_type, intensity), ()):
+                if entry[2].activity_id in excluded:
+                    continue
+                if best is None or (entry[0], entry[1]) > (best[0], best[1]):
+                    best = entry
+                break
+        return best[2] if best is not None else None
+
+
+# ==============================================================================
+# Session cache
+# ==============================================================================
+
+_rankings: "OrderedDict[Tuple[Any, ...], PairRanking]" = OrderedDict()
+_rankings_lock = threading.Lock()
+
+
+def _cache_size() -> int:
+    from ..services.config_service import get_config_int
+    return get_config_int('pair_ranking_cache_size', 512)
+
+
+def get_pair_ranking(
+    session_id: Any,
+    primary_player: Dict[str, Any],
+    secondary_player: Dict[str, Any],
+    player_a_profile: Dict[str, Any],
+    player_b_profile: Dict[str, Any],
+    rating: str,
+    session_mode: str = 'couples',
+    candidate_filter: Optional[CandidateFilter] = None,
+    rng: Optional[random.Random] = None
+) -> Optional[PairRanking]:
+    """
+    Get (building on first use) the ranking for a player pair in a session.
+
+    `rng` orders ties when the ranking is built; pass the session's ranking
+    generator so every worker builds the same ranking.
+
+    Returns:
+        PairRanking, or None if the activity bank snapshot is unavailable
+    """
+    bank = get_activity_bank()
+    if bank is None:
+        return None
+
+    key = (
+        str(session_id),
+        str(primary_player.get('id')),
+        str(secondary_player.get('id')),
+        rating,
+        session_mode,
+        bank.version,
+        player_a_profile.get('updated_at'),
+        player_b_profile.get('updated_at'),
+    )
+
+    with _rankings_lock:
+        ranking = _rankings.get(key)
+        if ranking is not None:
+            _rankings.move_to_end(key)
+            return ranking
+
+    ranking = PairRanking(
+        bank, player_a_profile, player_b_profile, rating,
+        session_mode=session_mode, candidate_filter=candidate_filter, rng=rng
+    )
+    logger.info("pair_ranking_built", session_id=str(session_id), activities=len(ranking))
+
+    max_size = _cache_size()
+    with _rankings_lock:
+        _rankings[key] = ranking
+        while len(_rankings) > max_size:
+            _rankings.popitem(last=False)
+    return ranking
+
+
+def invalidate_session_rankings(session_id: Any) -> None:
+    """Drop every cached ranking for a session."""
+    session_key = str(session_id)
+    with _rankings_lock:
+        for key in [k for k in _rankings if k[0] == session_key]:
+            del _rankings[key]
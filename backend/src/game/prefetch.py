@@ -0,0 +1,165 @@
+"""
+Background prefetch of gameplay cards.
+
+/next used to generate the replacement card (candidate search, scoring,
+history lookups) before responding. After a gameplay response is committed
+the session is now handed to a small in-process thread pool, which tops its
+queue up to a configured depth; the next /next pops a ready card and only
+generates synchronously if the prefetch has not caught up. Responses still
+show the first VISIBLE_QUEUE_SIZE cards.
+
+Configuration (app_config):
+- gameplay_prefetch_depth (default 6): cards kept queued per session;
+  VISIBLE_QUEUE_SIZE or less disables prefetch
+- gameplay_prefetch_workers (default 2): pool size; 0 disables prefetch
+
+Activity limits:
+- Capped players get at most as many prefetched cards as they have
+  credits left; limit barriers are only ever added by the request path.
+- Before saving, the worker re-reads the entitlement and scrubs the queue
+  with the request path's rules if the limit was reached while the cards
+  were generated.
+
+The worker saves with the session's turn_version check but does not bump
+it (routes/gameplay._save_turn_state): if a /next advanced the session
+meanwhile, the cards are dropped; if the prefetch lands first, a /next that
+read the older state still saves and only the prefetched cards are lost.
+
+Prefetch is skipped for testing apps; tests call top_up directly.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from flask import current_app
+
+from ..extensions import db
+from ..logging_config import get_logger
+from ..models.session import Session
+from ..services.entitlements import EntitlementService
+from . import turn_queue
+
+logger = get_logger()
+
+# Cards returned to the client (and generated synchronously if missing)
+VISIBLE_QUEUE_SIZE = 3
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Sessions with a prefetch queued or running
+_inflight = set()
+_inflight_lock = threading.Lock()
+
+
+def _depth() -> int:
+    from ..services.config_service import get_config_int
+    return get_config_int('gameplay_prefetch_depth', 6)
+
+
+def _workers() -> int:
+    from ..services.config_service import get_config_int
+    return get_config_int('gameplay_prefetch_workers', 2)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, _workers()), thread_name_prefix='turn-prefetch')
+        return _executor
+
+
+def schedule(session_id: Any, owner_id: Optional[str] = None, anonymous_session_id: Optional[str] = None) -> bool:
+    """
+    Queue a background top-up of a session (call after committing).
+
+    Returns:
+        True if a prefetch was queued, False if disabled or one is pending
+    """
+    app = current_app._get_current_object()
+    depth = _depth()
+    if app.testing or depth <= VISIBLE_QUEUE_SIZE or _workers() <= 0:
+        return False
+
+    key = str(session_id)
+    with _inflight_lock:
+        if key in _inflight:
+            return False
+        _inflight.add(key)
+
+    try:
+        _get_executor().submit(_run, app, key, owner_id, anonymous_session_id, depth)
+    except RuntimeError:  # Pool shut down (interpreter exit)
+        with _inflight_lock:
+            _inflight.discard(key)
+        return False
+    return True
+
+
+def _run(app, session_id: str, owner_id: Optional[str], anonymous_session_id: Optional[str], depth: int) -> None:
+    try:
+        with app.app_context():
+            top_up(session_id, owner_id, anonymous_session_id, depth)
+    except Exception as e:
+        logger.error("turn_prefetch_failed", session_id=session_id, error=str(e))
+    finally:
+        with _inflight_lock:
+            _inflight.discard(session_id)
+
+
+def top_up(
+    session_id: Any,
+    owner_id: Optional[str] = None,
+    anonymous_session_id: Optional[str] = None,
+    depth: Optional[int] = None
+) -> int:
+    """
+    Generate cards until the session's queue holds `depth` entries, and commit.
+
+    Returns:
+        Number of cards appended
+    """
+    # Turn generation lives with the gameplay routes
+    from ..routes.gameplay import _enforce_activity_limit, _generate_turn_data, _new_turn_batch, _save_turn_state
+
+    depth = _depth() if depth is None else depth
+    session = db.session.get(Session, str(session_id))
+    if session is None or session.status != 'active':
+        return 0
+
+    expected_version = session.turn_version or 0
+    state = dict(session.current_turn_state or {})
+    queue = turn_queue.compact_queue(state.get("queue"), len(session.players or []))
+    if len(queue) >= depth or any(turn_queue.is_limit(item) for item in queue):
+        return 0
+
+    entitlement = EntitlementService.load(owner_id, anonymous_session_id)
+    if entitlement.error or entitlement.limit_reached:
+        return 0
+
+    wanted = depth - len(queue)
+    if not entitlement.is_premium:
+        # Every queued card after the head is still to be charged
+        wanted = min(wanted, entitlement.limit - entitlement.used - max(0, len(queue) - 1))
+    if wanted <= 0:
+        return 0
+
+    upcoming = list(queue)
+    batch = _new_turn_batch()
+    for _ in range(wanted):
+        upcoming.append(_generate_turn_data(session, batch=batch, queue=upcoming))
+    cards = upcoming[len(queue):]
+
+    # The limit may have flipped while the cards were generated
+    entitlement = EntitlementService.load(owner_id, anonymous_session_id)
+    _, state["queue"] = _enforce_activity_limit(upcoming, entitlement, charge_credit=False)
+
+    if not _save_turn_state(session, state, expected_version, advance=False):
+        db.session.rollback()
+        logger.info("turn_prefetch_discarded", session_id=str(session_id), cards=len(cards))
+        return 0
+    db.session.commit()
+
+    logger.info("turn_prefetch_completed", session_id=str(session_id), cards=len(cards), depth=len(state["queue"]))
+    return len(cards)
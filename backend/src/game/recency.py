@@ -0,0 +1,220 @@
+"""
+Recent-activity buffers for repetition prevention.
+
+Turn generation excludes every activity already played in the session and
+the primary player's last 100 activities (across sessions). Instead of
+querying UserActivityHistory on every turn, each scope keeps a fixed-size
+RecentActivities buffer: a ring of the most recent activity ids plus a
+membership bitset, so exclusion checks are O(1) regardless of history size.
+
+Buffers are cached in-process. A miss loads the newest rows with one
+indexed query; next_turn appends to cached buffers as it writes each
+history row (record_activity).
+
+Session buffers are stamped with the session's turn_version: history rows
+are only written by /next, in the transaction that bumps the version, so a
+buffer is current exactly when its stamp matches the session it is read
+for. A session advanced by another worker process is reloaded on its next
+turn. Player buffers span sessions and expire after
+`recency_cache_ttl_seconds` instead.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from ..extensions import db
+from ..logging_config import get_logger
+
+logger = get_logger()
+
+SESSION_SCOPE = 'session'
+PLAYER_SCOPE = 'player'
+
+# Last N activities a player did as primary (matches the old per-turn query)
+PLAYER_HISTORY_SIZE = 100
+
+
+class RecentActivities:
+    """
+    The most recent `capacity` activity ids, oldest evicted first.
+
+    Membership is a bitset indexed by activity id; `_counts` tracks ids that
+    occur more than once in the ring so eviction only clears a bit when the
+    last copy leaves.
+    """
+
+    __slots__ = ('capacity', 'loaded_at', 'version', '_ring', '_head', '_counts', '_bits')
+
+    def __init__(self, capacity: int, activity_ids: Iterable[int] = (), version: Optional[int] = None):
+        self.capacity = max(1, capacity)
+        self.loaded_at = time.monotonic()
+        self.version = version  # Session turn_version the buffer is current for (session scope)
+        self._ring = [None] * self.capacity
+        self._head = 0
+        self._counts = {}
+        self._bits = bytearray()
+        for activity_id in activity_ids:
+            self.add(activity_id)
+
+    def add(self, activity_id: Optional[int]) -> None:
+        """Append an activity id, evicting the oldest once full."""
+        if activity_id is None or activity_id < 0:
+            return
+
+        evicted = self._ring[self._head]
+        if evicted is not None:
+            remaining = self._counts[evicted] - 1
+            if remaining:
+                self._counts[evicted] = remaining
+            else:
+                del self._counts[evicted]
+                self._bits[evicted >> 3] &= ~(1 << (evicted & 7)) & 0xFF
+
+        self._ring[self._head] = activity_id
+        self._head = (self._head + 1) % self.capacity
+        self._counts[activity_id] = self._counts.get(activity_id, 0) + 1
+
+        byte = activity_id >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        self._bits[byte] |= 1 << (activity_id & 7)
+
+    def __contains__(self, activity_id: Any) -> bool:
+        if not isinstance(activity_id, int) or activity_id < 0:
+            return False
+        byte = activity_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] >> (activity_id & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+class ExclusionSet:
+    """
+    Read-only union of several id containers, checked without copying them.
+
+    Sources are kept by reference, so ids added to a source later (e.g. the
+    running set of cards picked in a batch) are excluded too.
+    """
+
+    __slots__ = ('_sources',)
+
+    def __init__(self, *sources):
+        self._sources = sources
+
+    def __contains__(self, activity_id: Any) -> bool:
+        return any(activity_id in source for source in self._sources)
+
+    def __iter__(self) -> Iterator[int]:
+        seen = set()
+        for source in self._sources:
+            for activity_id in source:
+                if activity_id not in seen:
+                    seen.add(activity_id)
+                    yield activity_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+# ==============================================================================
+# Buffer cache
+# ==============================================================================
+
+_buffers: "OrderedDict[Tuple[str, str], RecentActivities]" = OrderedDict()
+_buffers_lock = threading.Lock()
+
+
+def _session_history_size() -> int:
+    from ..services.config_service import get_config_int
+    return get_config_int('session_recency_size', 500)
+
+
+def _load(scope: str, key: str, capacity: int) -> RecentActivities:
+    """Load the newest history rows for a scope with one indexed query."""
+    from ..models.activity_history import UserActivityHistory
+
+    column = UserActivityHistory.session_id if scope == SESSION_SCOPE else UserActivityHistory.primary_player_id
+    rows = db.session.query(UserActivityHistory.activity_id)\
+        .filter(column == key)\
+        .filter(UserActivityHistory.activity_id.isnot(None))\
+        .order_by(UserActivityHistory.presented_at.desc(), UserActivityHistory.id.desc())\
+        .limit(capacity)\
+        .all()
+    # Oldest first, so the ring evicts in presentation order
+    return RecentActivities(capacity, [activity_id for (activity_id,) in reversed(rows)])
+
+
+def _get(scope: str, key: Any, capacity: int, version: Optional[int] = None) -> RecentActivities:
+    """Cached buffer for a scope: valid for `version` if given, else until the TTL."""
+    from ..services.config_service import get_config_int
+
+    cache_key = (scope, str(key))
+    ttl = get_config_int('recency_cache_ttl_seconds', 300)
+    with _buffers_lock:
+        buffer = _buffers.get(cache_key)
+        if buffer is not None and (
+            buffer.version == version if version is not None
+            else time.monotonic() - buffer.loaded_at < ttl
+        ):
+            _buffers.move_to_end(cache_key)
+            return buffer
+
+    buffer = _load(scope, str(key), capacity)
+    buffer.version = version
+
+    max_size = get_config_int('recency_cache_size', 4096)
+    with _buffers_lock:
+        _buffers[cache_key] = buffer
+        while len(_buffers) > max_size:
+            _buffers.popitem(last=False)
+    return buffer
+
+
+def get_session_recency(session_id: Any, turn_version: int) -> RecentActivities:
+    """Activities played in a session by anyone, as of the session's turn_version."""
+    return _get(SESSION_SCOPE, session_id, _session_history_size(), version=turn_version or 0)
+
+
+def get_player_recency(player_id: Any) -> RecentActivities:
+    """The last PLAYER_HISTORY_SIZE activities a player did as primary."""
+    return _get(PLAYER_SCOPE, player_id, PLAYER_HISTORY_SIZE)
+
+
+def record_activity(
+    session_id: Any,
+    primary_player_id: Optional[str],
+    activity_id: Optional[int],
+    turn_version: int
+) -> None:
+    """
+    Append a newly committed history row to the cached buffers it belongs to.
+
+    `turn_version` is the session version the row was committed with. The
+    session buffer moves to it only if it was current for the version
+    before; otherwise it is left stale and reloads on next use. Buffers that
+    are not cached are left alone; their next load reads the row from the
+    database.
+    """
+    if activity_id is None:
+        return
+    with _buffers_lock:
+        buffer = _buffers.get((SESSION_SCOPE, str(session_id)))
+        if buffer is not None and buffer.version == turn_version - 1:
+            buffer.add(activity_id)
+            buffer.version = turn_version
+
+        if primary_player_id:
+            buffer = _buffers.get((PLAYER_SCOPE, str(primary_player_id)))
+            if buffer is not None:
+                buffer.add(activity_id)
+
+
+def clear_recency_cache() -> None:
+    """Drop every cached buffer."""
+    with _buffers_lock:
+        _buffers.clear()
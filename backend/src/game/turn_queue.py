@@ -0,0 +1,195 @@
+"""
+Compact storage for a gameplay session's turn queue.
+
+Session.current_turn_state["queue"] used to hold every queued turn fully
+rendered (display text, player names, progress), and the whole JSONB blob is
+rewritten on every /next. The queue now stores only what selection decided:
+
+    {"activity_id": 512, "type": "DARE", "step": 7, "primary_idx": 0, "secondary_idx": 1}
+
+Limit barriers are {"type": "LIMIT_REACHED", ..., "barrier_id": <hex>} so
+each keeps a stable card id. Everything shown to the client is derived when
+the response is built (hydrate_queue): script text from the activity bank
+snapshot resolved with the session's player names, intensity, and the
+progress phase from the step. The response format is unchanged.
+
+Queues written before this format (fully rendered entries) are converted on
+read by compact_queue.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..db.activity_bank import get_activity_bank
+from ..logging_config import get_logger
+from ..models.activity import Activity
+from ..recommender.picker import get_phase_name
+from .text_resolver import resolve_activity_text
+
+logger = get_logger()
+
+TOTAL_STEPS = 25
+LIMIT_REACHED = 'LIMIT_REACHED'
+LIMIT_STEP = 999
+
+# Card shown when no activity could be selected
+FALLBACK_TEXT = "Tell your partner something you love about them."
+FALLBACK_INTENSITY = 1
+# Card shown when the selected activity's script is unusable
+MYSTERY_TEXT = "Perform a mystery activity with your partner."
+LIMIT_TEXT = "Activity limit reached. Tap to unlock unlimited turns."
+
+
+def turn_entry(activity_id: Optional[int], card_type: str, step: int,
+               primary_idx: int, secondary_idx: int) -> Dict[str, Any]:
+    """Queue entry for a selected activity (activity_id None: fallback card)."""
+    return {
+        "activity_id": activity_id,
+        "type": card_type.upper(),
+        "step": step,
+        "primary_idx": primary_idx,
+        "secondary_idx": secondary_idx,
+    }
+
+
+def limit_entry() -> Dict[str, Any]:
+    """Queue entry for a limit barrier."""
+    entry = turn_entry(None, LIMIT_REACHED, LIMIT_STEP, -1, -1)
+    entry["barrier_id"] = uuid.uuid4().hex
+    return entry
+
+
+def is_limit(entry: Dict[str, Any]) -> bool:
+    return entry.get("type") == LIMIT_REACHED
+
+
+def card_id(entry: Dict[str, Any]) -> str:
+    """Card id shown to the client for an entry."""
+    if is_limit(entry):
+        return f"limit-barrier-{entry.get('barrier_id', '')}"
+    activity_id = entry.get("activity_id")
+    return str(activity_id) if activity_id is not None else "fallback"
+
+
+def _from_rendered(item: Dict[str, Any], num_players: int) -> Dict[str, Any]:
+    """Convert a fully rendered (pre-compact) queue entry."""
+    card = item.get("card") or {}
+    if card.get("type") == LIMIT_REACHED:
+        return limit_entry()
+
+    raw_id = card.get("card_id") or item.get("card_id")
+    try:
+        activity_id = int(raw_id)
+    except (TypeError, ValueError):
+        activity_id = None
+    primary_idx = item.get("primary_player_idx", 0)
+    if primary_idx is None or primary_idx < 0:
+        primary_idx = 0
+    secondary_idx = (primary_idx + 1) % num_players if num_players else 0
+    return turn_entry(activity_id, card.get("type") or "TRUTH", item.get("step", 0), primary_idx, secondary_idx)
+
+
+def compact_queue(queue: Optional[Iterable[Dict[str, Any]]], num_players: int) -> List[Dict[str, Any]]:
+    """The stored queue in compact form (rendered entries are converted)."""
+    return [item if "card" not in item else _from_rendered(item, num_players) for item in queue or ()]
+
+
+def _load_activities(activity_ids) -> Dict[int, Any]:
+    """Activities by id: the bank snapshot, then one query for any it lacks."""
+    found: Dict[int, Any] = {}
+    bank = get_activity_bank()
+    if bank is not None:
+        for activity_id in activity_ids:
+            activity = bank.get(activity_id)
+            if activity is not None:
+                found[activity_id] = activity
+
+    missing = [activity_id for activity_id in activity_ids if activity_id not in found]
+    if missing:
+        for activity in Activity.query.filter(Activity.activity_id.in_(missing)).all():
+            found[activity.activity_id] = activity
+    return found
+
+
+def _script_text(activity) -> str:
+    try:
+        script = activity.script
+        if not script or 'steps' not in script or not script['steps']:
+            raise ValueError("Activity script is missing or empty")
+        return script['steps'][0].get('do', "Perform the activity.")
+    except Exception as e:
+        logger.error("activity_text_extraction_failed", error=str(e), activity_id=str(activity.activity_id))
+        return MYSTERY_TEXT
+
+
+def _player_name(players: List[Dict[str, Any]], idx: int) -> str:
+    if 0 <= idx < len(players):
+        return players[idx].get("name") or "Player"
+    return "Player"
+
+
+def _limit_turn(entry: Dict[str, Any]) -> Dict[str, Any]:
+    cid = card_id(entry)
+    return {
+        "status": "SHOW_CARD",
+        "primary_player_idx": -1,
+        "step": LIMIT_STEP,
+        "card_id": cid,
+        "card": {
+            "card_id": cid,
+            "type": LIMIT_REACHED,
+            "primary_player": "System",
+            "secondary_players": [],
+            "display_text": LIMIT_TEXT,
+            "intensity_rating": 1
+        },
+        "progress": {
+            "current_step": LIMIT_STEP,
+            "total_steps": TOTAL_STEPS,
+            "intensity_phase": "Peak"
+        }
+    }
+
+
+def hydrate(entry: Dict[str, Any], players: List[Dict[str, Any]], activities: Dict[int, Any]) -> Dict[str, Any]:
+    """Render one compact entry as the turn object returned to the client."""
+    if is_limit(entry):
+        return _limit_turn(entry)
+
+    primary_name = _player_name(players, entry["primary_idx"])
+    secondary_name = _player_name(players, entry["secondary_idx"])
+    activity = activities.get(entry.get("activity_id"))
+    if activity is not None:
+        text, intensity = _script_text(activity), activity.intensity
+    else:
+        text, intensity = FALLBACK_TEXT, FALLBACK_INTENSITY
+
+    step = entry["step"]
+    effective_step = (step - 1) % TOTAL_STEPS + 1
+    cid = card_id(entry)
+    return {
+        "status": "SHOW_CARD",
+        "primary_player_idx": entry["primary_idx"],
+        "step": step,
+        "card_id": cid,
+        "card": {
+            "card_id": cid,
+            "type": entry["type"],
+            "primary_player": primary_name,
+            "secondary_players": [secondary_name],
+            "display_text": resolve_activity_text(text, primary_name, secondary_name),
+            "intensity_rating": intensity
+        },
+        "progress": {
+            "current_step": step,
+            "total_steps": TOTAL_STEPS,
+            "intensity_phase": get_phase_name(effective_step, TOTAL_STEPS).capitalize()
+        }
+    }
+
+
+def hydrate_queue(queue: List[Dict[str, Any]], players: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Render a compact queue, loading all of its activities at once."""
+    activity_ids = {entry["activity_id"] for entry in queue
+                    if not is_limit(entry) and entry.get("activity_id") is not None}
+    activities = _load_activities(sorted(activity_ids)) if activity_ids else {}
+    return [hydrate(entry, players, activities) for entry in queue]
@@ -0,0 +1,52 @@
+"""
+Seeded randomness for turn generation.
+
+Every random choice made for a turn (truth or dare, the primary player in
+RANDOM order mode, candidate sampling and fallback picks) is drawn from a
+generator derived from the session's turn_seed and the turn's step, instead
+of the process-wide random module. Given the same seed, step and exclusion
+set, a turn is generated identically on any worker, so queues can be
+recomputed on demand, previewed without being stored, and replayed in tests
+and benchmarks.
+
+Streams are derived with SHA-256 rather than hash(), which is salted per
+process for strings.
+"""
+import hashlib
+import random
+import secrets
+from typing import Any
+
+# Seeds are stored in a signed BIGINT column
+SEED_BITS = 63
+
+
+def new_seed() -> int:
+    """A fresh random session seed."""
+    return secrets.randbits(SEED_BITS)
+
+
+def derive_seed(seed: int, *parts: Any) -> int:
+    """Sub-seed for one stream of a session (e.g. ('step', 7))."""
+    material = ":".join(str(part) for part in (seed,) + parts).encode()
+    return int.from_bytes(hashlib.sha256(material).digest()[:8], "big") >> (64 - SEED_BITS)
+
+
+def step_rng(seed: int, step: int) -> random.Random:
+    """Generator for the random choices of one turn."""
+    return random.Random(derive_seed(seed, "step", step))
+
+
+def ranking_rng(seed: int, primary_id: Any, secondary_id: Any) -> random.Random:
+    """Generator for the tie order of a session's pair ranking."""
+    return random.Random(derive_seed(seed, "ranking", primary_id, secondary_id))
+
+
+def session_seed(session) -> int:
+    """
+    The session's turn seed, assigned on first use for sessions created
+    before seeds were stored (caller commits).
+    """
+    if session.turn_seed is None:
+        session.turn_seed = new_seed()
+    return session.turn_seed
@@ -34,6 +34,10 @@ from .models.session import Session
 from .models.activity import Activity
 from .models.session_activity import SessionActivity
 from .models.compatibility import Compatibility
+from .models.compatibility_job import CompatibilityJob
+from .models.compatibility_result_cache import CompatibilityResultCache
+from .models.compatibility_ui_payload import CompatibilityUIPayload
+from .models.anonymous_usage import AnonymousActivityUsage
 from .models.user import User
 from .models.influencer import Influencer
 from .models.promo_code import PromoCode
@@ -77,6 +81,13 @@ def create_app() -> Flask:
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config['MAX_CONTENT_LENGTH'] = 1 * 1024 * 1024  # 1MB
 
+    # Run compatibility jobs inside the enqueueing request instead of the worker.
+    # On by default: set COMPATIBILITY_JOBS_INLINE=false only where
+    # scripts/run_compatibility_worker.py runs (docs/DEPLOYMENT_GUIDE.md)
+    app.config['COMPATIBILITY_JOBS_INLINE'] = os.environ.get(
+        'COMPATIBILITY_JOBS_INLINE', 'true'
+    ).lower() in ('true', '1', 'yes')
+
     
     # Connection pooling configuration
     # Only apply PostgreSQL-specific settings for PostgreSQL databases
@@ -1,5 +1,6 @@
 """Activity model - stores activity bank templates."""
 from datetime import datetime
+from sqlalchemy import event
 from sqlalchemy.dialects.postgresql import ENUM
 from ..extensions import db
 
@@ -13,6 +14,28 @@ ALLOWED_BOUNDARIES = [
 # Allowed body parts
 ALLOWED_BODYPARTS = ['penis', 'vagina', 'breasts']
 
+# Bit positions for the closed taxonomies above (bit i <-> list index i).
+# Keys outside the taxonomy have no bit; callers must check them separately.
+BOUNDARY_BITS = {key: 1 << i for i, key in enumerate(ALLOWED_BOUNDARIES)}
+BODYPART_BITS = {part: 1 << i for i, part in enumerate(ALLOWED_BODYPARTS)}
+ALL_BODYPARTS_MASK = (1 << len(ALLOWED_BODYPARTS)) - 1
+
+
+def encode_boundaries(boundaries) -> int:
+    """Encode boundary keys as a bitmask (keys outside ALLOWED_BOUNDARIES are ignored)."""
+    mask = 0
+    for key in boundaries or ():
+        mask |= BOUNDARY_BITS.get(key, 0)
+    return mask
+
+
+def encode_bodyparts(parts) -> int:
+    """Encode body parts as a bitmask (parts outside ALLOWED_BODYPARTS are ignored)."""
+    mask = 0
+    for part in parts or ():
+        mask |= BODYPART_BITS.get(part, 0)
+    return mask
+
 
 class Activity(db.Model):
     """Activity template in the bank."""
@@ -55,6 +78,10 @@ class Activity(db.Model):
     )
     hard_boundaries = db.Column(db.JSON, nullable=False, default=list)  # 8-key boundary taxonomy
     required_bodyparts = db.Column(db.JSON, nullable=False, default=lambda: {"active": [], "partner": []})
+    # Bitmask mirrors of hard_boundaries / required_bodyparts (kept in sync on flush, see below)
+    boundary_mask = db.Column(db.Integer, nullable=False, default=0, index=True)
+    active_bodypart_mask = db.Column(db.Integer, nullable=False, default=0, index=True)
+    partner_bodypart_mask = db.Column(db.Integer, nullable=False, default=0, index=True)
     activity_uid = db.Column(db.String(64), unique=True, index=True)  # SHA256 hash for deduplication
     source_version = db.Column(db.String(32))  # Source spreadsheet version
     is_active = db.Column(db.Boolean, nullable=False, default=True, index=True)
@@ -91,6 +118,13 @@ class Activity(db.Model):
         return (all(bp in ALLOWED_BODYPARTS for bp in active) and
                 all(bp in ALLOWED_BODYPARTS for bp in partner))
     
+    def refresh_masks(self):
+        """Recompute the bitmask columns from hard_boundaries and required_bodyparts."""
+        req = self.required_bodyparts or {}
+        self.boundary_mask = encode_boundaries(self.hard_boundaries)
+        self.active_bodypart_mask = encode_bodyparts(req.get('active'))
+        self.partner_bodypart_mask = encode_bodyparts(req.get('partner'))
+    
     def to_dict(self):
         """Convert activity to dictionary format."""
         return {
@@ -142,3 +176,10 @@ class Activity(db.Model):
         
         return True
 
+
+# Keep the bitmask columns in sync with the JSON columns they mirror
+@event.listens_for(Activity, 'before_insert')
+@event.listens_for(Activity, 'before_update')
+def refresh_activity_masks(mapper, connection, target):
+    """Recompute bitmask columns before every ORM insert/update."""
+    target.refresh_masks()
@@ -0,0 +1,24 @@
+"""AnonymousActivityUsage model - activities charged to anonymous players, per hour."""
+from ..extensions import db
+
+
+class AnonymousActivityUsage(db.Model):
+    """
+    Activities charged to one anonymous session in one hour bucket.
+
+    Anonymous players are limited over a sliding 24h window; summing the
+    buckets in the window (services/entitlements.py) replaces counting
+    user_activity_history rows on every check.
+    """
+    __tablename__ = "anonymous_activity_usage"
+
+    anonymous_session_id = db.Column(db.String(255), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)  # UTC, truncated to the hour
+    activity_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('idx_anonymous_activity_usage_bucket', 'bucket_start'),
+    )
+
+    def __repr__(self):
+        return f"<AnonymousActivityUsage {self.anonymous_session_id} {self.bucket_start:%Y-%m-%d %H}h={self.activity_count}>"
@@ -54,6 +54,7 @@ class Compatibility(db.Model):
     
     # Metadata
     calculation_version = db.Column(db.String(16), default="0.4", nullable=False)
+    version = db.Column(db.Integer, default=1, server_default='1', nullable=False)  # Bumped on every rewrite
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
@@ -93,6 +94,7 @@ class Compatibility(db.Model):
             'blocked_activities': self.blocked_activities or {},
             'boundary_conflicts': self.boundary_conflicts or [],
             'calculation_version': self.calculation_version,
+            'version': self.version,
             'timestamp': self.created_at.isoformat(),
         }
 
@@ -0,0 +1,101 @@
+"""Compatibility job models - queued compatibility calculations per profile pair and per user."""
+from datetime import datetime
+from ..extensions import db
+from .guid import GUID
+
+
+class CompatibilityJob(db.Model):
+    """
+    Pending or finished compatibility calculation for one profile pair.
+
+    One row per pair (ordered like Compatibility: lower profile id first);
+    enqueueing an already queued pair reuses its row, and enqueueing a
+    finished pair re-queues it. Processed by CompatibilityJobService.
+    """
+    __tablename__ = "compatibility_jobs"
+
+    STATUSES = ('queued', 'running', 'done', 'failed')
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Pair key (ordered: lower id first, same as compatibility_results)
+    player_a_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False)
+    player_b_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False)
+
+    # Profile passed first to the calculator (the connection requester)
+    requester_profile_id = db.Column(db.Integer, nullable=False)
+
+    status = db.Column(db.String(16), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    last_error = db.Column(db.Text, nullable=True)
+
+    # Earliest time a queued job may run (retry backoff)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = db.Column(db.DateTime, nullable=True)  # Set while running
+
+    # Push notification sent once by the worker, then cleared
+    # JSON: {"requester_user_id": "...", "acceptor_user_id": "...", "acceptor_name": "..."}
+    notification = db.Column(db.JSON, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('idx_compatibility_jobs_pair', 'player_a_id', 'player_b_id', unique=True),
+        db.Index('idx_compatibility_jobs_queue', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f"<CompatibilityJob {self.id} players={self.player_a_id},{self.player_b_id} {self.status}>"
+
+    @property
+    def is_pending(self):
+        return self.status in ('queued', 'running')
+
+    def to_dict(self):
+        """Convert job to the status payload polled by clients."""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+
+class CompatibilityFanoutJob(db.Model):
+    """
+    Pending re-score of all of a user's partner compatibilities.
+
+    Queued when the user's profile is rewritten (survey retake). One row per
+    user: enqueueing again pushes run_after back (debounce) and bumps
+    requested_at, so a retake during a run queues one more run.
+    """
+    __tablename__ = "compatibility_fanout_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, unique=True)
+
+    status = db.Column(db.String(16), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    last_error = db.Column(db.Text, nullable=True)
+
+    # Latest profile write; a run only completes the request it started with
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('idx_compatibility_fanout_jobs_queue', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f"<CompatibilityFanoutJob {self.id} user={self.user_id} {self.status}>"
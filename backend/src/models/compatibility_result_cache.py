@@ -0,0 +1,26 @@
+"""CompatibilityResultCache model - persisted survey compatibility results by content key."""
+from datetime import datetime
+from ..extensions import db
+
+
+class CompatibilityResultCache(db.Model):
+    """
+    Calculator output for one content-addressed pair of survey submissions.
+
+    cache_key hashes both submission ids, a hash of each derived payload and
+    the calculator version (see compatibility/result_cache.py), so a row never
+    goes stale: changed inputs produce a different key.
+    """
+    __tablename__ = "compatibility_result_cache"
+
+    cache_key = db.Column(db.String(64), primary_key=True)  # sha256 hex
+    result = db.Column(db.JSON, nullable=False)
+    calculation_version = db.Column(db.String(16), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_compatibility_result_cache_version', 'calculation_version'),
+    )
+
+    def __repr__(self):
+        return f"<CompatibilityResultCache {self.cache_key[:12]} v{self.calculation_version}>"
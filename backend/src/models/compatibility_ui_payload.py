@@ -0,0 +1,46 @@
+"""CompatibilityUIPayload model - materialized compatibility UI payload per viewer."""
+from datetime import datetime
+from ..extensions import db
+from .guid import GUID
+
+
+class CompatibilityUIPayload(db.Model):
+    """
+    GET /api/compatibility/<user_id>/<partner_id>/ui payload for one viewer.
+
+    Two rows per compatibility record, one per side. payload is the
+    unrestricted view (as for 'all_responses'); sharing_setting and
+    partner_display_name are the partner's current values, kept up to date
+    when the partner changes them. compatibility/ui_payload.py builds the
+    rows and applies the privacy projection on read.
+    """
+    __tablename__ = "compatibility_ui_payloads"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    viewer_user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    partner_user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    viewer_profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False)
+    partner_profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False)
+
+    # Source record and its version when the payload was built
+    compatibility_id = db.Column(
+        db.Integer, db.ForeignKey('compatibility_results.id', ondelete='CASCADE'), nullable=False, index=True
+    )
+    record_version = db.Column(db.Integer, nullable=False)
+
+    # Partner's settings, applied by the privacy projection
+    sharing_setting = db.Column(db.String(32), nullable=False)
+    partner_display_name = db.Column(db.String(255), nullable=True)
+
+    payload = db.Column(db.JSON, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_compatibility_ui_payloads_viewer', 'viewer_user_id', 'partner_user_id', unique=True),
+        db.Index('idx_compatibility_ui_payloads_partner', 'partner_user_id'),
+    )
+
+    def __repr__(self):
+        return (f"<CompatibilityUIPayload viewer={self.viewer_user_id} partner={self.partner_user_id} "
+                f"record={self.compatibility_id}v{self.record_version}>")
@@ -73,6 +73,9 @@ class Session(db.Model):
     players = db.Column(JSONB, nullable=True)  # List of player objects
     game_settings = db.Column(JSONB, nullable=True)  # {intimacy_level, mode, etc.}
     current_turn_state = db.Column(JSONB, nullable=True)  # {status, primary_idx, etc.}
+    profile_snapshots = db.Column(JSONB, nullable=True)  # {player_id: scoring fields of the player's profile}
+    turn_seed = db.Column(db.BigInteger, nullable=True)  # Seed for per-step turn choices (game/turn_rng.py)
+    turn_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Bumped on every /next (compare-and-swap)
     
     # Relationships
     player_a_profile = db.relationship('Profile', foreign_keys=[player_a_profile_id], backref='sessions_as_a')
@@ -115,5 +118,6 @@ class Session(db.Model):
             'players': self.players or [],
             'game_settings': self.game_settings or {},
             'current_turn_state': self.current_turn_state or {},
+            'turn_version': self.turn_version,
         }
 
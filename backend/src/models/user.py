@@ -66,6 +66,14 @@ class User(db.Model):
     last_login_at = db.Column(db.DateTime)
     oauth_metadata = db.Column(JSONB)
     
+    # Latest profile, set in the same transaction as the profile write (survey
+    # submit / process_submission). Resolve with repository.get_current_profiles.
+    current_profile_id = db.Column(
+        db.Integer,
+        db.ForeignKey('profiles.id', ondelete='SET NULL', use_alter=True, name='fk_users_current_profile'),
+        nullable=True
+    )
+    
     # Timestamps
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
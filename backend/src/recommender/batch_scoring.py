@@ -0,0 +1,367 @@
+"""
+Vectorized activity scoring over a whole candidate pool.
+
+Batch counterpart of scoring.score_activity_for_players. The activity side
+(preference keys, power roles, domains, intensity, performance flag) is
+encoded into NumPy index matrices once; each player pair is then scored
+against every candidate in a single pass.
+
+Results are identical to the scalar scorer, not just close:
+- per-key and per-pair mutual-interest scores use the same comparisons;
+- power alignment and the arousal modifiers are looked up from tables built
+  with the scalar functions (they only depend on a handful of values);
+- per-activity averages are reduced with the builtin sum() in the scalar
+  key order, so floating point rounding matches on every Python version.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..scoring.directional import DIRECTIONAL_KEYS, GIVE, SELF, WATCHING, directional_key
+from .scoring import (
+    calculate_se_pacing_modifier,
+    calculate_sisp_modifier,
+    score_power_alignment,
+)
+
+DEFAULT_WEIGHTS = {
+    'mutual_interest': 0.5,
+    'power_alignment': 0.3,
+    'domain_fit': 0.2
+}
+
+# Same mapping as score_activity_for_players
+_INTENSITY_LEVELS = {'gentle': 1, 'moderate': 2, 'intense': 3}
+
+
+def _preference_units(keys: Sequence[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split an activity's preference keys into scoring units.
+
+    Mirrors the control flow of score_mutual_interest: each unit is either
+    (key, None) for a single key or (key, partner_key) for a directional pair
+    (_give/_receive, _self/_watching and the strip/solo special cases).
+    """
+    units = []
+    processed = set()
+
+    for key in keys:
+        if key in processed:
+            continue
+
+        entry = DIRECTIONAL_KEYS.get(key) or directional_key(key)
+        starts_pair = entry.direction in (GIVE, SELF) or (entry.direction == WATCHING and entry.irregular)
+
+        if starts_pair and entry.partner in keys:
+            processed.add(key)
+            processed.add(entry.partner)
+            units.append((key, entry.partner))
+            continue
+
+        processed.add(key)
+        units.append((key, None))
+
+    return units
+
+
+def _padded(rows: List[List[int]], pad: int) -> np.ndarray:
+    """Stack ragged index lists into a 2-D array padded with `pad`."""
+    width = max((len(r) for r in rows), default=0)
+    matrix = np.full((len(rows), max(width, 1)), pad, dtype=np.intp)
+    for i, r in enumerate(rows):
+        matrix[i, :len(r)] = r
+    return matrix
+
+
+def _row_means(values: np.ndarray, counts: np.ndarray, empty: float) -> List[float]:
+    """Per-row mean of the first `count` values, with the scalar scorer's sum()."""
+    return [
+        sum(row[:count]) / count if count else empty
+        for row, count in zip(values.tolist(), counts.tolist())
+    ]
+
+
+class ActivityMatrix:
+    """
+    Column encoding of a fixed list of activities for batch scoring.
+
+    Build once per activity set (the bank snapshot keeps one) and call
+    score() for each player pair. Activities are dicts in the
+    Activity.to_dict() shape.
+    """
+
+    def __init__(self, activities: Sequence[Dict[str, Any]]):
+        self.activity_ids = [a.get('activity_id') for a in activities]
+        self.row_of = {activity_id: i for i, activity_id in enumerate(self.activity_ids)}
+
+        # Preference keys -> scoring units -> (rows x units) index matrix
+        self.key_vocab: List[str] = []
+        key_index: Dict[str, int] = {}
+        unit_index: Dict[Tuple[str, Optional[str]], int] = {}
+        unit_rows = []
+
+        # Domains -> (rows x domains) index matrix
+        self.domain_vocab: List[str] = []
+        domain_index: Dict[str, int] = {}
+        domain_rows = []
+
+        self.power_roles: List[Any] = []
+        role_index: Dict[Any, int] = {}
+        role_rows = []
+
+        intensities = []
+        performance = []
+
+        for activity in activities:
+            row_units = []
+            for unit in _preference_units(activity.get('preference_keys', []) or []):
+                if unit not in unit_index:
+                    for key in unit:
+                        if key is not None and key not in key_index:
+                            key_index[key] = len(self.key_vocab)
+                            self.key_vocab.append(key)
+                    unit_index[unit] = len(unit_index)
+                row_units.append(unit_index[unit])
+            unit_rows.append(row_units)
+
+            row_domains = []
+            for domain in activity.get('domains', []) or []:
+                domain_key = domain.lower()
+                if domain_key not in domain_index:
+                    domain_index[domain_key] = len(self.domain_vocab)
+                    self.domain_vocab.append(domain_key)
+                row_domains.append(domain_index[domain_key])
+            domain_rows.append(row_domains)
+
+            role = activity.get('power_role', 'neutral')
+            if role not in role_index:
+                role_index[role] = len(self.power_roles)
+                self.power_roles.append(role)
+            role_rows.append(role_index[role])
+
+            intensity = activity.get('intensity', activity.get('intensity_level', 2))
+            if isinstance(intensity, str):
+                intensity = _INTENSITY_LEVELS.get(intensity, 2)
+            intensities.append(intensity)
+
+            performance.append(bool(activity.get(
+                'is_performance',
+                activity.get('performance_pressure', 'low') in ['high', 'moderate']
+            )))
+
+        # Units: first key and partner key (-1 for single keys)
+        units = sorted(unit_index, key=unit_index.get)
+        self._unit_key = np.array([key_index[k] for k, _ in units], dtype=np.intp)
+        self._unit_partner = np.array(
+            [key_index[p] if p is not None else -1 for _, p in units], dtype=np.intp
+        )
+        self._unit_is_pair = self._unit_partner >= 0
+
+        # Padding points at an extra trailing slot in the per-unit score vector
+        self._unit_matrix = _padded(unit_rows, len(units))
+        self._unit_counts = np.array([len(r) for r in unit_rows], dtype=np.intp)
+        self._domain_matrix = _padded(domain_rows, len(self.domain_vocab))
+        self._domain_counts = np.array([len(r) for r in domain_rows], dtype=np.intp)
+        self._role_rows = np.array(role_rows, dtype=np.intp)
+
+        self._intensity_values, self._intensity_rows = np.unique(
+            np.array(intensities, dtype=float), return_inverse=True
+        )
+        self._performance = np.array(performance, dtype=bool)
+
+    def __len__(self):
+        return len(self.activity_ids)
+
+    def _unit_scores(self, player_a_activities: Dict[str, float], player_b_activities: Dict[str, float]) -> np.ndarray:
+        """Mutual-interest score of every unit, plus a trailing 0.0 padding slot."""
+        n_keys = len(self.key_vocab)
+        va = np.fromiter((player_a_activities.get(k, 0.5) for k in self.key_vocab), float, n_keys)
+        vb = np.fromiter((player_b_activities.get(k, 0.5) for k in self.key_vocab), float, n_keys)
+
+        sa = va[self._unit_key]
+        sb = vb[self._unit_key]
+
+        # Directional pairs: best complementary direction
+        partner = np.where(self._unit_is_pair, self._unit_partner, 0)
+        pa = va[partner]
+        pb = vb[partner]
+        comp = np.maximum(np.minimum(sa, pb), np.minimum(sb, pa))
+        pair_scores = np.select(
+            [comp >= 0.7, comp >= 0.5, comp >= 0.3],
+            [1.0, 0.8, 0.6],
+            0.3
+        )
+
+        # Single keys
+        a_yes, b_yes = sa >= 0.7, sb >= 0.7
+        a_mid = (sa >= 0.3) & (sa < 0.7)
+        b_mid = (sb >= 0.3) & (sb < 0.7)
+        a_no, b_no = sa < 0.3, sb < 0.3
+        single_scores = np.select(
+            [
+                a_yes & b_yes,
+                (a_yes & b_mid) | (b_yes & a_mid),
+                a_mid & b_mid,
+                (a_yes & b_no) | (b_yes & a_no),
+            ],
+            [1.0, 0.6, 0.4, 0.1],
+            0.0
+        )
+
+        scores = np.where(self._unit_is_pair, pair_scores, single_scores)
+        return np.append(scores, 0.0)
+
+    def _domain_scores(self, player_a_domains: Dict[str, float], player_b_domains: Dict[str, float]) -> np.ndarray:
+        """Average domain score of both players for every domain, plus a padding slot."""
+        n_domains = len(self.domain_vocab)
+        va = np.fromiter((player_a_domains.get(d, 0.5) for d in self.domain_vocab), float, n_domains)
+        vb = np.fromiter((player_b_domains.get(d, 0.5) for d in self.domain_vocab), float, n_domains)
+        return np.append((va + vb) / 2, 0.0)
+
+    def score(
+        self,
+        player_a_profile: Dict[str, Any],
+        player_b_profile: Dict[str, Any],
+        weights: Optional[Dict[str, float]] = None,
+        session_context: Optional[Dict[str, Any]] = None,
+        rows: Optional[Sequence[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score activities for a player pair.
+
+        Args:
+            player_a_profile: Complete profile for player A
+            player_b_profile: Complete profile for player B
+            weights: Optional custom weights (default: mutual=0.5, power=0.3, domain=0.2)
+            session_context: Optional dict with 'seq' and 'target' for pacing
+            rows: Optional row indices to score (default: all activities)
+
+        Returns:
+            Dict of unrounded component arrays (mutual_interest, power_alignment,
+            domain_fit, se_pacing, sisp) and the clamped overall score, aligned
+            with `rows`
+        """
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+
+        # Mutual interest
+        unit_scores = self._unit_scores(
+            player_a_profile.get('activities', {}),
+            player_b_profile.get('activities', {})
+        )
+        mutual = np.array(_row_means(
+            unit_scores[self._unit_matrix[rows]], self._unit_counts[rows], 0.5
+        ), dtype=float)
+
+        # Power alignment: one scalar call per distinct role
+        orientation_a = player_a_profile.get('power_dynamic', {}).get('orientation', 'Switch')
+        orientation_b = player_b_profile.get('power_dynamic', {}).get('orientation', 'Switch')
+        role_table = np.array(
+            [score_power_alignment(role, orientation_a, orientation_b) for role in self.power_roles],
+            dtype=float
+        )
+        power = role_table[self._role_rows[rows]]
+
+        # Domain fit
+        domain_scores = self._domain_scores(
+            player_a_profile.get('domain_scores', {}),
+            player_b_profile.get('domain_scores', {})
+        )
+        domain = np.array(_row_means(
+            domain_scores[self._domain_matrix[rows]], self._domain_counts[rows], 0.5
+        ), dtype=float)
+
+        # Arousal modifiers: one scalar call per distinct intensity / performance flag
+        arousal_a = player_a_profile.get('arousal_propensity', {})
+        arousal_b = player_b_profile.get('arousal_propensity', {})
+        se_a = arousal_a.get('sexual_excitation', 0.5)
+        se_b = arousal_b.get('sexual_excitation', 0.5)
+        sisp_a = arousal_a.get('inhibition_performance', 0.5)
+        sisp_b = arousal_b.get('inhibition_performance', 0.5)
+
+        if session_context:
+            seq = session_context.get('seq', 1)
+            target = session_context.get('target', 25)
+            se_table = np.array([
+                calculate_se_pacing_modifier(intensity, se_a, se_b, seq, target)
+                for intensity in self._intensity_values.tolist()
+            ], dtype=float)
+            se_pacing = se_table[self._intensity_rows[rows]]
+        else:
+            se_pacing = np.zeros(len(rows))
+
+        sisp = np.where(
+            self._performance[rows],
+            calculate_sisp_modifier(True, sisp_a, sisp_b),
+            calculate_sisp_modifier(False, sisp_a, sisp_b)
+        ).astype(float)
+
+        base = (
+            weights['mutual_interest'] * mutual +
+            weights['power_alignment'] * power +
+            weights['domain_fit'] * domain
+        )
+        overall = np.maximum(0.0, np.minimum(1.0, base + se_pacing + sisp))
+
+        return {
+            'mutual_interest': mutual,
+            'power_alignment': power,
+            'domain_fit': domain,
+            'se_pacing': se_pacing,
+            'sisp': sisp,
+            'overall': overall,
+        }
+
+
+def to_score_dicts(components: Dict[str, np.ndarray], weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Expand ActivityMatrix.score() output into score_activity_for_players() result dicts."""
+    if weights is None:
+        weights = dict(DEFAULT_WEIGHTS)
+
+    results = []
+    for mutual, power, domain, se, sisp, overall in zip(
+        components['mutual_interest'].tolist(),
+        components['power_alignment'].tolist(),
+        components['domain_fit'].tolist(),
+        components['se_pacing'].tolist(),
+        components['sisp'].tolist(),
+        components['overall'].tolist(),
+    ):
+        results.append({
+            'mutual_interest_score': round(mutual, 3),
+            'power_alignment_score': round(power, 3),
+            'domain_fit_score': round(domain, 3),
+            'se_pacing_modifier': round(se, 3),
+            'sisp_modifier': round(sisp, 3),
+            'overall_score': round(overall, 3),
+            'components': {
+                'mutual_interest': mutual,
+                'power_alignment': power,
+                'domain_fit': domain,
+                'se_pacing': se,
+                'sisp': sisp,
+            },
+            'weights': weights
+        })
+    return results
+
+
+def score_activities_for_players(
+    activities: Sequence[Dict[str, Any]],
+    player_a_profile: Dict[str, Any],
+    player_b_profile: Dict[str, Any],
+    weights: Optional[Dict[str, float]] = None,
+    session_context: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Batch version of score_activity_for_players.
+
+    Returns one result dict per activity, identical to calling
+    score_activity_for_players on each activity in turn.
+    """
+    if not activities:
+        return []
+    matrix = ActivityMatrix(activities)
+    components = matrix.score(player_a_profile, player_b_profile, weights, session_context)
+    return to_score_dicts(components, weights)
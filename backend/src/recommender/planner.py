@@ -0,0 +1,147 @@
+"""
+Single-pass session planner for recommendation arcs.
+
+create_recommendations fills every slot of a session (25 by default). Instead
+of one candidate query and one scoring pass per slot, SessionPlanner loads the
+eligible pool once (bank snapshot, or one query), scores it once for the
+player pair and answers each slot from memory.
+
+Each slot uses the same selection rule as
+repository.find_best_activity_candidate: take a random sample of up to
+`sample_size` activities matching the slot's type, intensity window and
+actor anatomy, drop the ones already used, then return the best
+power-compatible activity by overall score (first wins ties), or the first
+sampled activity if none is compatible.
+"""
+import logging
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..db.activity_bank import get_activity_bank
+from ..db.repository import CandidateFilter, find_activity_pool
+from .batch_scoring import ActivityMatrix
+
+logger = logging.getLogger(__name__)
+
+# Same threshold as filter_by_power_dynamics (moderate filtering)
+MIN_POWER_ALIGNMENT = 0.3
+
+
+class SessionPlanner:
+    """Activity pool for one recommendation session, scored once for the player pair."""
+
+    def __init__(
+        self,
+        rating: str,
+        intensity_min: int,
+        intensity_max: int,
+        player_a_profile: Dict[str, Any],
+        player_b_profile: Dict[str, Any],
+        session_mode: str = 'couples',
+        player_boundaries: Optional[List[str]] = None,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            rating: Content rating (G/R/X)
+            intensity_min: Lowest intensity any slot can ask for
+            intensity_max: Highest intensity any slot can ask for
+            player_a_profile: Player A's profile (flattened activities)
+            player_b_profile: Player B's profile (flattened activities)
+            session_mode: Session mode ('couples' or 'groups')
+            player_boundaries: Combined player hard boundaries
+            rng: Random source for slot sampling (module `random` by default)
+        """
+        self.rating = rating
+        self.rng = rng or random
+        self.pool = find_activity_pool(
+            rating, intensity_min, intensity_max,
+            session_mode=session_mode,
+            candidate_filter=CandidateFilter(player_boundaries, None)
+        )
+
+        # (compatible, rounded overall score) per activity, from one scoring pass
+        self.scores: Dict[int, Tuple[bool, float]] = {}
+        if self.pool:
+            bank = get_activity_bank()
+            if bank is not None and all(bank.get(a.activity_id) is a for a in self.pool):
+                matrix = bank.scoring_matrix
+                rows = [matrix.row_of[a.activity_id] for a in self.pool]
+            else:
+                matrix = ActivityMatrix([a.to_dict() for a in self.pool])
+                rows = None
+            components = matrix.score(player_a_profile, player_b_profile, rows=rows)
+            for activity, power, overall in zip(
+                self.pool,
+                components['power_alignment'].tolist(),
+                components['overall'].tolist(),
+            ):
+                self.scores[activity.activity_id] = (power >= MIN_POWER_ALIGNMENT, round(overall, 3))
+
+        # Pool is in activity_id order, so every bucket is too
+        self.buckets: Dict[Tuple[str, int], List[Any]] = {}
+        for activity in self.pool:
+            self.buckets.setdefault((activity.type, activity.intensity), []).append(activity)
+
+        logger.debug(f"Session planner pool: {len(self.pool)} activities")
+
+    def candidates(
+        self,
+        activity_type: str,
+        intensity_min: int,
+        intensity_max: int,
+        candidate_filter: Optional[CandidateFilter] = None,
+        limit: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Pool activities for a slot, in activity_id order.
+
+        Args:
+            activity_type: 'truth' or 'dare'
+            intensity_min: Minimum intensity (inclusive)
+            intensity_max: Maximum intensity (inclusive)
+            candidate_filter: Anatomy filter for the slot's active player
+            limit: Maximum results to return
+        """
+        matches = []
+        for intensity in range(intensity_min, intensity_max + 1):
+            matches.extend(self.buckets.get((activity_type, intensity), ()))
+        if intensity_max > intensity_min:
+            matches.sort(key=lambda a: a.activity_id)
+        if candidate_filter is not None:
+            matches = [a for a in matches if candidate_filter.allows(a)]
+        return matches[:limit] if limit is not None else matches
+
+    def pick(
+        self,
+        activity_type: str,
+        intensity_min: int,
+        intensity_max: int,
+        candidate_filter: Optional[CandidateFilter] = None,
+        excluded_ids: Optional[Iterable[int]] = None,
+        sample_size: int = 60
+    ) -> Optional[Any]:
+        """
+        Best activity for a slot (see module docstring for the selection rule).
+
+        Returns:
+            Activity from the pool, or None if no unused activity matches
+        """
+        excluded = excluded_ids if excluded_ids is not None else ()
+        matches = self.candidates(activity_type, intensity_min, intensity_max, candidate_filter)
+        if len(matches) > sample_size:
+            matches = self.rng.sample(matches, sample_size)
+        matches = [a for a in matches if a.activity_id not in excluded]
+        if not matches:
+            return None
+
+        best = None
+        for activity in matches:
+            compatible, score = self.scores[activity.activity_id]
+            if compatible and (best is None or score > best[0]):
+                best = (score, activity)
+
+        if best is None:
+            logger.warning("No power-compatible activities found, using first candidate")
+            return matches[0]
+        return best[1]
@@ -9,6 +9,8 @@ Scoring weights:
 from typing import Dict, List, Any, Optional
 import logging
 
+from ..scoring.directional import DIRECTIONAL_KEYS, GIVE, SELF, WATCHING, directional_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,8 +22,9 @@ def score_mutual_interest(
     """
     Score how well activity matches both players' preferences (0-1).
     
-    Recognizes directional pairs (_give/_receive, _self/_watching) where
-    complementary preferences (A gives, B receives) should score high.
+    Recognizes directional pairs (_give/_receive, _self/_watching; see
+    scoring.directional) where complementary preferences (A gives,
+    B receives) should score high.
     
     Args:
         activity_preference_keys: List of preference keys from activity
@@ -45,83 +48,21 @@ def score_mutual_interest(
         score_a = player_a_activities.get(pref_key, 0.5)  # Default neutral
         score_b = player_b_activities.get(pref_key, 0.5)
         
-        # Check for directional pairs
-        is_directional_pair = False
-        complementary_score = None
-        
-        # Check for _give/_receive pairs
-        if pref_key.endswith('_give'):
-            receive_key = pref_key.replace('_give', '_receive')
-            if receive_key in activity_preference_keys:
-                processed_keys.add(pref_key)
-                processed_keys.add(receive_key)
-                is_directional_pair = True
-                
-                # Get complementary scores
-                score_a_receive = player_a_activities.get(receive_key, 0.5)
-                score_b_receive = player_b_activities.get(receive_key, 0.5)
-                
-                # A gives, B receives OR B gives, A receives
-                comp1 = min(score_a, score_b_receive)  # A gives → B receives
-                comp2 = min(score_b, score_a_receive)  # B gives → A receives
-                complementary_score = max(comp1, comp2)  # Best complementary match
+        # Directional pairs start from the give key, the _self key or an
+        # irregular watching key (watching_strip, watching_solo_pleasure)
+        entry = DIRECTIONAL_KEYS.get(pref_key) or directional_key(pref_key)
+        partner_key = entry.partner
+        starts_pair = entry.direction in (GIVE, SELF) or (entry.direction == WATCHING and entry.irregular)
         
-        # Check for _self/_watching pairs
-        elif pref_key.endswith('_self'):
-            # Try standard pattern first (_self → _watching)
-            watching_key = pref_key.replace('_self', '_watching')
+        if starts_pair and partner_key in activity_preference_keys:
+            processed_keys.add(pref_key)
+            processed_keys.add(partner_key)
             
-            # Special cases: stripping_self pairs with watching_strip (not stripping_watching)
-            if pref_key == 'stripping_self':
-                watching_key = 'watching_strip'
-            elif pref_key == 'solo_pleasure_self':
-                watching_key = 'watching_solo_pleasure'
+            # A gives/performs → B receives/watches OR the reverse
+            comp1 = min(score_a, player_b_activities.get(partner_key, 0.5))
+            comp2 = min(score_b, player_a_activities.get(partner_key, 0.5))
+            complementary_score = max(comp1, comp2)  # Best complementary match
             
-            if watching_key in activity_preference_keys:
-                processed_keys.add(pref_key)
-                processed_keys.add(watching_key)
-                is_directional_pair = True
-                
-                # Get complementary scores
-                score_a_watching = player_a_activities.get(watching_key, 0.5)
-                score_b_watching = player_b_activities.get(watching_key, 0.5)
-                
-                # A performs, B watches OR B performs, A watches
-                comp1 = min(score_a, score_b_watching)  # A performs → B watches
-                comp2 = min(score_b, score_a_watching)  # B performs → A watches
-                complementary_score = max(comp1, comp2)  # Best complementary match
-        
-        # Special cases: watching_strip pairs with stripping_self
-        elif pref_key == 'watching_strip':
-            self_key = 'stripping_self'
-            if self_key in activity_preference_keys:
-                processed_keys.add(pref_key)
-                processed_keys.add(self_key)
-                is_directional_pair = True
-                
-                score_a_self = player_a_activities.get(self_key, 0.5)
-                score_b_self = player_b_activities.get(self_key, 0.5)
-                
-                comp1 = min(score_a, score_b_self)  # A watches → B performs
-                comp2 = min(score_b, score_a_self)  # B watches → A performs
-                complementary_score = max(comp1, comp2)
-        
-        elif pref_key == 'watching_solo_pleasure':
-            self_key = 'solo_pleasure_self'
-            if self_key in activity_preference_keys:
-                processed_keys.add(pref_key)
-                processed_keys.add(self_key)
-                is_directional_pair = True
-                
-                score_a_self = player_a_activities.get(self_key, 0.5)
-                score_b_self = player_b_activities.get(self_key, 0.5)
-                
-                comp1 = min(score_a, score_b_self)
-                comp2 = min(score_b, score_a_self)
-                complementary_score = max(comp1, comp2)
-        
-        # If we found a directional pair, use complementary score
-        if is_directional_pair and complementary_score is not None:
             # Map complementary score to recommendation score
             if complementary_score >= 0.7:
                 scores.append(1.0)  # Perfect complementary match
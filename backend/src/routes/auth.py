@@ -11,8 +11,10 @@ from ..extensions import db, limiter
 from ..models.user import User
 from ..models.profile import Profile
 from ..models.survey import SurveySubmission
+from ..compatibility import ui_payload
 
 from ..middleware.auth import token_required
+from ..services.partner_adjacency import PartnerAdjacencyService
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -197,6 +199,9 @@ def update_user(current_user_id):
         if 'onboarding_completed' in data:
             user.onboarding_completed = data['onboarding_completed']
         
+        if 'display_name' in data or 'profile_sharing_setting' in data:
+            ui_payload.refresh_partner_settings(user)
+        
         db.session.commit()
         
         return jsonify({
@@ -238,8 +243,10 @@ def delete_user(current_user_id):
         # - push_notification_tokens
         # - subscription_transactions
         
+        partners = PartnerAdjacencyService.neighbours(uid_obj)
         db.session.delete(user)
         db.session.commit()
+        PartnerAdjacencyService.invalidate(uid_obj, *partners)
         
         logger.info(f"User deleted: {current_user_id}")
         
@@ -339,6 +346,7 @@ def complete_demographics(current_user_id):
         
         user.demographics = updated_demographics
         user.profile_completed = True
+        ui_payload.refresh_partner_settings(user)
         
         db.session.commit()
         
@@ -1,20 +1,16 @@
 """Compatibility routes for retrieving scores."""
-from flask import Blueprint, jsonify, current_app
-from sqlalchemy import or_
+from flask import Blueprint, Response, jsonify, current_app, request
 import uuid
 import re
 
 from ..extensions import db
 from ..models.user import User
-from ..models.profile import Profile
+from ..db.repository import get_current_profiles
 from ..models.compatibility import Compatibility
-from .partners import PartnerConnection
-from ..scoring.display_names import (
-    DOMAIN_DISPLAY_NAMES,
-    ACTIVITY_SECTION_DISPLAY_NAMES,
-    ACTIVITY_DISPLAY_NAMES
-)
+from ..compatibility import ui_payload
 from ..middleware.auth import token_required
+from ..services.compatibility_jobs import CompatibilityJobService
+from ..services.partner_adjacency import PartnerAdjacencyService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,6 +18,47 @@ logger = logging.getLogger(__name__)
 compatibility_bp = Blueprint('compatibility', __name__, url_prefix='/api/compatibility')
 
 
+def _not_calculated_response(p1, p2):
+    """
+    202 "pending" while the pair's compatibility job is queued or running,
+    503 once it failed or stalled waiting for a worker, else 404.
+    """
+    job = CompatibilityJobService.get_job(p1, p2)
+    if job and job.is_pending and not CompatibilityJobService.is_stalled(job):
+        response = jsonify({'status': 'pending', 'job': job.to_dict()})
+        response.headers['Retry-After'] = str(CompatibilityJobService.retry_after(job))
+        return response, 202
+    if job and job.status == 'failed':
+        return jsonify({
+            'status': 'failed',
+            'error': 'Compatibility calculation failed',
+            'job': job.to_dict()
+        }), 503
+    if job and job.is_pending:
+        logger.error(f"{job!r} stalled: no compatibility worker has picked it up")
+        return jsonify({
+            'status': 'stalled',
+            'error': 'Compatibility calculation is delayed',
+            'job': job.to_dict()
+        }), 503
+    return jsonify({
+        'error': 'Compatibility not calculated yet',
+        'job': job.to_dict() if job else None
+    }), 404
+
+
+def _ui_response(payload, sharing_setting, partner_display_name, etag):
+    """Privacy-projected UI payload, or 304 when the client's copy is current."""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(ui_payload.project(payload, sharing_setting, partner_display_name))
+    response.set_etag(etag)
+    # Per-user data: caches must revalidate before reuse
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @compatibility_bp.route('/<user_id>/<partner_id>', methods=['GET'])
 @token_required
 def get_compatibility(current_user_id, user_id, partner_id):
@@ -45,10 +82,6 @@ def get_compatibility(current_user_id, user_id, partner_id):
             u_uuid = extract_uuid_safe(user_id, "User")
             p_uuid = extract_uuid_safe(partner_id, "Partner")
             
-            # Canonical strings for querying PartnerConnection (model uses String)
-            u_str = str(u_uuid)
-            p_str = str(p_uuid)
-            
         except ValueError as val_err:
              logger.error(f"Invalid UUID input: User='{user_id}', Partner='{partner_id}'. Error: {val_err}")
              return jsonify({'error': f"Invalid UUID format: {str(val_err)}", 'received_user': str(user_id), 'received_partner': str(partner_id)}), 400
@@ -69,16 +102,8 @@ def get_compatibility(current_user_id, user_id, partner_id):
             my_uuid = p_uuid
             partner_uuid = u_uuid
 
-        # 1. Verify connection exists (active or accepted)
-        # Use sanitized strings to prevent "invalid input syntax" DB errors
-        connection = PartnerConnection.query.filter(
-            or_(
-                (PartnerConnection.requester_user_id == u_str) & (PartnerConnection.recipient_user_id == p_str),
-                (PartnerConnection.requester_user_id == p_str) & (PartnerConnection.recipient_user_id == u_str)
-            )
-        ).filter_by(status='accepted').first()
-
-        if not connection:
+        # 1. Verify an accepted connection exists
+        if not PartnerAdjacencyService.are_partners(u_uuid, p_uuid):
             return jsonify({'error': 'No active connection found'}), 403
 
         # 2. Get Partner's settings
@@ -90,8 +115,8 @@ def get_compatibility(current_user_id, user_id, partner_id):
 
         # 3. Fetch Compatibility Record
         # Determine order (lower ID first)
-        my_profile = Profile.query.filter_by(user_id=my_uuid).order_by(Profile.created_at.desc()).first()
-        partner_profile = Profile.query.filter_by(user_id=partner_uuid).order_by(Profile.created_at.desc()).first()
+        profiles = get_current_profiles([my_uuid, partner_uuid])
+        my_profile, partner_profile = profiles.get(my_uuid), profiles.get(partner_uuid)
 
         if not my_profile or not partner_profile:
              return jsonify({'error': 'Profiles not found'}), 404
@@ -104,7 +129,7 @@ def get_compatibility(current_user_id, user_id, partner_id):
         compat_record = Compatibility.query.filter_by(player_a_id=p1, player_b_id=p2).first()
         
         if not compat_record:
-            return jsonify({'error': 'Compatibility not calculated yet'}), 404
+            return _not_calculated_response(p1, p2)
             
         # 4. Construct Response based on Privacy Settings
         
@@ -223,21 +248,24 @@ def get_compatibility_ui(current_user_id, user_id, partner_id):
             my_uuid = p_uuid
             partner_uuid = u_uuid
 
-        # 1. Fetch Users
+        # 1. Materialized payload (written when the compatibility was calculated)
+        row = ui_payload.get_payload(my_uuid, partner_uuid)
+        if row is not None:
+            return _ui_response(row.payload, row.sharing_setting, row.partner_display_name, ui_payload.payload_etag(row))
+
+        # 2. Not materialized yet: build it from the users, profiles and record
         user_me = User.query.get(my_uuid)
         user_partner = User.query.get(partner_uuid)
 
         if not user_me or not user_partner:
              return jsonify({'error': 'Users not found'}), 404
 
-        # 2. Fetch Latest Profiles
-        my_profile = Profile.query.filter_by(user_id=my_uuid).order_by(Profile.created_at.desc()).first()
-        partner_profile = Profile.query.filter_by(user_id=partner_uuid).order_by(Profile.created_at.desc()).first()
+        profiles = get_current_profiles([my_uuid, partner_uuid])
+        my_profile, partner_profile = profiles.get(my_uuid), profiles.get(partner_uuid)
 
         if not my_profile or not partner_profile:
              return jsonify({'error': 'Profiles not found'}), 404
 
-        # 3. Fetch Compatibility Record
         if my_profile.id < partner_profile.id:
             p1, p2 = my_profile.id, partner_profile.id
         else:
@@ -246,348 +274,19 @@ def get_compatibility_ui(current_user_id, user_id, partner_id):
         compat_record = Compatibility.query.filter_by(player_a_id=p1, player_b_id=p2).first()
 
         if not compat_record:
-            return jsonify({'error': 'Compatibility not calculated yet'}), 404
-
-        # 4. Prepare Data
-        # Flatten derived data from profiles
-        # Note: We duplicate some logic from profile_ui to ensure stability without refactoring
-
-        # Helper to get safe int/float
-        def safe_val(val, default=0):
-            return val if val is not None else default
-
-        # --- A. Partner Profile (Mirrored UI Schema) ---
-        # Only show if allowed, but structure must exist (empty if restricted)
-        sharing_setting = user_partner.profile_sharing_setting
-
-        partner_ui_profile = _transform_profile_for_ui(partner_profile, user_partner, sharing_setting)
-        
-        # --- B. Comparison Data ---
-        
-        # Domains Radar - Critical Order
-        # Strict order: Sensation, Connection, Power, Exploration, Verbal
-        # Map internal keys to this order
-        domain_keys_ordered = ['sensation', 'connection', 'power', 'exploration', 'verbal']
-        u_domains = my_profile.domain_scores or {}
-        p_domains = partner_profile.domain_scores or {}
-        
-        comparison_domains = []
-        for key in domain_keys_ordered:
-            display_name = DOMAIN_DISPLAY_NAMES.get(key, key.title())
-            # Apply privacy to partner score
-            p_score = safe_val(p_domains.get(key, 0))
-            if sharing_setting == 'demographics_only':
-                p_score = 0
-            
-            comparison_domains.append({
-                "domain": display_name,
-                "user_score": safe_val(u_domains.get(key, 0)),
-                "partner_score": p_score
-            })
-
-        # Comparison Scores (Flattened Breakdown)
-        # Handle privacy for scores? Usually scores are shared unless Demographics Only.
-        # Demographics Only -> show overall only?
-        # Requirement: "If data is restricted, return an empty state (e.g., 0 or [])"
-        breakdown = compat_record.breakdown or {}
-        if sharing_setting == 'demographics_only':
-             breakdown = {}
-
-        comparison_scores = {
-            "overall_score": compat_record.overall_percentage,
-            "power_score": safe_val(breakdown.get('power_complement', 0)),
-            "domain_score": safe_val(breakdown.get('domain_similarity', 0)),
-            "activity_score": safe_val(breakdown.get('activity_overlap', 0)),
-            "truth_score": safe_val(breakdown.get('truth_overlap', 0))
-        }
-        
-        # Power Overlap
-        # Re-calculate simple labels
-        u_power = my_profile.power_dynamic or {}
-        p_power = partner_profile.power_dynamic or {}
-        
-        power_overlap = {
-            "user_label": u_power.get('orientation', 'Switch'),
-            "partner_label": p_power.get('orientation', 'Switch') if sharing_setting != 'demographics_only' else "Hidden",
-            "complement_score": safe_val(breakdown.get('power', 0))
-        }
+            return _not_calculated_response(p1, p2)
 
-        # Flattened Arousal Comparison
-        u_arousal = my_profile.arousal_propensity or {}
-        p_arousal = partner_profile.arousal_propensity or {}
-        
-        arousal_comparison = {
-            "user_sexual_excitation": safe_val(u_arousal.get('sexual_excitation', 0)),
-            "user_inhibition_performance": safe_val(u_arousal.get('inhibition_performance', 0)),
-            "user_inhibition_consequence": safe_val(u_arousal.get('inhibition_consequence', 0)),
-            "partner_sexual_excitation": safe_val(p_arousal.get('sexual_excitation', 0)) if sharing_setting != 'demographics_only' else 0,
-            "partner_inhibition_performance": safe_val(p_arousal.get('inhibition_performance', 0)) if sharing_setting != 'demographics_only' else 0,
-            "partner_inhibition_consequence": safe_val(p_arousal.get('inhibition_consequence', 0)) if sharing_setting != 'demographics_only' else 0
-        }
+        new_row = ui_payload.payload_row(compat_record, my_profile, partner_profile, user_partner)
+        ui_payload.save_row(new_row)
 
-        # Interests Comparison (Smart Matching)
-        interests_comp = []
-        if sharing_setting != 'demographics_only':
-            interests_comp = _compare_interests(
-                my_profile.activities or {},
-                my_profile.boundaries or {},
-                partner_profile.activities or {},
-                partner_profile.boundaries or {},
-                sharing_setting == 'overlapping_only'
-            )
-
-        # 5. Final Assembly
-        response = {
-            "compatibility_summary": {
-                "overall_score": compat_record.overall_percentage,
-                "interpretation": compat_record.interpretation,
-                "sharing_setting": sharing_setting,
-                "comparison_scores": comparison_scores
-            },
-            "comparison_data": {
-                "domains": comparison_domains,
-                "power_overlap": power_overlap,
-                "arousal": arousal_comparison
-            },
-            "interests_comparison": interests_comp,
-            "partner_profile": partner_ui_profile
-        }
-        
-        return jsonify(response), 200
+        return _ui_response(
+            new_row['payload'], new_row['sharing_setting'], new_row['partner_display_name'],
+            ui_payload.etag(compat_record.id, compat_record.version, new_row['sharing_setting'],
+                            new_row['partner_display_name'])
+        )
 
     except Exception as e:
         import traceback
         traceback.print_exc()
         logger.error(f"Get compatibility UI failed: {str(e)}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
-
-
-def _transform_profile_for_ui(profile, user, sharing_setting):
-    """
-    Transforms profile into UI schema.
-    Applies privacy: if restricted, returns empty structs, not nulls.
-    """
-    # Defaults
-    arousal_ui = {"sexual_excitation": 0.0, "inhibition_performance": 0.0, "inhibition_consequence": 0.0}
-    power_ui = {"label": "Hidden", "top_percentage": 50, "bottom_percentage": 50, "confidence": ""}
-    domain_ui = []
-    boundaries_ui = []
-    interests_ui = []
-
-    if sharing_setting == 'demographics_only':
-        # Return skeleton
-        pass
-    else:
-        # 1. Arousal
-        arousal = profile.arousal_propensity or {}
-        arousal_ui = {
-            "sexual_excitation": arousal.get('sexual_excitation', 0.0),
-            "inhibition_performance": arousal.get('inhibition_performance', 0.0),
-            "inhibition_consequence": arousal.get('inhibition_consequence', 0.0)
-        }
-        
-        # 2. Power
-        power = profile.power_dynamic or {}
-        top = power.get('top_score', 0)
-        btm = power.get('bottom_score', 0)
-        total = top + btm
-        if total > 0:
-            top_pct = int((top/total)*100)
-        else:
-            top_pct = 50
-        power_ui = {
-            "label": power.get('orientation', 'Switch'),
-            "top_percentage": top_pct,
-            "bottom_percentage": 100 - top_pct,
-            "confidence": power.get('interpretation', '')
-        }
-        
-        # 3. Domains
-        domains = profile.domain_scores or {}
-        for key in ['sensation', 'connection', 'power', 'exploration', 'verbal']: # Use same order
-             display = DOMAIN_DISPLAY_NAMES.get(key, key.title())
-             domain_ui.append({"domain": display, "score": domains.get(key, 0)})
-             
-        # 4. Boundaries
-        # In Overlapping Only, do we show full hard limits? 
-        # "Safety is critical". We'll list them unless prohibited.
-        # But for UI safety, if overlapping_only, usually we only show what matches.
-        # The prompt said "If data is restricted, return empty state".
-        # Let's assume for partner_profile snippet, overlapping_only hides non-shared info.
-        # But this is "Self" view of "Partner".
-        # We'll leave boundaries empty for overlapping_only to be conservative, 
-        # they appear in "conflict" check anyway.
-        if sharing_setting == 'all_responses':
-            bounds = profile.boundaries or {}
-            boundaries_ui = bounds.get('hard_limits', [])
-
-        # 5. Interests
-        # For Partner Profile UI, we only show what is allowed.
-        # If overlapping_only, we probably shouldn't show their full list here, 
-        # only the comparison list.
-        # So we keep this empty for overlapping_only.
-        if sharing_setting == 'all_responses':
-            acts = profile.activities or {}
-            for section_key, section_name in ACTIVITY_SECTION_DISPLAY_NAMES.items():
-                section_items = acts.get(section_key, {})
-                tags = []
-                for k, v in section_items.items():
-                    if v > 0:
-                        tags.append(ACTIVITY_DISPLAY_NAMES.get(k, k.replace('_', ' ').title()))
-                tags.sort()
-                if tags:
-                    interests_ui.append({"section": section_name, "tags": tags})
-
-    return {
-        "user_id": str(user.id),
-        "display_name": user.display_name,
-        "submission_id": str(profile.submission_id),
-        "general": {
-            "arousal_profile": arousal_ui,
-            "power": power_ui,
-            "domains": domain_ui,
-            "boundaries": boundaries_ui
-        },
-        "interests": interests_ui    
-    }
-
-def _compare_interests(u_acts, u_bounds, p_acts, p_bounds, overlapping_only):
-    """
-    Generates comparison list with Smart Matching & Conflicts.
-    
-    Returns tags with:
-    - status: 'mutual', 'conflict', 'user_only', 'partner_only'
-    - compatible: True if directional activities align (give/receive cross-match)
-    """
-    results = []
-    
-    # Normalize hard limits to lowercase for easier matching
-    # Limits might be stored as "Spanking" or "massage".
-    u_hard = {str(h).lower() for h in u_bounds.get('hard_limits', [])}
-    p_hard = {str(h).lower() for h in p_bounds.get('hard_limits', [])}
-
-    for section_key, section_name in ACTIVITY_SECTION_DISPLAY_NAMES.items():
-        u_section = u_acts.get(section_key, {})
-        p_section = p_acts.get(section_key, {})
-        
-        # Collect all unique keys appearing in either
-        all_keys = set(u_section.keys()) | set(p_section.keys())
-        
-        section_tags = []
-        
-        # We need to handle "Giving" vs "Receiving" pairs to avoid double counting
-        processed_keys = set()
-        
-        sorted_keys = sorted(list(all_keys))
-        
-        for k in sorted_keys:
-            if k in processed_keys:
-                continue
-            
-            u_score = u_section.get(k, 0)
-            p_score = p_section.get(k, 0)
-            
-            # Smart Match Logic
-            base = k
-            complement = None
-            is_receive = k.endswith('_receive')
-            is_give = k.endswith('_give')
-            is_directional = is_give or is_receive
-            
-            if is_receive:
-                base = k[:-8] # strip _receive
-                complement = f"{base}_give"
-            elif is_give:
-                base = k[:-5] # strip _give
-                complement = f"{base}_receive"
-            
-            # Improved Fallback Formatting
-            display_name = ACTIVITY_DISPLAY_NAMES.get(k, k.replace('_', ' ').title())
-            
-            # Status determination
-            status = None
-
-            # 1. Direct Conflict Logic
-            # Normalize key and base for checking
-            # We check if the OTHER person has any limit matching this activity
-            
-            # Check matches for Partner's limits (User likes 'k')
-            if u_score > 0:
-                # Does partner hate this?
-                # Check raw key, base key, and display name
-                checks = [k.lower(), base.lower(), base.replace('_', ' ').lower(), display_name.lower()]
-                if any(c in p_hard for c in checks):
-                    status = "conflict"
-
-            # Check matches for User's limits (Partner likes 'k')
-            if not status and p_score > 0:
-                 checks = [k.lower(), base.lower(), base.replace('_', ' ').lower(), display_name.lower()]
-                 if any(c in u_hard for c in checks):
-                     status = "conflict"
-            
-            if not status:
-                # 2. Smart Match
-                if u_score > 0 and p_score > 0:
-                    status = "mutual"
-                elif complement and complement in p_section:
-                    # Check cross match: User(Receive) & Partner(Give)
-                    if u_score > 0 and p_section[complement] > 0:
-                        status = "mutual"
-                        # De-duplicate: Mark complement as processed so it's not listed again
-                        processed_keys.add(complement)
-            
-            if not status:
-                if u_score > 0:
-                    status = "user_only"
-                elif p_score > 0:
-                    status = "partner_only"
-            
-            # Calculate compatibility (directional cross-match)
-            # compatible=True means the activity can actually happen with both satisfied
-            compatible = False
-            
-            if status == "conflict":
-                # Hard limit conflict - never compatible
-                compatible = False
-            elif is_directional:
-                # For directional activities, check if roles complement
-                if is_give:
-                    # This is a "give" activity - compatible if user wants to receive
-                    receive_key = f"{base}_receive"
-                    # Partner gives → User receives?
-                    if p_score > 0 and u_section.get(receive_key, 0) > 0:
-                        compatible = True
-                    # User gives → Partner receives?
-                    if u_score > 0 and p_section.get(receive_key, 0) > 0:
-                        compatible = True
-                elif is_receive:
-                    # This is a "receive" activity - compatible if the other wants to give
-                    give_key = f"{base}_give"
-                    # Partner receives → User gives?
-                    if p_score > 0 and u_section.get(give_key, 0) > 0:
-                        compatible = True
-                    # User receives → Partner gives?
-                    if u_score > 0 and p_section.get(give_key, 0) > 0:
-                        compatible = True
-            else:
-                # Non-directional activities: compatible if mutual
-                compatible = (status == "mutual")
-            
-            if status:
-                tag_data = {"name": display_name, "status": status, "compatible": compatible}
-                
-                # Privacy Filter
-                if overlapping_only:
-                    if status in ['mutual', 'conflict']:
-                        section_tags.append(tag_data)
-                    # Hide one-sided things
-                else:
-                    section_tags.append(tag_data)
-            
-            processed_keys.add(k)
-
-        if section_tags:
-            results.append({"section": section_name, "tags": section_tags})
-            
-    return results
-
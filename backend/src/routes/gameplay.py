@@ -10,8 +10,8 @@ from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import update
 from sqlalchemy.orm.attributes import flag_modified
-from sqlalchemy import text
 from ..middleware.auth import token_required, optional_token
 
 from ..extensions import db
@@ -19,16 +19,23 @@ from ..models.session import Session
 from ..models.user import User
 from ..models.activity import Activity
 from ..db import repository
-from ..recommender.picker import get_intensity_window, get_phase_name
-from ..game.text_resolver import resolve_activity_text
-from ..db.repository import find_best_activity_candidate
+from ..recommender.picker import get_intensity_window
+from ..db.repository import find_best_activity_candidate, CandidateFilter
+from ..db.activity_bank import get_activity_bank
+from ..game.pair_ranking import get_pair_ranking
+from ..game.recency import ExclusionSet, get_player_recency, get_session_recency, record_activity
+from ..game import prefetch, turn_queue, turn_rng
 from ..models.profile import Profile
-from ..models.partner import PartnerConnection
+from ..services.entitlements import Entitlement, EntitlementService
+from ..services.partner_adjacency import PartnerAdjacencyService
 
 logger = get_logger()
 
 gameplay_bp = Blueprint("gameplay", __name__, url_prefix="/api/game")
 
+# Upper bound on ?count= for /<session_id>/preview
+MAX_PREVIEW_CARDS = 10
+
 # --- Helper Functions ---
 
 def _resolve_player(player_data: Dict[str, Any], current_user_id: str) -> Dict[str, Any]:
@@ -73,22 +80,7 @@ def _resolve_player(player_data: Dict[str, Any], current_user_id: str) -> Dict[s
     
     # 2. Partner lookup (if connected)
     if not allow_lookup and player_id and current_user_id:
-        # Check for accepted connection
-        # (requester=me, recipient=them) OR (requester=them, recipient=me)
-        # Convert to UUIDs for strict comparison if possible
-        try:
-            uid_obj = uuid.UUID(str(current_user_id))
-            pid_obj = uuid.UUID(str(player_id))
-            
-            conn = PartnerConnection.query.filter(
-                ((PartnerConnection.requester_user_id == uid_obj) & (PartnerConnection.recipient_user_id == pid_obj)) |
-                ((PartnerConnection.requester_user_id == pid_obj) & (PartnerConnection.recipient_user_id == uid_obj))
-            ).filter_by(status='accepted').first()
-        except (ValueError, TypeError):
-             conn = None
-        
-        if conn:
-            allow_lookup = True
+        allow_lookup = PartnerAdjacencyService.are_partners(current_user_id, player_id)
 
     if allow_lookup:
         try:
@@ -97,7 +89,7 @@ def _resolve_player(player_data: Dict[str, Any], current_user_id: str) -> Dict[s
                 # Get display name with fallbacks
                 display_name = user.display_name
                 if not display_name:
-                    profile = Profile.query.filter_by(user_id=user.id).first()
+                    profile = repository.get_current_profile(user.id)
                     if profile and profile.submission and profile.submission.payload_json:
                         display_name = profile.submission.payload_json.get('name')
                 
@@ -120,22 +112,79 @@ def _resolve_player(player_data: Dict[str, Any], current_user_id: str) -> Dict[s
 
 
 
-def _get_player_profile(player_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Fetch profile dict for a player by user_id."""
-    player_id = player_data.get('id')
-    if not player_id:
-        return None
-        
-    try:
-        # Check if valid UUID
-        user_uuid = uuid.UUID(player_id)
-        profile = Profile.query.filter_by(user_id=user_uuid).first()
-        if profile:
-            return profile.to_dict()
-    except (ValueError, TypeError):
-        pass
-        
-    return None
+# Profile fields the turn generator and scorers read
+PROFILE_SNAPSHOT_FIELDS = (
+    'activities', 'power_dynamic', 'domain_scores', 'arousal_propensity', 'boundaries', 'anatomy'
+)
+
+
+def _snapshot_profile(profile: Profile) -> Dict[str, Any]:
+    """Compact, scoring-relevant copy of a profile (stored on the session)."""
+    snapshot = {field: getattr(profile, field) or {} for field in PROFILE_SNAPSHOT_FIELDS}
+    snapshot['id'] = profile.id
+    snapshot['updated_at'] = profile.updated_at.isoformat()
+    return snapshot
+
+
+def _session_profiles(session: Session) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Profile snapshots for the session's players, keyed by player id.
+
+    Snapshots live in session.profile_snapshots. Each call reads the
+    players' current profile ids and their (profile id, updated_at) stamps,
+    and reloads only the profiles that are new, were switched to, or whose
+    updated_at changed. Players without a
+    user profile map to None. Caller must commit.
+    """
+    user_ids = {}
+    for player in session.players or []:
+        player_id = player.get('id')
+        try:
+            user_ids[str(player_id)] = uuid.UUID(player_id)
+        except (ValueError, TypeError, AttributeError):
+            continue
+    if not user_ids:
+        return {}
+
+    # Each user's current profile (users.current_profile_id) and its stamp
+    current = repository.get_current_profile_ids(user_ids.values())
+    stamps = {}
+    if current:
+        updated = dict(db.session.query(Profile.id, Profile.updated_at)
+                       .filter(Profile.id.in_(set(current.values()))))
+        stamps = {
+            user_id: (profile_id, updated[profile_id].isoformat())
+            for user_id, profile_id in current.items() if profile_id in updated
+        }
+
+    stored = session.profile_snapshots or {}
+    snapshots = {}
+    stale = {}
+    for player_id, user_uuid in user_ids.items():
+        stamp = stamps.get(user_uuid)
+        if stamp is None:
+            continue
+        current = stored.get(player_id)
+        if current and (current.get('id'), current.get('updated_at')) == stamp:
+            snapshots[player_id] = current
+        else:
+            stale.setdefault(stamp[0], []).append(player_id)
+
+    if stale:
+        for profile in Profile.query.filter(Profile.id.in_(list(stale))).all():
+            for player_id in stale[profile.id]:
+                snapshots[player_id] = _snapshot_profile(profile)
+        logger.info("profile_snapshots_refreshed",
+            session_id=str(session.session_id),
+            profiles=len(stale)
+        )
+
+    if snapshots != stored:
+        session.profile_snapshots = snapshots
+        flag_modified(session, "profile_snapshots")
+
+    return {player_id: snapshots.get(player_id) for player_id in user_ids}
+
 
 def _invert_activity_preferences(activities: Dict[str, float]) -> Dict[str, float]:
     """Invert activity preferences (Give <-> Receive)."""
@@ -243,68 +292,9 @@ def _get_next_player_indices(current_idx: int, num_players: int, mode: str) -> t
     
     return primary, secondary
 
-def _get_anonymous_usage(anon_id: str) -> int:
-    """Count activities presented to anonymous session in last 24h."""
-    from datetime import datetime, timedelta
-    
-    cutoff = datetime.utcnow() - timedelta(hours=24)
-    
-    sql = text("""
-        SELECT COUNT(*) FROM user_activity_history 
-        WHERE anonymous_session_id = :anon_id 
-        AND presented_at > :cutoff
-    """)
-    result = db.session.execute(sql, {"anon_id": anon_id, "cutoff": cutoff}).scalar()
-    return result or 0
-
 def _check_activity_limit(user_id: Optional[str] = None, anonymous_session_id: Optional[str] = None) -> dict:
     """Check if user (auth or anon) has reached lifetime activity limit."""
-    from ..services.config_service import get_config_int
-
-    limit = get_config_int('free_tier_activity_limit', 10)
-
-    # 1. Authenticated User
-    if user_id:
-        # Ensure ID is UUID
-        if isinstance(user_id, str):
-            try:
-                user_id = uuid.UUID(user_id)
-            except ValueError:
-                return {"error": "Invalid User ID"}
-
-        user = User.query.get(user_id)
-        if not user:
-            return {"error": "User not found"}
-
-        if user.subscription_tier == 'premium':
-            return {
-                "limit_reached": False,
-                "remaining": -1,
-                "is_capped": False
-            }
-
-        used = user.lifetime_activity_count or 0
-
-        return {
-            "limit_reached": used >= limit,
-            "remaining": max(0, limit - used),
-            "is_capped": True,
-            "used": used,
-            "limit": limit
-        }
-
-    # 2. Anonymous User
-    if anonymous_session_id:
-        used_count = _get_anonymous_usage(anonymous_session_id)
-        return {
-            "limit_reached": used_count >= limit,
-            "remaining": max(0, limit - used_count),
-            "is_capped": True,
-            "used": used_count,
-            "limit": limit
-        }
-
-    return {"error": "No identity provided"}
+    return EntitlementService.load(user_id, anonymous_session_id).status()
 
 
 # Alias for backwards compatibility
@@ -314,15 +304,9 @@ def _check_daily_limit(user_id: Optional[str] = None, anonymous_session_id: Opti
 
 def _increment_activity_count(user_id: str):
     """Increment lifetime activity count for free users."""
-    if isinstance(user_id, str):
-        try:
-            user_id = uuid.UUID(user_id)
-        except ValueError:
-            return
-
-    user = User.query.get(user_id)
-    if user and user.subscription_tier != 'premium':
-        user.lifetime_activity_count = (user.lifetime_activity_count or 0) + 1
+    entitlement = EntitlementService.load(user_id)
+    if not entitlement.error:
+        EntitlementService.charge(entitlement)
         db.session.commit()
 
 
@@ -334,8 +318,7 @@ def _increment_daily_count(user_id: str):
 
 def _enforce_activity_limit(
     queue: List[Dict[str, Any]],
-    user_id: Optional[str] = None,
-    anonymous_session_id: Optional[str] = None,
+    entitlement: Entitlement,
     charge_credit: bool = True
 ) -> tuple:
     """
@@ -343,36 +326,31 @@ def _enforce_activity_limit(
 
     This function handles the complete limit enforcement logic:
     1. Checks if first card is a limit card (if so, no charge needed)
-    2. Increments activity count if charge_credit=True and card is real
-    3. Re-checks limit status AFTER increment (fresh status)
+    2. Charges the entitlement if charge_credit=True and card is real
+    3. Reads limit status AFTER the charge (fresh status)
     4. Scrubs queue if limit reached, with appropriate keep_first logic
     5. Returns fresh limit_status and modified queue
 
     Args:
         queue: The turn queue to potentially scrub
-        user_id: Authenticated user ID (optional)
-        anonymous_session_id: Anonymous session ID (optional)
+        entitlement: The request's EntitlementService snapshot (updated in place)
         charge_credit: Whether to charge a credit for the first card
 
     Returns:
         tuple: (limit_status: dict, queue: list)
-            - limit_status is ALWAYS fresh (post-increment if applicable)
+            - limit_status is ALWAYS fresh (post-charge if applicable)
             - queue is scrubbed if limit was reached
     """
-    from ..services.config_service import get_config_int
-
     # Check if first card is a limit card (no charge needed)
-    head_card = queue[0] if queue else {}
-    is_limit_card = head_card.get('card', {}).get('type') == 'LIMIT_REACHED'
+    is_limit_card = bool(queue) and turn_queue.is_limit(queue[0])
 
     # Charge credit if requested and card is real
-    if charge_credit and not is_limit_card:
-        if user_id:
-            _increment_activity_count(user_id)
-        # Anonymous users: count is tracked via history, not incremented here
+    # Anonymous players are charged when a card is played (next_turn), not here
+    if charge_credit and not is_limit_card and entitlement.user_id:
+        EntitlementService.charge(entitlement)
 
-    # Get FRESH limit status (post-increment)
-    limit_status = _check_activity_limit(user_id=user_id, anonymous_session_id=anonymous_session_id)
+    # FRESH limit status (post-charge)
+    limit_status = entitlement.status()
 
     # Scrub queue if limit reached
     if limit_status.get("limit_reached"):
@@ -380,22 +358,65 @@ def _enforce_activity_limit(
         # - If we just charged (card was real), keep first card (it's paid for)
         # - If we're over limit (used > limit), don't keep first
         # - If first card was already a limit card, doesn't matter
-        used = limit_status.get("used", 0)
-        limit = limit_status.get("limit", get_config_int('free_tier_activity_limit', 10))
-
         # Keep first if we're exactly at limit (not over), and card was real
-        keep_first = (used <= limit) and not is_limit_card
+        keep_first = (entitlement.used <= entitlement.limit) and not is_limit_card
 
         queue = _scrub_queue_for_limit(queue, keep_first=keep_first)
 
     return limit_status, queue
 
 
-def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: Optional[str] = None) -> Dict[str, Any]:
+def _new_turn_batch() -> Dict[str, Any]:
+    """
+    Shared lookups for generating several turns of one session in a row.
+
+    Profiles are loaded on first use and reused for every card in the batch;
+    `picked` is the running set of activities chosen so far.
+    """
+    return {
+        "profiles": None,          # player id -> profile snapshot (or None)
+        "picked": set(),           # activity ids chosen earlier in this batch
+    }
+
+
+def _batch_player_profile(batch: Dict[str, Any], session: Session, player: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Look up a player's profile snapshot (validated once per batch)."""
+    if batch["profiles"] is None:
+        batch["profiles"] = _session_profiles(session)
+    return batch["profiles"].get(str(player.get('id')))
+
+
+def _recent_activities(loader, key: Any, error_event: str, *args):
+    """Recency buffer for repetition prevention (empty if it cannot be loaded)."""
+    if not key:
+        return ()
+    try:
+        return loader(key, *args)
+    except Exception as e:
+        logger.error(error_event, error=str(e))
+        return ()
+
+
+def _generate_turn_data(
+    session: Session,
+    step_offset: int = 0,
+    selected_type: Optional[str] = None,
+    batch: Optional[Dict[str, Any]] = None,
+    queue: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
     """
     Generate data for a single turn without committing to DB.
-    Used for batch generation.
+    Used for batch generation: pass the same `batch` (see _new_turn_batch)
+    to share profile and history lookups across consecutive turns.
+
+    Random choices come from the session's seeded generator for the target
+    step (game/turn_rng.py), so the same step with the same exclusions is
+    generated identically on every call. `queue` replaces the stored queue
+    as the turns already ahead (used by the preview).
     """
+    if batch is None:
+        batch = _new_turn_batch()
+
     settings = session.game_settings or {}
     players = session.players or []
     state = session.current_turn_state or {}
@@ -414,7 +435,8 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
     base_step = state.get("step", 0)
     # If the queue exists, the "effective" current step for generation is 
     # the step of the last item in the queue.
-    queue = state.get("queue", [])
+    if queue is None:
+        queue = state.get("queue", [])
     if queue and step_offset == 0:
         # If we are just appending, we start from the end of the queue
         last_item = queue[-1]
@@ -424,6 +446,9 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
     
     # Infinite Loop Logic
     effective_step = (target_step - 1) % 25 + 1
+
+    seed = turn_rng.session_seed(session)
+    rng = turn_rng.step_rng(seed, target_step)
     
     # Player Rotation
     # We need to calculate rotation based on the step number.
@@ -439,7 +464,7 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
         primary_idx = (target_step - 1) % num_players
     else:
         # RANDOM
-        primary_idx = random.randint(0, num_players - 1)
+        primary_idx = rng.randint(0, num_players - 1)
         
     secondary_idx = (primary_idx + 1) % num_players
     
@@ -447,7 +472,7 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
     secondary_player = players[secondary_idx]
     
     # Activity Selection
-    activity_type = selected_type if selected_type else random.choice(["truth", "dare"])
+    activity_type = selected_type if selected_type else rng.choice(["truth", "dare"])
     if activity_type.lower() == "dare" and not settings.get("include_dare", True):
         activity_type = "truth"
         
@@ -463,10 +488,9 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
     
     # --- Personalization Logic ---
     
-    # Fetch profiles
-    # Fetch profiles
-    primary_profile_dict = _get_player_profile(primary_player)
-    partner_profile_dict = _get_player_profile(secondary_player)
+    # Fetch profiles (session snapshots, validated once per batch)
+    primary_profile_dict = _batch_player_profile(batch, session, primary_player)
+    partner_profile_dict = _batch_player_profile(batch, session, secondary_player)
     
     # Virtual Profile Support for Primary
     if not primary_profile_dict and primary_player.get('anatomy'):
@@ -486,49 +510,22 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
     # If we have both profiles (real or virtual), use personalization
     if primary_profile_dict and partner_profile_dict:
         # Build limits
-        exclude_ids = set()
-        for item in queue:
-            cid = item.get('card_id')
-            # Handle potential non-int IDs if needed (though card_id is string usually)
-            if cid and cid != 'fallback' and not cid.startswith('limit-'):
-                try: exclude_ids.add(int(cid))
-                except (ValueError, TypeError): pass
-        
-        # --- REPETITION PREVENTION ---
-        # 1. Session Exclusion (Strict): Exclude ANY activity played in this session by ANYONE
-        try:
-             from ..models.activity_history import UserActivityHistory
-             
-             session_history = db.session.query(UserActivityHistory.activity_id)\
-                 .filter(UserActivityHistory.session_id == session.session_id)\
-                 .filter(UserActivityHistory.activity_id.isnot(None))\
-                 .all()
-             
-             for (hid,) in session_history:
-                 exclude_ids.add(hid)
-        except Exception as e:
-            logger.error("session_history_fetch_failed", error=str(e))
+        queued_ids = {item["activity_id"] for item in queue if item.get("activity_id") is not None}
 
-        # 2. Player History Exclusion (Long-term): Look back at history for the ACTIVE primary player
-        # We want to avoid activities YOU (as primary) have just done (even in other sessions).
-        try:
-             primary_uid = primary_player.get('id')
-             if primary_uid:
-                 # Fetch last 100 activities where this user was primary
-                 # Use efficient index on (primary_player_id, presented_at)
-                 recent_history = db.session.query(UserActivityHistory.activity_id)\
-                     .filter(UserActivityHistory.primary_player_id == str(primary_uid))\
-                     .filter(UserActivityHistory.activity_id.isnot(None))\
-                     .order_by(UserActivityHistory.presented_at.desc())\
-                     .limit(100)\
-                     .all()
-                 
-                 for (hid,) in recent_history:
-                     exclude_ids.add(hid)
-        except Exception as e:
-            logger.error("player_history_fetch_failed", error=str(e))
+        # --- REPETITION PREVENTION ---
+        # Checked by membership against the recency buffers; nothing is copied.
+        exclude_ids = ExclusionSet(
+            queued_ids,
+            # 1. Session Exclusion (Strict): Exclude ANY activity played in this session by ANYONE
+            _recent_activities(get_session_recency, session.session_id, "session_history_fetch_failed",
+                               session.turn_version),
+            # 2. Player History Exclusion (Long-term): activities YOU (as primary) have just done,
+            # even in other sessions
+            _recent_activities(get_player_recency, primary_player.get('id'), "player_history_fetch_failed"),
+            # 3. Cards picked earlier in this batch
+            batch["picked"],
+        )
 
-                
         # Build boundary list (union of hard limits)
         p1_bounds = primary_profile_dict.get('boundaries', {}).get('hard_limits', [])
         p2_bounds = partner_profile_dict.get('boundaries', {}).get('hard_limits', [])
@@ -546,20 +543,36 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
         # Determine Session Mode
         session_mode = 'groups' if len(players) > 2 else 'couples'
         
-        candidate = find_best_activity_candidate(
-            rating=rating,
-            intensity_min=intensity_min,
-            intensity_max=intensity_max,
-            activity_type=activity_type.lower(),
-            player_a_profile=primary_profile_dict,
-            player_b_profile=partner_profile_dict,
+        # Per-session pair ranking (scored once, then sliced by type/intensity)
+        ranking = get_pair_ranking(
+            session.session_id,
+            primary_player,
+            secondary_player,
+            primary_profile_dict,
+            partner_profile_dict,
+            rating,
             session_mode=session_mode,
-            player_boundaries=player_boundaries,
-            player_anatomy=player_anatomy,
-            excluded_ids=exclude_ids,
-            top_n=75, # Heavy JIT: Fetch 75*2=150 candidates
-            randomize=True # Random sample
+            candidate_filter=CandidateFilter(player_boundaries, player_anatomy),
+            rng=turn_rng.ranking_rng(seed, primary_player.get('id'), secondary_player.get('id'))
         )
+        if ranking is not None:
+            candidate = ranking.pick(activity_type.lower(), intensity_min, intensity_max, exclude_ids)
+        else:
+            candidate = find_best_activity_candidate(
+                rating=rating,
+                intensity_min=intensity_min,
+                intensity_max=intensity_max,
+                activity_type=activity_type.lower(),
+                player_a_profile=primary_profile_dict,
+                player_b_profile=partner_profile_dict,
+                session_mode=session_mode,
+                player_boundaries=player_boundaries,
+                player_anatomy=player_anatomy,
+                excluded_ids=exclude_ids,
+                top_n=75, # Heavy JIT: Fetch 75*2=150 candidates
+                randomize=True, # Random sample
+                rng=rng
+            )
 
     # Fallback to Random Activity
     # Fallback to Random Activity
@@ -568,17 +581,29 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
         session_mode = 'groups' if len(players) > 2 else 'couples'
         scope_filter = ['couples', 'all'] if session_mode == 'couples' else ['groups', 'all']
         
-        candidate = Activity.query.filter(
-            Activity.type == activity_type.lower(),
-            Activity.rating == rating,
-            Activity.intensity >= intensity_min,
-            Activity.intensity <= intensity_max,
-            Activity.is_active == True,
-            Activity.approved == True,
-            Activity.audience_scope.in_(scope_filter)
-        ).order_by(db.func.random()).first()
+        bank = get_activity_bank()
+        if bank is not None:
+            # Same filters, answered from the in-memory partitions
+            pool = bank.candidates(
+                rating, intensity_min, intensity_max,
+                activity_type=activity_type.lower(),
+                session_mode=session_mode
+            )
+            candidate = rng.choice(pool) if pool else None
+        else:
+            sampled = repository.sample_activities(Activity.query.filter(
+                Activity.type == activity_type.lower(),
+                Activity.rating == rating,
+                Activity.intensity >= intensity_min,
+                Activity.intensity <= intensity_max,
+                Activity.is_active == True,
+                Activity.approved == True,
+                Activity.audience_scope.in_(scope_filter)
+            ), 1, rng=rng)
+            candidate = sampled[0] if sampled else None
     
     if candidate:
+        batch["picked"].add(candidate.activity_id)
         logger.info("activity_selected", 
             activity_id=str(candidate.activity_id),
             type=candidate.type,
@@ -586,72 +611,26 @@ def _generate_turn_data(session: Session, step_offset: int = 0, selected_type: O
             step=target_step
         )
     
-    if not candidate:
-        candidate = Activity(
-            script={"steps": [{"actor": "A", "do": "Tell your partner something you love about them."}]},
-            type="truth",
-            intensity=1
-        )
-        # Mock ID for fallback if needed, or handle in response
-        
-    # Text Resolution
-    try:
-        script = candidate.script
-        if not script or 'steps' not in script or not script['steps']:
-            raise ValueError("Activity script is missing or empty")
-        activity_text = script['steps'][0].get('do', "Perform the activity.")
-    except Exception as e:
-        logger.error("activity_text_extraction_failed", error=str(e), activity_id=str(candidate.activity_id) if candidate else None)
-        activity_text = "Perform a mystery activity with your partner."
-        
-    resolved_text = resolve_activity_text(
-        activity_text,
-        primary_player["name"],
-        secondary_player["name"]
+    # Queue entry only; display fields are rendered by turn_queue.hydrate_queue
+    # (no candidate: fallback card)
+    return turn_queue.turn_entry(
+        candidate.activity_id if candidate else None,
+        activity_type,
+        target_step,
+        primary_idx,
+        secondary_idx
     )
-    
-    # Return Turn Object (not full response)
-    return {
-        "status": "SHOW_CARD",
-        "primary_player_idx": primary_idx,
-        "step": target_step,
-        "card_id": str(candidate.activity_id) if hasattr(candidate, 'activity_id') else "fallback",
-        "card": {
-            "card_id": str(candidate.activity_id) if hasattr(candidate, 'activity_id') else "fallback",
-            "type": activity_type.upper(),
-            "primary_player": primary_player["name"],
-            "secondary_players": [secondary_player["name"]],
-            "display_text": resolved_text,
-            "intensity_rating": candidate.intensity
-        },
-        "progress": {
-            "current_step": target_step,
-            "total_steps": 25,
-            "intensity_phase": get_phase_name(effective_step, 25).capitalize()
-        }
-    }
+
+def _is_participant(players: List[Dict[str, Any]], current_user_id, anonymous_session_id: Optional[str]) -> bool:
+    """Whether the authenticated user or, failing that, the anonymous id is one of the players."""
+    player_ids = {str(p.get('id')) for p in players}
+    if current_user_id and str(current_user_id) in player_ids:
+        return True
+    return bool(anonymous_session_id) and str(anonymous_session_id) in player_ids
 
 def _generate_limit_card() -> Dict[str, Any]:
     """Generate a barrier card for when activity limit is reached."""
-    return {
-        "status": "SHOW_CARD",
-        "primary_player_idx": -1,
-        "step": 999, # Dummy step
-        "card_id": f"limit-barrier-{uuid.uuid4()}",
-        "card": {
-            "card_id": f"limit-barrier-{uuid.uuid4()}",
-            "type": "LIMIT_REACHED",
-            "primary_player": "System",
-            "secondary_players": [],
-            "display_text": "Activity limit reached. Tap to unlock unlimited turns.",
-            "intensity_rating": 1
-        },
-        "progress": {
-            "current_step": 999,
-            "total_steps": 25,
-            "intensity_phase": "Peak"
-        }
-    }
+    return turn_queue.limit_entry()
 
 def _scrub_queue_for_limit(queue: List[Dict[str, Any]], keep_first: bool = True) -> List[Dict[str, Any]]:
     """
@@ -667,7 +646,7 @@ def _scrub_queue_for_limit(queue: List[Dict[str, Any]], keep_first: bool = True)
     for i in range(start_idx, len(queue)):
         item = queue[i]
         # If it's not already a limit card, replace it
-        if item.get('card', {}).get('type') != 'LIMIT_REACHED':
+        if not turn_queue.is_limit(item):
             # Generate replacement
             barrier = _generate_limit_card()
             # Preserve some flow data? No, barrier resets step usually.
@@ -677,17 +656,21 @@ def _scrub_queue_for_limit(queue: List[Dict[str, Any]], keep_first: bool = True)
             
     return queue
 
-def _fill_queue(session: Session, target_size: int = 3, owner_id: str = None, anonymous_session_id: str = None) -> List[Dict[str, Any]]:
+def _fill_queue(
+    session: Session,
+    target_size: int = 3,
+    entitlement: Optional[Entitlement] = None,
+    batch: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Ensure the session quantity has `target_size` items.
     Updates session.current_turn_state but caller must commit.
     Returns the updated queue.
     """
     state = session.current_turn_state or {}
-    queue = state.get("queue", [])
-    
-    # If queue is missing (migration), init it
-    if queue is None: queue = []
+    # Missing (migration) or rendered (pre-compact) queues are converted
+    queue = turn_queue.compact_queue(state.get("queue"), len(session.players or []))
+    state["queue"] = queue
     
     current_size = len(queue)
     if current_size >= target_size:
@@ -696,16 +679,16 @@ def _fill_queue(session: Session, target_size: int = 3, owner_id: str = None, an
     needed = target_size - current_size
     
     # Check limit status if owner known
-    limit_reached = False
-    if owner_id or anonymous_session_id:
-        status = _check_activity_limit(user_id=owner_id, anonymous_session_id=anonymous_session_id)
-        limit_reached = status.get("limit_reached", False)
+    limit_reached = entitlement.limit_reached if entitlement else False
     
+    # Generate the missing cards in one pass with shared lookups
+    if batch is None:
+        batch = _new_turn_batch()
     for _ in range(needed):
         if limit_reached:
             turn_data = _generate_limit_card()
         else:
-            turn_data = _generate_turn_data(session)
+            turn_data = _generate_turn_data(session, batch=batch)
             
         queue.append(turn_data)
         
@@ -714,16 +697,54 @@ def _fill_queue(session: Session, target_size: int = 3, owner_id: str = None, an
     
     if queue:
         head = queue[0]
-        state["status"] = head["status"]
-        state["primary_player_idx"] = head["primary_player_idx"]
+        state["status"] = "SHOW_CARD"
+        state["primary_player_idx"] = head["primary_idx"]
         state["step"] = head["step"]
-        state["card_id"] = head["card_id"]
+        state["card_id"] = turn_queue.card_id(head)
         
     session.current_turn_state = state
     flag_modified(session, "current_turn_state")
     
     return queue
 
+def _save_turn_state(session: Session, state: Dict[str, Any], expected_version: int, advance: bool = True) -> bool:
+    """
+    Compare-and-swap the session's turn state (caller commits).
+
+    Writes only if sessions.turn_version still equals `expected_version`,
+    so concurrent writers never hold the row while generating cards; the
+    loser gets False and must roll back. `advance` bumps the version (a
+    card was played); the prefetch appends cards without bumping it.
+    """
+    sessions = Session.__table__
+    values = {"current_turn_state": state, "turn_seed": session.turn_seed}
+    if advance:
+        values["turn_version"] = sessions.c.turn_version + 1
+
+    # Drop the ORM's pending copy so it is not flushed unchecked
+    db.session.expire(session, ["current_turn_state", "turn_seed"])
+    result = db.session.execute(
+        update(sessions)
+        .where(sessions.c.session_id == session.session_id, sessions.c.turn_version == expected_version)
+        .values(**values)
+    )
+    return result.rowcount == 1
+
+def _current_turn_response(session: Session, owner_id: Optional[str], anonymous_session_id: Optional[str]):
+    """Response with the session's stored state, for /next calls that lost a conflict."""
+    db.session.refresh(session)
+    players = session.players or []
+    queue = turn_queue.compact_queue((session.current_turn_state or {}).get("queue"), len(players))
+    turns = turn_queue.hydrate_queue(queue[:prefetch.VISIBLE_QUEUE_SIZE], players)
+    return jsonify({
+        "session_id": session.session_id,
+        "limit_status": EntitlementService.load(owner_id, anonymous_session_id).status(),
+        "queue": turns,
+        "current_turn": turns[0] if turns else {},
+        "turn_version": session.turn_version,
+        "conflict": True
+    })
+
 @gameplay_bp.route("/start", methods=["POST"])
 @token_required
 def start_game(current_user_id):
@@ -829,7 +850,8 @@ def start_game(current_user_id):
             player_a_profile_id=1, 
             player_b_profile_id=1,
             # Link owner
-            session_owner_user_id=owner_uuid
+            session_owner_user_id=owner_uuid,
+            turn_seed=turn_rng.new_seed()
         )
         
         # If anonymous, we might want to store partner_anonymous_name/anatomy on the session for legacy
@@ -839,15 +861,17 @@ def start_game(current_user_id):
         # Commit first to get session_id 
         db.session.commit()
         
-        # Fill Queue (Batch of 3)
-        queue = _fill_queue(session, target_size=3, owner_id=owner_id, anonymous_session_id=owner_anon_id)
+        # Tier, usage and limit, read once for the request
+        entitlement = EntitlementService.load(owner_id, owner_anon_id)
+
+        # Fill Queue (Batch of 3; deeper cards are prefetched after the response)
+        queue = _fill_queue(session, target_size=prefetch.VISIBLE_QUEUE_SIZE, entitlement=entitlement)
 
         # Enforce activity limit: charge credit, get fresh status, scrub if needed
-        # This returns FRESH limit_status (post-increment) and modified queue
+        # This returns FRESH limit_status (post-charge) and modified queue
         limit_status, queue = _enforce_activity_limit(
             queue=queue,
-            user_id=owner_id,
-            anonymous_session_id=owner_anon_id,
+            entitlement=entitlement,
             charge_credit=True
         )
 
@@ -858,6 +882,7 @@ def start_game(current_user_id):
         flag_modified(session, "current_turn_state")
             
         db.session.commit()
+        prefetch.schedule(session.session_id, owner_id, owner_anon_id)
         
         logger.info("game_session_started",
             session_id=str(session.session_id),
@@ -865,12 +890,14 @@ def start_game(current_user_id):
             intimacy_level=settings.get('intimacy_level')
         )
         
-        # Response
+        # Response (queue entries rendered for display)
+        turns = turn_queue.hydrate_queue(queue[:prefetch.VISIBLE_QUEUE_SIZE], players)
         return jsonify({
             "session_id": session.session_id,
             "limit_status": limit_status,
-            "queue": queue, # Return full queue
-            "current_turn": queue[0] if queue else {} # Legacy support / convenience
+            "queue": turns, # Return full queue
+            "current_turn": turns[0] if turns else {}, # Legacy support / convenience
+            "turn_version": session.turn_version
         }), 200
 
     except Exception as e:
@@ -883,6 +910,12 @@ def next_turn(current_user_id, session_id):
     """
     Advance to next turn.
     Consumes the played card, increments credit, replenishes queue.
+
+    Concurrent calls for one session are resolved optimistically: the state
+    is saved only if no other call advanced it since it was read
+    (_save_turn_state). A call that loses, or whose `turn_version` (the
+    version of the card the client is showing) is already stale, changes
+    nothing and gets the current state back with "conflict": true.
     """
     try:
         session = Session.query.get(session_id)
@@ -894,33 +927,16 @@ def next_turn(current_user_id, session_id):
             return jsonify({"error": "Session is not active"}), 400
             
         # Validate Participation
-        # session.players is JSON list of dicts [{'id':...}, ...]
         players = session.players or []
-        is_participant = False
-        
-        # Check against Auth User
-        if current_user_id:
-            for p in players:
-                 if str(p.get('id')) == str(current_user_id):
-                     is_participant = True
-                     break
-        
-        # Check against Anonymous ID (if no auth match)
         data = request.get_json() or {} # Handle empty body safety
         anonymous_session_id = data.get("anonymous_session_id")
-         
-        if not is_participant and anonymous_session_id:
-             for p in players:
-                 if str(p.get('id')) == str(anonymous_session_id):
-                     is_participant = True
-                     break
-        
-        if not is_participant:
+
+        if not _is_participant(players, current_user_id, anonymous_session_id):
              return jsonify({'error': 'Unauthorized', 'message': 'Not a participant'}), 403
             
         
         state = session.current_turn_state or {}
-        queue = state.get("queue", [])
+        queue = turn_queue.compact_queue(state.get("queue"), len(players))
         
         # Determine owner
         owner_id = str(current_user_id) if current_user_id else None
@@ -929,68 +945,88 @@ def next_turn(current_user_id, session_id):
         if not owner_id and not anonymous_session_id:
             return jsonify({'error': 'Unauthorized', 'message': 'Identity required for billing'}), 401
 
+        # Optimistic concurrency: the version this request advances from
+        expected_version = session.turn_version or 0
+        seen_version = data.get("turn_version")
+        if isinstance(seen_version, int) and seen_version != expected_version:
+            # Double tap: the client's card was already played
+            return _current_turn_response(session, owner_id, anonymous_session_id)
+
+        # Tier, usage and limit, read once for the request
+        entitlement = EntitlementService.load(owner_id, anonymous_session_id)
+
         # 1. Consume the current card (Head of queue)
-        if queue:
-            last_card = queue.pop(0)
-            state["queue"] = queue
-            session.current_turn_state = state
-            flag_modified(session, "current_turn_state")
-            
-            # LOGGING: Record history for ALL users (Auth & Anon) to prevent repetition
-            if last_card and last_card.get('card', {}).get('type') != 'LIMIT_REACHED':
-                 from ..models.activity_history import UserActivityHistory
-                 
-                 card_data = last_card.get('card', {})
-                 cid_str = card_data.get('card_id')
-                 activity_id = int(cid_str) if cid_str and cid_str.isdigit() else None
-                 
-                 # Determine Primary Player ID for this specific turn
-                 turn_primary_idx = last_card.get('primary_player_idx')
-                 turn_primary_id = None
-                 if turn_primary_idx is not None and 0 <= turn_primary_idx < len(players):
-                     turn_primary_id = str(players[turn_primary_idx].get('id'))
-                 
-                 history = UserActivityHistory(
-                     user_id=owner_id, # Owner (payer)
-                     anonymous_session_id=anonymous_session_id, # Track anon session too
-                     session_id=session.session_id,
-                     activity_id=activity_id,
-                     activity_type=card_data.get('type', 'TRUTH').lower(),
-                     primary_player_id=turn_primary_id, # Track who did it
-                     was_skipped=False,
-                     presented_at=datetime.utcnow()
-                 )
-                 db.session.add(history)
-                 
-            # Charge 1 Credit for the played card IF it wasn't a barrier card
-            if owner_id and last_card and last_card.get('card', {}).get('type') != 'LIMIT_REACHED':
-                _increment_activity_count(owner_id)
-        
-        # 2. Replenish Queue (Add 1 to end)
-        queue = _fill_queue(session, target_size=3, owner_id=owner_id, anonymous_session_id=anonymous_session_id)
-
-        # Enforce activity limit: get fresh status, scrub if needed
-        # charge_credit=False because we already charged above for the consumed card
+        last_card = queue.pop(0) if queue else None
+        state["queue"] = queue
+        played = bool(last_card) and not turn_queue.is_limit(last_card)
+
+        # The played card is not in the session's recency buffer until this commits
+        batch = _new_turn_batch()
+        if played and last_card.get('activity_id') is not None:
+            batch["picked"].add(last_card['activity_id'])
+
+        # Refill and scrub against the entitlement as it will be after charging
+        # the played card; the charge itself waits for the state to be saved
+        outlook = entitlement.charged() if played else entitlement
+
+        # 2. Replenish Queue (only if the background prefetch has not kept up)
+        queue = _fill_queue(session, target_size=prefetch.VISIBLE_QUEUE_SIZE, entitlement=outlook, batch=batch)
+
+        # Enforce activity limit: scrub if needed (the played card is charged below)
         limit_status, queue = _enforce_activity_limit(
             queue=queue,
-            user_id=owner_id,
-            anonymous_session_id=anonymous_session_id,
-            charge_credit=False  # Already charged for consumed card
+            entitlement=outlook,
+            charge_credit=False
         )
 
-        # Update session state with scrubbed queue
+        # Save the scrubbed queue unless another request advanced the session first.
+        # Nothing else has been written yet, so a losing request never waits on
+        # the users row the winner charges.
         state["queue"] = queue
-        session.current_turn_state = state
-        flag_modified(session, "current_turn_state")
-        
+        if not _save_turn_state(session, state, expected_version):
+            db.session.rollback()
+            logger.info("next_turn_conflict", session_id=session_id, turn_version=expected_version)
+            return _current_turn_response(session, owner_id, anonymous_session_id)
+
+        # 3. Winner only: record history and charge in the same transaction
+        turn_primary_id = None
+        if played:
+            from ..models.activity_history import UserActivityHistory
+
+            # Determine Primary Player ID for this specific turn
+            turn_primary_idx = last_card.get('primary_idx')
+            if turn_primary_idx is not None and 0 <= turn_primary_idx < len(players):
+                turn_primary_id = str(players[turn_primary_idx].get('id'))
+
+            # LOGGING: Record history for ALL users (Auth & Anon) to prevent repetition
+            db.session.add(UserActivityHistory(
+                user_id=owner_id, # Owner (payer)
+                anonymous_session_id=anonymous_session_id, # Track anon session too
+                session_id=session.session_id,
+                activity_id=last_card.get('activity_id'),
+                activity_type=last_card.get('type', 'TRUTH').lower(),
+                primary_player_id=turn_primary_id, # Track who did it
+                was_skipped=False,
+                presented_at=datetime.utcnow()
+            ))
+            # Charge 1 Credit for the played card (barrier cards are free)
+            EntitlementService.charge(entitlement)
+            limit_status = entitlement.status()
+
         db.session.commit()
+        if played:
+            record_activity(session.session_id, turn_primary_id, last_card.get('activity_id'),
+                            turn_version=expected_version + 1)
+        prefetch.schedule(session.session_id, owner_id, anonymous_session_id)
         
-        # 3. Response
+        # 4. Response (queue entries rendered for display)
+        turns = turn_queue.hydrate_queue(queue[:prefetch.VISIBLE_QUEUE_SIZE], players)
         response = {
             "session_id": session.session_id,
             "limit_status": limit_status,
-            "queue": queue,
-            "current_turn": queue[0] if queue else {}
+            "queue": turns,
+            "current_turn": turns[0] if turns else {},
+            "turn_version": expected_version + 1
         }
         
         return jsonify(response)
@@ -1002,3 +1038,75 @@ def next_turn(current_user_id, session_id):
         # If DB error, rollback?
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
+
+
+@gameplay_bp.route("/<session_id>/preview", methods=["GET"])
+@token_required
+def preview_turns(current_user_id, session_id):
+    """
+    Preview the cards that follow the visible queue, without storing them.
+
+    Turns are generated from the session seed (game/turn_rng.py), so while
+    no other play changes the exclusions, /next deals the previewed cards in
+    this order. Capped players see limit barriers past their remaining
+    credits.
+
+    Query params:
+        count: Number of cards to preview (1-MAX_PREVIEW_CARDS, default 3)
+        anonymous_session_id: Identity for guests
+    """
+    try:
+        session = Session.query.get(session_id)
+        if not session:
+            return jsonify({"error": "Session not found"}), 404
+
+        if session.status != 'active':
+            return jsonify({"error": "Session is not active"}), 400
+
+        players = session.players or []
+        anonymous_session_id = request.args.get("anonymous_session_id")
+        if not _is_participant(players, current_user_id, anonymous_session_id):
+            return jsonify({'error': 'Unauthorized', 'message': 'Not a participant'}), 403
+
+        count = max(1, min(request.args.get("count", 3, type=int), MAX_PREVIEW_CARDS))
+
+        owner_id = str(current_user_id) if current_user_id else None
+        entitlement = EntitlementService.load(owner_id, anonymous_session_id)
+
+        state = session.current_turn_state or {}
+        queue = turn_queue.compact_queue(state.get("queue"), len(players))
+
+        # Cards after the visible ones: prefetched entries first, then generated
+        visible = prefetch.VISIBLE_QUEUE_SIZE
+        missing = max(0, visible + count - len(queue))
+
+        # Cards the player can still pay for beyond the queue (the head is already paid)
+        allowed = missing
+        if not entitlement.error and not entitlement.is_premium:
+            allowed = max(0, entitlement.limit - entitlement.used - max(0, len(queue) - 1))
+        if any(turn_queue.is_limit(item) for item in queue):
+            allowed = 0
+
+        seeded = session.turn_seed is None
+        upcoming = list(queue)
+        batch = _new_turn_batch()
+        for i in range(missing):
+            if i < allowed:
+                upcoming.append(_generate_turn_data(session, batch=batch, queue=upcoming))
+            else:
+                upcoming.append(_generate_limit_card())
+
+        # Only a newly assigned seed is persisted; the preview itself is not
+        if seeded:
+            db.session.commit()
+
+        return jsonify({
+            "session_id": session.session_id,
+            "limit_status": entitlement.status(),
+            "preview": turn_queue.hydrate_queue(upcoming[visible:visible + count], players)
+        })
+
+    except Exception as e:
+        logger.error("preview_turns_failed", session_id=session_id, error=str(e))
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
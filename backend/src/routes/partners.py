@@ -13,14 +13,13 @@ from ..middleware.auth import token_required
 from ..models.user import User
 from ..services.email_service import send_partner_request, send_partner_accepted
 from ..services.notification_service import NotificationService
+from ..services.compatibility_jobs import CompatibilityJobService
+from ..services.partner_adjacency import PartnerAdjacencyService
 
 # Import PartnerConnection and RememberedPartner models
 # These will need to be created based on the migrations
 from sqlalchemy import or_
-# Import Compatibility model and calculator
-from ..models.compatibility import Compatibility
-from ..compatibility.calculator import calculate_compatibility
-from ..models.profile import Profile
+from ..db.repository import get_current_profiles
 # Import Partner models
 from ..models.partner import PartnerConnection, RememberedPartner
 
@@ -279,97 +278,52 @@ def accept_connection(current_user_id, connection_id):
             db.session.add(rp2)
             
         db.session.commit()
-
-        # --- TRIGGER COMPATIBILITY CALCULATION ---
+        PartnerAdjacencyService.invalidate(requester_uuid, recipient_uuid)
+
+        # Acceptor's name for the email and push notification
+        accepted_by_name = "A user"
+        acceptor = User.query.get(accepted_by_user_id)
+        if acceptor:
+            accepted_by_name = acceptor.display_name or acceptor.email
+        notification = {
+            'requester_user_id': str(requester_uuid),
+            'acceptor_user_id': str(recipient_uuid),
+            'acceptor_name': accepted_by_name
+        } if requester else None
+
+        # --- QUEUE COMPATIBILITY CALCULATION ---
+        # The worker calculates and stores the result, then sends the push
+        # notification; GET /api/compatibility reports "pending" until then.
+        compatibility_job = None
         try:
-            # Fetch profiles for both users
-            requester_profile = Profile.query.filter_by(user_id=requester_uuid).order_by(Profile.created_at.desc()).first()
-            recipient_profile = Profile.query.filter_by(user_id=recipient_uuid).order_by(Profile.created_at.desc()).first()
+            profiles = get_current_profiles([requester_uuid, recipient_uuid])
+            requester_profile, recipient_profile = profiles.get(requester_uuid), profiles.get(recipient_uuid)
             
             if requester_profile and recipient_profile:
-                logger.info(f"Calculating compatibility for {requester_uuid} and {recipient_uuid}")
-                
-                # Prepare profile data for calculator
-                profile_a_data = requester_profile.to_dict()
-                profile_b_data = recipient_profile.to_dict()
-                
-                # Calculate scores
-                result = calculate_compatibility(profile_a_data, profile_b_data)
-                
-                # Determine ordered IDs for storage (low ID first)
-                if requester_profile.id < recipient_profile.id:
-                    p1_id, p2_id = requester_profile.id, recipient_profile.id
-                else:
-                    p1_id, p2_id = recipient_profile.id, requester_profile.id
-                
-                # Check for existing record
-                compat_record = Compatibility.query.filter_by(player_a_id=p1_id, player_b_id=p2_id).first()
-                
-                if not compat_record:
-                    compat_record = Compatibility(
-                        player_a_id=p1_id,
-                        player_b_id=p2_id
-                    )
-                
-                # Update record
-                compat_record.overall_score = float(result['overall_compatibility']['score']) / 100.0
-                compat_record.overall_percentage = int(result['overall_compatibility']['score'])
-                compat_record.interpretation = result['overall_compatibility']['interpretation']
-                compat_record.breakdown = result['breakdown']
-                compat_record.mutual_activities = result['mutual_activities']
-                compat_record.growth_opportunities = result['growth_opportunities']
-                compat_record.mutual_truth_topics = result['mutual_truth_topics']
-                compat_record.blocked_activities = result['blocked_activities']
-                compat_record.boundary_conflicts = result['boundary_conflicts']
-                compat_record.calculation_version = result['compatibility_version']
-                compat_record.created_at = datetime.utcnow()
-                
-                db.session.add(compat_record)
-                db.session.commit()
-                logger.info(f"Compatibility calculated: {compat_record.overall_percentage}%")
-                
+                compatibility_job = CompatibilityJobService.enqueue(requester_profile, recipient_profile, notification)
+                notification = None
             else:
-                 logger.warning("Could not calculate compatibility: One or both profiles missing")
-
-        except Exception as calc_error:
-            # Don't fail the connection acceptance if calculation fails
-            logger.error(f"Compatibility calculation failed: {calc_error}")
-            db.session.rollback()  # Rollback only calculation part if needed, but connection was already committed above logic check.
-            # Actually, `db.session.commit()` was called at line 236. So we are in a new transaction implicitly or need to manage it.
-            # Best to keep it separate.
-
-            # Best to keep it separate.
+                logger.warning("Could not queue compatibility: One or both profiles missing")
+        except Exception as queue_error:
+            # Don't fail the connection acceptance if queueing fails
+            logger.error(f"Compatibility job enqueue failed: {queue_error}")
+            db.session.rollback()
             
         # Send acceptance email
         if requester:
-            accepted_by_name = "A user"
-            # We need the acceptor's name (current user)
-            acceptor = User.query.get(accepted_by_user_id)
-            if acceptor:
-                accepted_by_name = acceptor.display_name or acceptor.email
-            
             send_partner_accepted(
                 recipient_email=requester.email,
                 partner_name=accepted_by_name,
                 user_name=requester.display_name or "Love"
             )
             
-            # Send push notification to requester
-            try:
-                push_result = NotificationService.send_invitation_accepted(
-                    requester_user_id=str(requester_uuid),
-                    acceptor_user_id=str(recipient_uuid),
-                    acceptor_name=accepted_by_name
-                )
-                if push_result.get('success'):
-                    logger.info(f"Acceptance push notification sent to user {requester_uuid}")
-                else:
-                    logger.info(f"Acceptance push notification skipped: {push_result.get('reason')}")
-            except Exception as push_error:
-                logger.warning(f"Push notification failed (non-fatal): {push_error}")
+            # No job to carry the push notification
+            if notification:
+                CompatibilityJobService.send_notification(notification)
         return jsonify({
             'success': True,
-            'connection': connection.to_dict()
+            'connection': connection.to_dict(),
+            'compatibility': compatibility_job.to_dict() if compatibility_job else None
         }), 200
         
     except Exception as e:
@@ -414,6 +368,7 @@ def decline_connection(current_user_id, connection_id):
         
         connection.status = 'declined'
         db.session.commit()
+        PartnerAdjacencyService.invalidate(connection.requester_user_id, connection.recipient_user_id)
         
         return jsonify({
             'success': True,
@@ -554,6 +509,7 @@ def remove_remembered_partner(current_user_id, partner_user_id):
             connection.status = 'disconnected'
             
         db.session.commit()
+        PartnerAdjacencyService.invalidate(user_uuid, partner_uuid)
         
         return jsonify({
             'success': True,
@@ -7,6 +7,7 @@ from ..models.profile import Profile
 from ..models.user import User
 from ..scoring.profile import calculate_profile
 from ..db.repository import sync_user_anatomy_to_profile
+from ..services.compatibility_jobs import CompatibilityJobService
 
 process_submission_bp = Blueprint('process_submission', __name__, url_prefix='/api/survey/submissions')
 
@@ -121,6 +122,10 @@ def process_submission(submission_id):
         )
 
         db.session.add(profile)
+        if user_id:
+            # Point the user at the new profile in the same transaction
+            db.session.flush()
+            User.query.filter_by(id=user_id).update({User.current_profile_id: profile.id})
         db.session.commit()
         
         current_app.logger.info(f"Profile created: {profile.id} for user: {user_id}")
@@ -135,6 +140,13 @@ def process_submission(submission_id):
             else:
                  current_app.logger.warning(f"Failed to sync anatomy for user {user_id}")
 
+            # Re-score stored compatibilities against the new profile in the background
+            try:
+                CompatibilityJobService.enqueue_fanout(user_id)
+            except Exception as fanout_error:
+                current_app.logger.error(f"Compatibility fan-out enqueue failed for user {user_id}: {fanout_error}")
+                db.session.rollback()
+
         # 7. Update Submission Payload (Optional, for consistency)
         # We can write the derived data back to the submission payload so it looks like the web one
         if 'derived' not in payload:
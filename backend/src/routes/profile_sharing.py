@@ -1,12 +1,13 @@
 """Profile sharing and visibility routes."""
 from flask import Blueprint, jsonify, request, current_app
-from sqlalchemy import or_
 
 from ..extensions import db
 from ..models.user import User
 from ..models.profile import Profile
-from ..models.partner import PartnerConnection, RememberedPartner
+from ..models.partner import RememberedPartner
+from ..compatibility import ui_payload
 from ..middleware.auth import token_required
+from ..services.partner_adjacency import PartnerAdjacencyService
 import logging
 import uuid
 
@@ -20,22 +21,10 @@ def has_partner_relationship(requester_uuid, partner_uuid):
     Check if requester has a partner relationship with the target user.
 
     Returns True if:
-    - There's an accepted PartnerConnection between them
+    - There's an accepted PartnerConnection between them (PartnerAdjacencyService)
     - The partner is in the requester's remembered partners list
     """
-    # Check for accepted connection (either direction)
-    has_connection = PartnerConnection.query.filter(
-        or_(
-            (PartnerConnection.requester_user_id == requester_uuid) &
-            (PartnerConnection.recipient_user_id == partner_uuid) &
-            (PartnerConnection.status == 'accepted'),
-            (PartnerConnection.requester_user_id == partner_uuid) &
-            (PartnerConnection.recipient_user_id == requester_uuid) &
-            (PartnerConnection.status == 'accepted')
-        )
-    ).first()
-
-    if has_connection:
+    if PartnerAdjacencyService.are_partners(requester_uuid, partner_uuid):
         return True
 
     # Check if partner is in remembered partners list
@@ -103,6 +92,7 @@ def update_sharing_settings(current_user_id):
             return jsonify({'error': 'User not found'}), 404
         
         user.profile_sharing_setting = setting
+        ui_payload.refresh_partner_settings(user)
         db.session.commit()
         
         return jsonify({
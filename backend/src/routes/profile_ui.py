@@ -2,7 +2,7 @@
 from flask import Blueprint, jsonify, current_app
 from ..models.user import User
 from ..models.survey import SurveySubmission
-from ..models.profile import Profile
+from ..db.repository import get_current_profile
 from ..scoring.profile import calculate_profile
 from ..scoring.display_names import (
     DOMAIN_DISPLAY_NAMES,
@@ -33,9 +33,9 @@ def get_profile_ui(current_user_id):
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        # 2. Fetch Latest Profile
-        # We query the Profile table directly as it contains the derived data
-        profile = Profile.query.filter_by(user_id=user_uuid).order_by(Profile.created_at.desc()).first()
+        # 2. Fetch Current Profile
+        # The Profile row contains the derived data
+        profile = get_current_profile(user_uuid)
         
         if not profile:
             return jsonify({"error": "No profile found"}), 404
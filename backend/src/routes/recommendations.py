@@ -1,10 +1,12 @@
 """API routes for activity recommendations and compatibility."""
+import copy
+import json
 import logging
 import uuid
 import time
 from typing import Dict, Any, List
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
@@ -13,7 +15,9 @@ from ..models.profile import Profile
 from ..models.session import Session
 from ..models.activity import Activity
 from ..db import repository
+from ..db.repository import CandidateFilter
 from ..recommender.picker import pick_type_balanced, get_intensity_window
+from ..recommender.planner import SessionPlanner
 from ..recommender.validator import check_activity_item, ValidationError
 from ..recommender.repair import fast_repair, get_safe_fallback, create_placeholder_activity
 from ..llm.generator import generate_recommendations
@@ -24,6 +28,49 @@ logger = logging.getLogger(__name__)
 
 bp = Blueprint("recommendations", __name__, url_prefix="/api")
 
+# Streaming formats for POST /api/recommendations
+STREAM_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+
+def _requested_stream_format():
+    """Streaming format asked for via ?stream=ndjson|sse or the Accept header, else None."""
+    requested = request.args.get('stream')
+    if requested in STREAM_MIMETYPES:
+        return requested
+    best = request.accept_mimetypes.best_match(['application/json', *STREAM_MIMETYPES.values()])
+    for stream_format, mimetype in STREAM_MIMETYPES.items():
+        if best == mimetype:
+            return stream_format
+    return None
+
+
+def _encode_record(stream_format: str, record_type: str, payload: Dict[str, Any]) -> str:
+    """Encode one stream record as an NDJSON line or an SSE event."""
+    if stream_format == 'sse':
+        return f"event: {record_type}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps({'type': record_type, **payload}) + "\n"
+
+
+def _stream_records(stream_format, session_id, activities, finish, request_id):
+    """
+    Yield the streamed response: a session record, one record per activity,
+    then a stats record once everything is persisted (or an error record).
+    """
+    yield _encode_record(stream_format, 'session', {'session_id': session_id})
+    try:
+        for activity in activities:
+            yield _encode_record(stream_format, 'activity', {'activity': activity})
+        stats = finish()
+        yield _encode_record(stream_format, 'stats', {'session_id': session_id, 'stats': stats})
+    except Exception as e:
+        # Headers are already sent, so the failure is reported in-band
+        logger.error(f"Recommendation stream failed: {str(e)}", extra={"request_id": request_id})
+        db.session.rollback()
+        yield _encode_record(stream_format, 'error', {'error': f'Internal error: {str(e)}'})
+
 
 @bp.route("/recommendations", methods=["POST"])
 @optional_token
@@ -57,6 +104,13 @@ def create_recommendations(current_user_id):
             "elapsed_ms": T
         }
     }
+    
+    Streaming (?stream=ndjson|sse, or Accept: application/x-ndjson / text/event-stream):
+    one record per line (NDJSON, with a "type" field) or per SSE event:
+        session   {"session_id": "..."}
+        activity  {"activity": {...}}          (once per activity, as soon as it is decided)
+        stats     {"session_id": "...", "stats": {...}}   (after persisting)
+        error     {"error": "..."}             (if generation fails mid-stream)
     """
     start_time = time.time()
     request_id = str(uuid.uuid4())
@@ -196,222 +250,237 @@ def create_recommendations(current_user_id):
         
         # Generate activities
         activities = []
-        truth_count = 0
-        dare_count = 0
-        bank_count = 0
-        ai_count = 0
-        repaired_count = 0
+        counts = {'truths': 0, 'dares': 0, 'bank_count': 0, 'ai_count': 0, 'repaired_count': 0}
         used_activity_ids = set()  # Track used bank activity IDs
         used_fallback_keys = set()  # Track used fallback templates by (type, intensity)
         
-        for seq in range(1, target_activities + 1):
-            # 1. Pick type (truth or dare)
-            picked_type = pick_type_balanced(seq, target_activities, truth_count, dare_count, activity_type)
-            
-            # 2. Get intensity window (rating-aware)
-            intensity_min, intensity_max = get_intensity_window(seq, target_activities, rating)
+        # Load and score the eligible pool once for the whole arc
+        windows = [get_intensity_window(seq, target_activities, rating) for seq in range(1, target_activities + 1)]
+        planner = SessionPlanner(
+            rating,
+            min((w[0] for w in windows), default=1),
+            max((w[1] for w in windows), default=1),
+            player_a_profile,
+            player_b_profile,
+            session_mode=session_mode,
+            player_boundaries=all_hard_limits
+        )
+        actor_filters = {
+            'A': CandidateFilter(None, {
+                'active_anatomy': a_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts']),
+                'partner_anatomy': b_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts'])
+            }),
+            'B': CandidateFilter(None, {
+                'active_anatomy': b_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts']),
+                'partner_anatomy': a_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts'])
+            }),
+        }
+        repair_filter = CandidateFilter(None, player_anatomy)
+        
+        def plan_activities():
+            """Decide and validate each slot in order, yielding every activity as it is added."""
+            for seq in range(1, target_activities + 1):
+                # 1. Pick type (truth or dare)
+                picked_type = pick_type_balanced(seq, target_activities, counts['truths'], counts['dares'], activity_type)
             
-            # 3. Determine actor FIRST (before candidate selection for correct anatomy filtering)
-            actor = 'A' if seq % 2 == 1 else 'B'
-            partner = 'B' if actor == 'A' else 'A'
+                # 2. Get intensity window (rating-aware)
+                intensity_min, intensity_max = windows[seq - 1]
             
-            # 4. Create dynamic anatomy mapping based on which player is active
-            # This ensures anatomy requirements are checked against the correct player
-            if actor == 'A':
-                current_player_anatomy = {
-                    'active_anatomy': a_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts']),
-                    'partner_anatomy': b_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts'])
-                }
-            else:  # actor == 'B'
-                current_player_anatomy = {
-                    'active_anatomy': b_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts']),
-                    'partner_anatomy': a_anatomy.get('anatomy_self', ['penis', 'vagina', 'breasts'])
-                }
+                # 3. Determine actor FIRST (before candidate selection for correct anatomy filtering)
+                actor = 'A' if seq % 2 == 1 else 'B'
+                partner = 'B' if actor == 'A' else 'A'
             
-            # 5. Try to find from bank FIRST (bank-first priority, fallback as last resort)
-            activity_item = None
+                # 4. Try to find from bank FIRST (bank-first priority, fallback as last resort)
+                activity_item = None
             
-            # Always try bank first (removed bank_ratio limitation)
-            best_candidate = repository.find_best_activity_candidate(
-                rating=rating,
-                intensity_min=intensity_min,
-                intensity_max=intensity_max,
-                activity_type=picked_type,
-                player_a_profile=player_a_profile,
-                player_b_profile=player_b_profile,
-                session_mode=session_mode,
-                player_boundaries=all_hard_limits,
-                player_anatomy=current_player_anatomy,  # Use dynamic anatomy for this step
-                excluded_ids=used_activity_ids,  # Prevent duplicates
-                top_n=30  # Consider top 30 candidates for better variety
-            )
+                # Always try bank first (removed bank_ratio limitation)
+                # Anatomy is checked against the active player for this step
+                best_candidate = planner.pick(
+                    picked_type, intensity_min, intensity_max,
+                    candidate_filter=actor_filters[actor],
+                    excluded_ids=used_activity_ids,  # Prevent duplicates
+                    sample_size=60  # Random sample of 60 candidates for variety
+                )
             
-            if best_candidate:
-                # Mark this activity as used
-                used_activity_ids.add(best_candidate.activity_id)
-                
-                # Actor already determined above - just use it
-                # Update script with the actor
-                script = best_candidate.script.copy() if best_candidate.script else {'steps': []}
-                if script.get('steps'):
-                    for step in script['steps']:
-                        step['actor'] = actor
+                if best_candidate:
+                    # Mark this activity as used
+                    used_activity_ids.add(best_candidate.activity_id)
                 
-                activity_item = {
-                    'id': f'bank_{best_candidate.activity_id}',
-                    'seq': seq,
-                    'type': best_candidate.type,
-                    'rating': best_candidate.rating,
-                    'intensity': best_candidate.intensity,
-                    'roles': {'active_player': actor, 'partner_player': partner},
-                    'script': script,
-                    'tags': best_candidate.tags or [],
-                    'power_role': best_candidate.power_role,
-                    'preference_keys': best_candidate.preference_keys or [],
-                    'domains': best_candidate.domains or [],
-                    'hard_boundaries': best_candidate.hard_boundaries or [],
-                    'provenance': {
-                        'source': 'bank',
-                        'template_id': best_candidate.activity_id
-                    },
-                    'checks': {
-                        'respects_hard_limits': True,
-                        'uses_yes_overlap': True,
-                        'maybe_items_present': False,
-                        'anatomy_ok': True,
-                        'power_alignment': True,  # Verified by scoring
-                        'notes': 'Selected via preference scoring'
-                    }
-                }
-                bank_count += 1
-            
-            # 4. If no bank activity, use AI generation or fallback (last resort)
-            if not activity_item:
-                # For now, use safe fallback instead of calling Groq for each activity
-                # TODO: Implement batch AI generation or per-activity AI calls
-                fallback = get_safe_fallback(
-                    picked_type, seq, rating, intensity_min, intensity_max,
-                    used_fallback_keys  # Prevent fallback duplicates
-                )
+                    # Actor already determined above - just use it
+                    # Update script with the actor (deep copy: bank activities are shared snapshots)
+                    script = copy.deepcopy(best_candidate.script) if best_candidate.script else {'steps': []}
+                    if script.get('steps'):
+                        for step in script['steps']:
+                            step['actor'] = actor
                 
-                if fallback:
                     activity_item = {
-                        'id': f'fallback_{seq}',
+                        'id': f'bank_{best_candidate.activity_id}',
                         'seq': seq,
-                        **fallback
+                        'type': best_candidate.type,
+                        'rating': best_candidate.rating,
+                        'intensity': best_candidate.intensity,
+                        'roles': {'active_player': actor, 'partner_player': partner},
+                        'script': script,
+                        'tags': best_candidate.tags or [],
+                        'power_role': best_candidate.power_role,
+                        'preference_keys': best_candidate.preference_keys or [],
+                        'domains': best_candidate.domains or [],
+                        'hard_boundaries': best_candidate.hard_boundaries or [],
+                        'provenance': {
+                            'source': 'bank',
+                            'template_id': best_candidate.activity_id
+                        },
+                        'checks': {
+                            'respects_hard_limits': True,
+                            'uses_yes_overlap': True,
+                            'maybe_items_present': False,
+                            'anatomy_ok': True,
+                            'power_alignment': True,  # Verified by scoring
+                            'notes': 'Selected via preference scoring'
+                        }
                     }
-                    ai_count += 1
-                else:
-                    # Last resort: placeholder
-                    intensity = (intensity_min + intensity_max) // 2
-                    activity_item = create_placeholder_activity(seq, picked_type, rating, intensity)
-            
-            # 5. Validate
-            is_valid, error = check_activity_item(
-                activity_item,
-                seq,
-                rating,
-                rules.get('avoid_maybe_until', 6),
-                all_hard_limits,
-                target_activities
-            )
+                    counts['bank_count'] += 1
             
-            # 6. Repair if needed
-            if not is_valid:
-                logger.warning(f"Activity {seq} failed validation: {error}")
+                # 4. If no bank activity, use AI generation or fallback (last resort)
+                if not activity_item:
+                    # For now, use safe fallback instead of calling Groq for each activity
+                    # TODO: Implement batch AI generation or per-activity AI calls
+                    fallback = get_safe_fallback(
+                        picked_type, seq, rating, intensity_min, intensity_max,
+                        used_fallback_keys  # Prevent fallback duplicates
+                    )
                 
-                # Try repair
-                repaired = fast_repair(
-                    activity_item, seq, rating, picked_type,
-                    intensity_min, intensity_max,
-                    [c.to_dict() for c in repository.find_activity_candidates(
-                        rating, intensity_min, intensity_max, picked_type,
-                        session_mode=session_mode,
-                        player_boundaries=all_hard_limits,
-                        player_anatomy=player_anatomy,
-                        limit=20
-                    )],
+                    if fallback:
+                        activity_item = {
+                            'id': f'fallback_{seq}',
+                            'seq': seq,
+                            **fallback
+                        }
+                        counts['ai_count'] += 1
+                    else:
+                        # Last resort: placeholder
+                        intensity = (intensity_min + intensity_max) // 2
+                        activity_item = create_placeholder_activity(seq, picked_type, rating, intensity)
+            
+                # 5. Validate
+                is_valid, error = check_activity_item(
+                    activity_item,
+                    seq,
+                    rating,
+                    rules.get('avoid_maybe_until', 6),
                     all_hard_limits,
-                    used_fallback_keys,  # Pass tracking
-                    used_activity_ids    # Pass tracking
+                    target_activities
                 )
+            
+                # 6. Repair if needed
+                if not is_valid:
+                    logger.warning(f"Activity {seq} failed validation: {error}")
                 
-                if repaired:
-                    # Extract only the needed fields from repaired activity
-                    activity_item = {
-                        'id': f'repaired_{seq}',
-                        'seq': seq,
-                        'type': repaired.get('type'),
-                        'rating': repaired.get('rating'),
-                        'intensity': repaired.get('intensity'),
-                        'roles': repaired.get('roles', {'active_player': 'A', 'partner_player': 'B'}),
-                        'script': repaired.get('script'),
-                        'tags': repaired.get('tags', []),
-                        'power_role': repaired.get('power_role'),
-                        'preference_keys': repaired.get('preference_keys', []),
-                        'domains': repaired.get('domains', []),
-                        'hard_boundaries': repaired.get('hard_boundaries', []),
-                        'provenance': repaired.get('provenance', {'source': 'bank', 'template_id': None}),
-                        'checks': repaired.get('checks', {})
-                    }
-                    repaired_count += 1
-                else:
-                    # Keep the failed item but log it
-                    logger.error(f"Could not repair activity {seq}")
+                    # Try repair
+                    repaired = fast_repair(
+                        activity_item, seq, rating, picked_type,
+                        intensity_min, intensity_max,
+                        [c.to_dict() for c in planner.candidates(
+                            picked_type, intensity_min, intensity_max,
+                            candidate_filter=repair_filter,
+                            limit=20
+                        )],
+                        all_hard_limits,
+                        used_fallback_keys,  # Pass tracking
+                        used_activity_ids    # Pass tracking
+                    )
+                
+                    if repaired:
+                        # Extract only the needed fields from repaired activity
+                        activity_item = {
+                            'id': f'repaired_{seq}',
+                            'seq': seq,
+                            'type': repaired.get('type'),
+                            'rating': repaired.get('rating'),
+                            'intensity': repaired.get('intensity'),
+                            'roles': repaired.get('roles', {'active_player': 'A', 'partner_player': 'B'}),
+                            'script': repaired.get('script'),
+                            'tags': repaired.get('tags', []),
+                            'power_role': repaired.get('power_role'),
+                            'preference_keys': repaired.get('preference_keys', []),
+                            'domains': repaired.get('domains', []),
+                            'hard_boundaries': repaired.get('hard_boundaries', []),
+                            'provenance': repaired.get('provenance', {'source': 'bank', 'template_id': None}),
+                            'checks': repaired.get('checks', {})
+                        }
+                        counts['repaired_count'] += 1
+                    else:
+                        # Keep the failed item but log it
+                        logger.error(f"Could not repair activity {seq}")
             
-            # 7. Check for duplicates before adding (safety net)
-            activity_text = activity_item['script']['steps'][0]['do']
-            existing_texts = [a['script']['steps'][0]['do'] for a in activities]
+                # 7. Check for duplicates before adding (safety net)
+                activity_text = activity_item['script']['steps'][0]['do']
+                existing_texts = [a['script']['steps'][0]['do'] for a in activities]
             
-            if activity_text in existing_texts:
-                logger.warning(
-                    f"Duplicate activity detected at seq {seq}: {activity_text[:50]}...",
-                    extra={"request_id": request_id, "seq": seq}
-                )
-                # Skip this duplicate and try to get another
-                continue
+                if activity_text in existing_texts:
+                    logger.warning(
+                        f"Duplicate activity detected at seq {seq}: {activity_text[:50]}...",
+                        extra={"request_id": request_id, "seq": seq}
+                    )
+                    # Skip this duplicate and try to get another
+                    continue
             
-            # 8. Add to list
-            activities.append(activity_item)
+                # 8. Add to list
+                activities.append(activity_item)
             
-            # Update counters
-            if activity_item['type'] == 'truth':
-                truth_count += 1
-            else:
-                dare_count += 1
-        
-        # Save activities to database
-        if session:
-            repository.save_session_activities(session_id, activities)
-            repository.update_session_progress(session_id, target_activities, truth_count, dare_count)
+                # Update counters
+                if activity_item['type'] == 'truth':
+                    counts['truths'] += 1
+                else:
+                    counts['dares'] += 1
+                
+                # Hand the activity to the caller right away (streaming mode)
+                yield activity_item
+
+        def finish() -> Dict[str, Any]:
+            """Persist the generated activities and return the response stats."""
+            if session:
+                repository.save_session_activities(session_id, activities)
+                repository.update_session_progress(session_id, target_activities, counts['truths'], counts['dares'])
+            
+            elapsed_ms = (time.time() - start_time) * 1000
+            
+            logger.info(
+                f"Recommendations generated successfully",
+                extra={
+                    "request_id": request_id,
+                    "session_id": session_id,
+                    "activity_count": len(activities),
+                    "bank_count": counts['bank_count'],
+                    "ai_count": counts['ai_count'],
+                    "repaired_count": counts['repaired_count'],
+                    "elapsed_ms": elapsed_ms
+                }
+            )
+            
+            return {
+                'total': len(activities),
+                **counts,
+                'elapsed_ms': elapsed_ms
+            }
         
-        elapsed_ms = (time.time() - start_time) * 1000
+        # Streaming mode: emit each activity as soon as its slot is decided
+        stream_format = _requested_stream_format()
+        if stream_format:
+            return Response(
+                stream_with_context(_stream_records(stream_format, session_id, plan_activities(), finish, request_id)),
+                mimetype=STREAM_MIMETYPES[stream_format],
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
         
-        logger.info(
-            f"Recommendations generated successfully",
-            extra={
-                "request_id": request_id,
-                "session_id": session_id,
-                "activity_count": len(activities),
-                "bank_count": bank_count,
-                "ai_count": ai_count,
-                "repaired_count": repaired_count,
-                "elapsed_ms": elapsed_ms
-            }
-        )
+        for _ in plan_activities():
+            pass
+        stats = finish()
         
         return jsonify({
             'session_id': session_id,
             'activities': activities,
-            'stats': {
-                'total': len(activities),
-                'truths': truth_count,
-                'dares': dare_count,
-                'bank_count': bank_count,
-                'ai_count': ai_count,
-                'repaired_count': repaired_count,
-                'elapsed_ms': elapsed_ms
-            }
+            'stats': stats
         }), 200
     
     except ValueError as e:
@@ -5,6 +5,7 @@ from ..extensions import db
 from ..models.user import User
 from ..middleware.auth import token_required
 from ..services.config_service import get_config_int
+from ..services.entitlements import EntitlementService
 import logging
 import uuid
 
@@ -120,19 +121,18 @@ def increment_activity_count(current_user_id, user_id):
         except ValueError:
             return jsonify({'error': 'Invalid user ID'}), 400
 
-        user = User.query.filter_by(id=uid).first()
+        entitlement = EntitlementService.load(uid)
 
-        if not user:
+        if entitlement.error:
             return jsonify({'error': 'User not found'}), 404
 
-        # Only increment for free tier
-        if user.subscription_tier == 'free':
-            user.lifetime_activity_count = (user.lifetime_activity_count or 0) + 1
-            db.session.commit()
+        # Only increment for free tier (atomic UPDATE ... RETURNING)
+        EntitlementService.charge(entitlement)
+        db.session.commit()
 
         return jsonify({
             'success': True,
-            'lifetime_activity_count': user.lifetime_activity_count or 0
+            'lifetime_activity_count': entitlement.used
         }), 200
 
     except Exception as e:
@@ -3,7 +3,7 @@ from datetime import datetime
 import math
 from typing import Optional
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 import logging
 from ..middleware.auth import token_required
 
@@ -14,6 +14,7 @@ from ..extensions import db
 from ..models.survey import SurveyBaseline, SurveySubmission
 from ..models.user import User
 from ..scoring.profile import calculate_profile
+from ..compatibility.result_cache import cache_key, get_or_calculate, submission_input
 
 
 bp = Blueprint("survey", __name__, url_prefix="/api/survey")
@@ -285,6 +286,27 @@ def clear_baseline(current_user_id):
         return jsonify({"error": "Failed to clear baseline"}), 500
 
 
+def _calculate_submission_compatibility(source: SurveySubmission, target: SurveySubmission) -> dict:
+    """Score two submissions (result cache miss path)."""
+    # Ensure we have derived profiles
+    # In v0.5, derived profiles are stored in payload_json['derived'] or calculated on fly
+    # The create_submission route puts it in payload_json['derived']
+    source_profile = source.payload_json.get('derived')
+    target_profile = target.payload_json.get('derived')
+
+    if not source_profile:
+        # Fallback: calculate if missing (shouldn't happen for new subs)
+        source_profile = calculate_profile(source.submission_id, source.payload_json.get('answers', {}))
+
+    if not target_profile:
+        target_profile = calculate_profile(target.submission_id, target.payload_json.get('answers', {}))
+
+    # Import here to avoid circular imports if any
+    from ..compatibility.calculator import calculate_compatibility
+
+    return calculate_compatibility(source_profile, target_profile)
+
+
 @bp.route("/compatibility/<source_id>/<target_id>", methods=["GET"])
 @token_required
 def get_compatibility(current_user_id, source_id, target_id):
@@ -310,26 +332,23 @@ def get_compatibility(current_user_id, source_id, target_id):
         if not owns_source and not owns_target:
             return jsonify({"error": "Forbidden"}), 403
 
-        # Ensure we have derived profiles
-        # In v0.5, derived profiles are stored in payload_json['derived'] or calculated on fly
-        # The create_submission route puts it in payload_json['derived']
-
-        source_profile = source.payload_json.get('derived')
-        target_profile = target.payload_json.get('derived')
-
-        if not source_profile:
-            # Fallback: calculate if missing (shouldn't happen for new subs)
-            source_profile = calculate_profile(source.submission_id, source.payload_json.get('answers', {}))
-
-        if not target_profile:
-            target_profile = calculate_profile(target.submission_id, target.payload_json.get('answers', {}))
-
-        # Import here to avoid circular imports if any
-        from ..compatibility.calculator import calculate_compatibility
-
-        result = calculate_compatibility(source_profile, target_profile)
-
-        return jsonify(result)
+        # Results are cached by content: both submission ids, a hash of what the
+        # calculator sees for each, and the calculator version. The key is also
+        # the strong ETag, so revalidation needs no calculation at all.
+        key = cache_key(
+            submission_input(source.submission_id, source.payload_json),
+            submission_input(target.submission_id, target.payload_json)
+        )
+        if key in request.if_none_match:
+            response = Response(status=304)
+        else:
+            result = get_or_calculate(key, lambda: _calculate_submission_compatibility(source, target))
+            response = jsonify(result)
+
+        response.set_etag(key)
+        # Per-user data: caches must revalidate before reuse
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as exc:
         logger.error(f"get_compatibility failed: {str(exc)}")
         db.session.rollback()
@@ -9,6 +9,7 @@ from ..models.profile import Profile
 from ..models.user import User
 from ..scoring.profile import calculate_profile
 from ..middleware.auth import token_required
+from ..services.compatibility_jobs import CompatibilityJobService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -156,6 +157,8 @@ def submit_survey(current_user_id):
             user = User.query.get(user_id)
             if user:
                 user.onboarding_completed = True
+                db.session.flush()  # Assign the new profile's id
+                user.current_profile_id = profile.id
                 # Optional: Sync anatomy from profile to user if needed, 
                 # but usually we sync User -> Profile. 
                 # If this is the source of truth, maybe we should?
@@ -164,6 +167,14 @@ def submit_survey(current_user_id):
         db.session.commit()
         
         logger.info(f"Survey submitted successfully for user {user_id}. Profile: {profile.id}")
+
+        # Stored compatibilities with partners are now stale; re-score them in the background
+        try:
+            CompatibilityJobService.enqueue_fanout(user_id)
+        except Exception as fanout_error:
+            logger.error(f"Compatibility fan-out enqueue failed for user {user_id}: {fanout_error}")
+            db.session.rollback()
+
         return jsonify({
             'message': 'Survey submitted successfully',
             'profile_id': profile.id
@@ -2,6 +2,7 @@ import os
 from flask import Blueprint, jsonify
 from ..middleware.auth import token_required
 from ..services.config_service import refresh_cache
+from ..db.activity_bank import get_activity_bank, invalidate_activity_bank
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ def is_admin(user_id):
 @token_required
 def trigger_cache_refresh(current_user_id):
     """
-    Force a reload of the configuration cache.
+    Force a reload of the configuration cache and the activity bank snapshot.
 
     Security: Requires admin role (user ID in ADMIN_USER_IDS env var).
     """
@@ -36,9 +37,12 @@ def trigger_cache_refresh(current_user_id):
 
     try:
         refresh_cache()
+        invalidate_activity_bank()
+        bank = get_activity_bank()
         return jsonify({
             "success": True,
-            "message": "Configuration cache refreshed successfully"
+            "message": "Configuration cache refreshed successfully",
+            "activity_bank_size": len(bank) if bank is not None else None
         }), 200
     except Exception as e:
         logger.error(f"Failed to refresh cache: {e}")
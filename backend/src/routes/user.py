@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request, abort
 from ..models.user import User
 from ..middleware.auth import token_required
 from ..extensions import db
+from ..compatibility import ui_payload
 import uuid
 
 user_bp = Blueprint('user', __name__)
@@ -54,6 +55,9 @@ def update_user(current_user_id, user_id):
     if 'demographics' in data:
         user.demographics = data['demographics']
     
+    if 'username' in data or 'display_name' in data:
+        ui_payload.refresh_partner_settings(user)
+    
     db.session.commit()
     return jsonify(user.to_dict())
 
@@ -0,0 +1,91 @@
+"""
+Directional pairing of activity keys.
+
+Activity keys come in complementary pairs: <x>_give / <x>_receive and
+<x>_self / <x>_watching, plus two irregular pairs whose watching key does
+not follow the suffix pattern (stripping_self / watching_strip and
+solo_pleasure_self / watching_solo_pleasure).
+
+This module is the single source of truth for that taxonomy. The survey's
+activity keys (convert_activities) are compiled into DIRECTIONAL_KEYS at
+import time; any other key (activity bank preference keys, hand-written
+profiles) is classified with the same rules on first use.
+"""
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .activities import convert_activities
+
+GIVE = 'give'
+RECEIVE = 'receive'
+SELF = 'self'
+WATCHING = 'watching'
+
+# Survey activity keys per category, in convert_activities order
+ACTIVITY_LAYOUT: Dict[str, Tuple[str, ...]] = {
+    category: tuple(keys) for category, keys in convert_activities({}).items()
+}
+ACTIVITY_CATEGORIES = tuple(ACTIVITY_LAYOUT)
+
+# Pairs whose watching key is not <stem>_watching
+IRREGULAR_PAIRS = {
+    'stripping_self': 'watching_strip',
+    'solo_pleasure_self': 'watching_solo_pleasure',
+}
+
+# suffix -> (direction, partner suffix)
+_SUFFIXES = (
+    ('_give', GIVE, '_receive'),
+    ('_receive', RECEIVE, '_give'),
+    ('_self', SELF, '_watching'),
+    ('_watching', WATCHING, '_self'),
+)
+
+
+class DirectionalKey(NamedTuple):
+    """How one activity key pairs with its complement."""
+    key: str
+    partner: Optional[str]      # Complementary key, None for non-directional keys
+    direction: Optional[str]    # GIVE, RECEIVE, SELF, WATCHING or None
+    stem: str                   # Key without its direction suffix
+    irregular: bool             # Partner is not derived from the suffix
+    category: Optional[int]     # Index into ACTIVITY_CATEGORIES, None outside the survey
+
+
+def _classify(key: str, category: Optional[int]) -> DirectionalKey:
+    for self_key, watching_key in IRREGULAR_PAIRS.items():
+        stem = self_key[:-len('_self')]
+        if key == self_key:
+            return DirectionalKey(key, watching_key, SELF, stem, True, category)
+        if key == watching_key:
+            return DirectionalKey(key, self_key, WATCHING, stem, True, category)
+
+    for suffix, direction, partner_suffix in _SUFFIXES:
+        if key.endswith(suffix):
+            stem = key[:-len(suffix)]
+            return DirectionalKey(key, stem + partner_suffix, direction, stem, False, category)
+
+    return DirectionalKey(key, None, None, key, False, category)
+
+
+DIRECTIONAL_KEYS: Dict[str, DirectionalKey] = {
+    key: _classify(key, category)
+    for category, keys in enumerate(ACTIVITY_LAYOUT.values())
+    for key in keys
+}
+
+
+@lru_cache(maxsize=4096)
+def _extra_key(key: str) -> DirectionalKey:
+    return _classify(key, None)
+
+
+def directional_key(key: str) -> DirectionalKey:
+    """
+    Look up the pairing of an activity key.
+
+    Survey keys come from the compiled table. Hot loops inline this as
+    `DIRECTIONAL_KEYS.get(key) or directional_key(key)`.
+    """
+    entry = DIRECTIONAL_KEYS.get(key)
+    return entry if entry is not None else _extra_key(key)
@@ -8,6 +8,10 @@ from .truth_topics import convert_truth_topics
 from .domains import calculate_domain_scores
 from .tags import generate_activity_tags
 
+# Bump when calculate_profile() returns a different profile for the same
+# answers (keys cached compatibility results of on-the-fly derived profiles)
+SCORING_VERSION = '1'
+
 def extract_boundaries(answers: Dict[str, Any]) -> Dict[str, Any]:
     """
     Extract boundaries from answers
@@ -4,9 +4,11 @@ from datetime import datetime, timedelta
 from sqlalchemy import or_
 
 from ..extensions import db
+from ..models.anonymous_usage import AnonymousActivityUsage
 from ..models.partner import PartnerConnection
 from ..models.session import Session
 from ..models.survey import SurveySubmission, SurveyProgress
+from .entitlements import ANONYMOUS_WINDOW
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +74,21 @@ class CleanupService:
             db.session.rollback()
             return 0
 
+    @staticmethod
+    def cleanup_anonymous_usage() -> int:
+        """Delete anonymous activity usage buckets older than the limit window."""
+        try:
+            cutoff = datetime.utcnow() - ANONYMOUS_WINDOW - timedelta(hours=1)
+            count = AnonymousActivityUsage.query.filter(
+                AnonymousActivityUsage.bucket_start < cutoff
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            return count
+        except Exception as e:
+            logger.error(f"Error cleaning up anonymous usage: {e}")
+            db.session.rollback()
+            return 0
+
     @staticmethod
     def run_all():
         """Run all cleanup tasks and log results."""
@@ -80,5 +97,6 @@ class CleanupService:
         expired_conn = CleanupService.cleanup_pending_connections()
         abandoned_sess = CleanupService.cleanup_stale_sessions()
         abandoned_surv = CleanupService.cleanup_abandoned_surveys()
+        anon_usage = CleanupService.cleanup_anonymous_usage()
         
-        logger.info(f"Cleanup complete: {expired_conn} connections expired, {abandoned_sess} sessions abandoned, {abandoned_surv} surveys marked abandoned")
+        logger.info(f"Cleanup complete: {expired_conn} connections expired, {abandoned_sess} sessions abandoned, {abandoned_surv} surveys marked abandoned, {anon_usage} anonymous usage buckets deleted")
@@ -0,0 +1,302 @@
+"""
+Compatibility job service - runs compatibility calculations off the request path.
+
+Accepting a partner connection enqueues a CompatibilityJob for the pair's
+latest profiles. A worker (scripts/run_compatibility_worker.py) claims due
+jobs, calculates and upserts the Compatibility row, and sends the acceptance
+push notification. Failed jobs are retried with backoff up to max_attempts.
+Deployments run the worker as the Procfile's worker process; jobs left
+unclaimed past compatibility_job_stalled_seconds are reported as stalled.
+
+Rewriting a profile (survey retake) enqueues a CompatibilityFanoutJob for
+the user instead: after a debounce window the worker re-scores the user
+against every accepted partner in one batch (rescore_partners). Retakes
+within the window collapse into one run.
+
+With app.config['COMPATIBILITY_JOBS_INLINE'] (env COMPATIBILITY_JOBS_INLINE,
+on unless a deployment runs the worker) enqueueing runs the job immediately.
+"""
+from datetime import datetime, timedelta
+import logging
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..compatibility import ui_payload
+from ..compatibility.calculator import calculate_compatibility
+from ..compatibility.rescore import rescore_partners
+from ..db.repository import compatibility_row, upsert_compatibility_rows
+from ..models.compatibility import Compatibility
+from ..models.compatibility_job import CompatibilityFanoutJob, CompatibilityJob
+from ..models.profile import Profile
+from .config_service import get_config_int
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+class CompatibilityJobService:
+    """Queue and process compatibility calculations."""
+
+    # Delay before retry n (1-based); the last value repeats
+    RETRY_DELAYS = (timedelta(seconds=30), timedelta(minutes=2), timedelta(minutes=10))
+
+    # A running job whose worker died is reclaimed after this long
+    STALE_LOCK = timedelta(minutes=10)
+
+    # Default quiet period before a fan-out re-score runs (app_config override)
+    FANOUT_DEBOUNCE_SECONDS = 60
+
+    # Default time a due job may wait for a worker before it is reported as
+    # stalled to polling clients (app_config override)
+    STALLED_AFTER_SECONDS = 300
+
+    @staticmethod
+    def inline_enabled() -> bool:
+        return bool(current_app.config.get('COMPATIBILITY_JOBS_INLINE'))
+
+    @staticmethod
+    def get_job(profile_id_1: int, profile_id_2: int) -> Optional[CompatibilityJob]:
+        """Job for a profile pair, in either order."""
+        player_a_id, player_b_id = Compatibility.get_or_create_key(profile_id_1, profile_id_2)
+        return CompatibilityJob.query.filter_by(player_a_id=player_a_id, player_b_id=player_b_id).first()
+
+    @classmethod
+    def is_stalled(cls, job: CompatibilityJob) -> bool:
+        """
+        Whether a pending job has gone unclaimed for too long, i.e. no worker
+        is draining the queue (or the one that claimed it died and nothing
+        reclaimed it).
+        """
+        wait = timedelta(seconds=get_config_int('compatibility_job_stalled_seconds', cls.STALLED_AFTER_SECONDS))
+        now = datetime.utcnow()
+        if job.status == 'queued':
+            return job.run_after < now - wait
+        if job.status == 'running':
+            return job.locked_at is not None and job.locked_at < now - cls.STALE_LOCK - wait
+        return False
+
+    @staticmethod
+    def retry_after(job: CompatibilityJob) -> int:
+        """Seconds a client should wait before polling a pending job again."""
+        if job.status == 'queued' and job.run_after:
+            return max(2, int((job.run_after - datetime.utcnow()).total_seconds()) + 1)
+        return 2
+
+    @classmethod
+    def enqueue(
+        cls,
+        requester_profile: Profile,
+        recipient_profile: Profile,
+        notification: Optional[Dict[str, Any]] = None
+    ) -> CompatibilityJob:
+        """
+        Queue a calculation for a profile pair (deduplicated per pair).
+
+        A queued or running job is reused; a done or failed job is re-queued.
+
+        Args:
+            requester_profile: Profile passed first to the calculator
+            recipient_profile: The other profile
+            notification: send_invitation_accepted kwargs, sent once by the worker
+
+        Returns:
+            The pair's job (already processed when running inline)
+        """
+        player_a_id, player_b_id = Compatibility.get_or_create_key(requester_profile.id, recipient_profile.id)
+
+        job = cls.get_job(player_a_id, player_b_id)
+        if job is None:
+            job = CompatibilityJob(player_a_id=player_a_id, player_b_id=player_b_id)
+            db.session.add(job)
+        if job.status != 'running':
+            job.status = 'queued'
+            job.requester_profile_id = requester_profile.id
+            job.attempts = 0
+            job.last_error = None
+            job.run_after = datetime.utcnow()
+            job.completed_at = None
+        if notification:
+            job.notification = notification
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request created the pair's job first
+            db.session.rollback()
+            return cls.enqueue(requester_profile, recipient_profile, notification)
+
+        logger.info(f"Compatibility job {job.id} {job.status} for profiles {player_a_id}, {player_b_id}")
+
+        if cls.inline_enabled() and job.status == 'queued':
+            cls._lock(job)
+            db.session.commit()
+            cls.process(job)
+        return job
+
+    @classmethod
+    def claim(cls, limit: int = 10, model=CompatibilityJob) -> List[int]:
+        """
+        Lock up to `limit` due jobs of `model` for this worker.
+
+        Uses FOR UPDATE SKIP LOCKED where the database supports it so
+        several workers can poll the same table.
+        """
+        now = datetime.utcnow()
+        jobs = model.query.filter(or_(
+            and_(model.status == 'queued', model.run_after <= now),
+            and_(model.status == 'running', model.locked_at < now - cls.STALE_LOCK)
+        )).order_by(model.run_after).limit(limit).with_for_update(skip_locked=True).all()
+
+        for job in jobs:
+            cls._lock(job)
+        db.session.commit()
+        return [job.id for job in jobs]
+
+    @classmethod
+    def run_pending(cls, limit: int = 10) -> int:
+        """Claim and process due pair and fan-out jobs. Returns the number processed."""
+        job_ids = cls.claim(limit)
+        for job_id in job_ids:
+            cls.process(db.session.get(CompatibilityJob, job_id))
+
+        fanout_ids = cls.claim(limit, CompatibilityFanoutJob)
+        for job_id in fanout_ids:
+            cls.process_fanout(db.session.get(CompatibilityFanoutJob, job_id))
+        return len(job_ids) + len(fanout_ids)
+
+    @classmethod
+    def process(cls, job: CompatibilityJob) -> CompatibilityJob:
+        """Calculate and store the pair's compatibility for a claimed job."""
+        try:
+            profiles = {
+                profile.id: profile
+                for profile in Profile.query.filter(Profile.id.in_([job.player_a_id, job.player_b_id]))
+            }
+            requester = profiles[job.requester_profile_id]
+            partner = profiles[job.player_b_id if job.requester_profile_id == job.player_a_id else job.player_a_id]
+
+            result = calculate_compatibility(requester.to_dict(), partner.to_dict())
+            upsert_compatibility_rows([compatibility_row(requester.id, partner.id, result)])
+
+            job.status = 'done'
+            job.last_error = None
+            job.completed_at = datetime.utcnow()
+            logger.info(f"Compatibility job {job.id} done: {result['overall_compatibility']['score']}%")
+        except Exception as e:
+            db.session.rollback()
+            cls._retry_or_fail(job, e)
+
+        job.locked_at = None
+        notification, job.notification = job.notification, None
+        db.session.commit()
+
+        if notification:
+            cls.send_notification(notification)
+        return job
+
+    @classmethod
+    def enqueue_fanout(cls, user_id) -> CompatibilityFanoutJob:
+        """
+        Queue a re-score of all of a user's partner compatibilities.
+
+        Call after committing a profile write. Each call pushes the run back
+        by the debounce window (app_config compatibility_fanout_debounce_seconds),
+        so a burst of retakes triggers one re-score. The user's materialized
+        UI payloads are dropped until then; the endpoint rebuilds them on view.
+        """
+        ui_payload.invalidate_user(user_id)
+
+        now = datetime.utcnow()
+        inline = cls.inline_enabled()
+        debounce = 0 if inline else get_config_int('compatibility_fanout_debounce_seconds', cls.FANOUT_DEBOUNCE_SECONDS)
+
+        job = CompatibilityFanoutJob.query.filter_by(user_id=user_id).first()
+        if job is None:
+            job = CompatibilityFanoutJob(user_id=user_id)
+            db.session.add(job)
+        job.requested_at = now
+        job.run_after = now + timedelta(seconds=debounce)
+        if job.status != 'running':
+            # A running job re-queues itself when it sees the newer requested_at
+            job.status = 'queued'
+            job.attempts = 0
+            job.last_error = None
+            job.completed_at = None
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request created the user's job first
+            db.session.rollback()
+            return cls.enqueue_fanout(user_id)
+
+        logger.info(f"Compatibility fan-out job {job.id} {job.status} for user {user_id}, runs after {job.run_after}")
+
+        if inline and job.status == 'queued':
+            cls._lock(job)
+            db.session.commit()
+            cls.process_fanout(job)
+        return job
+
+    @classmethod
+    def process_fanout(cls, job: CompatibilityFanoutJob) -> CompatibilityFanoutJob:
+        """Re-score a claimed fan-out job's user against all accepted partners."""
+        claimed_request = job.requested_at
+        try:
+            stats = rescore_partners(job.user_id)
+        except Exception as e:
+            db.session.rollback()
+            cls._retry_or_fail(job, e)
+            job.locked_at = None
+            db.session.commit()
+            return job
+
+        # Only complete the request this run started with
+        completed = db.session.execute(
+            update(CompatibilityFanoutJob)
+            .where(CompatibilityFanoutJob.id == job.id, CompatibilityFanoutJob.requested_at == claimed_request)
+            .values(status='done', last_error=None, locked_at=None, completed_at=datetime.utcnow())
+        ).rowcount
+        if not completed:
+            # Profile rewritten during the run: run again after its debounce
+            job.status = 'queued'
+            job.attempts = 0
+            job.locked_at = None
+        db.session.commit()
+        logger.info(f"Compatibility fan-out job {job.id} {job.status}: {stats}")
+        return job
+
+    @staticmethod
+    def send_notification(notification: Dict[str, Any]) -> None:
+        """Send the invitation-accepted push (non-fatal)."""
+        try:
+            push_result = NotificationService.send_invitation_accepted(**notification)
+            if push_result.get('success'):
+                logger.info(f"Acceptance push notification sent to user {notification['requester_user_id']}")
+            else:
+                logger.info(f"Acceptance push notification skipped: {push_result.get('reason')}")
+        except Exception as push_error:
+            logger.warning(f"Push notification failed (non-fatal): {push_error}")
+
+    @classmethod
+    def _retry_or_fail(cls, job, error: Exception) -> None:
+        """Re-queue a failed job with backoff, or fail it after max_attempts."""
+        job.last_error = str(error)
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.completed_at = datetime.utcnow()
+            logger.error(f"{job!r} failed after {job.attempts} attempts: {error}")
+        else:
+            job.status = 'queued'
+            job.run_after = datetime.utcnow() + cls.RETRY_DELAYS[min(job.attempts, len(cls.RETRY_DELAYS)) - 1]
+            logger.warning(f"{job!r} attempt {job.attempts} failed, retrying: {error}")
+
+    @staticmethod
+    def _lock(job) -> None:
+        job.status = 'running'
+        job.locked_at = datetime.utcnow()
+        job.attempts += 1
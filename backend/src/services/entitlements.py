@@ -0,0 +1,208 @@
+"""
+Entitlement service - free-tier activity limits for gameplay.
+
+A gameplay request used to re-read the user (or re-count the anonymous
+session's history rows) and the configured limit for every limit check and
+charge. EntitlementService.load() reads tier, usage and limit once into an
+Entitlement snapshot; the request checks and charges against it.
+
+Charges are single statements, so concurrent requests cannot lose an
+increment:
+
+- Users: UPDATE users SET lifetime_activity_count = lifetime_activity_count + 1
+  ... RETURNING lifetime_activity_count (premium users are never charged)
+- Anonymous sessions: +1 on the current hour's anonymous_activity_usage
+  bucket. Usage is the sum of the buckets in the last 24h; the oldest bucket
+  counts whole, so the window errs towards the limit by under an hour.
+
+Neither commits: the charge lands with the caller's transaction.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import uuid
+
+from sqlalchemy import func, insert, select, update
+
+from ..db.repository import _ON_CONFLICT_DIALECTS
+from ..extensions import db
+from ..models.anonymous_usage import AnonymousActivityUsage
+from ..models.user import User
+from .config_service import get_config_int
+
+ANONYMOUS_WINDOW = timedelta(hours=24)
+
+
+def _bucket(moment: datetime) -> datetime:
+    """Start of the hour bucket containing moment."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class Entitlement:
+    """Tier, usage and limit of one player, loaded once per request."""
+
+    __slots__ = ('user_id', 'anonymous_session_id', 'is_premium', 'used', 'limit', 'error')
+
+    def __init__(
+        self,
+        user_id: Optional[uuid.UUID] = None,
+        anonymous_session_id: Optional[str] = None,
+        is_premium: bool = False,
+        used: int = 0,
+        limit: int = 0,
+        error: Optional[str] = None
+    ):
+        self.user_id = user_id
+        self.anonymous_session_id = anonymous_session_id
+        self.is_premium = is_premium
+        self.used = used
+        self.limit = limit
+        self.error = error
+
+    @property
+    def limit_reached(self) -> bool:
+        return not self.error and not self.is_premium and self.used >= self.limit
+
+    def charged(self) -> 'Entitlement':
+        """Copy of the snapshot as it will be after one charge (see EntitlementService.charge)."""
+        chargeable = not self.error and not self.is_premium and (self.user_id or self.anonymous_session_id)
+        return Entitlement(
+            user_id=self.user_id,
+            anonymous_session_id=self.anonymous_session_id,
+            is_premium=self.is_premium,
+            used=self.used + 1 if chargeable else self.used,
+            limit=self.limit,
+            error=self.error
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """The limit_status dict returned by the gameplay endpoints."""
+        if self.error:
+            return {"error": self.error}
+        if self.is_premium:
+            return {
+                "limit_reached": False,
+                "remaining": -1,
+                "is_capped": False
+            }
+        return {
+            "limit_reached": self.limit_reached,
+            "remaining": max(0, self.limit - self.used),
+            "is_capped": True,
+            "used": self.used,
+            "limit": self.limit
+        }
+
+
+class EntitlementService:
+    """Load and charge free-tier activity entitlements."""
+
+    @classmethod
+    def load(cls, user_id=None, anonymous_session_id: Optional[str] = None) -> Entitlement:
+        """
+        Snapshot for an authenticated user or, failing that, an anonymous session.
+
+        One query: the user's tier and count, or the anonymous session's
+        usage in the window.
+        """
+        limit = get_config_int('free_tier_activity_limit', 10)
+
+        if user_id:
+            if not isinstance(user_id, uuid.UUID):
+                try:
+                    user_id = uuid.UUID(str(user_id))
+                except ValueError:
+                    return Entitlement(error="Invalid User ID")
+
+            row = db.session.execute(
+                select(User.subscription_tier, User.lifetime_activity_count).where(User.id == user_id)
+            ).first()
+            if row is None:
+                return Entitlement(user_id=user_id, error="User not found")
+            tier, used = row
+            return Entitlement(user_id=user_id, is_premium=(tier == 'premium'), used=used or 0, limit=limit)
+
+        if anonymous_session_id:
+            return Entitlement(
+                anonymous_session_id=anonymous_session_id,
+                used=cls.anonymous_usage(anonymous_session_id),
+                limit=limit
+            )
+
+        return Entitlement(error="No identity provided")
+
+    @staticmethod
+    def anonymous_usage(anonymous_session_id: str, now: Optional[datetime] = None) -> int:
+        """Activities charged to an anonymous session in the last 24h."""
+        cutoff = _bucket((now or datetime.utcnow()) - ANONYMOUS_WINDOW)
+        used = db.session.execute(
+            select(func.sum(AnonymousActivityUsage.activity_count)).where(
+                AnonymousActivityUsage.anonymous_session_id == anonymous_session_id,
+                AnonymousActivityUsage.bucket_start >= cutoff
+            )
+        ).scalar()
+        return used or 0
+
+    @classmethod
+    def charge(cls, entitlement: Entitlement) -> Entitlement:
+        """
+        Charge one activity and update the snapshot from the stored count.
+
+        Premium users and errored snapshots are left alone.
+        """
+        if entitlement.error or entitlement.is_premium:
+            return entitlement
+
+        if entitlement.user_id:
+            used = cls._charge_user(entitlement.user_id)
+            if used is not None:
+                entitlement.used = used
+        elif entitlement.anonymous_session_id:
+            cls._charge_anonymous(entitlement.anonymous_session_id)
+            entitlement.used += 1
+        return entitlement
+
+    @staticmethod
+    def _charge_user(user_id: uuid.UUID) -> Optional[int]:
+        """Atomically increment a free user's count; the new count, or None if not charged."""
+        users = User.__table__
+        stmt = update(users).where(
+            users.c.id == user_id,
+            users.c.subscription_tier != 'premium'
+        ).values(lifetime_activity_count=func.coalesce(users.c.lifetime_activity_count, 0) + 1)
+
+        if db.session.get_bind().dialect.update_returning:
+            return db.session.execute(stmt.returning(users.c.lifetime_activity_count)).scalar()
+
+        if db.session.execute(stmt).rowcount == 0:
+            return None
+        return db.session.execute(
+            select(users.c.lifetime_activity_count).where(users.c.id == user_id)
+        ).scalar()
+
+    @staticmethod
+    def _charge_anonymous(anonymous_session_id: str, now: Optional[datetime] = None) -> None:
+        """Add one activity to the session's current hour bucket."""
+        table = AnonymousActivityUsage.__table__
+        row = {
+            'anonymous_session_id': anonymous_session_id,
+            'bucket_start': _bucket(now or datetime.utcnow()),
+            'activity_count': 1,
+        }
+        dialect_insert = _ON_CONFLICT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(table).values(row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.anonymous_session_id, table.c.bucket_start],
+                set_={'activity_count': table.c.activity_count + 1}
+            )
+            db.session.execute(stmt)
+            return
+
+        bumped = db.session.execute(
+            update(table).where(
+                table.c.anonymous_session_id == row['anonymous_session_id'],
+                table.c.bucket_start == row['bucket_start']
+            ).values(activity_count=table.c.activity_count + 1)
+        )
+        if bumped.rowcount == 0:
+            db.session.execute(insert(table).values(row))
@@ -0,0 +1,170 @@
+"""
+Partner adjacency service - who has an accepted connection with whom.
+
+Gameplay player lookups, the compatibility endpoint and profile sharing all
+ask "is there an accepted PartnerConnection between A and B, in either
+direction?", often several times per request. The answer comes from each
+user's neighbour set (the users they have an accepted connection with),
+loaded in one query and kept in an in-process LRU:
+
+- app_config partner_adjacency_cache_size (default 4096 users)
+- app_config partner_adjacency_ttl_seconds (default 30); 0 disables caching
+
+Pairs are keyed canonically as (low, high), so both directions of a
+connection resolve to the same lookup. Accepting, declining or
+disconnecting a connection (and deleting a user) invalidates both users in
+this process; other worker processes pick the change up when the TTL runs
+out.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import or_
+
+from ..models.partner import PartnerConnection
+
+_neighbours: "OrderedDict[uuid.UUID, Tuple[float, FrozenSet[uuid.UUID]]]" = OrderedDict()
+_neighbours_lock = threading.Lock()
+# Bumped by every invalidation so a load that raced one is not cached
+_generation = 0
+
+
+def _cache_size() -> int:
+    from .config_service import get_config_int
+    return get_config_int('partner_adjacency_cache_size', 4096)
+
+
+def _ttl() -> int:
+    from .config_service import get_config_int
+    return get_config_int('partner_adjacency_ttl_seconds', 30)
+
+
+def _as_uuid(value) -> Optional[uuid.UUID]:
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class PartnerAdjacencyService:
+    """Cached accepted-connection lookups."""
+
+    @staticmethod
+    def pair_key(user_a, user_b) -> Tuple[uuid.UUID, uuid.UUID]:
+        """Canonical (low, high) key for a pair of users, independent of order."""
+        a, b = _as_uuid(user_a), _as_uuid(user_b)
+        if a is None or b is None:
+            raise ValueError(f"Invalid user id pair: {user_a!r}, {user_b!r}")
+        return (a, b) if a <= b else (b, a)
+
+    @classmethod
+    def are_partners(cls, user_a, user_b) -> bool:
+        """True if the two users have an accepted connection (either direction)."""
+        try:
+            low, high = cls.pair_key(user_a, user_b)
+        except ValueError:
+            return False
+        if low == high:
+            return False
+        return high in cls.neighbours(low)
+
+    @classmethod
+    def neighbours(cls, user_id) -> FrozenSet[uuid.UUID]:
+        """Users with an accepted connection to user_id."""
+        user_uuid = _as_uuid(user_id)
+        if user_uuid is None:
+            return frozenset()
+        return cls.neighbours_many([user_uuid])[user_uuid]
+
+    @classmethod
+    def neighbours_many(cls, user_ids: Iterable) -> Dict[uuid.UUID, FrozenSet[uuid.UUID]]:
+        """
+        Neighbour sets for several users, for list endpoints.
+
+        Cached users are served from memory; the rest are loaded in a single
+        query. Invalid ids are skipped.
+        """
+        ids = {u for u in (_as_uuid(value) for value in user_ids) if u is not None}
+        ttl = _ttl()
+        now = time.monotonic()
+
+        result: Dict[uuid.UUID, FrozenSet[uuid.UUID]] = {}
+        if ttl > 0:
+            with _neighbours_lock:
+                for user_id in ids:
+                    entry = _neighbours.get(user_id)
+                    if entry is None:
+                        continue
+                    expires_at, neighbours = entry
+                    if expires_at <= now:
+                        del _neighbours[user_id]
+                        continue
+                    _neighbours.move_to_end(user_id)
+                    result[user_id] = neighbours
+
+        missing = ids - result.keys()
+        if not missing:
+            return result
+
+        generation = _generation
+        loaded = cls._load(missing)
+        result.update(loaded)
+        if ttl > 0:
+            expires_at = now + ttl
+            limit = _cache_size()
+            with _neighbours_lock:
+                if generation != _generation:
+                    return result
+                for user_id, neighbours in loaded.items():
+                    _neighbours[user_id] = (expires_at, neighbours)
+                    _neighbours.move_to_end(user_id)
+                while len(_neighbours) > limit:
+                    _neighbours.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _load(user_ids) -> Dict[uuid.UUID, FrozenSet[uuid.UUID]]:
+        """Accepted connections touching any of user_ids, as neighbour sets."""
+        user_ids = list(user_ids)
+        rows = PartnerConnection.query.with_entities(
+            PartnerConnection.requester_user_id, PartnerConnection.recipient_user_id
+        ).filter(
+            PartnerConnection.status == 'accepted',
+            or_(PartnerConnection.requester_user_id.in_(user_ids),
+                PartnerConnection.recipient_user_id.in_(user_ids))
+        ).all()
+
+        wanted = set(user_ids)
+        neighbours = {user_id: set() for user_id in user_ids}
+        for requester_id, recipient_id in rows:
+            requester, recipient = _as_uuid(requester_id), _as_uuid(recipient_id)
+            if requester is None or recipient is None:
+                continue
+            if requester in wanted:
+                neighbours[requester].add(recipient)
+            if recipient in wanted:
+                neighbours[recipient].add(requester)
+        return {user_id: frozenset(ids) for user_id, ids in neighbours.items()}
+
+    @staticmethod
+    def invalidate(*user_ids) -> None:
+        """Drop cached neighbour sets, e.g. after a connection changes status."""
+        global _generation
+        with _neighbours_lock:
+            _generation += 1
+            for value in user_ids:
+                user_id = _as_uuid(value)
+                if user_id is not None:
+                    _neighbours.pop(user_id, None)
+
+    @staticmethod
+    def clear() -> None:
+        global _generation
+        with _neighbours_lock:
+            _generation += 1
+            _neighbours.clear()
@@ -1,6 +1,7 @@
 """
 Pytest configuration and fixtures for Attuned tests.
 """
+import jwt
 import pytest
 import sys
 import os
@@ -15,6 +16,8 @@ os.environ['FLASK_ENV'] = 'testing'
 os.environ['SUPABASE_JWT_SECRET'] = 'test-secret-key'
 os.environ['RATELIMIT_ENABLED'] = 'False'
 os.environ['PROPAGATE_EXCEPTIONS'] = 'True'
+# Exercise the queued path; tests opt into inline compatibility jobs
+os.environ['COMPATIBILITY_JOBS_INLINE'] = 'false'
 
 import logging
 logging.basicConfig(level=logging.ERROR)
@@ -32,6 +35,9 @@ def compile_jsonb(element, compiler, **kw):
 # Note: importing main executes create_app() immediately due to the 'app = create_app()' line at the bottom of main.py
 from backend.src.main import create_app
 from backend.src.extensions import db, limiter
+from backend.src.db.activity_bank import invalidate_activity_bank
+from backend.src.game import pair_ranking
+from backend.src.game.recency import clear_recency_cache
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
 from sqlalchemy import event, String
@@ -40,6 +46,8 @@ from sqlalchemy.dialects.postgresql import UUID as pg_UUID
 import uuid
 # Import models to ensure they are registered for create_all
 from backend.src.models.activity_history import UserActivityHistory
+from backend.src.models.activity import Activity
+from backend.src.models.user import User
 
 # SQLite UUID handling
 @compiles(pg_UUID, 'sqlite')
@@ -115,6 +123,108 @@ def db_session(app):
         connection.close()
         session.remove()
         db.session = old_session
+        # Rolled-back activity rows fire no mapper events
+        invalidate_activity_bank()
+
+
+class QueryCapture:
+    """
+    SQL statements executed on db.engine (see the `queries` fixture).
+
+    Records from fixture setup; `with queries:` restarts the capture and
+    stops it at the end of the block.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.active = True
+
+    def __enter__(self):
+        self.statements.clear()
+        self.active = True
+        return self
+
+    def __exit__(self, *exc):
+        self.active = False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, *args):
+        if self.active:
+            self.statements.append(statement)
+
+
+@pytest.fixture
+def queries(app):
+    """Capture the statements a test (or a `with queries:` block) executes."""
+    capture = QueryCapture()
+    event.listen(db.engine, 'before_cursor_execute', capture._record)
+    yield capture
+    event.remove(db.engine, 'before_cursor_execute', capture._record)
+
+
+@pytest.fixture
+def bank_activities():
+    """
+    Unsaved synthetic activity bank for gameplay tests: six R-rated couples
+    truths and six dares at each intensity 1-3.
+    """
+    return [
+        Activity(
+            activity_id=700 + i, type=activity_type, rating='R', intensity=intensity,
+            audience_scope='couples', script={'steps': [{'actor': 'A', 'do': f'Ask your partner {activity_type} {i}'}]},
+        )
+        for i, (activity_type, intensity) in enumerate(
+            (t, n) for t in ('truth', 'dare') for n in (1, 2, 3) for _ in range(6)
+        )
+    ]
+
+
+@pytest.fixture
+def seeded_bank(request, db_session, bank_activities):
+    """
+    The synthetic bank plus a registered player "Alex"; yields the user id.
+
+    Alex is premium unless overridden by indirect parametrization with User
+    fields, e.g. {'subscription_tier': 'free', 'lifetime_activity_count': 5}.
+    Pair rankings and recency buffers are cleared around the test.
+    """
+    user_id = uuid.uuid4()
+    fields = {'display_name': 'Alex', 'subscription_tier': 'premium', **getattr(request, 'param', {})}
+    db_session.add_all(bank_activities)
+    db_session.add(User(id=user_id, email=f"{user_id.hex[:10]}@test.com", **fields))
+    db_session.commit()
+    pair_ranking._rankings.clear()
+    clear_recency_cache()
+    yield user_id
+    pair_ranking._rankings.clear()
+    clear_recency_cache()
+
+
+@pytest.fixture
+def auth_headers():
+    """Build the bearer-token headers for a user id (signed with the test JWT secret)."""
+    def headers(user_id):
+        token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, "test-secret-key", algorithm="HS256")
+        return {'Authorization': f'Bearer {token}'}
+    return headers
+
+
+@pytest.fixture
+def start_game(client, auth_headers):
+    """
+    Start a game for `user_id` as "Alex" against the guest "Sam" and return
+    the response. Pass `client` for another app, `players` to override the
+    player list.
+    """
+    def start(user_id, player_order_mode='SEQUENTIAL', players=None, client=client):
+        return client.post('/api/game/start', json={
+            "players": players or [{"id": str(user_id), "name": "Alex"}, {"name": "Sam"}],
+            "settings": {"intimacy_level": 3, "player_order_mode": player_order_mode}
+        }, headers=auth_headers(user_id))
+    return start
 
 
 @pytest.fixture
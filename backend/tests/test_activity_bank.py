@@ -0,0 +1,148 @@
+"""
+Tests for the in-process activity bank snapshot (src/db/activity_bank.py).
+"""
+from unittest.mock import patch
+
+import pytest
+
+from backend.src.models.activity import Activity
+from backend.src.db import activity_bank
+from backend.src.db.activity_bank import ActivityBank, BankActivity, get_activity_bank, invalidate_activity_bank
+from backend.src.db.repository import find_activity_candidates, find_best_activity_candidate
+
+
+def _make_activity(activity_id, **overrides):
+    fields = dict(
+        activity_id=activity_id,
+        type="truth",
+        rating="R",
+        intensity=2,
+        audience_scope="couples",
+        script={'steps': [{'actor': 'A', 'do': f'Activity {activity_id}'}]},
+        hard_boundaries=[],
+        required_bodyparts={"active": [], "partner": []},
+    )
+    fields.update(overrides)
+    return Activity(**fields)
+
+
+@pytest.fixture
+def seeded_bank(db_session):
+    db_session.add_all([
+        _make_activity(101),
+        _make_activity(102, type="dare"),
+        _make_activity(103, intensity=4),
+        _make_activity(104, audience_scope="groups"),
+        _make_activity(105, audience_scope="all"),
+        _make_activity(106, rating="X"),
+        _make_activity(107, is_active=False),
+        _make_activity(108, approved=False),
+        _make_activity(109, hard_boundaries=["impact"]),
+    ])
+    db_session.commit()
+    return db_session
+
+
+def _ids(items):
+    return [a.activity_id for a in items]
+
+
+class TestActivityBank:
+    def test_loads_only_active_approved(self, seeded_bank):
+        bank = get_activity_bank()
+        assert bank is not None
+        assert bank.get(107) is None
+        assert bank.get(108) is None
+        assert isinstance(bank.get(101), BankActivity)
+
+    def test_partitions_by_rating_type_intensity_scope(self, seeded_bank):
+        bank = get_activity_bank()
+        assert _ids(bank.partitions[("R", "truth", 2, "couples")]) == [101, 109]
+        assert _ids(bank.partitions[("R", "dare", 2, "couples")]) == [102]
+        assert _ids(bank.partitions[("R", "truth", 2, "groups")]) == [104]
+
+    def test_candidates_match_sql_filters(self, seeded_bank):
+        bank = get_activity_bank()
+        assert _ids(bank.candidates("R", 1, 3, "truth", "couples")) == [101, 105, 109]
+        assert _ids(bank.candidates("R", 1, 3, "truth", "groups")) == [104, 105]
+        assert _ids(bank.candidates("R", 1, 5, None, "couples")) == [101, 102, 103, 105, 109]
+        assert _ids(bank.candidates("X", 1, 5)) == [106]
+
+    def test_to_dict_matches_model_fields(self, seeded_bank):
+        bank = get_activity_bank()
+        model_dict = seeded_bank.get(Activity, 101).to_dict()
+        for key, value in bank.get(101).to_dict().items():
+            assert model_dict[key] == value
+
+    def test_snapshot_reused_when_unchanged(self, seeded_bank):
+        assert get_activity_bank() is get_activity_bank()
+
+    def test_hot_swaps_on_insert(self, seeded_bank):
+        before = get_activity_bank()
+        seeded_bank.add(_make_activity(110))
+        seeded_bank.commit()
+
+        after = get_activity_bank()
+        assert after is not before
+        assert after.get(110) is not None
+
+    def test_hot_swaps_on_bulk_update(self, seeded_bank):
+        """Bulk UPDATEs skip mapper events; the version stamp still catches them."""
+        bank = get_activity_bank()
+        Activity.query.filter(Activity.activity_id == 101).update({'is_active': False})
+        seeded_bank.commit()
+        activity_bank._bank_invalidated = False  # Rely on the version stamp only
+
+        # Within the check interval the snapshot is served without re-checking
+        assert get_activity_bank() is bank
+        with patch('backend.src.services.config_service.get_config_int', return_value=0):
+            assert get_activity_bank() is not bank
+            assert get_activity_bank().get(101) is None
+
+    def test_invalidate_forces_reload(self, seeded_bank):
+        bank = get_activity_bank()
+        invalidate_activity_bank()
+        assert get_activity_bank() is not bank
+
+    def test_failed_load_keeps_callers_transaction(self, seeded_bank, db_session):
+        invalidate_activity_bank()
+        db_session.add(_make_activity(111))
+        with patch.object(activity_bank, '_load_bank', side_effect=RuntimeError('boom')):
+            assert get_activity_bank() is None
+
+        db_session.commit()
+        assert db_session.get(Activity, 111) is not None
+        assert get_activity_bank().get(111) is not None
+
+    def test_empty_bank(self, db_session):
+        bank = ActivityBank([], (0, None, None))
+        assert len(bank) == 0
+        assert bank.candidates("R", 1, 5) == []
+
+
+class TestRepositoryUsesBank:
+    def test_find_candidates_served_from_bank(self, seeded_bank):
+        candidates = find_activity_candidates("R", 1, 3, "truth", randomize=False)
+        assert _ids(candidates) == [101, 105, 109]
+        assert all(isinstance(c, BankActivity) for c in candidates)
+
+    def test_boundary_filter_applies(self, seeded_bank):
+        candidates = find_activity_candidates(
+            "R", 1, 3, "truth", randomize=False, player_boundaries=["impact"]
+        )
+        assert _ids(candidates) == [101, 105]
+
+    def test_randomized_sample_respects_limit(self, seeded_bank):
+        candidates = find_activity_candidates("R", 1, 5, None, randomize=True, limit=2)
+        assert len(candidates) == 2
+        assert set(_ids(candidates)) <= {101, 102, 103, 105, 109}
+
+    def test_falls_back_to_sql_without_bank(self, seeded_bank, monkeypatch):
+        monkeypatch.setattr('backend.src.db.repository.get_activity_bank', lambda: None)
+        candidates = find_activity_candidates("R", 1, 3, "truth", randomize=False)
+        assert sorted(_ids(candidates)) == [101, 105, 109]
+
+    def test_best_candidate_from_bank(self, seeded_bank):
+        profile = {'activities': {}, 'power_dynamic': {}}
+        best = find_best_activity_candidate("R", 1, 3, "dare", profile, profile, randomize=False)
+        assert best.activity_id == 102
@@ -0,0 +1,145 @@
+"""
+Tests for bitmask-encoded boundary and anatomy filtering of activity candidates.
+"""
+import itertools
+import random
+
+from backend.src.models.activity import (
+    Activity, ALLOWED_BOUNDARIES, ALLOWED_BODYPARTS, encode_boundaries, encode_bodyparts
+)
+from backend.src.db.activity_bank import BankActivity, _BANK_COLUMNS
+from backend.src.db.repository import (
+    CandidateFilter, find_activity_candidates, has_boundary_conflict, meets_anatomy_requirements
+)
+
+
+def _bank_activity(activity_id, hard_boundaries=None, active=None, partner=None):
+    """Build a BankActivity without touching the database."""
+    row = {column.key: None for column in _BANK_COLUMNS}
+    row.update(
+        activity_id=activity_id, type='truth', rating='R', intensity=2,
+        audience_scope='couples', script={'steps': []},
+        hard_boundaries=hard_boundaries or [],
+        required_bodyparts={'active': active or [], 'partner': partner or []},
+    )
+    return BankActivity(tuple(row[column.key] for column in _BANK_COLUMNS))
+
+
+class TestEncoding:
+    def test_each_key_gets_its_own_bit(self):
+        masks = [encode_boundaries([key]) for key in ALLOWED_BOUNDARIES]
+        assert len(set(masks)) == len(ALLOWED_BOUNDARIES)
+        assert all(mask and mask & (mask - 1) == 0 for mask in masks)
+
+    def test_unknown_keys_are_ignored(self):
+        assert encode_boundaries(['not_a_boundary']) == 0
+        assert encode_bodyparts(['tail']) == 0
+        assert encode_boundaries(None) == 0
+
+    def test_bodyparts_combine(self):
+        assert encode_bodyparts(ALLOWED_BODYPARTS) == 0b111
+
+    def test_model_masks_refreshed_on_flush(self, db_session):
+        activity = Activity(
+            activity_id=201, type='dare', rating='X', intensity=3, script={'steps': []},
+            hard_boundaries=['hardBoundaryImpact'],
+            required_bodyparts={'active': ['penis'], 'partner': ['vagina', 'breasts']},
+        )
+        db_session.add(activity)
+        db_session.commit()
+        assert activity.boundary_mask == encode_boundaries(['hardBoundaryImpact'])
+        assert activity.active_bodypart_mask == encode_bodyparts(['penis'])
+        assert activity.partner_bodypart_mask == encode_bodyparts(['vagina', 'breasts'])
+
+        activity.hard_boundaries = ['hardBoundaryAnal', 'hardBoundaryPublic']
+        db_session.commit()
+        assert activity.boundary_mask == encode_boundaries(['hardBoundaryAnal', 'hardBoundaryPublic'])
+
+
+class TestCandidateFilterParity:
+    """CandidateFilter must agree exactly with the list-based checks."""
+
+    BOUNDARY_KEYS = ALLOWED_BOUNDARIES + ['anal_play', 'limit_x']
+    BODYPART_KEYS = ALLOWED_BODYPARTS + ['prosthetic']
+
+    def _expected(self, activity, player_boundaries, player_anatomy):
+        if player_anatomy and not meets_anatomy_requirements(activity, player_anatomy):
+            return False
+        if player_boundaries and has_boundary_conflict(activity.hard_boundaries, player_boundaries):
+            return False
+        return True
+
+    def test_random_combinations(self):
+        rng = random.Random(42)
+        for i in range(2000):
+            activity = _bank_activity(
+                i,
+                hard_boundaries=rng.sample(self.BOUNDARY_KEYS, rng.randint(0, 3)),
+                active=rng.sample(self.BODYPART_KEYS, rng.randint(0, 2)),
+                partner=rng.sample(self.BODYPART_KEYS, rng.randint(0, 2)),
+            )
+            player_boundaries = rng.sample(self.BOUNDARY_KEYS, rng.randint(0, 3))
+            player_anatomy = rng.choice([
+                None,
+                {},
+                {'active_anatomy': rng.sample(self.BODYPART_KEYS, rng.randint(0, 4))},
+                {
+                    'active_anatomy': rng.sample(self.BODYPART_KEYS, rng.randint(0, 4)),
+                    'partner_anatomy': rng.sample(self.BODYPART_KEYS, rng.randint(0, 4)),
+                },
+            ])
+
+            candidate_filter = CandidateFilter(player_boundaries, player_anatomy)
+            assert candidate_filter.allows(activity) == self._expected(
+                activity, player_boundaries, player_anatomy
+            ), (activity.hard_boundaries, activity.required_bodyparts, player_boundaries, player_anatomy)
+
+    def test_all_single_requirements(self):
+        for part, has in itertools.product(ALLOWED_BODYPARTS, [[], ['penis'], ALLOWED_BODYPARTS]):
+            activity = _bank_activity(1, active=[part])
+            anatomy = {'active_anatomy': has, 'partner_anatomy': []}
+            assert CandidateFilter(None, anatomy).allows(activity) == (part in has)
+
+
+class TestSqlPushDown:
+    def _seed(self, db_session):
+        db_session.add_all([
+            Activity(activity_id=301, type='truth', rating='R', intensity=2, script={'steps': []},
+                     audience_scope='couples'),
+            Activity(activity_id=302, type='truth', rating='R', intensity=2, script={'steps': []},
+                     audience_scope='couples', hard_boundaries=['hardBoundaryRecord']),
+            Activity(activity_id=303, type='truth', rating='R', intensity=2, script={'steps': []},
+                     audience_scope='couples',
+                     required_bodyparts={'active': ['vagina'], 'partner': []}),
+            Activity(activity_id=304, type='truth', rating='R', intensity=2, script={'steps': []},
+                     audience_scope='couples', hard_boundaries=['limit_x']),
+        ])
+        db_session.commit()
+
+    def _ids(self, candidates):
+        return sorted(c.activity_id for c in candidates)
+
+    def test_sql_and_bank_paths_agree(self, db_session, monkeypatch):
+        self._seed(db_session)
+        kwargs = dict(
+            rating='R', intensity_min=1, intensity_max=3, activity_type='truth',
+            player_boundaries=['hardBoundaryRecord', 'limit_x'],
+            player_anatomy={'active_anatomy': ['penis'], 'partner_anatomy': ['vagina']},
+        )
+        from_bank = find_activity_candidates(**kwargs)
+
+        monkeypatch.setattr('backend.src.db.repository.get_activity_bank', lambda: None)
+        from_sql = find_activity_candidates(**kwargs)
+
+        assert self._ids(from_bank) == self._ids(from_sql) == [301]
+
+    def test_sql_criteria_filter_in_query(self, db_session):
+        self._seed(db_session)
+        candidate_filter = CandidateFilter(
+            ['hardBoundaryRecord'], {'active_anatomy': ['penis'], 'partner_anatomy': []}
+        )
+        rows = Activity.query.filter(
+            Activity.activity_id.in_([301, 302, 303, 304]),
+            *candidate_filter.sql_criteria()
+        ).all()
+        assert self._ids(rows) == [301, 304]
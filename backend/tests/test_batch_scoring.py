@@ -0,0 +1,129 @@
+"""
+Parity tests for the vectorized scorer (src/recommender/batch_scoring.py).
+
+The batch scorer must return exactly what score_activity_for_players returns
+for every activity, including the rounded scores and the raw components.
+"""
+import random
+
+import pytest
+
+from src.recommender.scoring import score_activity_for_players
+from src.recommender.batch_scoring import ActivityMatrix, score_activities_for_players, to_score_dicts
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+
+def _flatten(profile):
+    """Flatten nested activities like the recommendations endpoint does."""
+    flat = {}
+    for category, items in profile.get('activities', {}).items():
+        if isinstance(items, dict):
+            flat.update(items)
+        else:
+            flat[category] = items
+    return {**profile, 'activities': flat}
+
+
+def _activity_pool(size=400, seed=7):
+    """Synthetic activities covering every branch of the scalar scorer."""
+    rng = random.Random(seed)
+
+    keys = set()
+    for pair in DIVERSE_TEST_PAIRS.values():
+        for profile in (pair['profile_a'], pair['profile_b']):
+            keys.update(_flatten(profile)['activities'])
+    keys.update([
+        'stripping_self', 'watching_strip', 'solo_pleasure_self', 'watching_solo_pleasure',
+        'dancing_self', 'dancing_watching', 'roleplay', 'massage', 'unknown_key_give',
+    ])
+    keys = sorted(keys)
+    domains = ['sensation', 'Connection', 'POWER', 'exploration', 'verbal', 'playful', 'sensual']
+    roles = ['top', 'bottom', 'switch', 'neutral', None, 'mystery']
+
+    pool = [
+        # Fixed edge cases
+        {'activity_id': 0, 'preference_keys': [], 'domains': [], 'power_role': 'neutral', 'intensity': 1},
+        {'activity_id': 1, 'preference_keys': None, 'domains': None, 'power_role': None, 'intensity': 5},
+        {'activity_id': 2, 'preference_keys': ['massage_receive', 'massage_give'],
+         'domains': ['sensation'], 'power_role': 'top', 'intensity': 2},
+        {'activity_id': 3, 'preference_keys': ['watching_strip', 'stripping_self', 'watching_strip'],
+         'domains': ['playful', 'playful'], 'power_role': 'bottom', 'intensity': 3},
+        {'activity_id': 4, 'preference_keys': ['solo_pleasure_self', 'watching_solo_pleasure'],
+         'domains': ['power'], 'power_role': 'switch', 'intensity_level': 'intense',
+         'performance_pressure': 'high'},
+        {'activity_id': 5, 'preference_keys': ['roleplay'], 'domains': ['verbal'],
+         'power_role': 'mystery', 'intensity_level': 'gentle', 'is_performance': True},
+    ]
+
+    for activity_id in range(len(pool), size):
+        chosen = rng.sample(keys, rng.randint(1, 5))
+        # Add the directional partner of some keys, in either order
+        for key in list(chosen):
+            if key.endswith('_give') and rng.random() < 0.6:
+                chosen.insert(rng.randint(0, len(chosen)), key.replace('_give', '_receive'))
+        activity = {
+            'activity_id': activity_id,
+            'preference_keys': chosen,
+            'domains': rng.sample(domains, rng.randint(0, 3)),
+            'power_role': rng.choice(roles),
+            'intensity': rng.randint(1, 5),
+        }
+        if rng.random() < 0.3:
+            activity['performance_pressure'] = rng.choice(['low', 'moderate', 'high'])
+        pool.append(activity)
+    return pool
+
+
+ACTIVITY_POOL = _activity_pool()
+SESSION_CONTEXTS = [None, {}, {'seq': 1, 'target': 25}, {'seq': 12, 'target': 25}, {'seq': 24}]
+
+
+def _pair_params():
+    for name, pair in DIVERSE_TEST_PAIRS.items():
+        yield pytest.param(pair['profile_a'], pair['profile_b'], id=f"{name}-nested")
+        yield pytest.param(_flatten(pair['profile_a']), _flatten(pair['profile_b']), id=f"{name}-flat")
+        yield pytest.param(_flatten(pair['profile_b']), _flatten(pair['profile_a']), id=f"{name}-swapped")
+
+
+class TestBatchScoringParity:
+    @pytest.mark.parametrize("profile_a,profile_b", list(_pair_params()))
+    @pytest.mark.parametrize("session_context", SESSION_CONTEXTS)
+    def test_matches_scalar_exactly(self, profile_a, profile_b, session_context):
+        expected = [
+            score_activity_for_players(activity, profile_a, profile_b, session_context=session_context)
+            for activity in ACTIVITY_POOL
+        ]
+        actual = score_activities_for_players(
+            ACTIVITY_POOL, profile_a, profile_b, session_context=session_context
+        )
+        assert actual == expected
+
+    def test_custom_weights(self):
+        pair = DIVERSE_TEST_PAIRS['pair_5_partial_mismatch']
+        profile_a, profile_b = _flatten(pair['profile_a']), _flatten(pair['profile_b'])
+        weights = {'mutual_interest': 0.7, 'power_alignment': 0.1, 'domain_fit': 0.2}
+
+        expected = [
+            score_activity_for_players(activity, profile_a, profile_b, weights=weights)
+            for activity in ACTIVITY_POOL
+        ]
+        assert score_activities_for_players(ACTIVITY_POOL, profile_a, profile_b, weights=weights) == expected
+
+    def test_row_subset_matches_full_pool(self):
+        pair = DIVERSE_TEST_PAIRS['pair_3_kink_complementary']
+        profile_a, profile_b = _flatten(pair['profile_a']), _flatten(pair['profile_b'])
+        matrix = ActivityMatrix(ACTIVITY_POOL)
+        rows = [17, 3, 250, 3, 0]
+
+        subset = to_score_dicts(matrix.score(profile_a, profile_b, rows=rows))
+        expected = [
+            score_activity_for_players(ACTIVITY_POOL[row], profile_a, profile_b)
+            for row in rows
+        ]
+        assert subset == expected
+
+    def test_empty_inputs(self):
+        assert score_activities_for_players([], {}, {}) == []
+        assert score_activities_for_players(ACTIVITY_POOL[:2], {}, {}) == [
+            score_activity_for_players(activity, {}, {}) for activity in ACTIVITY_POOL[:2]
+        ]
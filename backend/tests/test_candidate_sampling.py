@@ -0,0 +1,83 @@
+"""
+Tests for random candidate sampling without ORDER BY random().
+"""
+import random
+from collections import Counter
+
+import pytest
+
+from backend.src.models.activity import Activity
+from backend.src.db.repository import find_activity_candidates, sample_activities
+
+
+POOL_IDS = list(range(801, 813))
+
+
+@pytest.fixture
+def pool(db_session):
+    db_session.add_all([
+        Activity(activity_id=activity_id, type='truth', rating='R', intensity=2,
+                 audience_scope='couples', script={'steps': []})
+        for activity_id in POOL_IDS
+    ] + [
+        Activity(activity_id=850, type='dare', rating='R', intensity=2,
+                 audience_scope='couples', script={'steps': []}),
+    ])
+    db_session.commit()
+
+
+def _truths():
+    return Activity.query.filter(Activity.type == 'truth', Activity.activity_id.in_(POOL_IDS + [850]))
+
+
+class TestSampleActivities:
+    def test_returns_distinct_matching_rows(self, pool):
+        sampled = sample_activities(_truths(), 5)
+        ids = [a.activity_id for a in sampled]
+        assert len(ids) == 5 == len(set(ids))
+        assert set(ids) <= set(POOL_IDS)
+
+    def test_small_pool_and_empty_requests(self, pool):
+        assert sorted(a.activity_id for a in sample_activities(_truths(), 100)) == POOL_IDS
+        assert sample_activities(_truths(), 0) == []
+        assert sample_activities(_truths().filter(Activity.intensity == 5), 3) == []
+
+    def test_reproducible_with_seeded_rng(self, pool):
+        first = [a.activity_id for a in sample_activities(_truths(), 4, rng=random.Random(9))]
+        second = [a.activity_id for a in sample_activities(_truths(), 4, rng=random.Random(9))]
+        assert first == second
+
+    def test_uniform_distribution(self, pool):
+        """Every row is equally likely in the subset and in first position, like ORDER BY random()."""
+        rng = random.Random(1234)
+        trials, k, n = 3000, 3, len(POOL_IDS)
+        included, first = Counter(), Counter()
+        for _ in range(trials):
+            ids = [a.activity_id for a in sample_activities(_truths(), k, rng=rng)]
+            included.update(ids)
+            first[ids[0]] += 1
+
+        expected_included = trials * k / n   # 750
+        expected_first = trials / n          # 250
+        for activity_id in POOL_IDS:
+            assert abs(included[activity_id] - expected_included) < 0.15 * expected_included
+            assert abs(first[activity_id] - expected_first) < 0.25 * expected_first
+
+        # Chi-square goodness of fit on first position (11 dof, p=0.001 critical value 31.26)
+        chi2 = sum((first[i] - expected_first) ** 2 / expected_first for i in POOL_IDS)
+        assert chi2 < 31.26
+
+    def test_does_not_sort_randomly_in_sql(self, pool, queries):
+        with queries:
+            sample_activities(_truths(), 3)
+        assert queries.statements
+        assert not any('random()' in s.lower() for s in queries.statements)
+
+
+def test_sql_fallback_path_uses_sampler(pool, queries, monkeypatch):
+    monkeypatch.setattr('backend.src.db.repository.get_activity_bank', lambda: None)
+    with queries:
+        candidates = find_activity_candidates('R', 2, 2, activity_type='truth', randomize=True, limit=4)
+    assert 0 < len(candidates) <= 4
+    assert {a.activity_id for a in candidates} <= set(POOL_IDS)
+    assert not any('random()' in s.lower() for s in queries.statements)
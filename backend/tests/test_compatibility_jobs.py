@@ -0,0 +1,321 @@
+"""
+Tests for queued compatibility calculation on partner acceptance
+(CompatibilityJobService and the "pending" compatibility responses).
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from backend.src.models.compatibility import Compatibility
+from backend.src.models.compatibility_job import CompatibilityFanoutJob, CompatibilityJob
+from backend.src.models.partner import PartnerConnection
+from backend.src.models.profile import Profile
+from backend.src.models.survey import SurveySubmission
+from backend.src.models.user import User
+from backend.src.services import compatibility_jobs
+from backend.src.services.compatibility_jobs import CompatibilityJobService
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+PAIR = DIVERSE_TEST_PAIRS['pair_1_perfect_match']
+
+
+def get_auth_header(user_id):
+    """Generate a valid JWT auth header for testing."""
+    secret = os.environ.get('SUPABASE_JWT_SECRET', 'test-secret-key')
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, secret, algorithm="HS256")
+    return {'Authorization': f'Bearer {token}'}
+
+
+def create_player(db_session, profile_data=None):
+    """User with (optionally) a profile."""
+    user = User(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex[:10]}@example.com",
+        display_name="Player",
+        auth_provider='email'
+    )
+    db_session.add(user)
+    profile = None
+    if profile_data is not None:
+        submission = SurveySubmission(submission_id=f"jobs_{uuid.uuid4()}", payload_json={})
+        db_session.add(submission)
+        db_session.flush()
+        profile = Profile(user_id=user.id, submission_id=submission.submission_id, **profile_data)
+        db_session.add(profile)
+    db_session.commit()
+    return user, profile
+
+
+def create_connection(db_session, requester, recipient):
+    connection = PartnerConnection(
+        requester_user_id=requester.id,
+        recipient_email=recipient.email,
+        recipient_user_id=recipient.id,
+        status='pending',
+        connection_token=str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + timedelta(days=1)
+    )
+    db_session.add(connection)
+    db_session.commit()
+    return connection
+
+
+def accept(client, connection, recipient):
+    with patch('backend.src.routes.partners.send_partner_accepted'):
+        return client.post(f'/api/partners/connections/{connection.id}/accept',
+                           json={}, headers=get_auth_header(recipient.id))
+
+
+@pytest.fixture
+def push():
+    with patch.object(compatibility_jobs.NotificationService, 'send_invitation_accepted',
+                      return_value={'success': True}) as mock_push:
+        yield mock_push
+
+
+@pytest.fixture
+def players(db_session):
+    requester, requester_profile = create_player(db_session, PAIR['profile_a'])
+    recipient, recipient_profile = create_player(db_session, PAIR['profile_b'])
+    return requester, requester_profile, recipient, recipient_profile
+
+
+def stored(db_session, profile_a, profile_b):
+    pair = Compatibility.get_or_create_key(profile_a.id, profile_b.id)
+    return db_session.query(Compatibility).filter_by(player_a_id=pair[0], player_b_id=pair[1]).first()
+
+
+class TestAcceptQueuesJob:
+    def test_accept_returns_before_calculation(self, client, db_session, players, push):
+        requester, requester_profile, recipient, recipient_profile = players
+        connection = create_connection(db_session, requester, recipient)
+
+        resp = accept(client, connection, recipient)
+
+        assert resp.status_code == 200
+        assert resp.get_json()['compatibility']['status'] == 'queued'
+        assert stored(db_session, requester_profile, recipient_profile) is None
+        push.assert_not_called()
+
+        pending = client.get(f'/api/compatibility/{recipient.id}/{requester.id}', headers=get_auth_header(recipient.id))
+        assert pending.status_code == 202
+        assert pending.get_json()['status'] == 'pending'
+        ui_pending = client.get(f'/api/compatibility/{recipient.id}/{requester.id}/ui',
+                                headers=get_auth_header(recipient.id))
+        assert ui_pending.status_code == 202
+
+        assert CompatibilityJobService.run_pending() >= 1
+
+        row = stored(db_session, requester_profile, recipient_profile)
+        assert row is not None
+        job = CompatibilityJobService.get_job(recipient_profile.id, requester_profile.id)
+        assert (job.status, job.attempts, job.notification) == ('done', 1, None)
+        push.assert_called_once_with(
+            requester_user_id=str(requester.id), acceptor_user_id=str(recipient.id), acceptor_name='Player'
+        )
+
+        done = client.get(f'/api/compatibility/{recipient.id}/{requester.id}', headers=get_auth_header(recipient.id))
+        assert done.status_code == 200
+        assert done.get_json()['overall_compatibility']['score'] == row.overall_percentage
+
+    def test_unclaimed_job_reported_as_stalled(self, client, db_session, players, push):
+        requester, requester_profile, recipient, recipient_profile = players
+        create_connection(db_session, requester, recipient).status = 'accepted'
+        job = CompatibilityJobService.enqueue(requester_profile, recipient_profile)
+        url = f'/api/compatibility/{recipient.id}/{requester.id}'
+
+        job.run_after = datetime.utcnow() + timedelta(seconds=30)  # Retry backoff
+        db_session.commit()
+        backoff = client.get(url, headers=get_auth_header(recipient.id))
+        assert backoff.status_code == 202
+        assert int(backoff.headers['Retry-After']) >= 30
+
+        job.run_after = datetime.utcnow() - timedelta(seconds=CompatibilityJobService.STALLED_AFTER_SECONDS + 1)
+        db_session.commit()
+        stalled = client.get(url, headers=get_auth_header(recipient.id))
+        assert stalled.status_code == 503
+        assert stalled.get_json()['status'] == 'stalled'
+
+        job.status = 'failed'
+        db_session.commit()
+        failed = client.get(f'{url}/ui', headers=get_auth_header(recipient.id))
+        assert failed.status_code == 503
+        assert failed.get_json()['status'] == 'failed'
+
+    def test_inline_mode(self, app, client, db_session, players, push, monkeypatch):
+        monkeypatch.setitem(app.config, 'COMPATIBILITY_JOBS_INLINE', True)
+        requester, requester_profile, recipient, recipient_profile = players
+        connection = create_connection(db_session, requester, recipient)
+
+        resp = accept(client, connection, recipient)
+
+        assert resp.get_json()['compatibility']['status'] == 'done'
+        assert stored(db_session, requester_profile, recipient_profile) is not None
+        push.assert_called_once()
+
+    def test_missing_profile_sends_push_inline(self, client, db_session, push):
+        requester, _ = create_player(db_session, PAIR['profile_a'])
+        recipient, _ = create_player(db_session)
+        connection = create_connection(db_session, requester, recipient)
+
+        resp = accept(client, connection, recipient)
+
+        assert resp.status_code == 200
+        assert resp.get_json()['compatibility'] is None
+        push.assert_called_once()
+
+
+class TestJobProcessing:
+    def test_enqueue_deduplicates_pair(self, db_session, players, push):
+        _, requester_profile, _, recipient_profile = players
+        first = CompatibilityJobService.enqueue(requester_profile, recipient_profile)
+        second = CompatibilityJobService.enqueue(recipient_profile, requester_profile)
+
+        assert first.id == second.id
+        assert second.requester_profile_id == recipient_profile.id
+        assert db_session.query(CompatibilityJob).filter_by(player_a_id=first.player_a_id).count() == 1
+
+    def test_finished_job_requeued(self, db_session, players, push):
+        _, requester_profile, _, recipient_profile = players
+        job = CompatibilityJobService.enqueue(requester_profile, recipient_profile)
+        CompatibilityJobService.run_pending()
+        assert job.status == 'done'
+
+        job = CompatibilityJobService.enqueue(requester_profile, recipient_profile)
+
+        assert (job.status, job.attempts, job.completed_at) == ('queued', 0, None)
+
+    def test_retry_then_fail(self, db_session, players, push, monkeypatch):
+        requester, requester_profile, _, recipient_profile = players
+        monkeypatch.setattr(compatibility_jobs, 'calculate_compatibility', lambda a, b: 1 / 0)
+        notification = {'requester_user_id': str(requester.id), 'acceptor_user_id': 'x', 'acceptor_name': 'X'}
+        job = CompatibilityJobService.enqueue(requester_profile, recipient_profile, notification)
+
+        CompatibilityJobService.run_pending()
+        assert (job.status, job.attempts) == ('queued', 1)
+        assert 'division by zero' in job.last_error
+        assert job.run_after > datetime.utcnow()
+        push.assert_called_once()  # Sent with the first attempt, not on retries
+
+        # Backoff: not due yet
+        assert job.id not in CompatibilityJobService.claim()
+
+        for attempt in (2, 3):
+            job.run_after = datetime.utcnow() - timedelta(seconds=1)
+            db_session.commit()
+            CompatibilityJobService.run_pending()
+            assert job.attempts == attempt
+
+        assert job.status == 'failed'
+        assert push.call_count == 1
+        assert stored(db_session, requester_profile, recipient_profile) is None
+
+    def test_stale_running_job_reclaimed(self, db_session, players, push):
+        _, requester_profile, _, recipient_profile = players
+        job = CompatibilityJobService.enqueue(requester_profile, recipient_profile)
+        assert job.id in CompatibilityJobService.claim()
+        assert job.id not in CompatibilityJobService.claim()
+
+        job.locked_at = datetime.utcnow() - CompatibilityJobService.STALE_LOCK - timedelta(seconds=1)
+        db_session.commit()
+
+        assert job.id in CompatibilityJobService.claim()
+        assert job.attempts == 2
+
+
+class TestFanout:
+    @pytest.fixture
+    def user_with_partners(self, db_session):
+        """User who requested one partner and was requested by another."""
+        user, user_profile = create_player(db_session, PAIR['profile_a'])
+        invited, invited_profile = create_player(db_session, PAIR['profile_b'])
+        inviter, inviter_profile = create_player(db_session, DIVERSE_TEST_PAIRS['pair_4_enthusiast_curious']['profile_a'])
+        for requester, recipient in ((user, invited), (inviter, user)):
+            connection = create_connection(db_session, requester, recipient)
+            connection.status = 'accepted'
+        db_session.commit()
+        return user, user_profile, [(user_profile, invited_profile), (inviter_profile, user_profile)]
+
+    def test_retake_rescores_all_partners(self, db_session, user_with_partners, monkeypatch):
+        from backend.src.compatibility import rescore
+        from backend.src.compatibility.calculator import calculate_compatibility
+
+        user, user_profile, pairs = user_with_partners
+        user_profile.boundaries = {'hard_limits': ['hardBoundaryImpact']}
+        db_session.commit()
+        batch_calls = []
+        real_many = rescore.calculate_compatibility_many
+        monkeypatch.setattr(rescore, 'calculate_compatibility_many',
+                            lambda a, partners: (batch_calls.append(len(partners)), real_many(a, partners))[1])
+
+        job = CompatibilityJobService.enqueue_fanout(user.id)
+        job.run_after = datetime.utcnow()
+        db_session.commit()
+        CompatibilityJobService.run_pending()
+
+        assert job.status == 'done'
+        assert sorted(batch_calls) == [1, 1]  # One batch per player A
+        for requester_profile, recipient_profile in pairs:
+            expected = calculate_compatibility(requester_profile.to_dict(), recipient_profile.to_dict())
+            row = stored(db_session, requester_profile, recipient_profile)
+            assert row.boundary_conflicts == expected['boundary_conflicts']
+            assert row.overall_percentage == expected['overall_compatibility']['score']
+
+    def test_retakes_debounced(self, db_session, user_with_partners):
+        user = user_with_partners[0]
+        first = CompatibilityJobService.enqueue_fanout(user.id)
+        first_run_after = first.run_after
+        second = CompatibilityJobService.enqueue_fanout(user.id)
+
+        assert first.id == second.id
+        assert second.run_after >= first_run_after > datetime.utcnow()
+        assert first.id not in CompatibilityJobService.claim(model=CompatibilityFanoutJob)
+
+    def test_retake_during_run_requeues(self, db_session, user_with_partners, monkeypatch):
+        user = user_with_partners[0]
+        job = CompatibilityJobService.enqueue_fanout(user.id)
+        job.run_after = datetime.utcnow()
+        db_session.commit()
+
+        real_rescore = compatibility_jobs.rescore_partners
+
+        def retaken_during_run(user_id):
+            CompatibilityJobService.enqueue_fanout(user_id)
+            return real_rescore(user_id)
+
+        monkeypatch.setattr(compatibility_jobs, 'rescore_partners', retaken_during_run)
+        CompatibilityJobService.run_pending()
+
+        assert (job.status, job.attempts) == ('queued', 0)
+        assert job.run_after > datetime.utcnow()
+
+    def test_inline_mode(self, app, db_session, user_with_partners, monkeypatch):
+        monkeypatch.setitem(app.config, 'COMPATIBILITY_JOBS_INLINE', True)
+        user, _, pairs = user_with_partners
+
+        assert CompatibilityJobService.enqueue_fanout(user.id).status == 'done'
+        assert all(stored(db_session, a, b) is not None for a, b in pairs)
+
+    def test_survey_submit_enqueues_fanout(self, client, db_session):
+        from backend.src.models.survey import SurveyProgress
+
+        user, _ = create_player(db_session)
+        db_session.add(SurveyProgress(user_id=user.id, survey_version='0.4', status='in_progress',
+                                      answers={}, completion_percentage=0, started_at=datetime.utcnow()))
+        db_session.commit()
+
+        with patch('backend.src.middleware.auth.jwt.decode', return_value={'sub': str(user.id)}), \
+             patch('backend.src.routes.survey_submit.calculate_profile', return_value=PAIR['profile_a']):
+            for retake in (False, True, True):
+                resp = client.post('/api/survey/submit', json={'survey_version': '0.4', 'answers': {'q1': 1},
+                                                               'retake': retake},
+                                   headers={'Authorization': 'Bearer test-token'})
+                assert resp.status_code == 200
+
+        jobs = db_session.query(CompatibilityFanoutJob).filter_by(user_id=user.id).all()
+        assert len(jobs) == 1
+        assert jobs[0].status == 'queued'
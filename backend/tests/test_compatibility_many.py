@@ -0,0 +1,203 @@
+"""
+Parity tests for the one-vs-many compatibility scorer
+(calculate_compatibility_many in src/compatibility/calculator.py).
+
+The batch scorer must return exactly what calculate_compatibility returns
+for every pair, and its unrounded components must match the scalar
+component functions.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from src.compatibility import calculator
+from src.compatibility.calculator import (
+    ACTIVITY_LAYOUT,
+    TRUTH_TOPIC_KEYS,
+    calculate_asymmetric_directional_jaccard,
+    calculate_compatibility,
+    calculate_compatibility_many,
+    calculate_domain_similarity,
+    calculate_power_complement,
+    calculate_same_pole_jaccard,
+    calculate_se_modifier,
+    calculate_sisc_modifier,
+    calculate_truth_overlap,
+)
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+
+ORIENTATIONS = ['Top', 'Bottom', 'Switch', 'Versatile', 'Versatile/Undefined', None, 'missing']
+ACTIVITY_VALUES = [0.0, 0.0, 0.3, 0.5, 0.5, 0.7, 0.8, 1.0, 1.0]
+AROUSAL_VALUES = [0.1, 0.3, 0.35, 0.5, 0.64, 0.65, 0.75, 0.9, 1]
+HARD_LIMITS = ['hardBoundaryImpact', 'anal_activities', 'hardBoundaryRecord', 'unmapped_limit']
+
+
+def _diverse_profiles():
+    return [pair[side] for pair in DIVERSE_TEST_PAIRS.values() for side in ('profile_a', 'profile_b')]
+
+
+def _random_profile(rng):
+    """Survey-shaped profile covering every branch of the scalar functions."""
+    power = {'intensity': rng.choice([0.0, 0.2, 0.5, 0.9, 1])}
+    orientation = rng.choice(ORIENTATIONS)
+    if orientation != 'missing':
+        power['orientation'] = orientation
+
+    categories = list(ACTIVITY_LAYOUT.items())
+    rng.shuffle(categories)  # JSONB does not keep the survey's category order
+    activities = {
+        category: {key: rng.choice(ACTIVITY_VALUES) for key in keys}
+        for category, keys in categories
+    }
+
+    scale = rng.choice([1, 100])
+    domains = {
+        domain: rng.choice([0, 0.2, 0.45, 0.5, 0.9, 1]) * scale
+        for domain in ('sensation', 'connection', 'power', 'exploration', 'verbal')
+        if rng.random() > 0.1
+    }
+
+    truth_topics = {topic: rng.choice([0.0, 0.5, 0.6, 1.0]) for topic in TRUTH_TOPIC_KEYS}
+    truth_topics['openness_score'] = 50
+
+    return {
+        'power_dynamic': power,
+        'arousal_propensity': {
+            'sexual_excitation': rng.choice(AROUSAL_VALUES),
+            'inhibition_consequence': rng.choice(AROUSAL_VALUES),
+        },
+        'activities': activities,
+        'domain_scores': domains,
+        'truth_topics': truth_topics,
+        'boundaries': {'hard_limits': rng.sample(HARD_LIMITS, rng.choice([0, 0, 0, 1, 2]))},
+    }
+
+
+@pytest.fixture(scope='module')
+def random_profiles():
+    rng = random.Random(12)
+    return [_random_profile(rng) for _ in range(120)]
+
+
+class TestResultParity:
+    def test_diverse_profiles(self):
+        profiles = _diverse_profiles()
+        for player_a in profiles:
+            expected = [calculate_compatibility(player_a, partner) for partner in profiles]
+            assert calculate_compatibility_many(player_a, profiles) == expected
+
+    def test_random_profiles(self, random_profiles):
+        for player_a in random_profiles[:40]:
+            expected = [calculate_compatibility(player_a, partner) for partner in random_profiles]
+            assert calculate_compatibility_many(player_a, random_profiles) == expected
+
+    def test_custom_weights(self, random_profiles):
+        weights = {'power': 0.3, 'domain': 0.2, 'activity': 0.3, 'truth': 0.2}
+        player_a = random_profiles[0]
+        expected = [calculate_compatibility(player_a, partner, weights) for partner in random_profiles]
+        assert calculate_compatibility_many(player_a, random_profiles, weights) == expected
+
+    def test_empty(self, random_profiles):
+        assert calculate_compatibility_many(random_profiles[0], []) == []
+
+
+class TestFallback:
+    def _off_layout(self, profile):
+        flat = dict(profile)
+        flat['activities'] = {**profile['activities'], 'extra': {'custom_give': 1.0, 'custom_receive': 1.0}}
+        return flat
+
+    def test_off_layout_partners_use_scalar(self, random_profiles, monkeypatch):
+        partners = random_profiles[:6]
+        partners[2] = self._off_layout(partners[2])
+        partners[4] = {**partners[4], 'activities': {'physical_touch': {'massage_give': 1.0}}}
+        partners[5] = {**partners[5], 'power_dynamic': {'orientation': 'Switch', 'intensity': None}}
+        expected = [calculate_compatibility(random_profiles[10], p) for p in partners]
+
+        scalar_calls = []
+        real = calculator.calculate_compatibility
+        monkeypatch.setattr(calculator, 'calculate_compatibility',
+                            lambda a, b, w=None: (scalar_calls.append(b), real(a, b, w))[1])
+
+        assert calculate_compatibility_many(random_profiles[10], partners) == expected
+        assert [id(b) for b in scalar_calls] == [id(partners[2]), id(partners[4]), id(partners[5])]
+
+    def test_off_layout_player_a(self, random_profiles):
+        player_a = self._off_layout(random_profiles[0])
+        expected = [calculate_compatibility(player_a, p) for p in random_profiles[:10]]
+        assert calculate_compatibility_many(player_a, random_profiles[:10]) == expected
+
+
+class TestComponentParity:
+    """Unrounded components against the scalar component functions."""
+
+    def _rows(self, profiles):
+        return np.array([calculator._encode_profile(p) for p in profiles], dtype=float)
+
+    def _activities(self, profiles):
+        return self._rows(profiles)[:, :calculator._N_ACTIVITIES]
+
+    def test_asymmetric_directional_jaccard(self, random_profiles):
+        tops, bottoms = random_profiles[:60], random_profiles[60:]
+        scores = calculator._asymmetric_directional_jaccard(self._activities(tops), self._activities(bottoms))
+        for i, (top, bottom) in enumerate(zip(tops, bottoms)):
+            for j, category in enumerate(ACTIVITY_LAYOUT):
+                expected = calculate_asymmetric_directional_jaccard(
+                    top['activities'][category], bottom['activities'][category]
+                )
+                assert scores[i, j] == expected
+
+    def test_same_pole_jaccard(self, random_profiles):
+        a, b = random_profiles[:60], random_profiles[60:]
+        scores = calculator._same_pole_jaccard(self._activities(a), self._activities(b))
+        for i, (pa, pb) in enumerate(zip(a, b)):
+            for j, category in enumerate(ACTIVITY_LAYOUT):
+                expected = calculate_same_pole_jaccard(pa['activities'][category], pb['activities'][category])
+                # Scalar adds 0.3 credits in set order, the batch in key order
+                assert scores[i, j] == pytest.approx(expected, abs=1e-12)
+
+    @pytest.mark.parametrize("player_index", range(8))
+    def test_scalar_components(self, random_profiles, player_index):
+        player_a = random_profiles[player_index]
+        partners = random_profiles
+        a = np.array(calculator._encode_profile(player_a), dtype=float)
+        rows = self._rows(partners)
+        power_a = player_a['power_dynamic']
+        orientations = [p['power_dynamic'].get('orientation', 'Switch') for p in partners]
+        orientation_a = power_a.get('orientation', 'Switch')
+        top_bottom = np.array([{orientation_a, o} == {'Top', 'Bottom'} for o in orientations])
+        same_pole = np.array([orientation_a in ('Top', 'Bottom') and o == orientation_a for o in orientations])
+
+        power = calculator._power_complement(power_a, orientations, rows[:, calculator._INTENSITY_COLUMN])
+        domain = calculator._domain_similarity(
+            a[calculator._DOMAIN_COLUMNS], rows[:, calculator._DOMAIN_COLUMNS], top_bottom, same_pole
+        )
+        truth = calculator._truth_overlap(a[calculator._TRUTH_COLUMNS], rows[:, calculator._TRUTH_COLUMNS])
+        se = calculator._se_modifier(a[calculator._SE_COLUMN], rows[:, calculator._SE_COLUMN])
+        sisc = calculator._sisc_modifier(a[calculator._SISC_COLUMN], rows[:, calculator._SISC_COLUMN])
+
+        arousal_a = player_a['arousal_propensity']
+        for i, partner in enumerate(partners):
+            assert power[i] == calculate_power_complement(power_a, partner['power_dynamic'])
+            assert domain[i] == calculate_domain_similarity(
+                player_a['domain_scores'], partner['domain_scores'], power_a, partner['power_dynamic']
+            )
+            assert truth[i] == calculate_truth_overlap(player_a['truth_topics'], partner['truth_topics'])
+            arousal_b = partner['arousal_propensity']
+            assert se[i] == calculate_se_modifier(arousal_a['sexual_excitation'], arousal_b['sexual_excitation'])
+            assert sisc[i] == calculate_sisc_modifier(
+                arousal_a['inhibition_consequence'], arousal_b['inhibition_consequence']
+            )
+
+    def test_every_orientation_as_player_a(self, random_profiles):
+        """Power/domain parity for each orientation of player A."""
+        partners = random_profiles
+        for orientation in ORIENTATIONS:
+            player_a = dict(random_profiles[0])
+            player_a['power_dynamic'] = {'intensity': 0.7}
+            if orientation != 'missing':
+                player_a['power_dynamic']['orientation'] = orientation
+            expected = [calculate_compatibility(player_a, p) for p in partners]
+            assert calculate_compatibility_many(player_a, partners) == expected
@@ -0,0 +1,223 @@
+"""
+Tests for the bulk compatibility re-score engine (src/compatibility/rescore.py)
+and the compatibility_results upsert it writes through.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.src.compatibility import rescore
+from backend.src.compatibility.calculator import COMPATIBILITY_VERSION, calculate_compatibility
+from backend.src.compatibility.rescore import rescore_compatibility
+from backend.src.db import repository
+from backend.src.db.repository import compatibility_row, upsert_compatibility_rows
+from backend.src.models.compatibility import Compatibility
+from backend.src.models.partner import PartnerConnection
+from backend.src.models.profile import Profile
+from backend.src.models.survey import SurveySubmission
+from backend.src.models.user import User
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+SCORE_COLUMNS = ('overall_score', 'overall_percentage', 'interpretation', 'breakdown', 'mutual_activities',
+                 'growth_opportunities', 'mutual_truth_topics', 'blocked_activities', 'boundary_conflicts',
+                 'calculation_version')
+
+
+def create_profile(db_session, data):
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:10]}@example.com", auth_provider='email')
+    submission = SurveySubmission(submission_id=f"rescore_{uuid.uuid4()}", payload_json={})
+    db_session.add_all([user, submission])
+    db_session.flush()
+    profile = Profile(user_id=user.id, submission_id=submission.submission_id, **data)
+    db_session.add(profile)
+    db_session.commit()
+    return profile
+
+
+def connect(db_session, requester, recipient, status='accepted'):
+    connection = PartnerConnection(
+        requester_user_id=requester.user_id,
+        recipient_email=f"{uuid.uuid4().hex[:10]}@example.com",
+        recipient_user_id=recipient.user_id,
+        status=status,
+        connection_token=str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + timedelta(days=1)
+    )
+    db_session.add(connection)
+    db_session.commit()
+    return connection
+
+
+@pytest.fixture
+def couples(db_session):
+    """(requester, recipient, connection) for each diverse test pair."""
+    result = []
+    for pair in list(DIVERSE_TEST_PAIRS.values())[:6]:
+        requester = create_profile(db_session, pair['profile_a'])
+        recipient = create_profile(db_session, pair['profile_b'])
+        result.append((requester, recipient, connect(db_session, requester, recipient)))
+    return result
+
+
+def stored(db_session, requester, recipient):
+    pair = Compatibility.get_or_create_key(requester.id, recipient.id)
+    return db_session.query(Compatibility).filter_by(player_a_id=pair[0], player_b_id=pair[1]).one_or_none()
+
+
+def scores(row):
+    return {column: getattr(row, column) for column in SCORE_COLUMNS}
+
+
+class TestRescore:
+    def test_rows_match_calculator(self, db_session, couples):
+        stats = rescore_compatibility(chunk_size=4)
+
+        assert stats['errors'] == 0
+        for requester, recipient, _ in couples:
+            expected = compatibility_row(
+                requester.id, recipient.id, calculate_compatibility(requester.to_dict(), recipient.to_dict())
+            )
+            row = stored(db_session, requester, recipient)
+            assert scores(row) == {column: expected[column] for column in SCORE_COLUMNS}
+            assert row.calculation_version == COMPATIBILITY_VERSION
+
+    def test_pending_and_profileless_connections_skipped(self, db_session, couples):
+        requester, recipient, _ = couples[0]
+        loner = create_profile(db_session, DIVERSE_TEST_PAIRS['pair_1_perfect_match']['profile_a'])
+        connect(db_session, requester, loner, status='pending')
+        user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:10]}@example.com", auth_provider='email')
+        db_session.add(user)
+        db_session.add(PartnerConnection(
+            requester_user_id=recipient.user_id, recipient_email=user.email, recipient_user_id=user.id,
+            status='accepted', connection_token=str(uuid.uuid4()), expires_at=datetime.utcnow() + timedelta(days=1)
+        ))
+        db_session.commit()
+
+        stats = rescore_compatibility()
+
+        assert stored(db_session, requester, loner) is None
+        assert stats['skipped'] >= 1
+
+    def test_only_stale(self, db_session, couples):
+        rescore_compatibility()
+        fresh_at = datetime.utcnow() + timedelta(hours=1)
+        db_session.query(Compatibility).update({'created_at': fresh_at})
+        (old_version, _, _), (updated_a, _, _), (_, updated_b, _), (fresh, fresh_partner, _) = couples[:4]
+        stored(db_session, old_version, couples[0][1]).calculation_version = '0.6'
+        updated_a.updated_at = fresh_at + timedelta(hours=1)
+        updated_b.updated_at = fresh_at + timedelta(hours=1)
+        db_session.commit()
+
+        stats = rescore_compatibility(mode='stale')
+
+        for requester, recipient, _ in couples[:3]:
+            row = stored(db_session, requester, recipient)
+            assert row.created_at != fresh_at
+            assert row.calculation_version == COMPATIBILITY_VERSION
+        assert stored(db_session, fresh, fresh_partner).created_at == fresh_at
+        assert stats['up_to_date'] >= 3
+
+    def test_missing_only(self, db_session, couples):
+        rescore_compatibility()
+        db_session.query(Compatibility).update({'calculation_version': '0.6'})
+        requester, recipient, _ = couples[0]
+        db_session.delete(stored(db_session, requester, recipient))
+        db_session.commit()
+
+        rescore_compatibility(mode='missing')
+
+        assert stored(db_session, requester, recipient).calculation_version == COMPATIBILITY_VERSION
+        for requester, recipient, _ in couples[1:]:
+            assert stored(db_session, requester, recipient).calculation_version == '0.6'
+
+    def test_unknown_mode(self, db_session):
+        with pytest.raises(ValueError):
+            rescore_compatibility(mode='everything')
+
+    def test_resume_after_failed_chunk(self, db_session, couples, tmp_path, monkeypatch):
+        checkpoint = tmp_path / 'rescore.json'
+        real_upsert = rescore.upsert_compatibility_rows
+        calls = []
+
+        def failing_upsert(rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            real_upsert(rows)
+
+        monkeypatch.setattr(rescore, 'upsert_compatibility_rows', failing_upsert)
+        with pytest.raises(RuntimeError):
+            rescore_compatibility(chunk_size=2, checkpoint_path=str(checkpoint))
+
+        saved = json.loads(checkpoint.read_text())
+        assert saved['calculation_version'] == COMPATIBILITY_VERSION
+        done = [c for c in couples if c[2].id <= saved['last_connection_id']]
+        pending = [c for c in couples if c[2].id > saved['last_connection_id']]
+        assert pending
+        assert all(stored(db_session, a, b) is None for a, b, _ in pending)
+
+        resumed = []
+        monkeypatch.setattr(rescore, 'upsert_compatibility_rows', lambda rows: (resumed.extend(rows), real_upsert(rows)))
+        rescore_compatibility(chunk_size=2, checkpoint_path=str(checkpoint), resume=True)
+
+        assert all(stored(db_session, a, b) is not None for a, b, _ in couples)
+        assert not checkpoint.exists()
+        # Committed chunks are not scored again
+        first_chunk = {Compatibility.get_or_create_key(a.id, b.id) for a, b, _ in done}
+        assert not first_chunk & {(row['player_a_id'], row['player_b_id']) for row in resumed}
+
+    def test_process_pool_matches_inline(self, db_session, couples):
+        rescore_compatibility()
+        inline = {(a.id, b.id): scores(stored(db_session, a, b)) for a, b, _ in couples}
+        db_session.query(Compatibility).delete()
+        db_session.commit()
+
+        stats = rescore_compatibility(workers=2, chunk_size=3)
+
+        assert stats['errors'] == 0
+        assert {(a.id, b.id): scores(stored(db_session, a, b)) for a, b, _ in couples} == inline
+
+    def test_bad_profile_isolated(self, db_session, couples):
+        requester, recipient, _ = couples[0]
+        recipient.domain_scores = {**recipient.domain_scores, 'sensation': 'high'}
+        db_session.commit()
+
+        stats = rescore_compatibility()
+
+        assert stats['errors'] >= 1
+        assert stored(db_session, requester, recipient) is None
+        for requester, recipient, _ in couples[1:]:
+            assert stored(db_session, requester, recipient) is not None
+
+
+class TestUpsertCompatibilityRows:
+    @pytest.fixture(params=['on_conflict', 'fallback'])
+    def upsert_path(self, request, monkeypatch):
+        if request.param == 'fallback':
+            monkeypatch.setattr(repository, '_ON_CONFLICT_DIALECTS', {})
+        return request.param
+
+    def test_insert_then_update(self, db_session, upsert_path):
+        pair = DIVERSE_TEST_PAIRS['pair_1_perfect_match']
+        a = create_profile(db_session, pair['profile_a'])
+        b = create_profile(db_session, pair['profile_b'])
+        result = calculate_compatibility(pair['profile_a'], pair['profile_b'])
+
+        # Reversed ids are stored low-high; a repeated pair keeps the last row
+        upsert_compatibility_rows([compatibility_row(b.id, a.id, result), compatibility_row(a.id, b.id, result)])
+        assert stored(db_session, a, b).overall_percentage == result['overall_compatibility']['score']
+
+        result['overall_compatibility']['score'] = 12
+        upsert_compatibility_rows([compatibility_row(a.id, b.id, result)])
+
+        rows = db_session.query(Compatibility).filter(Compatibility.player_a_id.in_([a.id, b.id])).all()
+        assert len(rows) == 1
+        db_session.refresh(rows[0])
+        assert (rows[0].player_a_id, rows[0].player_b_id) == (a.id, b.id)
+        assert rows[0].overall_percentage == 12
+        assert rows[0].overall_score == 0.12
+
+    def test_empty(self, db_session, upsert_path):
+        upsert_compatibility_rows([])
@@ -0,0 +1,174 @@
+"""
+Tests for the content-addressed survey compatibility cache
+(src/compatibility/result_cache.py) and its ETag handling in
+GET /api/survey/compatibility/<source_id>/<target_id>.
+"""
+import os
+import uuid
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from backend.src.compatibility import calculator, result_cache
+from backend.src.models.compatibility_result_cache import CompatibilityResultCache
+from backend.src.models.survey import SurveySubmission
+from backend.src.models.user import User
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+PAIR = DIVERSE_TEST_PAIRS['pair_3_kink_complementary']
+
+
+def get_auth_header(user_id):
+    """Generate a valid JWT auth header for testing."""
+    secret = os.environ.get('SUPABASE_JWT_SECRET', 'test-secret-key')
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, secret, algorithm="HS256")
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_cache():
+    result_cache.clear_memory_cache()
+    yield
+    result_cache.clear_memory_cache()
+
+
+@pytest.fixture
+def calculations(monkeypatch):
+    calls = []
+    real = calculator.calculate_compatibility
+    monkeypatch.setattr(calculator, 'calculate_compatibility', lambda a, b: (calls.append(1), real(a, b))[1])
+    return calls
+
+
+@pytest.fixture
+def submissions(db_session):
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:10]}@example.com", auth_provider='email')
+    db_session.add(user)
+    source = SurveySubmission(submission_id=f"cache_{uuid.uuid4()}", user_id=user.id,
+                              payload_json={'derived': PAIR['profile_a']})
+    target = SurveySubmission(submission_id=f"cache_{uuid.uuid4()}", payload_json={'derived': PAIR['profile_b']})
+    db_session.add_all([source, target])
+    db_session.commit()
+    return user, source, target
+
+
+def get(client, user, source, target, etag=None):
+    headers = get_auth_header(user.id)
+    if etag:
+        headers['If-None-Match'] = f'"{etag}"'
+    return client.get(f'/api/survey/compatibility/{source.submission_id}/{target.submission_id}', headers=headers)
+
+
+class TestSurveyCompatibilityCache:
+    def test_repeat_views_served_from_cache(self, client, submissions, calculations):
+        user, source, target = submissions
+
+        first = get(client, user, source, target)
+        second = get(client, user, source, target)
+
+        assert first.status_code == second.status_code == 200
+        assert len(calculations) == 1
+        assert first.get_json() == second.get_json() == calculator.calculate_compatibility(
+            PAIR['profile_a'], PAIR['profile_b']
+        )
+        etag, weak = first.get_etag()
+        assert not weak and etag == second.get_etag()[0]
+        assert 'no-cache' in first.headers['Cache-Control']
+
+    def test_if_none_match_returns_304(self, client, submissions, calculations):
+        user, source, target = submissions
+        etag = get(client, user, source, target).get_etag()[0]
+        result_cache.clear_memory_cache()
+
+        resp = get(client, user, source, target, etag=etag)
+
+        assert resp.status_code == 304
+        assert resp.get_etag()[0] == etag
+        assert resp.data == b''
+        assert len(calculations) == 1
+
+    def test_changed_payload_changes_key(self, client, db_session, submissions, calculations):
+        user, source, target = submissions
+        etag = get(client, user, source, target).get_etag()[0]
+
+        target.payload_json = {'derived': DIVERSE_TEST_PAIRS['pair_6a_top_top_conflict']['profile_b']}
+        db_session.commit()
+        resp = get(client, user, source, target, etag=etag)
+
+        assert resp.status_code == 200
+        assert resp.get_etag()[0] != etag
+        assert len(calculations) == 2
+
+    def test_version_in_key(self, submissions, monkeypatch):
+        _, source, target = submissions
+        inputs = (result_cache.submission_input(source.submission_id, source.payload_json),
+                  result_cache.submission_input(target.submission_id, target.payload_json))
+        key = result_cache.cache_key(*inputs)
+        monkeypatch.setattr(result_cache, 'COMPATIBILITY_VERSION', '9.9')
+        assert result_cache.cache_key(*inputs) != key
+        assert result_cache.cache_key(inputs[1], inputs[0]) != result_cache.cache_key(*inputs)
+
+    def test_scoring_version_in_answers_key(self, monkeypatch):
+        answers = {'answers': {'A1': 5}}
+        derived = {'derived': PAIR['profile_a']}
+        before = (result_cache.submission_input('s1', answers), result_cache.submission_input('s2', derived))
+        monkeypatch.setattr(result_cache, 'SCORING_VERSION', '99')
+        assert result_cache.submission_input('s1', answers) != before[0]
+        assert result_cache.submission_input('s2', derived) == before[1]
+
+    def test_payload_hash_ignores_key_order(self):
+        a = {'x': 1, 'y': {'b': 2, 'a': 1}}
+        b = {'y': {'a': 1, 'b': 2}, 'x': 1}
+        assert result_cache.payload_hash(a) == result_cache.payload_hash(b)
+
+    def test_database_tier_shared_across_processes(self, client, db_session, submissions, calculations):
+        user, source, target = submissions
+        etag = get(client, user, source, target).get_etag()[0]
+        row = db_session.get(CompatibilityResultCache, etag)
+        assert row.calculation_version == calculator.COMPATIBILITY_VERSION
+
+        result_cache.clear_memory_cache()  # As seen from another worker process
+        resp = get(client, user, source, target)
+
+        assert resp.status_code == 200
+        assert resp.get_json() == row.result
+        assert len(calculations) == 1
+
+    def test_database_tier_optional(self, client, db_session, submissions, calculations, monkeypatch):
+        monkeypatch.setattr(result_cache, '_db_tier_enabled', lambda: False)
+        user, source, target = submissions
+        etag = get(client, user, source, target).get_etag()[0]
+        assert db_session.get(CompatibilityResultCache, etag) is None
+
+        result_cache.clear_memory_cache()
+        get(client, user, source, target)
+        assert len(calculations) == 2
+
+    def test_memory_tier_bounded(self, monkeypatch):
+        monkeypatch.setattr(result_cache, '_cache_size', lambda: 2)
+        monkeypatch.setattr(result_cache, '_db_tier_enabled', lambda: False)
+        for key in ('a', 'b', 'c'):
+            result_cache.store_result(key, {'key': key})
+        assert result_cache.get_cached_result('a') is None
+        assert result_cache.get_cached_result('c') == {'key': 'c'}
+
+    def test_missing_derived_profiles_calculated_once(self, client, db_session, submissions):
+        user, source, target = submissions
+        source.payload_json = {'answers': {'q1': 1}}
+        db_session.commit()
+
+        with patch('backend.src.routes.survey.calculate_profile', return_value=PAIR['profile_a']) as mock_profile:
+            assert get(client, user, source, target).status_code == 200
+            assert get(client, user, source, target).status_code == 200
+
+        assert mock_profile.call_count == 1
+
+    def test_authorization_checked_before_304(self, client, submissions):
+        user, source, target = submissions
+        etag = get(client, user, source, target).get_etag()[0]
+        stranger = User(id=uuid.uuid4(), email="x@example.com")
+
+        resp = get(client, stranger, source, target, etag=etag)
+
+        assert resp.status_code == 403
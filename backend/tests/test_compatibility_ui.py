@@ -12,7 +12,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 # Set test environment variables before importing the app
 os.environ.setdefault('SUPABASE_JWT_SECRET', 'test-secret-key')
 
-from src.routes.compatibility import compatibility_bp, _compare_interests
+from src.routes.compatibility import compatibility_bp
+from src.compatibility.ui_payload import compare_interests as _compare_interests
 # Note: We will import _compare_interests after implementing it, for now we mock or test logic units if possible.
 # Actually, since I haven't implemented it yet, I can't import it. 
 # I will write the test to hit the endpoint and mock the dependencies.
@@ -39,7 +40,7 @@ class TestInterestLogic(unittest.TestCase):
     def test_smart_matching_giving_receiving(self):
         """Test that 'Massage (Giving)' and 'Massage (Receiving)' match."""
         # Logic to be implemented in _compare_interests
-        from src.routes.compatibility import _compare_interests
+        from src.compatibility.ui_payload import compare_interests as _compare_interests
         
         user_acts = {'massage_give': 1.0}
         partner_acts = {'massage_receive': 1.0}
@@ -67,10 +68,10 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
         self.p_id = uuid.uuid4()
 
     @patch('src.routes.compatibility.User')
-    @patch('src.routes.compatibility.Profile')
+    @patch('src.routes.compatibility.get_current_profiles')
     @patch('src.routes.compatibility.Compatibility')
-    @patch('src.routes.compatibility.PartnerConnection')
-    def test_ui_structure_and_order(self, mock_conn, mock_compat, mock_profile, mock_user):
+    @patch('src.routes.compatibility.PartnerAdjacencyService')
+    def test_ui_structure_and_order(self, mock_adjacency, mock_compat, mock_profile, mock_user):
         # Create a valid JWT token for authentication
         token = jwt.encode(
             {"sub": str(self.u_id), "aud": "authenticated"},
@@ -80,7 +81,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
         auth_header = {'Authorization': f'Bearer {token}'}
 
         # Mock Connection
-        mock_conn.query.filter.return_value.filter_by.return_value.first.return_value = StubModel(status='accepted')
+        mock_adjacency.are_partners.return_value = True
         
         # Mock Users
         u_user = StubModel(id=self.u_id, display_name="User", profile_sharing_setting="all_responses")
@@ -111,21 +112,13 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
             created_at='2023-01-01'
         )
         
-        # Setup mocking chain: Profile.query... -> first()
-        # We need to handle the chain carefully
-        # query.filter_by().order_by().first()
-        
-        # Mock chained return
-        mock_query_u = MagicMock()
-        mock_query_u.order_by.return_value.first.return_value = u_profile
-        
-        mock_query_p = MagicMock()
-        mock_query_p.order_by.return_value.first.return_value = p_profile
-
-        mock_profile.query.filter_by.side_effect = lambda user_id: mock_query_u if user_id == self.u_id else mock_query_p
+        # Current profiles, keyed by user id
+        mock_profile.return_value = {self.u_id: u_profile, self.p_id: p_profile}
 
         # Mock Compatibility
         mock_compat_rec = StubModel(
+            id=1,
+            version=1,
             overall_percentage=85,
             interpretation="Great",
             created_at=MagicMock(isoformat=lambda: "2023-01-01"),
@@ -214,7 +207,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
 
     def test_logic_refinements(self):
         """Test specific edge cases for logic refinements."""
-        from src.routes.compatibility import _compare_interests
+        from src.compatibility.ui_payload import compare_interests as _compare_interests
         
         # Setup Data
         u_acts = {
@@ -258,7 +251,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
 
     def test_compatible_field_cross_match(self):
         """Test compatible=True when give/receive cross-match (complementary roles)."""
-        from src.routes.compatibility import _compare_interests
+        from src.compatibility.ui_payload import compare_interests as _compare_interests
         
         # User wants to give, Partner wants to receive - perfect complement
         u_acts = {'physical_touch': {'massage_give': 1.0}}
@@ -274,7 +267,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
 
     def test_compatible_field_same_role(self):
         """Test compatible=False when both want same role (both givers, no receiver)."""
-        from src.routes.compatibility import _compare_interests
+        from src.compatibility.ui_payload import compare_interests as _compare_interests
         
         # Both want to give, neither wants to receive - not compatible
         u_acts = {'physical_touch': {'massage_give': 1.0}}
@@ -290,7 +283,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
 
     def test_compatible_field_non_directional(self):
         """Test compatible=mutual for non-directional activities."""
-        from src.routes.compatibility import _compare_interests
+        from src.compatibility.ui_payload import compare_interests as _compare_interests
         
         # Non-directional activity - both want it
         u_acts = {'physical_touch': {'kissing': 1.0}}
@@ -306,7 +299,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
 
     def test_compatible_field_conflict(self):
         """Test compatible=False when there's a hard limit conflict."""
-        from src.routes.compatibility import _compare_interests
+        from src.compatibility.ui_payload import compare_interests as _compare_interests
         
         # User wants to give, but partner has hard limit
         u_acts = {'physical_touch': {'spanking_give': 1.0}}
@@ -322,10 +315,10 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
         self.assertFalse(spanking['compatible'], "Conflict should never be compatible")
 
     @patch('src.routes.compatibility.User')
-    @patch('src.routes.compatibility.Profile')
+    @patch('src.routes.compatibility.get_current_profiles')
     @patch('src.routes.compatibility.Compatibility')
-    @patch('src.routes.compatibility.PartnerConnection')
-    def test_partner_profile_power_data_regression(self, mock_conn, mock_compat, mock_profile, mock_user):
+    @patch('src.routes.compatibility.PartnerAdjacencyService')
+    def test_partner_profile_power_data_regression(self, mock_adjacency, mock_compat, mock_profile, mock_user):
         """
         Regression test for bug where partner_profile.general.power showed the
         authenticated user's data instead of the partner's data when the URL
@@ -348,7 +341,7 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
         auth_header = {'Authorization': f'Bearer {token}'}
 
         # Mock Connection (accepts both directions)
-        mock_conn.query.filter.return_value.filter_by.return_value.first.return_value = StubModel(status='accepted')
+        mock_adjacency.are_partners.return_value = True
 
         # Mock Users - User B is the "partner" we want to see
         user_a = StubModel(id=user_a_id, display_name="UserA", profile_sharing_setting="all_responses")
@@ -381,25 +374,13 @@ class TestCompatibilityUIIntegration(unittest.TestCase):
             created_at='2023-01-01'
         )
 
-        # Setup profile query mock
-        mock_query_a = MagicMock()
-        mock_query_a.order_by.return_value.first.return_value = profile_a
-
-        mock_query_b = MagicMock()
-        mock_query_b.order_by.return_value.first.return_value = profile_b
-
-        def profile_filter_by(**kwargs):
-            user_id = kwargs.get('user_id')
-            if user_id == user_a_id:
-                return mock_query_a
-            elif user_id == user_b_id:
-                return mock_query_b
-            return MagicMock()
-
-        mock_profile.query.filter_by.side_effect = profile_filter_by
+        # Current profiles, keyed by user id
+        mock_profile.return_value = {user_a_id: profile_a, user_b_id: profile_b}
 
         # Mock Compatibility
         mock_compat_rec = StubModel(
+            id=1,
+            version=1,
             overall_percentage=85,
             interpretation="Great",
             created_at=MagicMock(isoformat=lambda: "2023-01-01"),
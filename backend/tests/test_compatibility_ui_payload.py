@@ -0,0 +1,241 @@
+"""
+Tests for materialized compatibility UI payloads (src/compatibility/ui_payload.py)
+served by GET /api/compatibility/<user_id>/<partner_id>/ui.
+"""
+import os
+import uuid
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+
+from backend.src.compatibility import ui_payload
+from backend.src.compatibility.calculator import calculate_compatibility
+from backend.src.db.repository import compatibility_row, upsert_compatibility_rows
+from backend.src.models.compatibility import Compatibility
+from backend.src.models.compatibility_ui_payload import CompatibilityUIPayload
+from backend.src.models.profile import Profile
+from backend.src.models.survey import SurveySubmission
+from backend.src.models.user import User
+from backend.src.services.compatibility_jobs import CompatibilityJobService
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+PAIR = DIVERSE_TEST_PAIRS['pair_3_kink_complementary']
+
+
+def get_auth_header(user_id):
+    """Generate a valid JWT auth header for testing."""
+    secret = os.environ.get('SUPABASE_JWT_SECRET', 'test-secret-key')
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, secret, algorithm="HS256")
+    return {'Authorization': f'Bearer {token}'}
+
+
+def create_player(db_session, profile_data, sharing='all_responses'):
+    user = User(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex[:10]}@example.com",
+        display_name="Player",
+        auth_provider='email',
+        profile_sharing_setting=sharing
+    )
+    db_session.add(user)
+    submission = SurveySubmission(submission_id=f"ui_{uuid.uuid4()}", payload_json={})
+    db_session.add(submission)
+    db_session.flush()
+    profile = Profile(user_id=user.id, submission_id=submission.submission_id, **profile_data)
+    db_session.add(profile)
+    db_session.commit()
+    return user, profile
+
+
+def score(profile_a, profile_b):
+    result = calculate_compatibility(profile_a.to_dict(), profile_b.to_dict())
+    upsert_compatibility_rows([compatibility_row(profile_a.id, profile_b.id, result)])
+
+
+@pytest.fixture
+def pair(db_session):
+    user_a, profile_a = create_player(db_session, PAIR['profile_a'])
+    user_b, profile_b = create_player(db_session, PAIR['profile_b'])
+    return user_a, profile_a, user_b, profile_b
+
+
+def get_ui(client, viewer, partner, etag=None):
+    headers = get_auth_header(viewer.id)
+    if etag:
+        headers['If-None-Match'] = f'"{etag}"'
+    return client.get(f'/api/compatibility/{viewer.id}/{partner.id}/ui', headers=headers)
+
+
+def payload_rows(db_session):
+    return db_session.query(CompatibilityUIPayload).all()
+
+
+class TestWriteThrough:
+    def test_scoring_materializes_both_viewers(self, db_session, pair):
+        user_a, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+
+        rows = {(row.viewer_user_id, row.partner_user_id): row for row in payload_rows(db_session)}
+        record = Compatibility.query.filter_by(player_a_id=profile_a.id, player_b_id=profile_b.id).one()
+
+        assert set(rows) == {(user_a.id, user_b.id), (user_b.id, user_a.id)}
+        row = rows[(user_a.id, user_b.id)]
+        assert (row.compatibility_id, row.record_version) == (record.id, 1)
+        assert row.payload == ui_payload.build_payload(record, profile_a, profile_b, user_b)
+
+    def test_rescore_bumps_record_version(self, db_session, pair):
+        _, profile_a, _, profile_b = pair
+        score(profile_a, profile_b)
+        score(profile_a, profile_b)
+
+        record = Compatibility.query.filter_by(player_a_id=profile_a.id, player_b_id=profile_b.id).one()
+        assert record.version == 2
+        assert {row.record_version for row in payload_rows(db_session)} == {2}
+
+    def test_superseded_profile_not_materialized(self, db_session, pair):
+        user_a, profile_a, _, profile_b = pair
+        submission = SurveySubmission(submission_id=f"ui_{uuid.uuid4()}", payload_json={})
+        db_session.add(submission)
+        db_session.flush()
+        db_session.add(Profile(user_id=user_a.id, submission_id=submission.submission_id, **PAIR['profile_a']))
+        db_session.commit()
+
+        score(profile_a, profile_b)
+
+        assert payload_rows(db_session) == []
+
+    def test_sharing_setting_written_through(self, client, db_session, pair):
+        user_a, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+
+        resp = client.put('/api/profile-sharing/settings', json={'profile_sharing_setting': 'demographics_only'},
+                          headers=get_auth_header(user_b.id))
+
+        assert resp.status_code == 200
+        settings = {row.partner_user_id: row.sharing_setting for row in payload_rows(db_session)}
+        assert settings == {user_b.id: 'demographics_only', user_a.id: 'all_responses'}
+
+    @pytest.mark.parametrize('rename', [
+        lambda client, user: client.put(f'/users/{user.id}', json={'display_name': 'Renamed'},
+                                        headers=get_auth_header(user.id)),
+        lambda client, user: client.post('/api/auth/complete-demographics', json={
+            'name': 'Renamed', 'has_vagina': True, 'likes_penis': True
+        }, headers=get_auth_header(user.id)),
+    ], ids=['update_user', 'complete_demographics'])
+    def test_display_name_written_through(self, client, db_session, pair, rename):
+        user_a, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+        etag = get_ui(client, user_a, user_b).get_etag()[0]
+
+        assert rename(client, user_b).status_code == 200
+
+        names = {row.partner_user_id: row.partner_display_name for row in payload_rows(db_session)}
+        assert names[user_b.id] == 'Renamed'
+        resp = get_ui(client, user_a, user_b, etag=etag)
+        assert resp.status_code == 200
+        assert resp.get_etag()[0] != etag
+
+    def test_profile_rewrite_drops_payloads(self, app, db_session, pair):
+        user_a, profile_a, _, profile_b = pair
+        score(profile_a, profile_b)
+
+        with patch.dict(app.config, {'COMPATIBILITY_JOBS_INLINE': False}):
+            CompatibilityJobService.enqueue_fanout(user_a.id)
+
+        assert payload_rows(db_session) == []
+
+
+class TestEndpoint:
+    def test_served_from_materialized_row(self, client, pair):
+        user_a, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+        expected = get_ui(client, user_a, user_b).get_json()
+
+        # The hot path never touches users, profiles or the record
+        unavailable = MagicMock(side_effect=AssertionError('not materialized'))
+        with patch('backend.src.routes.compatibility.User', unavailable), \
+                patch('backend.src.routes.compatibility.get_current_profiles', unavailable), \
+                patch('backend.src.routes.compatibility.Compatibility', unavailable):
+            resp = get_ui(client, user_a, user_b)
+
+        assert resp.status_code == 200
+        assert resp.get_json() == expected
+        assert expected['partner_profile']['user_id'] == str(user_b.id)
+
+    def test_etag_and_304(self, client, pair):
+        user_a, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+        etag, weak = get_ui(client, user_a, user_b).get_etag()
+        assert etag and not weak
+
+        resp = get_ui(client, user_a, user_b, etag=etag)
+        assert resp.status_code == 304
+        assert resp.data == b''
+
+        score(profile_a, profile_b)
+        resp = get_ui(client, user_a, user_b, etag=etag)
+        assert resp.status_code == 200
+        assert resp.get_etag()[0] != etag
+
+    def test_sharing_change_changes_etag_and_projection(self, client, pair):
+        user_a, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+        etag = get_ui(client, user_a, user_b).get_etag()[0]
+
+        client.put('/api/profile-sharing/settings', json={'profile_sharing_setting': 'demographics_only'},
+                   headers=get_auth_header(user_b.id))
+        resp = get_ui(client, user_a, user_b, etag=etag)
+
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['compatibility_summary']['sharing_setting'] == 'demographics_only'
+        assert all(d['partner_score'] == 0 for d in data['comparison_data']['domains'])
+        assert data['comparison_data']['power_overlap']['partner_label'] == 'Hidden'
+        assert data['interests_comparison'] == []
+
+    def test_missing_row_rebuilt_on_view(self, client, db_session, pair):
+        user_a, profile_a, user_b, profile_b = pair
+        result = calculate_compatibility(profile_a.to_dict(), profile_b.to_dict())
+        db_session.add(Compatibility(**compatibility_row(profile_a.id, profile_b.id, result)))
+        db_session.commit()
+        assert payload_rows(db_session) == []
+
+        resp = get_ui(client, user_b, user_a)
+
+        assert resp.status_code == 200
+        rows = payload_rows(db_session)
+        assert [(row.viewer_user_id, row.partner_user_id) for row in rows] == [(user_b.id, user_a.id)]
+        assert resp.get_etag()[0] == ui_payload.payload_etag(rows[0])
+
+    def test_not_calculated(self, client, pair):
+        user_a, _, user_b, _ = pair
+        assert get_ui(client, user_a, user_b).status_code == 404
+
+
+class TestProjection:
+    @pytest.fixture
+    def payload(self, db_session, pair):
+        _, profile_a, user_b, profile_b = pair
+        score(profile_a, profile_b)
+        record = Compatibility.query.filter_by(player_a_id=profile_a.id, player_b_id=profile_b.id).one()
+        return ui_payload.build_payload(record, profile_a, profile_b, user_b), profile_a, profile_b, user_b
+
+    @pytest.mark.parametrize('setting', ['all_responses', 'overlapping_only', 'demographics_only'])
+    def test_partner_profile_matches_setting(self, payload, setting):
+        full, _, profile_b, user_b = payload
+        view = ui_payload.project(full, setting, user_b.display_name)
+        assert view['partner_profile'] == ui_payload.transform_profile_for_ui(profile_b, user_b, setting)
+
+    def test_overlapping_only_interests(self, payload):
+        full, profile_a, profile_b, user_b = payload
+        view = ui_payload.project(full, 'overlapping_only', user_b.display_name)
+        assert view['interests_comparison'] == ui_payload.compare_interests(
+            profile_a.activities, profile_a.boundaries or {}, profile_b.activities, profile_b.boundaries or {}, True
+        )
+
+    def test_projection_does_not_mutate(self, payload):
+        full, _, _, user_b = payload
+        before = repr(full)
+        ui_payload.project(full, 'demographics_only', user_b.display_name)
+        assert repr(full) == before
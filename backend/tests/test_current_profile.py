@@ -0,0 +1,113 @@
+"""
+Tests for the users.current_profile_id pointer and the repository resolvers
+(get_current_profiles, get_current_profile_ids, get_current_profile).
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from backend.src.db import repository
+from backend.src.models.profile import Profile
+from backend.src.models.survey import SurveyProgress, SurveySubmission
+from backend.src.models.user import User
+from tests.fixtures.diverse_test_profiles import DIVERSE_TEST_PAIRS
+
+PROFILE = DIVERSE_TEST_PAIRS['pair_1_perfect_match']['profile_a']
+TEST_INTERNAL_SECRET = 'test-internal-secret'
+
+
+def create_user(db_session):
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:10]}@example.com", auth_provider='email')
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def add_profile(db_session, user, created_at=None):
+    submission = SurveySubmission(submission_id=f"current_{uuid.uuid4()}", payload_json={})
+    db_session.add(submission)
+    db_session.flush()
+    profile = Profile(user_id=user.id, submission_id=submission.submission_id,
+                      created_at=created_at or datetime.utcnow(), **PROFILE)
+    db_session.add(profile)
+    db_session.commit()
+    return profile
+
+
+class TestResolvers:
+    def test_pointer_wins_over_created_at(self, db_session):
+        user = create_user(db_session)
+        pointed = add_profile(db_session, user, created_at=datetime.utcnow() - timedelta(days=1))
+        add_profile(db_session, user)
+        user.current_profile_id = pointed.id
+        db_session.commit()
+
+        assert repository.get_current_profile(user.id) is pointed
+        assert repository.get_current_profile_ids([user.id]) == {user.id: pointed.id}
+
+    def test_fallback_to_latest_without_pointer(self, db_session):
+        user = create_user(db_session)
+        add_profile(db_session, user, created_at=datetime.utcnow() - timedelta(days=1))
+        latest = add_profile(db_session, user)
+
+        assert repository.get_current_profile(str(user.id)) is latest
+        assert repository.get_current_profile_ids([str(user.id)]) == {user.id: latest.id}
+
+    def test_batch_resolves_in_one_query(self, app, db_session, queries):
+        users = [create_user(db_session) for _ in range(5)]
+        for user in users:
+            user.current_profile_id = add_profile(db_session, user).id
+        db_session.commit()
+        expected = {user.id: user.current_profile_id for user in users}
+        db_session.expire_all()
+
+        with app.app_context(), queries:
+            profiles = repository.get_current_profiles(list(expected))
+
+        assert {user_id: profile.id for user_id, profile in profiles.items()} == expected
+        assert len([s for s in queries.statements if s.startswith('SELECT')]) == 1
+
+    def test_users_without_profiles_absent(self, db_session):
+        user = create_user(db_session)
+        assert repository.get_current_profiles([user.id]) == {}
+        assert repository.get_current_profile(user.id) is None
+        assert repository.get_current_profiles([]) == {}
+
+
+class TestPointerMaintenance:
+    def test_survey_submit_sets_pointer(self, client, db_session):
+        user = create_user(db_session)
+        db_session.add(SurveyProgress(user_id=user.id, survey_version='0.4', status='in_progress',
+                                      answers={}, completion_percentage=0, started_at=datetime.utcnow()))
+        db_session.commit()
+
+        with patch('backend.src.middleware.auth.jwt.decode', return_value={'sub': str(user.id)}), \
+             patch('backend.src.routes.survey_submit.calculate_profile', return_value=PROFILE):
+            resp = client.post('/api/survey/submit', json={'survey_version': '0.4', 'answers': {'q1': 1}},
+                               headers={'Authorization': 'Bearer test-token'})
+
+        assert resp.status_code == 200
+        db_session.refresh(user)
+        profile = Profile.query.filter_by(user_id=user.id).one()
+        assert user.current_profile_id == profile.id
+
+    @patch.dict(os.environ, {'INTERNAL_WEBHOOK_SECRET': TEST_INTERNAL_SECRET})
+    def test_process_submission_sets_pointer(self, client, db_session):
+        user = create_user(db_session)
+        old = add_profile(db_session, user)
+        user.current_profile_id = old.id
+        submission = SurveySubmission(submission_id=f"current_{uuid.uuid4()}", user_id=user.id,
+                                      payload_json={'answers': {'q1': 1}})
+        db_session.add(submission)
+        db_session.commit()
+
+        with patch('backend.src.routes.process_submission.calculate_profile', return_value=PROFILE):
+            resp = client.post(f'/api/survey/submissions/{submission.submission_id}/process',
+                               headers={'Authorization': f'Bearer {TEST_INTERNAL_SECRET}'})
+
+        assert resp.status_code == 201
+        db_session.refresh(user)
+        new_profile = Profile.query.filter_by(submission_id=submission.submission_id).one()
+        assert user.current_profile_id == new_profile.id
+        assert repository.get_current_profile(user.id) is new_profile
@@ -0,0 +1,83 @@
+"""
+Tests for the compiled directional key table (src/scoring/directional.py).
+"""
+import pytest
+
+from src.scoring.directional import (
+    ACTIVITY_CATEGORIES,
+    ACTIVITY_LAYOUT,
+    DIRECTIONAL_KEYS,
+    GIVE,
+    RECEIVE,
+    SELF,
+    WATCHING,
+    directional_key,
+)
+from src.compatibility.calculator import calculate_asymmetric_directional_jaccard, calculate_same_pole_jaccard
+from src.recommender.scoring import score_mutual_interest
+
+
+COMPLEMENT = {GIVE: RECEIVE, RECEIVE: GIVE, SELF: WATCHING, WATCHING: SELF}
+
+
+def test_every_survey_key_compiled():
+    for category_index, (category, keys) in enumerate(ACTIVITY_LAYOUT.items()):
+        assert ACTIVITY_CATEGORIES[category_index] == category
+        for key in keys:
+            assert DIRECTIONAL_KEYS[key].category == category_index
+
+
+def test_pairs_are_symmetric():
+    for key, entry in DIRECTIONAL_KEYS.items():
+        if entry.direction is None:
+            assert entry.partner is None and entry.stem == key
+            continue
+        partner = DIRECTIONAL_KEYS[entry.partner]
+        assert partner.partner == key
+        assert partner.direction == COMPLEMENT[entry.direction]
+        assert partner.category == entry.category
+        assert partner.stem == entry.stem and partner.irregular == entry.irregular
+
+
+@pytest.mark.parametrize("key, partner, direction, stem, irregular", [
+    ('spanking_moderate_give', 'spanking_moderate_receive', GIVE, 'spanking_moderate', False),
+    ('commands_receive', 'commands_give', RECEIVE, 'commands', False),
+    ('posing_self', 'posing_watching', SELF, 'posing', False),
+    ('dancing_watching', 'dancing_self', WATCHING, 'dancing', False),
+    ('stripping_self', 'watching_strip', SELF, 'stripping', True),
+    ('watching_strip', 'stripping_self', WATCHING, 'stripping', True),
+    ('solo_pleasure_self', 'watching_solo_pleasure', SELF, 'solo_pleasure', True),
+    ('watching_solo_pleasure', 'solo_pleasure_self', WATCHING, 'solo_pleasure', True),
+    ('dirty_talk', None, None, 'dirty_talk', False),
+])
+def test_survey_pairs(key, partner, direction, stem, irregular):
+    entry = DIRECTIONAL_KEYS[key]
+    assert (entry.partner, entry.direction, entry.stem, entry.irregular) == (partner, direction, stem, irregular)
+
+
+def test_keys_outside_survey_use_same_rules():
+    entry = directional_key('kissing_neck_give')
+    assert (entry.partner, entry.direction, entry.category) == ('kissing_neck_receive', GIVE, None)
+    assert directional_key('massage').direction is None
+    assert directional_key('stripping_self') is DIRECTIONAL_KEYS['stripping_self']
+
+
+class TestScorersShareTaxonomy:
+    def test_irregular_pair_scored_from_watching_key(self):
+        # Without watching_strip the stripping pair is not scored by the asymmetric Jaccard
+        assert calculate_asymmetric_directional_jaccard({'stripping_self': 1.0}, {'stripping_self': 1.0}) == 0.5
+        top = {'stripping_self': 0.0, 'watching_strip': 1.0}
+        bottom = {'stripping_self': 1.0, 'watching_strip': 0.0}
+        assert calculate_asymmetric_directional_jaccard(top, bottom) == 1.0
+
+    def test_same_pole_counts_self_and_irregular_watching_keys(self):
+        a = {'watching_strip': 1.0, 'posing_self': 1.0, 'posing_watching': 1.0, 'massage_receive': 1.0}
+        b = {'watching_strip': 1.0, 'posing_self': 0.0, 'posing_watching': 1.0, 'massage_receive': 1.0}
+        # watching_strip and posing_self count; posing_watching and massage_receive are skipped
+        assert calculate_same_pole_jaccard(a, b) == 0.5
+
+    def test_mutual_interest_pairs_irregular_keys(self):
+        a = {'stripping_self': 1.0, 'watching_strip': 0.0}
+        b = {'stripping_self': 0.0, 'watching_strip': 1.0}
+        assert score_mutual_interest(['watching_strip', 'stripping_self'], a, b) == 1.0
+        assert score_mutual_interest(['watching_strip'], a, b) == 0.1
@@ -0,0 +1,96 @@
+"""
+Tests for the activity-limit entitlement service (src/services/entitlements.py).
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from backend.src.models.anonymous_usage import AnonymousActivityUsage
+from backend.src.models.user import User
+from backend.src.services.cleanup import CleanupService
+from backend.src.services.entitlements import EntitlementService
+
+
+def create_user(db_session, count=0, tier='free'):
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:10]}@example.com",
+                lifetime_activity_count=count, subscription_tier=tier)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+class TestUserEntitlement:
+    def test_snapshot_in_one_query(self, db_session, queries):
+        user_id = create_user(db_session, count=4).id
+        EntitlementService.load(user_id)  # warm the app_config cache
+
+        with queries:
+            entitlement = EntitlementService.load(str(user_id))
+            status = entitlement.status()
+
+        assert len(queries.statements) == 1
+        assert status == {'limit_reached': False, 'remaining': 6, 'is_capped': True, 'used': 4, 'limit': 10}
+
+    def test_charge_is_single_update(self, db_session, queries):
+        user = create_user(db_session, count=9)
+        entitlement = EntitlementService.load(user.id)
+
+        with queries:
+            EntitlementService.charge(entitlement)
+
+        assert [s.split()[0] for s in queries.statements] == ['UPDATE']
+        assert 'RETURNING' in queries.statements[0]
+        assert entitlement.used == 10 and entitlement.limit_reached
+        db_session.refresh(user)
+        assert user.lifetime_activity_count == 10
+
+    def test_stale_snapshots_do_not_lose_charges(self, db_session):
+        user = create_user(db_session, count=3)
+        first, second = EntitlementService.load(user.id), EntitlementService.load(user.id)
+
+        EntitlementService.charge(first)
+        EntitlementService.charge(second)
+
+        assert (first.used, second.used) == (4, 5)
+        db_session.refresh(user)
+        assert user.lifetime_activity_count == 5
+
+    def test_premium_never_charged(self, db_session):
+        user = create_user(db_session, count=1000, tier='premium')
+        entitlement = EntitlementService.charge(EntitlementService.load(user.id))
+
+        assert entitlement.status() == {'limit_reached': False, 'remaining': -1, 'is_capped': False}
+        db_session.refresh(user)
+        assert user.lifetime_activity_count == 1000
+
+    def test_errors(self, db_session):
+        assert EntitlementService.load('not-a-uuid').status() == {'error': 'Invalid User ID'}
+        assert EntitlementService.load(uuid.uuid4()).status() == {'error': 'User not found'}
+        assert EntitlementService.load().status() == {'error': 'No identity provided'}
+
+
+class TestAnonymousEntitlement:
+    def test_charges_counted_in_window(self, db_session):
+        anon_id = f"anon_{uuid.uuid4().hex}"
+        entitlement = EntitlementService.load(anonymous_session_id=anon_id)
+        for _ in range(3):
+            EntitlementService.charge(entitlement)
+
+        assert entitlement.used == 3
+        assert EntitlementService.anonymous_usage(anon_id) == 3
+        assert EntitlementService.load(anonymous_session_id=anon_id).status()['remaining'] == 7
+        assert db_session.query(AnonymousActivityUsage).filter_by(anonymous_session_id=anon_id).count() == 1
+
+    def test_old_buckets_leave_window(self, db_session):
+        anon_id = f"anon_{uuid.uuid4().hex}"
+        now = datetime.utcnow()
+        db_session.add_all([
+            AnonymousActivityUsage(anonymous_session_id=anon_id, bucket_start=now.replace(minute=0, second=0, microsecond=0),
+                                   activity_count=2),
+            AnonymousActivityUsage(anonymous_session_id=anon_id, bucket_start=now - timedelta(hours=30),
+                                   activity_count=9),
+        ])
+        db_session.commit()
+
+        assert EntitlementService.anonymous_usage(anon_id) == 2
+        assert CleanupService.cleanup_anonymous_usage() == 1
+        assert EntitlementService.anonymous_usage(anon_id) == 2
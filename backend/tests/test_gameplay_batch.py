@@ -0,0 +1,48 @@
+"""
+Tests for batched queue generation in _fill_queue (shared profile/history lookups).
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+
+from backend.src.routes import gameplay
+
+# Anatomy: the registered player's comes from the account, the guest's from the request
+pytestmark = pytest.mark.parametrize('seeded_bank', [{'has_vagina': True}], indirect=True)
+
+
+def _start(start_game, user_id):
+    return start_game(user_id, players=[{"id": str(user_id), "name": "Alex", "anatomy": ["vagina"]},
+                                        {"name": "Sam", "anatomy": ["penis"]}])
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+def test_profiles_loaded_once_per_batch(seeded_bank, start_game):
+    with patch.object(gameplay, '_session_profiles', wraps=gameplay._session_profiles) as loader:
+        resp = _start(start_game, seeded_bank)
+    assert resp.status_code == 200
+    assert loader.call_count == 1
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+def test_history_loaded_once_per_batch(seeded_bank, start_game, queries):
+    with queries:
+        resp = _start(start_game, seeded_bank)
+    assert resp.status_code == 200
+    statements = [s for s in queries.statements
+                  if 'user_activity_history' in s and s.lstrip().upper().startswith('SELECT')]
+
+    # One session-history query plus one recent-history query per distinct primary (Alex, Sam)
+    assert len(statements) <= 3
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+def test_batch_has_no_duplicate_cards(seeded_bank, start_game):
+    resp = _start(start_game, seeded_bank)
+    assert resp.status_code == 200
+
+    card_ids = [turn['card_id'] for turn in resp.get_json()['queue']]
+    assert len(card_ids) == 3
+    assert len(card_ids) == len(set(card_ids))
+
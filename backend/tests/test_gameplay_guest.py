@@ -9,6 +9,7 @@ from src.models.user import User
 from src.models.session import Session
 from src.models.activity import Activity
 from src.models.profile import Profile
+from src.models.survey import SurveySubmission
 from src.extensions import db
 import os
 import uuid
@@ -93,6 +94,29 @@ class TestResolvePlayerHelper:
             assert set(result["anatomy"]) == {"vagina", "breasts"}
             assert "penis" in result["anatomy_preference"]
     
+    @patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+    def test_resolve_player_name_from_current_profile(self, app):
+        """Without a display name, the name comes from the current profile's survey."""
+        user_id = str(uuid.uuid4())
+        create_user(app, user_id, display_name=None)
+
+        with app.app_context():
+            uid = uuid.UUID(user_id)
+            for submission_id, name in (("first", "Old Name"), ("retake", "New Name")):
+                db.session.add(SurveySubmission(submission_id=f"{submission_id}_{user_id}", user_id=uid,
+                                                payload_json={"name": name}))
+                db.session.add(Profile(
+                    user_id=uid, submission_id=f"{submission_id}_{user_id}", power_dynamic={},
+                    arousal_propensity={}, domain_scores={}, activities={}, truth_topics={},
+                    boundaries={}, anatomy={}
+                ))
+            db.session.flush()
+            retake = Profile.query.filter_by(submission_id=f"retake_{user_id}").one()
+            db.session.get(User, uid).current_profile_id = retake.id
+            db.session.commit()
+
+            assert _resolve_player({"id": user_id}, user_id)["name"] == "New Name"
+
     @patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
     def test_resolve_player_other_user_not_looked_up(self, app):
         """Other user IDs should NOT be looked up (IDOR protection)."""
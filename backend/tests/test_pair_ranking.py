@@ -0,0 +1,148 @@
+"""
+Tests for the per-session pair ranking (src/game/pair_ranking.py).
+"""
+import os
+import uuid
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from backend.src.models.activity import Activity
+from backend.src.models.user import User
+from backend.src.db.activity_bank import get_activity_bank
+from backend.src.db.repository import CandidateFilter
+from backend.src.game import pair_ranking
+from backend.src.game.pair_ranking import PairRanking, get_pair_ranking
+
+
+PROFILE_A = {
+    'activities': {'massage_give': 1.0, 'massage_receive': 1.0, 'tickling': 0.0},
+    'power_dynamic': {'orientation': 'Top'},
+    'updated_at': '2026-01-01T00:00:00',
+}
+PROFILE_B = {
+    'activities': {'massage_give': 1.0, 'massage_receive': 1.0, 'tickling': 0.0},
+    'power_dynamic': {'orientation': 'Top'},
+    'updated_at': '2026-01-01T00:00:00',
+}
+
+
+def _activity(activity_id, **overrides):
+    fields = dict(
+        activity_id=activity_id, type='truth', rating='R', intensity=2,
+        audience_scope='couples', script={'steps': [{'actor': 'A', 'do': f'Card {activity_id}'}]},
+    )
+    fields.update(overrides)
+    return Activity(**fields)
+
+
+@pytest.fixture
+def bank(db_session):
+    db_session.add_all([
+        _activity(401, preference_keys=['massage_give', 'massage_receive']),   # Loved by both
+        _activity(402, preference_keys=['tickling']),                           # Disliked
+        _activity(403),                                                        # Neutral
+        _activity(404, preference_keys=['massage_give'], power_role='bottom'),  # Power mismatch
+        _activity(405, intensity=3, preference_keys=['massage_give', 'massage_receive']),
+        _activity(406, type='dare'),
+        _activity(407, rating='X'),
+        _activity(408, audience_scope='groups'),
+        _activity(409, hard_boundaries=['hardBoundaryImpact']),
+    ])
+    db_session.commit()
+    pair_ranking._rankings.clear()
+    yield get_activity_bank()
+    pair_ranking._rankings.clear()
+
+
+def _ids(entries):
+    return [entry[2].activity_id for entry in entries]
+
+
+class TestPairRanking:
+    def test_buckets_by_type_and_intensity(self, bank):
+        ranking = PairRanking(bank, PROFILE_A, PROFILE_B, 'R')
+        assert set(ranking.buckets) == {('truth', 2), ('truth', 3), ('dare', 2)}
+        assert 407 not in _ids(ranking.buckets[('truth', 2)])  # Other rating
+        assert 408 not in _ids(ranking.buckets[('truth', 2)])  # Other audience
+
+    def test_bucket_order_is_compatible_then_score(self, bank):
+        ranking = PairRanking(bank, PROFILE_A, PROFILE_B, 'R')
+        order = _ids(ranking.buckets[('truth', 2)])
+        assert order[0] == 401
+        assert order.index(403) < order.index(402)
+        assert order[-1] == 404  # Both Top: bottom activity is a last resort
+
+    def test_candidate_filter_applied(self, bank):
+        ranking = PairRanking(
+            bank, PROFILE_A, PROFILE_B, 'R',
+            candidate_filter=CandidateFilter(['hardBoundaryImpact'], None)
+        )
+        assert 409 not in _ids(ranking.buckets[('truth', 2)])
+
+    def test_pick_respects_window_type_and_exclusions(self, bank):
+        ranking = PairRanking(bank, PROFILE_A, PROFILE_B, 'R')
+        assert ranking.pick('truth', 2, 2).activity_id == 401
+        assert ranking.pick('truth', 3, 3).activity_id == 405
+        assert ranking.pick('truth', 2, 3, {401}).activity_id == 405
+        assert ranking.pick('dare', 1, 3).activity_id == 406
+        assert ranking.pick('dare', 1, 3, {406}) is None
+        assert ranking.pick('truth', 4, 5) is None
+
+    def test_pick_matches_find_best_candidate(self, bank):
+        """The ranking picks what a full rescoring of the window would pick."""
+        from backend.src.db.repository import find_best_activity_candidate
+
+        ranking = PairRanking(bank, PROFILE_A, PROFILE_B, 'R')
+        best = find_best_activity_candidate(
+            'R', 2, 3, 'truth', PROFILE_A, PROFILE_B, excluded_ids={401}, randomize=False
+        )
+        assert ranking.pick('truth', 2, 3, {401}).activity_id == best.activity_id
+
+
+class TestRankingCache:
+    def test_reused_within_session(self, bank):
+        first = get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R')
+        second = get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R')
+        assert first is second
+
+    def test_keyed_by_ordered_pair_and_session(self, bank):
+        ab = get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R')
+        assert get_pair_ranking('s1', {'id': 'b'}, {'id': 'a'}, PROFILE_B, PROFILE_A, 'R') is not ab
+        assert get_pair_ranking('s2', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R') is not ab
+
+    def test_rebuilt_when_profile_updated(self, bank):
+        first = get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R')
+        updated = {**PROFILE_A, 'updated_at': '2026-02-01T00:00:00'}
+        assert get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, updated, PROFILE_B, 'R') is not first
+
+    def test_invalidate_session(self, bank):
+        first = get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R')
+        pair_ranking.invalidate_session_rankings('s1')
+        assert get_pair_ranking('s1', {'id': 'a'}, {'id': 'b'}, PROFILE_A, PROFILE_B, 'R') is not first
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+def test_game_builds_ranking_once_per_pair(client, db_session, bank):
+    user_id = uuid.uuid4()
+    db_session.add(User(id=user_id, email="ranking@test.com", subscription_tier='premium', has_vagina=True))
+    db_session.commit()
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, "test-secret-key", algorithm="HS256")
+    headers = {'Authorization': f'Bearer {token}'}
+
+    with patch.object(pair_ranking, 'PairRanking', wraps=PairRanking) as builder:
+        resp = client.post('/api/game/start', json={
+            "players": [{"id": str(user_id), "name": "Alex", "anatomy": ["vagina"]},
+                        {"name": "Sam", "anatomy": ["penis"]}],
+            "settings": {"intimacy_level": 3, "player_order_mode": "SEQUENTIAL"}
+        }, headers=headers)
+        assert resp.status_code == 200
+        session_id = resp.get_json()['session_id']
+
+        for _ in range(3):
+            resp = client.post(f'/api/game/{session_id}/next', json={}, headers=headers)
+            assert resp.status_code == 200
+
+    # Two ordered pairs (Alex->Sam, Sam->Alex), each scored once
+    assert builder.call_count == 2
@@ -0,0 +1,171 @@
+"""
+Tests for the cached partner adjacency service (src/services/partner_adjacency.py)
+and its invalidation by the partner routes.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from backend.src.models.partner import PartnerConnection, RememberedPartner
+from backend.src.models.user import User
+from backend.src.services import partner_adjacency
+from backend.src.services.partner_adjacency import PartnerAdjacencyService
+
+
+def get_auth_header(user_id):
+    """Generate a valid JWT auth header for testing."""
+    secret = os.environ.get('SUPABASE_JWT_SECRET', 'test-secret-key')
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, secret, algorithm="HS256")
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    PartnerAdjacencyService.clear()
+    yield
+    PartnerAdjacencyService.clear()
+
+
+def create_user(db_session):
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex[:10]}@example.com", auth_provider='email')
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def connect(db_session, requester, recipient, status='accepted'):
+    connection = PartnerConnection(
+        requester_user_id=requester.id,
+        recipient_email=recipient.email,
+        recipient_user_id=recipient.id,
+        status=status,
+        connection_token=str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + timedelta(days=1)
+    )
+    db_session.add(connection)
+    db_session.commit()
+    return connection
+
+
+class TestLookups:
+    def test_either_direction(self, db_session):
+        a, b, c = (create_user(db_session) for _ in range(3))
+        connect(db_session, a, b)
+        connect(db_session, a, c, status='pending')
+
+        assert PartnerAdjacencyService.are_partners(a.id, b.id)
+        assert PartnerAdjacencyService.are_partners(str(b.id), str(a.id))
+        assert not PartnerAdjacencyService.are_partners(a.id, c.id)
+        assert not PartnerAdjacencyService.are_partners(a.id, a.id)
+        assert not PartnerAdjacencyService.are_partners(a.id, 'not-a-uuid')
+
+    def test_pair_key_canonical(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        assert PartnerAdjacencyService.pair_key(a, b) == PartnerAdjacencyService.pair_key(str(b), a)
+        assert PartnerAdjacencyService.pair_key(a, b) == tuple(sorted((a, b)))
+
+    def test_repeat_checks_served_from_cache(self, app, db_session, queries):
+        a, b, c = (create_user(db_session) for _ in range(3))
+        connect(db_session, a, b)
+        connect(db_session, c, a)
+        a, b, c = (user.id for user in (a, b, c))
+        PartnerAdjacencyService.neighbours_many([a, b, c])
+
+        with app.app_context(), queries:
+            assert PartnerAdjacencyService.are_partners(b, a)
+            assert PartnerAdjacencyService.are_partners(a, c)
+            assert not PartnerAdjacencyService.are_partners(b, c)
+            assert PartnerAdjacencyService.neighbours(a) == {b, c}
+
+        assert queries.count == 0
+
+    def test_ttl_expiry(self, db_session, monkeypatch):
+        a, b = create_user(db_session), create_user(db_session)
+        assert not PartnerAdjacencyService.are_partners(a.id, b.id)
+        connect(db_session, a, b)
+        assert not PartnerAdjacencyService.are_partners(a.id, b.id)  # cached
+
+        clock = partner_adjacency.time.monotonic() + 3600
+        monkeypatch.setattr(partner_adjacency.time, 'monotonic', lambda: clock)
+        assert PartnerAdjacencyService.are_partners(a.id, b.id)
+
+    def test_ttl_zero_disables_cache(self, db_session, monkeypatch):
+        monkeypatch.setattr(partner_adjacency, '_ttl', lambda: 0)
+        a, b = create_user(db_session), create_user(db_session)
+        assert not PartnerAdjacencyService.are_partners(a.id, b.id)
+        connect(db_session, a, b)
+        assert PartnerAdjacencyService.are_partners(a.id, b.id)
+
+    def test_cache_bounded(self, db_session, monkeypatch):
+        monkeypatch.setattr(partner_adjacency, '_cache_size', lambda: 2)
+        users = [create_user(db_session) for _ in range(3)]
+        PartnerAdjacencyService.neighbours_many(user.id for user in users)
+        assert len(partner_adjacency._neighbours) == 2
+
+    def test_neighbours_many_single_query(self, app, db_session, queries):
+        a, b, c, d = (create_user(db_session) for _ in range(4))
+        connect(db_session, a, b)
+        connect(db_session, c, a)
+        connect(db_session, b, d, status='declined')
+        a, b, c, d = (user.id for user in (a, b, c, d))
+
+        with app.app_context(), queries:
+            result = PartnerAdjacencyService.neighbours_many([a, str(b), d, 'bogus'])
+
+        assert queries.count == 1
+        assert result == {a: {b, c}, b: {a}, d: frozenset()}
+
+
+class TestInvalidation:
+    def test_accept(self, client, db_session):
+        a, b = create_user(db_session), create_user(db_session)
+        connection = connect(db_session, a, b, status='pending')
+        assert not PartnerAdjacencyService.are_partners(a.id, b.id)
+
+        with patch('backend.src.routes.partners.send_partner_accepted'):
+            resp = client.post(f'/api/partners/connections/{connection.id}/accept',
+                               json={}, headers=get_auth_header(b.id))
+
+        assert resp.status_code == 200
+        assert PartnerAdjacencyService.are_partners(a.id, b.id)
+
+    def test_decline(self, client, db_session):
+        a, b = create_user(db_session), create_user(db_session)
+        connection = connect(db_session, a, b, status='pending')
+        PartnerAdjacencyService.neighbours_many([a.id, b.id])
+
+        resp = client.post(f'/api/partners/connections/{connection.id}/decline', headers=get_auth_header(b.id))
+
+        assert resp.status_code == 200
+        assert partner_adjacency._neighbours.get(a.id) is None
+        assert partner_adjacency._neighbours.get(b.id) is None
+
+    def test_disconnect(self, client, db_session):
+        a, b = create_user(db_session), create_user(db_session)
+        connect(db_session, a, b)
+        db_session.add(RememberedPartner(user_id=a.id, partner_user_id=b.id, partner_name='B',
+                                        partner_email=b.email))
+        db_session.commit()
+        assert PartnerAdjacencyService.are_partners(a.id, b.id)
+
+        resp = client.delete(f'/api/partners/remembered/{b.id}', headers=get_auth_header(a.id))
+
+        assert resp.status_code == 200
+        assert not PartnerAdjacencyService.are_partners(a.id, b.id)
+        assert PartnerAdjacencyService.neighbours(b.id) == frozenset()
+
+    def test_compatibility_forbidden_after_disconnect(self, client, db_session):
+        a, b = create_user(db_session), create_user(db_session)
+        connection = connect(db_session, a, b)
+        assert PartnerAdjacencyService.are_partners(a.id, b.id)
+
+        connection.status = 'disconnected'
+        db_session.commit()
+        PartnerAdjacencyService.invalidate(a.id, b.id)
+
+        resp = client.get(f'/api/compatibility/{a.id}/{b.id}', headers=get_auth_header(a.id))
+        assert resp.status_code == 403
@@ -27,12 +27,9 @@ def test_get_profile_ui_includes_display_name(client, db_session):
 
     # Patch the queries
     with patch('backend.src.models.user.User.query') as mock_user_query, \
-         patch('backend.src.models.profile.Profile.query') as mock_profile_query:
+         patch('backend.src.routes.profile_ui.get_current_profile', return_value=mock_profile):
         
         mock_user_query.get.return_value = mock_user
-        
-        # Mock chain: filter_by -> order_by -> first
-        mock_profile_query.filter_by.return_value.order_by.return_value.first.return_value = mock_profile
 
         # Route does not take user_id in path
         import jwt
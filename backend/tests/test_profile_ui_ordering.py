@@ -19,14 +19,14 @@ def test_domain_ordering(mock_jwt_decode, client, db_session, auth_header):
     
     # Mock DB queries
     with patch('backend.src.routes.profile_ui.User') as MockUser, \
-         patch('backend.src.routes.profile_ui.Profile') as MockProfile:
+         patch('backend.src.routes.profile_ui.get_current_profile') as mock_get_current_profile:
         
         # Setup Mock User
         mock_user_instance = MockUser.query.get.return_value
         mock_user_instance.display_name = "Test User"
         
         # Setup Mock Profile
-        mock_profile_instance = MockProfile.query.filter_by.return_value.order_by.return_value.first.return_value
+        mock_profile_instance = mock_get_current_profile.return_value
         mock_profile_instance.submission_id = 'sub1'
         mock_profile_instance.domain_scores = {
             'sensation': 86,
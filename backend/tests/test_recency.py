@@ -0,0 +1,164 @@
+"""
+Tests for the recent-activity ring buffers (src/game/recency.py).
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from backend.src.models.activity import Activity
+from backend.src.models.activity_history import UserActivityHistory
+from backend.src.models.user import User
+from backend.src.game import recency
+from backend.src.game.recency import (
+    ExclusionSet, RecentActivities, clear_recency_cache, get_player_recency,
+    get_session_recency, record_activity
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    clear_recency_cache()
+    yield
+    clear_recency_cache()
+
+
+class TestRecentActivities:
+    def test_membership(self):
+        recent = RecentActivities(5, [3, 17, 1000])
+        assert 3 in recent and 17 in recent and 1000 in recent
+        assert 4 not in recent and 999 not in recent and 10 ** 6 not in recent
+        assert None not in recent and -1 not in recent and '3' not in recent
+
+    def test_evicts_oldest_when_full(self):
+        recent = RecentActivities(3, [1, 2, 3])
+        recent.add(4)
+        assert 1 not in recent
+        assert set(recent) == {2, 3, 4}
+
+    def test_duplicate_stays_until_last_copy_evicted(self):
+        recent = RecentActivities(3, [7, 8, 7])
+        recent.add(9)  # Evicts the first 7
+        assert 7 in recent
+        recent.add(10)  # Evicts 8
+        recent.add(11)  # Evicts the second 7
+        assert 7 not in recent
+        assert len(recent) == 3
+
+    def test_ignores_missing_ids(self):
+        recent = RecentActivities(2, [None, 5])
+        assert set(recent) == {5}
+
+    def test_matches_last_n_slice(self):
+        """Membership equals 'in the last N ids' for any sequence."""
+        import random
+        rng = random.Random(3)
+        ids = [rng.randint(0, 60) for _ in range(500)]
+        recent = RecentActivities(25)
+        for i, activity_id in enumerate(ids):
+            recent.add(activity_id)
+            window = set(ids[max(0, i - 24):i + 1])
+            assert set(recent) == window
+            assert all((x in recent) == (x in window) for x in range(62))
+
+
+class TestExclusionSet:
+    def test_union_by_reference(self):
+        picked = set()
+        exclusions = ExclusionSet({1, 2}, RecentActivities(3, [2, 3]), picked)
+        assert 1 in exclusions and 3 in exclusions and 4 not in exclusions
+        picked.add(4)
+        assert 4 in exclusions
+        assert sorted(exclusions) == [1, 2, 3, 4]
+        assert len(exclusions) == 4
+
+
+def _history(session_id, player_id, activity_id, minutes_ago):
+    return UserActivityHistory(
+        session_id=session_id, primary_player_id=player_id, activity_id=activity_id,
+        activity_type='truth', presented_at=datetime.utcnow() - timedelta(minutes=minutes_ago),
+    )
+
+
+class TestBufferCache:
+    def test_loads_newest_rows(self, db_session):
+        db_session.add_all(
+            [_history('s-old', 'p1', 600 + i, minutes_ago=200 - i) for i in range(150)]
+            + [_history('s-new', 'p2', 900, minutes_ago=1)]
+        )
+        db_session.commit()
+
+        player = get_player_recency('p1')
+        assert len(player) == recency.PLAYER_HISTORY_SIZE
+        assert 649 not in player and 650 in player and 749 in player
+        assert set(get_session_recency('s-new', 0)) == {900}
+
+    def test_player_cached_until_ttl(self, db_session):
+        first = get_player_recency('p1')
+        assert get_player_recency('p1') is first
+        with patch('backend.src.services.config_service.get_config_int', return_value=0):
+            assert get_player_recency('p1') is not first
+
+    def test_session_cached_per_turn_version(self, db_session):
+        first = get_session_recency('s1', 3)
+        with patch('backend.src.services.config_service.get_config_int', return_value=0):
+            assert get_session_recency('s1', 3) is first
+        assert get_session_recency('s1', 4) is not first
+
+    def test_session_advanced_elsewhere_is_reloaded(self, db_session):
+        assert 77 not in get_session_recency('s1', 0)
+        # Another worker plays a card: history row + turn_version bump, nothing recorded here
+        db_session.add(_history('s1', 'p1', 77, minutes_ago=0))
+        db_session.commit()
+
+        assert 77 in get_session_recency('s1', 1)
+
+    def test_record_activity_updates_cached_buffers(self, db_session):
+        session_buffer = get_session_recency('s1', 0)
+        player_buffer = get_player_recency('p1')
+        record_activity('s1', 'p1', 42, turn_version=1)
+        record_activity('s2', 'p2', 43, turn_version=1)  # Not cached: ignored
+        assert 42 in session_buffer and 42 in player_buffer
+        assert 43 not in session_buffer
+        assert get_session_recency('s1', 1) is session_buffer
+
+    def test_record_activity_skips_stale_session_buffer(self, db_session):
+        session_buffer = get_session_recency('s1', 0)
+        record_activity('s1', 'p1', 42, turn_version=3)  # Versions 1-2 were played elsewhere
+        assert 42 not in session_buffer
+        assert get_session_recency('s1', 3) is not session_buffer
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+def test_next_turn_keeps_buffers_current(client, db_session):
+    db_session.add_all([
+        Activity(activity_id=700 + i, type=t, rating='R', intensity=n, audience_scope='couples',
+                 script={'steps': [{'actor': 'A', 'do': f'Card {i}'}]})
+        for i, (t, n) in enumerate((t, n) for t in ('truth', 'dare') for n in (1, 2, 3) for _ in range(3))
+    ])
+    user_id = uuid.uuid4()
+    db_session.add(User(id=user_id, email="recency@test.com", subscription_tier='premium', has_vagina=True))
+    db_session.commit()
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, "test-secret-key", algorithm="HS256")
+    headers = {'Authorization': f'Bearer {token}'}
+
+    resp = client.post('/api/game/start', json={
+        "players": [{"id": str(user_id), "name": "Alex", "anatomy": ["vagina"]},
+                    {"name": "Sam", "anatomy": ["penis"]}],
+        "settings": {"intimacy_level": 3, "player_order_mode": "SEQUENTIAL"}
+    }, headers=headers)
+    session_id = resp.get_json()['session_id']
+
+    with patch.object(recency, '_load', wraps=recency._load) as loader:
+        for _ in range(4):
+            resp = client.post(f'/api/game/{session_id}/next', json={}, headers=headers)
+            assert resp.status_code == 200
+    # Buffers loaded by /start are reused and appended to on write
+    assert loader.call_count == 0
+
+    played = [row.activity_id for row in UserActivityHistory.query.filter_by(session_id=session_id)]
+    session_buffer = get_session_recency(session_id, 4)
+    assert played and all(activity_id in session_buffer for activity_id in played)
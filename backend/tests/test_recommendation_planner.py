@@ -0,0 +1,121 @@
+"""
+Tests for the single-pass recommendation planner (src/recommender/planner.py).
+"""
+import pytest
+
+from backend.src.models.activity import Activity
+from backend.src.db.repository import CandidateFilter, find_best_activity_candidate
+from backend.src.recommender.picker import get_intensity_window, pick_type_balanced
+from backend.src.recommender.planner import SessionPlanner
+
+
+PROFILE_A = {
+    'activities': {'massage_give': 1.0, 'massage_receive': 1.0, 'kissing': 0.5},
+    'power_dynamic': {'orientation': 'Top'},
+    'anatomy': {'anatomy_self': ['penis']},
+}
+PROFILE_B = {
+    'activities': {'massage_give': 1.0, 'massage_receive': 1.0, 'kissing': 1.0},
+    'power_dynamic': {'orientation': 'Bottom'},
+    'anatomy': {'anatomy_self': ['vagina']},
+}
+KEYS = [['massage_give', 'massage_receive'], ['kissing'], [], ['tickling']]
+ROLES = ['top', 'bottom', 'neutral', None]
+
+
+@pytest.fixture
+def pool(db_session):
+    activities = []
+    for i in range(60):
+        activity_type = 'truth' if i % 2 else 'dare'
+        activities.append(Activity(
+            activity_id=1000 + i, type=activity_type, rating='R', intensity=1 + i % 3,
+            audience_scope='couples', script={'steps': [{'actor': 'A', 'do': f'Planner card {i}'}]},
+            preference_keys=KEYS[i % 4], power_role=ROLES[(i // 4) % 4],
+            required_bodyparts={'active': ['vagina'], 'partner': []} if i % 7 == 0 else None,
+            hard_boundaries=['hardBoundaryImpact'] if i % 11 == 0 else [],
+        ))
+    db_session.add_all(activities)
+    db_session.commit()
+
+
+@pytest.fixture
+def no_bank(monkeypatch):
+    monkeypatch.setattr('backend.src.db.repository.get_activity_bank', lambda: None)
+    monkeypatch.setattr('backend.src.recommender.planner.get_activity_bank', lambda: None)
+
+
+def _anatomy(active, partner):
+    return {'active_anatomy': active['anatomy']['anatomy_self'],
+            'partner_anatomy': partner['anatomy']['anatomy_self']}
+
+
+class TestSessionPlanner:
+    def test_pool_respects_boundaries(self, pool):
+        planner = SessionPlanner('R', 1, 3, PROFILE_A, PROFILE_B, player_boundaries=['hardBoundaryImpact'])
+        ids = {a.activity_id for a in planner.pool}
+        assert 1000 not in ids and 1011 not in ids
+        assert len(ids) == 60 - 6
+
+    @pytest.mark.parametrize("activity_type", ['truth', 'dare'])
+    @pytest.mark.parametrize("window", [(1, 1), (1, 2), (2, 3), (3, 3)])
+    @pytest.mark.parametrize("actor", ['A', 'B'])
+    def test_pick_matches_find_best_candidate(self, pool, activity_type, window, actor):
+        """With the whole window in the sample, the planner picks what find_best would."""
+        active, partner = (PROFILE_A, PROFILE_B) if actor == 'A' else (PROFILE_B, PROFILE_A)
+        anatomy = _anatomy(active, partner)
+        excluded = {1001, 1002, 1004}
+
+        planner = SessionPlanner('R', 1, 3, PROFILE_A, PROFILE_B)
+        picked = planner.pick(activity_type, *window, candidate_filter=CandidateFilter(None, anatomy),
+                              excluded_ids=excluded)
+        expected = find_best_activity_candidate(
+            'R', window[0], window[1], activity_type, PROFILE_A, PROFILE_B,
+            player_anatomy=anatomy, excluded_ids=excluded, randomize=False
+        )
+        assert picked.activity_id == expected.activity_id
+
+    def test_pick_exhausts_to_none(self, pool):
+        planner = SessionPlanner('R', 1, 3, PROFILE_A, PROFILE_B)
+        every_id = {a.activity_id for a in planner.pool}
+        assert planner.pick('truth', 1, 3, excluded_ids=every_id) is None
+
+    def test_candidates_in_id_order(self, pool):
+        planner = SessionPlanner('R', 1, 3, PROFILE_A, PROFILE_B)
+        ids = [a.activity_id for a in planner.candidates('truth', 1, 3, limit=5)]
+        assert ids == sorted(ids) and len(ids) == 5
+
+    def test_one_query_without_bank(self, pool, no_bank, queries):
+        with queries:
+            planner = SessionPlanner('R', 1, 3, PROFILE_A, PROFILE_B, player_boundaries=['hardBoundaryImpact'])
+            for seq in range(1, 26):
+                planner.pick('truth' if seq % 2 else 'dare', *get_intensity_window(seq, 25, 'R'))
+        assert len([s for s in queries.statements if 'from activities' in s.lower()]) == 1
+
+
+def test_recommendations_arc(client, pool, no_bank, queries):
+    resp = client.post('/api/recommendations', json={
+        'player_a': PROFILE_A,
+        'player_b': PROFILE_B,
+        'session': {'rating': 'R', 'target_activities': 25},
+    })
+    assert resp.status_code == 200
+    activities = resp.get_json()['activities']
+
+    # One round-trip for the whole arc
+    assert len([s for s in queries.statements if 'from activities' in s.lower()]) == 1
+
+    truths = dares = 0
+    bank_ids = []
+    for item in activities:
+        seq = item['seq']
+        assert item['type'] == pick_type_balanced(seq, 25, truths, dares, 'random')
+        assert item['roles']['active_player'] == ('A' if seq % 2 else 'B')
+        if item['provenance']['source'] == 'bank':
+            low, high = get_intensity_window(seq, 25, 'R')
+            assert low <= item['intensity'] <= high
+            bank_ids.append(item['provenance']['template_id'])
+        truths += item['type'] == 'truth'
+        dares += item['type'] == 'dare'
+
+    assert bank_ids and len(bank_ids) == len(set(bank_ids))
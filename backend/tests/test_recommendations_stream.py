@@ -0,0 +1,115 @@
+"""
+Tests for the streaming (NDJSON / SSE) mode of POST /api/recommendations.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from backend.src.models.activity import Activity
+from backend.src.models.session import Session
+from backend.src.db import repository
+
+
+PLAYER_A = {'activities': {'kissing': 1.0}, 'anatomy': {'anatomy_self': ['penis']}}
+PLAYER_B = {'activities': {'kissing': 1.0}, 'anatomy': {'anatomy_self': ['vagina']}}
+BODY = {'player_a': PLAYER_A, 'player_b': PLAYER_B, 'session': {'rating': 'R', 'target_activities': 10}}
+
+
+@pytest.fixture
+def pool(db_session):
+    db_session.add_all([
+        Activity(activity_id=1100 + i, type='truth' if i % 2 else 'dare', rating='R', intensity=1 + i % 3,
+                 audience_scope='couples', preference_keys=['kissing'],
+                 script={'steps': [{'actor': 'A', 'do': f'Stream card {i}'}]})
+        for i in range(30)
+    ])
+    db_session.commit()
+
+
+def _ndjson(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines() if line]
+
+
+def _sse(resp):
+    events = []
+    for block in resp.get_data(as_text=True).strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_ndjson_stream(client, pool):
+    resp = client.post('/api/recommendations?stream=ndjson', json=BODY)
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/x-ndjson'
+
+    records = _ndjson(resp)
+    assert records[0]['type'] == 'session'
+    assert records[-1]['type'] == 'stats'
+
+    activities = [r['activity'] for r in records if r['type'] == 'activity']
+    assert [a['seq'] for a in activities] == sorted(a['seq'] for a in activities)
+    stats = records[-1]['stats']
+    assert stats['total'] == len(activities) > 0
+    assert stats['truths'] + stats['dares'] == len(activities)
+    assert records[-1]['session_id'] == records[0]['session_id']
+
+
+def test_sse_stream_via_accept_header(client, pool):
+    resp = client.post('/api/recommendations', json=BODY, headers={'Accept': 'text/event-stream'})
+    assert resp.mimetype == 'text/event-stream'
+
+    events = _sse(resp)
+    assert events[0][0] == 'session'
+    assert events[-1][0] == 'stats'
+    assert sum(1 for name, _ in events if name == 'activity') == events[-1][1]['stats']['total']
+
+
+def test_json_response_unchanged_by_default(client, pool):
+    resp = client.post('/api/recommendations', json=BODY)
+    assert resp.mimetype == 'application/json'
+    data = resp.get_json()
+    assert set(data) == {'session_id', 'activities', 'stats'}
+    assert data['stats']['total'] == len(data['activities'])
+
+
+def test_activities_emitted_before_persisting(client, pool):
+    saved = []
+    with patch.object(repository, 'save_session_activities', side_effect=lambda *a: saved.append(a)), \
+         patch.object(repository, 'get_session', return_value=Session(session_id='stream-1')), \
+         patch.object(repository, 'update_session_progress'):
+        body = {**BODY, 'session': {**BODY['session'], 'session_id': 'stream-1'}}
+        resp = client.post('/api/recommendations?stream=ndjson', json=body, buffered=False)
+        chunks = resp.iter_encoded()
+
+        assert json.loads(next(chunks))['type'] == 'session'
+        assert json.loads(next(chunks))['type'] == 'activity'
+        assert saved == []  # Nothing persisted until the arc is complete
+
+        rest = [json.loads(chunk) for chunk in chunks]
+        resp.close()
+
+    assert rest[-1]['type'] == 'stats'
+    assert len(saved) == 1
+    session_id, activities = saved[0]
+    assert session_id == 'stream-1'
+    assert len(activities) == rest[-1]['stats']['total']
+
+
+def test_stream_persists_session_activities(client, pool, db_session):
+    db_session.add(Session(session_id='stream-2', player_a_profile_id=1, player_b_profile_id=1))
+    db_session.commit()
+    body = {**BODY, 'session': {**BODY['session'], 'session_id': 'stream-2'}}
+
+    records = _ndjson(client.post('/api/recommendations?stream=ndjson', json=body))
+
+    saved = repository.get_session_activities('stream-2')
+    assert len(saved) == records[-1]['stats']['total']
+
+
+def test_error_reported_in_band(client, pool):
+    with patch('backend.src.recommender.planner.SessionPlanner.pick', side_effect=RuntimeError('boom')):
+        records = _ndjson(client.post('/api/recommendations?stream=ndjson', json=BODY))
+    assert records[0]['type'] == 'session'
+    assert records[-1] == {'type': 'error', 'error': 'Internal error: boom'}
@@ -0,0 +1,91 @@
+"""
+Tests for the set-based upsert in repository.save_session_activities.
+"""
+import pytest
+
+from backend.src.extensions import db
+from backend.src.db import repository
+from backend.src.db.repository import get_session_activities, save_session_activities
+from backend.src.models.session import Session
+
+
+def _activity(seq, text='Card', template_id=None, source='bank'):
+    return {
+        'seq': seq, 'type': 'truth' if seq % 2 else 'dare', 'rating': 'R', 'intensity': 2,
+        'script': {'steps': [{'actor': 'A', 'do': f'{text} {seq}'}]},
+        'tags': ['t'], 'roles': {'active_player': 'A', 'partner_player': 'B'},
+        'provenance': {'source': source, 'template_id': template_id},
+        'checks': {'notes': text},
+    }
+
+
+@pytest.fixture(params=['on_conflict', 'fallback'])
+def upsert_path(request, monkeypatch):
+    if request.param == 'fallback':
+        monkeypatch.setattr(repository, '_ON_CONFLICT_DIALECTS', {})
+    return request.param
+
+
+@pytest.fixture
+def session_id(db_session):
+    db_session.add(Session(session_id='save-1', player_a_profile_id=1, player_b_profile_id=1))
+    db_session.commit()
+    return 'save-1'
+
+
+def test_inserts_rows(session_id, upsert_path):
+    save_session_activities(session_id, [_activity(seq) for seq in range(1, 26)])
+    saved = get_session_activities(session_id)
+    assert [a.seq for a in saved] == list(range(1, 26))
+    assert saved[0].script == {'steps': [{'actor': 'A', 'do': 'Card 1'}]}
+    assert saved[0].roles == {'active_player': 'A', 'partner_player': 'B'}
+    assert saved[0].source == 'bank' and saved[0].created_at is not None
+
+
+def test_updates_existing_rows(session_id, upsert_path, db_session):
+    save_session_activities(session_id, [_activity(1), _activity(2)])
+    first_created = {a.seq: a.created_at for a in get_session_activities(session_id)}
+
+    save_session_activities(session_id, [_activity(2, text='New', source='ai_generated'), _activity(3)])
+    db_session.expire_all()
+    saved = {a.seq: a for a in get_session_activities(session_id)}
+
+    assert set(saved) == {1, 2, 3}
+    assert saved[1].script['steps'][0]['do'] == 'Card 1'
+    assert saved[2].script['steps'][0]['do'] == 'New 2'
+    assert saved[2].source == 'ai_generated' and saved[2].checks == {'notes': 'New'}
+    assert saved[2].created_at == first_created[2]
+
+
+def test_repeated_seq_last_wins(session_id, upsert_path):
+    save_session_activities(session_id, [_activity(1), _activity(1, text='Again')])
+    saved = get_session_activities(session_id)
+    assert len(saved) == 1
+    assert saved[0].script['steps'][0]['do'] == 'Again 1'
+
+
+def test_set_based_round_trips(session_id, upsert_path, queries):
+    save_session_activities(session_id, [_activity(seq) for seq in range(1, 11)])
+    with queries:
+        save_session_activities(session_id, [_activity(seq) for seq in range(6, 31)])
+
+    statements = [s.lstrip().split()[0].upper() for s in queries.statements]
+    writes = [s for s in statements if s in ('INSERT', 'UPDATE')]
+    reads = [s for s in statements if s == 'SELECT']
+    if upsert_path == 'on_conflict':
+        assert writes == ['INSERT'] and not reads
+    else:
+        assert len(reads) == 1 and sorted(writes) == ['INSERT', 'UPDATE']  # One executemany each
+
+
+def test_commits_once(session_id, monkeypatch):
+    commits = []
+    real_commit = db.session.commit
+    monkeypatch.setattr(db.session, 'commit', lambda: (commits.append(1), real_commit()))
+    save_session_activities(session_id, [_activity(seq) for seq in range(1, 26)])
+    assert len(commits) == 1
+
+
+def test_empty_list(session_id):
+    save_session_activities(session_id, [])
+    assert get_session_activities(session_id) == []
@@ -0,0 +1,122 @@
+"""
+Tests for session-scoped profile snapshots used by turn generation.
+"""
+import os
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from backend.src.models.profile import Profile
+from backend.src.models.session import Session
+from backend.src.models.user import User
+from backend.src.routes import gameplay
+
+
+@pytest.fixture
+def player(db_session):
+    user_id = uuid.uuid4()
+    db_session.add(User(id=user_id, email="snapshot@test.com", subscription_tier='premium', has_vagina=True))
+    profile = Profile(
+        user_id=user_id, submission_id=f"sub_{user_id}",
+        power_dynamic={'orientation': 'Top'}, arousal_propensity={'sexual_excitation': 0.5},
+        domain_scores={'sensation': 70}, activities={'massage_give': 1.0},
+        truth_topics={'fantasies': 1.0}, boundaries={'hard_limits': ['hardBoundaryAnal']},
+        anatomy={'anatomy_self': ['vagina'], 'anatomy_preference': ['penis']},
+    )
+    db_session.add(profile)
+    db_session.commit()
+    return user_id, profile
+
+
+def _session(user_id):
+    return Session(players=[{'id': str(user_id), 'name': 'Alex'}, {'id': 'guest-1', 'name': 'Sam'}])
+
+
+def test_snapshot_has_scoring_fields_only(player):
+    user_id, profile = player
+    session = _session(user_id)
+
+    profiles = gameplay._session_profiles(session)
+    snapshot = profiles[str(user_id)]
+    full = profile.to_dict()
+
+    for field in gameplay.PROFILE_SNAPSHOT_FIELDS:
+        assert snapshot[field] == full[field]
+    assert snapshot['updated_at'] == full['updated_at']
+    assert 'truth_topics' not in snapshot
+    assert session.profile_snapshots == {str(user_id): snapshot}
+
+
+def test_players_without_profile_map_to_none(player):
+    user_id, _ = player
+    session = Session(players=[{'id': str(uuid.uuid4())}, {'id': 'guest-1'}, {'name': 'No id'}])
+    assert gameplay._session_profiles(session) == {session.players[0]['id']: None}
+
+
+def test_unchanged_profile_is_not_reloaded(player):
+    user_id, _ = player
+    session = _session(user_id)
+    gameplay._session_profiles(session)
+
+    with patch.object(gameplay, '_snapshot_profile', wraps=gameplay._snapshot_profile) as snapshot:
+        profiles = gameplay._session_profiles(session)
+    assert snapshot.call_count == 0
+    assert profiles[str(user_id)]['activities'] == {'massage_give': 1.0}
+
+
+def test_profile_update_invalidates_snapshot(player, db_session):
+    user_id, profile = player
+    session = _session(user_id)
+    gameplay._session_profiles(session)
+
+    profile.activities = {'massage_give': 0.0}
+    profile.updated_at = profile.updated_at + timedelta(seconds=1)
+    db_session.commit()
+
+    profiles = gameplay._session_profiles(session)
+    assert profiles[str(user_id)]['activities'] == {'massage_give': 0.0}
+    assert session.profile_snapshots[str(user_id)]['activities'] == {'massage_give': 0.0}
+
+
+def test_snapshot_follows_current_profile(player, db_session):
+    user_id, _ = player
+    session = _session(user_id)
+    gameplay._session_profiles(session)
+
+    retake = Profile(
+        user_id=user_id, submission_id=f"retake_{user_id}",
+        power_dynamic={'orientation': 'Bottom'}, arousal_propensity={}, domain_scores={},
+        activities={'massage_give': 0.5}, truth_topics={}, boundaries={}, anatomy={},
+    )
+    db_session.add(retake)
+    db_session.flush()
+    db_session.get(User, user_id).current_profile_id = retake.id
+    db_session.commit()
+
+    profiles = gameplay._session_profiles(session)
+    assert profiles[str(user_id)]['id'] == retake.id
+    assert profiles[str(user_id)]['power_dynamic'] == {'orientation': 'Bottom'}
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+def test_snapshot_stored_with_game_session(client, player, db_session):
+    user_id, _ = player
+    token = jwt.encode({"sub": str(user_id), "aud": "authenticated"}, "test-secret-key", algorithm="HS256")
+    headers = {'Authorization': f'Bearer {token}'}
+
+    resp = client.post('/api/game/start', json={
+        "players": [{"id": str(user_id), "name": "Alex", "anatomy": ["vagina"]},
+                    {"name": "Sam", "anatomy": ["penis"]}],
+        "settings": {"intimacy_level": 3}
+    }, headers=headers)
+    assert resp.status_code == 200
+    session_id = resp.get_json()['session_id']
+
+    stored = db_session.get(Session, session_id)
+    assert stored.profile_snapshots[str(user_id)]['power_dynamic'] == {'orientation': 'Top'}
+
+    resp = client.post(f'/api/game/{session_id}/next', json={}, headers=headers)
+    assert resp.status_code == 200
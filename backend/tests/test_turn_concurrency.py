@@ -0,0 +1,117 @@
+"""
+Concurrent /next calls for one session (optimistic turn_version check).
+
+Runs against a file-backed SQLite app so every request thread has its own
+connection and transaction, unlike the shared in-memory test database.
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from backend.src.extensions import db
+from backend.src.game import pair_ranking
+from backend.src.game.recency import clear_recency_cache
+from backend.src.main import create_app
+from backend.src.models.activity_history import UserActivityHistory
+from backend.src.models.session import Session
+from backend.src.models.user import User
+
+PARALLEL = 4
+
+
+@pytest.fixture
+def file_app(app, tmp_path, bank_activities):
+    with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{tmp_path / 'game.db'}"}):
+        file_app = create_app()
+    file_app.config['TESTING'] = True
+
+    with file_app.app_context():
+        db.session.add_all(bank_activities)
+        db.session.commit()
+    pair_ranking._rankings.clear()
+    clear_recency_cache()
+
+    yield file_app
+
+    pair_ranking._rankings.clear()
+    clear_recency_cache()
+    with file_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def start_session(file_app, start_game):
+    user_id = uuid.uuid4()
+    with file_app.app_context():
+        db.session.add(User(id=user_id, email=f"{user_id.hex[:10]}@test.com", display_name='Alex'))
+        db.session.commit()
+
+    resp = start_game(user_id, client=file_app.test_client())
+    assert resp.status_code == 200
+    return user_id, resp.get_json()['session_id']
+
+
+def parallel_next(file_app, headers, session_id, body):
+    barrier = threading.Barrier(PARALLEL)
+
+    def call():
+        client = file_app.test_client()
+        barrier.wait()
+        return client.post(f'/api/game/{session_id}/next', json=body, headers=headers)
+
+    with ThreadPoolExecutor(PARALLEL) as pool:
+        futures = [pool.submit(call) for _ in range(PARALLEL)]
+        responses = [future.result() for future in futures]
+    assert all(resp.status_code == 200 for resp in responses)
+    return [resp.get_json() for resp in responses]
+
+
+def stored(file_app, user_id, session_id):
+    with file_app.app_context():
+        session = db.session.get(Session, session_id)
+        played = UserActivityHistory.query.filter_by(session_id=session_id).count()
+        charged = db.session.get(User, user_id).lifetime_activity_count
+        return session.turn_version, session.current_turn_state['queue'], played, charged
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+class TestParallelNext:
+    def test_double_tap_advances_once(self, file_app, start_game, auth_headers):
+        user_id, session_id = start_session(file_app, start_game)
+
+        results = parallel_next(file_app, auth_headers(user_id), session_id, {"turn_version": 0})
+
+        assert sum(not data.get('conflict') for data in results) == 1
+        assert len({data['current_turn']['card_id'] for data in results}) == 1
+        assert {data['turn_version'] for data in results} == {1}
+        version, queue, played, charged = stored(file_app, user_id, session_id)
+        assert (version, played, charged) == (1, 1, 2)  # start charged the first card
+        assert [entry['step'] for entry in queue] == [2, 3, 4]
+
+    def test_every_advance_is_saved_and_charged_once(self, file_app, start_game, auth_headers):
+        user_id, session_id = start_session(file_app, start_game)
+
+        results = parallel_next(file_app, auth_headers(user_id), session_id, {})
+
+        advanced = sum(not data.get('conflict') for data in results)
+        version, queue, played, charged = stored(file_app, user_id, session_id)
+        assert advanced >= 1
+        assert (version, played, charged) == (advanced, advanced, advanced + 1)
+        assert [entry['step'] for entry in queue] == [advanced + 1, advanced + 2, advanced + 3]
+
+    @pytest.mark.parametrize('seeded_bank', [{'subscription_tier': 'free'}], indirect=True)
+    def test_losing_request_neither_charges_nor_records(self, client, seeded_bank, start_game, auth_headers):
+        user_id = seeded_bank
+        session_id = start_game(user_id).get_json()['session_id']
+
+        with patch('backend.src.routes.gameplay._save_turn_state', return_value=False), \
+                patch('backend.src.routes.gameplay.EntitlementService.charge') as charge:
+            resp = client.post(f'/api/game/{session_id}/next', json={}, headers=auth_headers(user_id))
+
+        assert resp.get_json()['conflict'] is True
+        charge.assert_not_called()
+        assert UserActivityHistory.query.filter_by(session_id=session_id).count() == 0
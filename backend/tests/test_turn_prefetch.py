@@ -0,0 +1,96 @@
+"""
+Tests for background card prefetch (src/game/prefetch.py).
+"""
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import update
+
+from backend.src.game import prefetch, turn_queue
+from backend.src.models.session import Session
+from backend.src.models.user import User
+from backend.src.routes import gameplay
+
+
+def start(start_game, user_id):
+    return start_game(user_id).get_json()['session_id']
+
+
+def stored_queue(db_session, session_id):
+    db_session.expire_all()
+    return db_session.get(Session, session_id).current_turn_state['queue']
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+class TestTopUp:
+    def test_next_pops_prefetched_card(self, client, db_session, seeded_bank, start_game, auth_headers):
+        user_id = seeded_bank
+        session_id = start(start_game, user_id)
+
+        assert prefetch.top_up(session_id, str(user_id), depth=6) == 3
+        queue = stored_queue(db_session, session_id)
+        assert [entry['step'] for entry in queue] == [1, 2, 3, 4, 5, 6]
+
+        with patch.object(gameplay, '_generate_turn_data') as generate:
+            resp = client.post(f'/api/game/{session_id}/next', json={}, headers=auth_headers(user_id))
+
+        generate.assert_not_called()
+        data = resp.get_json()
+        assert [turn['step'] for turn in data['queue']] == [2, 3, 4]
+        assert stored_queue(db_session, session_id) == queue[1:]
+
+    @pytest.mark.parametrize('seeded_bank', [{'subscription_tier': 'free', 'lifetime_activity_count': 5}],
+                             indirect=True)
+    def test_capped_player_prefetches_remaining_credits(self, db_session, seeded_bank, start_game):
+        user_id = seeded_bank
+        session_id = start(start_game, user_id)  # charges the head: 6 used, 4 left, 2 queued unpaid
+
+        assert prefetch.top_up(session_id, str(user_id), depth=6) == 2
+        assert len(stored_queue(db_session, session_id)) == 5
+
+    def test_discarded_when_session_advanced(self, db_session, seeded_bank, start_game):
+        user_id = seeded_bank
+        session_id = start(start_game, user_id)
+        advanced = stored_queue(db_session, session_id)[1:]
+        generate = gameplay._generate_turn_data
+
+        def next_meanwhile(*args, **kwargs):
+            db_session.execute(update(Session).where(Session.session_id == session_id)
+                               .values(current_turn_state={"queue": advanced, "step": 2}, turn_version=1))
+            db_session.commit()
+            return generate(*args, **kwargs)
+
+        with patch.object(gameplay, '_generate_turn_data', side_effect=next_meanwhile):
+            assert prefetch.top_up(session_id, str(user_id), depth=6) == 0
+        assert stored_queue(db_session, session_id) == advanced
+
+    @pytest.mark.parametrize('seeded_bank', [{'subscription_tier': 'free', 'lifetime_activity_count': 0}],
+                             indirect=True)
+    def test_limit_reached_during_prefetch_scrubs(self, db_session, seeded_bank, start_game):
+        user_id = seeded_bank
+        session_id = start(start_game, user_id)
+        generate = gameplay._generate_turn_data
+
+        def spend_credits(*args, **kwargs):
+            db_session.execute(update(User).where(User.id == user_id).values(lifetime_activity_count=10))
+            return generate(*args, **kwargs)
+
+        with patch.object(gameplay, '_generate_turn_data', side_effect=spend_credits):
+            assert prefetch.top_up(session_id, str(user_id), depth=6) == 3
+
+        queue = stored_queue(db_session, session_id)
+        assert not turn_queue.is_limit(queue[0])
+        assert all(turn_queue.is_limit(entry) for entry in queue[1:])
+
+
+def test_schedule_once_per_session(app):
+    executor = MagicMock()
+    with app.test_request_context(), patch.object(prefetch, '_get_executor', return_value=executor):
+        assert not prefetch.schedule('s1', 'owner')  # testing app
+        with patch.dict(app.config, {'TESTING': False}):
+            assert prefetch.schedule('s1', 'owner')
+            assert not prefetch.schedule('s1', 'owner')
+    prefetch._inflight.clear()
+
+    executor.submit.assert_called_once()
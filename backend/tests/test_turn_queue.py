@@ -0,0 +1,86 @@
+"""
+Tests for compact turn queue storage (src/game/turn_queue.py): session state
+holds only selection results, responses are rendered from the activity bank.
+"""
+import os
+from unittest.mock import patch
+
+from backend.src.game import turn_queue
+from backend.src.game.text_resolver import resolve_activity_text
+from backend.src.models.activity import Activity
+from backend.src.models.session import Session
+
+COMPACT_KEYS = {"activity_id", "type", "step", "primary_idx", "secondary_idx"}
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+class TestCompactQueue:
+    def test_state_stores_ids_only(self, db_session, seeded_bank, start_game):
+        resp = start_game(seeded_bank)
+        assert resp.status_code == 200
+
+        session = db_session.get(Session, resp.get_json()['session_id'])
+        stored = session.current_turn_state['queue']
+        assert len(stored) == 3
+        assert all(set(entry) == COMPACT_KEYS for entry in stored)
+        assert [entry['step'] for entry in stored] == [1, 2, 3]
+        assert [entry['primary_idx'] for entry in stored] == [0, 1, 0]
+
+    def test_response_rendered_from_bank(self, db_session, seeded_bank, start_game):
+        data = start_game(seeded_bank).get_json()
+        session = db_session.get(Session, data['session_id'])
+
+        for turn, entry in zip(data['queue'], session.current_turn_state['queue']):
+            activity = db_session.get(Activity, entry['activity_id'])
+            primary, secondary = ('Alex', 'Sam') if entry['primary_idx'] == 0 else ('Sam', 'Alex')
+            assert turn['card_id'] == turn['card']['card_id'] == str(activity.activity_id)
+            assert turn['card']['type'] == activity.type.upper()
+            assert turn['card']['primary_player'] == primary
+            assert turn['card']['secondary_players'] == [secondary]
+            assert turn['card']['display_text'] == resolve_activity_text(
+                activity.script['steps'][0]['do'], primary, secondary
+            )
+            assert secondary in turn['card']['display_text']
+            assert turn['card']['intensity_rating'] == activity.intensity
+            assert turn['progress'] == {'current_step': turn['step'], 'total_steps': 25, 'intensity_phase': 'Warmup'}
+        assert data['current_turn'] == data['queue'][0]
+
+    def test_next_consumes_compact_head(self, client, db_session, seeded_bank, start_game, auth_headers):
+        data = start_game(seeded_bank).get_json()
+        second = data['queue'][1]
+
+        resp = client.post(f"/api/game/{data['session_id']}/next", json={}, headers=auth_headers(seeded_bank))
+
+        assert resp.status_code == 200
+        assert resp.get_json()['current_turn'] == second
+        session = db_session.get(Session, data['session_id'])
+        assert [entry['step'] for entry in session.current_turn_state['queue']] == [2, 3, 4]
+
+
+class TestFormat:
+    def test_rendered_entries_converted(self):
+        legacy = [
+            {"status": "SHOW_CARD", "primary_player_idx": 1, "step": 4, "card_id": "12",
+             "card": {"card_id": "12", "type": "DARE"}},
+            {"status": "SHOW_CARD", "primary_player_idx": -1, "step": 999, "card_id": "limit-barrier-x",
+             "card": {"card_id": "limit-barrier-y", "type": "LIMIT_REACHED"}},
+        ]
+        compact = turn_queue.compact_queue(legacy, num_players=2)
+
+        assert compact[0] == turn_queue.turn_entry(12, 'dare', 4, 1, 0)
+        assert turn_queue.is_limit(compact[1])
+        assert turn_queue.compact_queue(compact, num_players=2) == compact
+        assert turn_queue.compact_queue(None, num_players=2) == []
+
+    def test_fallback_and_limit_rendering(self):
+        players = [{"name": "Alex"}, {"name": "Sam"}]
+        barrier = turn_queue.limit_entry()
+        fallback, limit = (turn_queue.hydrate(entry, players, {}) for entry in (
+            turn_queue.turn_entry(None, 'truth', 26, 1, 0), barrier
+        ))
+
+        assert fallback['card_id'] == 'fallback'
+        assert fallback['card']['display_text'] == 'Tell Alex something you love about them.'
+        assert fallback['progress']['intensity_phase'] == 'Warmup'  # step 26 wraps to 1
+        assert limit['card']['type'] == 'LIMIT_REACHED'
+        assert limit['card_id'] == turn_queue.hydrate(barrier, players, {})['card_id']
@@ -0,0 +1,67 @@
+"""
+Tests for seeded turn generation (src/game/turn_rng.py) and the queue preview.
+"""
+import os
+import uuid
+from unittest.mock import patch
+
+from backend.src.game import turn_rng
+from backend.src.models.session import Session
+
+
+def start(start_game, user_id):
+    return start_game(user_id, player_order_mode='RANDOM').get_json()
+
+
+def test_streams_are_stable_and_distinct():
+    assert turn_rng.derive_seed(42, 'step', 3) == turn_rng.derive_seed(42, 'step', 3)
+    assert 0 <= turn_rng.derive_seed(42, 'step', 3) < 2 ** turn_rng.SEED_BITS
+    assert turn_rng.step_rng(42, 3).random() == turn_rng.step_rng(42, 3).random()
+    assert turn_rng.step_rng(42, 3).random() != turn_rng.step_rng(42, 4).random()
+    assert turn_rng.step_rng(42, 3).random() != turn_rng.step_rng(43, 3).random()
+
+
+@patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"})
+class TestSeededQueue:
+    def test_same_seed_replays_queue(self, db_session, seeded_bank, start_game):
+        with patch.object(turn_rng, 'new_seed', return_value=1234):
+            first, second = start(start_game, seeded_bank), start(start_game, seeded_bank)
+
+        queues = [db_session.get(Session, data['session_id']).current_turn_state['queue'] for data in (first, second)]
+        assert queues[0] == queues[1]
+        assert db_session.get(Session, first['session_id']).turn_seed == 1234
+
+    def test_preview_matches_next(self, client, db_session, seeded_bank, start_game, auth_headers):
+        data = start(start_game, seeded_bank)
+        session_id = data['session_id']
+        state_before = dict(db_session.get(Session, session_id).current_turn_state)
+
+        resp = client.get(f'/api/game/{session_id}/preview?count=3', headers=auth_headers(seeded_bank))
+        assert resp.status_code == 200
+        preview = resp.get_json()['preview']
+        assert len(preview) == 3
+        db_session.expire_all()
+        assert db_session.get(Session, session_id).current_turn_state == state_before
+
+        dealt = []
+        for _ in range(3):
+            turns = client.post(f'/api/game/{session_id}/next', json={}, headers=auth_headers(seeded_bank)).get_json()['queue']
+            dealt.append(turns[-1])
+        assert dealt == preview
+
+    def test_legacy_session_gets_seed(self, client, db_session, seeded_bank, start_game, auth_headers):
+        session_id = start(start_game, seeded_bank)['session_id']
+        session = db_session.get(Session, session_id)
+        session.turn_seed = None
+        db_session.commit()
+
+        resp = client.get(f'/api/game/{session_id}/preview?count=1', headers=auth_headers(seeded_bank))
+
+        assert resp.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Session, session_id).turn_seed is not None
+
+    def test_preview_requires_participant(self, client, seeded_bank, start_game, auth_headers):
+        session_id = start(start_game, seeded_bank)['session_id']
+        resp = client.get(f'/api/game/{session_id}/preview', headers=auth_headers(uuid.uuid4()))
+        assert resp.status_code == 403